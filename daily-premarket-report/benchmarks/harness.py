@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Benchmark Harness
+=================
+
+Times pipeline stages repeatably, records allocations and compares runs against stored JSON baselines
+"""
+
+import gc
+import json
+import logging
+import os
+import platform
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Callable, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NS_PER_MS = 1_000_000
+
+# A stage regresses when its p50 is this much slower than the baseline...
+DEFAULT_TOLERANCE = 0.25
+# ...and the slowdown is at least this large (sub-millisecond stages are mostly noise)
+DEFAULT_MIN_DELTA_MS = 0.5
+
+@dataclass
+class Stage:
+    """One measured unit of work; fn(state) is timed, setup() runs once beforehand and builds state"""
+    name: str
+    group: str
+    fn: Callable[[Any], Any]
+    setup: Callable[[], Any] = lambda: None
+    items: Callable[[Any], int] = lambda result: 1  # units of work per call, for throughput
+    repeat: Optional[int] = None
+
+@dataclass
+class StageResult:
+    name: str
+    group: str
+    runs: int
+    items: int
+    p50_ms: float
+    p95_ms: float
+    mean_ms: float
+    min_ms: float
+    throughput_per_s: float
+    alloc_peak_kib: float
+    alloc_net_kib: float
+    alloc_blocks: int
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.__dict__)
+
+@dataclass
+class Regression:
+    stage: str
+    metric: str
+    baseline: float
+    current: float
+
+    @property
+    def ratio(self) -> float:
+        return self.current / self.baseline if self.baseline else float('inf')
+
+    def __str__(self) -> str:
+        return f"{self.stage}: {self.metric} {self.baseline:.3f} -> {self.current:.3f} ({self.ratio:.2f}x)"
+
+def measure(stage: Stage, repeat: int = 30, warmup: int = 3) -> StageResult:
+    """Time repeated calls of a stage, then trace one extra call for allocations"""
+
+    state = stage.setup()
+    repeat = stage.repeat or repeat
+
+    result = None
+    for _ in range(warmup):
+        result = stage.fn(state)
+    items = stage.items(result) if result is not None else 1
+
+    timings = np.empty(repeat, dtype=np.int64)
+    gc_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for i in range(repeat):
+            start = time.perf_counter_ns()
+            stage.fn(state)
+            timings[i] = time.perf_counter_ns() - start
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    # Tracing slows the call down, so allocations come from a separate, untimed run
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base_size = tracemalloc.get_traced_memory()[0]
+        stage.fn(state)
+        current_size, peak_size = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+    finally:
+        tracemalloc.stop()
+    blocks = sum(stat.count_diff for stat in after.compare_to(before, 'filename') if stat.count_diff > 0)
+
+    timings_ms = timings / NS_PER_MS
+    p50 = float(np.percentile(timings_ms, 50))
+    return StageResult(
+        name=stage.name,
+        group=stage.group,
+        runs=repeat,
+        items=items,
+        p50_ms=round(p50, 4),
+        p95_ms=round(float(np.percentile(timings_ms, 95)), 4),
+        mean_ms=round(float(timings_ms.mean()), 4),
+        min_ms=round(float(timings_ms.min()), 4),
+        throughput_per_s=round(items / (p50 / 1000), 1) if p50 else 0.0,
+        alloc_peak_kib=round((peak_size - base_size) / 1024, 1),
+        alloc_net_kib=round((current_size - base_size) / 1024, 1),
+        alloc_blocks=int(blocks)
+    )
+
+def run_stages(stages: List[Stage], repeat: int = 30, warmup: int = 3) -> Dict[str, Any]:
+    """Measure every stage and wrap the results with environment details"""
+
+    results = {}
+    for stage in stages:
+        try:
+            results[stage.name] = measure(stage, repeat, warmup).to_dict()
+            logger.info(f"{stage.name}: p50 {results[stage.name]['p50_ms']:.3f} ms")
+        except Exception as e:
+            logger.error(f"Benchmark stage {stage.name} failed: {e}")
+
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'environment': {
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'machine': platform.machine(),
+            'platform': platform.platform(terse=True),
+            'cpu_count': os.cpu_count()
+        },
+        'repeat': repeat,
+        'stages': results
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE,
+            min_delta_ms: float = DEFAULT_MIN_DELTA_MS) -> List[Regression]:
+    """Stages whose p50/p95 latency or peak allocation grew past the tolerance"""
+
+    regressions = []
+    for name, result in current['stages'].items():
+        reference = baseline.get('stages', {}).get(name)
+        if not reference:
+            continue
+
+        for metric in ('p50_ms', 'p95_ms'):
+            if (result[metric] > reference[metric] * (1 + tolerance)
+                    and result[metric] - reference[metric] >= min_delta_ms):
+                regressions.append(Regression(name, metric, reference[metric], result[metric]))
+
+        # Allocation peaks are deterministic enough to compare without a floor beyond 1 KiB
+        if (result['alloc_peak_kib'] > reference['alloc_peak_kib'] * (1 + tolerance)
+                and result['alloc_peak_kib'] - reference['alloc_peak_kib'] >= 1):
+            regressions.append(Regression(name, 'alloc_peak_kib', reference['alloc_peak_kib'],
+                                          result['alloc_peak_kib']))
+    return regressions
+
+def load_results(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_results(results: Dict[str, Any], path: Path) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    return path
+
+def format_table(results: Dict[str, Any], baseline: Dict[str, Any] = None) -> str:
+    """Plain-text summary, with the p50 change against the baseline when there is one"""
+
+    header = f"{'stage':<34}{'p50 ms':>10}{'p95 ms':>10}{'items/s':>12}{'peak KiB':>10}{'blocks':>8}"
+    if baseline:
+        header += f"{'vs base':>9}"
+    lines = [header, '-' * len(header)]
+
+    group = None
+    for name, result in results['stages'].items():
+        if result['group'] != group:
+            group = result['group']
+            lines.append(f"[{group}]")
+        line = (f"  {name:<32}{result['p50_ms']:>10.3f}{result['p95_ms']:>10.3f}"
+                f"{result['throughput_per_s']:>12,.0f}{result['alloc_peak_kib']:>10.1f}{result['alloc_blocks']:>8}")
+        reference = (baseline or {}).get('stages', {}).get(name)
+        if reference and reference['p50_ms']:
+            line += f"{(result['p50_ms'] / reference['p50_ms'] - 1) * 100:>+8.0f}%"
+        lines.append(line)
+    return '\n'.join(lines)
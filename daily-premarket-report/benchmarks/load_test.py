@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Provider Load Test
+==================
+
+Runs report-style collector fan-outs at increasing concurrency against the local provider stand-in and
+reports tail latency, throughput and how often providers throttled or failed.
+
+    python benchmarks/load_test.py --from-fixtures --concurrency 1 8 32 --error-rate 0.02
+    python benchmarks/load_test.py --cassettes http_cassettes --rate-limit finviz.com=5
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BENCH_DIR.parent / 'src'))
+
+from http_replay import CassetteStore
+from http_session import warm_pool
+from provider_standin import ProviderStandin
+from alphavantage_collector import AlphaVantageCollector
+from finviz_news_collector import FinvizNewsCollector
+from enhanced_data_collector import TradingViewCollector
+import circuit_breaker
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = BENCH_DIR / 'fixtures'
+
+# (method, url, fixture, content type) for the collectors the load test drives
+FIXTURE_RESPONSES = [
+    ('GET', 'https://finviz.com/news.ashx', 'finviz_news.html', 'text/html; charset=utf-8'),
+    ('GET', 'https://www.alphavantage.co/query?function=NEWS_SENTIMENT&limit=10',
+     'alphavantage_news_sentiment.json', 'application/json'),
+    ('POST', 'https://scanner.tradingview.com/america/scan', 'tradingview_scan.json', 'application/json'),
+]
+
+def seed_cassettes(store: CassetteStore) -> int:
+    """Cassettes built from the benchmark fixtures, for machines without recordings"""
+
+    for method, url, fixture, content_type in FIXTURE_RESPONSES:
+        content = (FIXTURE_DIR / fixture).read_bytes()
+        store.save(method, url, None, None, 200, 'OK', {'Content-Type': content_type}, content)
+    return len(FIXTURE_RESPONSES)
+
+async def report_fanout() -> float:
+    """One report's worth of provider calls, issued concurrently as in a real run; returns seconds"""
+
+    started = time.perf_counter()
+    await asyncio.gather(
+        FinvizNewsCollector().get_finviz_news(10),
+        AlphaVantageCollector('loadtest').get_market_news_with_sentiment(),
+        TradingViewCollector('loadtest').get_futures_data()
+    )
+    return time.perf_counter() - started
+
+async def run_level(standin: ProviderStandin, concurrency: int, jobs: int) -> Dict[str, Any]:
+    """Run jobs fan-outs with at most concurrency in flight"""
+
+    # Fresh breakers per level so one level's failures don't short-circuit the next
+    circuit_breaker._default_registry = None
+    before = standin.snapshot()
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def job() -> float:
+        async with semaphore:
+            return await report_fanout()
+
+    started = time.perf_counter()
+    latencies = np.array(await asyncio.gather(*(job() for _ in range(jobs)))) * 1000
+    elapsed = time.perf_counter() - started
+
+    after = standin.snapshot()
+    totals = {}
+    for host, counts in after.items():
+        for name, value in counts.items():
+            totals[name] = totals.get(name, 0) + value - before.get(host, {}).get(name, 0)
+
+    breakers = circuit_breaker.get_registry().get_status()
+    return {
+        'concurrency': concurrency,
+        'jobs': jobs,
+        'p50_ms': round(float(np.percentile(latencies, 50)), 2),
+        'p95_ms': round(float(np.percentile(latencies, 95)), 2),
+        'p99_ms': round(float(np.percentile(latencies, 99)), 2),
+        'max_ms': round(float(latencies.max()), 2),
+        'jobs_per_s': round(jobs / elapsed, 2),
+        'requests': totals.get('requests', 0),
+        'throttled': totals.get('throttled', 0),
+        'errors': totals.get('errors', 0),
+        'not_found': totals.get('not_found', 0),
+        'open_breakers': sorted(key for key, state in breakers.items() if state.get('state') != 'closed')
+    }
+
+async def run(args, cassette_dir: str) -> List[Dict[str, Any]]:
+    standin = ProviderStandin(cassette_dir, args.latency_ms, args.jitter_ms, args.error_rate,
+                              args.throttle_rate, dict(args.rate_limit), args.seed)
+    results = []
+    async with standin.running() as url, warm_pool(limit=args.pool_limit, limit_per_host=args.pool_limit):
+        logger.info(f"Stand-in at {url}")
+        for concurrency in args.concurrency:
+            result = await run_level(standin, concurrency, args.jobs)
+            results.append(result)
+            print(f"{concurrency:>5}{result['p50_ms']:>10.1f}{result['p95_ms']:>10.1f}{result['p99_ms']:>10.1f}"
+                  f"{result['max_ms']:>10.1f}{result['jobs_per_s']:>10.1f}{result['throttled']:>8}{result['errors']:>8}"
+                  f"  {', '.join(result['open_breakers'])}")
+    return results
+
+def _rate_limit(value: str):
+    host, _, rate = value.partition('=')
+    return host, float(rate)
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the collectors against the provider stand-in")
+    parser.add_argument("--cassettes", default=os.getenv('HTTP_CASSETTE_DIR', 'http_cassettes'),
+                        help="Recorded responses (HTTP_MODE=record captures them)")
+    parser.add_argument("--from-fixtures", action="store_true",
+                        help="Serve cassettes built from benchmarks/fixtures instead")
+    parser.add_argument("--concurrency", type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument("--jobs", type=int, default=64, help="Report fan-outs per concurrency level")
+    parser.add_argument("--latency-ms", type=float, default=80)
+    parser.add_argument("--jitter-ms", type=float, default=40)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--rate-limit", type=_rate_limit, action="append", default=[],
+                        help="host=requests_per_second (repeatable)")
+    parser.add_argument("--pool-limit", type=int, default=100, help="Shared connection pool size")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--verbose", action="store_true")
+    args = parser.parse_args()
+
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.CRITICAL)
+
+    with tempfile.TemporaryDirectory(prefix='premarket_load_') as work_dir:
+        # Breaker state from load tests must not leak into real runs
+        os.environ['CIRCUIT_STATE_FILE'] = os.path.join(work_dir, 'circuit_state.json')
+        cassette_dir = args.cassettes
+        if args.from_fixtures:
+            cassette_dir = os.path.join(work_dir, 'cassettes')
+            seed_cassettes(CassetteStore(cassette_dir))
+
+        print(f"{'conc':>5}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}{'jobs/s':>10}{'429s':>8}{'errors':>8}  open breakers")
+        results = asyncio.run(run(args, cassette_dir))
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'settings': {k: v for k, v in vars(args).items() if k != 'output'}, 'levels': results},
+                      f, indent=2)
+        print(f"\nResults saved to {args.output}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
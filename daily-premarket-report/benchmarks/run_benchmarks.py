@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Report Pipeline Benchmarks
+==========================
+
+Offline benchmarks for every collector parser, analyzer, codec and renderer, run against recorded fixtures.
+
+    python benchmarks/run_benchmarks.py                    # run and compare against the baseline
+    python benchmarks/run_benchmarks.py --only renderers   # one group, or stages whose name contains the text
+    python benchmarks/run_benchmarks.py --update-baseline  # accept the current numbers
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Any
+
+import numpy as np
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.append(str(BENCH_DIR.parent / 'src'))
+sys.path.append(str(BENCH_DIR))
+
+from harness import Stage, run_stages, compare, load_results, save_results, format_table, DEFAULT_TOLERANCE
+
+from alphavantage_collector import AlphaVantageCollector
+from finviz_news_collector import FinvizNewsCollector
+from forexfactory_collector import ForexFactoryCollector
+from enhanced_data_collector import TradingViewCollector, FinvizCollector
+from report_generator import NewsAnalyzer
+from sector_rotation import SectorRotationEngine
+from risk_model import RiskModel
+from price_matrix import PriceMatrix
+from bar_store import BarStore
+from symbol_universe import UNIVERSE
+from report_model import ReportModel, SECTION_BUILDERS
+from pdf_generator import PDFReportGenerator
+from notion_report_generator import NotionReportGenerator
+from audio_generator import AudioReportGenerator
+import report_codec
+
+logger = logging.getLogger(__name__)
+
+FIXTURE_DIR = BENCH_DIR / 'fixtures'
+BASELINE_PATH = BENCH_DIR / 'baselines' / 'baseline.json'
+RESULTS_DIR = BENCH_DIR / 'results'
+
+# Recorded calendar pages are parsed as of the day they were captured
+FIXTURE_DATE = datetime(2026, 7, 14)
+
+def fixture_text(name: str) -> str:
+    with open(FIXTURE_DIR / name, 'r') as f:
+        return f.read()
+
+def fixture_json(name: str) -> Any:
+    return json.loads(fixture_text(name))
+
+def synthetic_bar_store(root_dir: str, symbols: List[str], days: int = 400, seed: int = 42) -> BarStore:
+    """Bar store filled with a seeded random walk per symbol (stands in for a year of downloaded bars)"""
+
+    rng = np.random.default_rng(seed)
+    store = BarStore(root_dir)
+    start_ms = int(datetime(2025, 1, 2).timestamp()) * 1000
+    t = start_ms + np.arange(days, dtype=np.int64) * 86_400_000
+
+    for symbol in symbols:
+        closes = 100 * np.exp(np.cumsum(rng.normal(0.0003, 0.012, days)))
+        volumes = rng.integers(1_000_000, 50_000_000, days)
+        store.append(symbol, [
+            {'t': int(t[i]), 'o': float(closes[i]), 'h': float(closes[i] * 1.01),
+             'l': float(closes[i] * 0.99), 'c': float(closes[i]), 'v': float(volumes[i])}
+            for i in range(days)
+        ])
+    return store
+
+def build_stages(work_dir: str) -> List[Stage]:
+    """Every benchmarked stage, in pipeline order"""
+
+    loop = asyncio.new_event_loop()
+    report = report_codec.load(FIXTURE_DIR / 'report.json')
+    encoded = report_codec.dumps(report)
+
+    sectors = UNIVERSE.symbol_map('sectors', 'yfinance')
+    risk_symbols = RiskModel(bar_store=BarStore(os.path.join(work_dir, 'unused'))).symbols
+    bar_symbols = sorted(set(sectors) | {'SPY'} | set(risk_symbols))
+
+    def bars():
+        return synthetic_bar_store(os.path.join(work_dir, 'bars'), bar_symbols)
+
+    def sector_matrix():
+        store = bars()
+        return PriceMatrix.build(store, ['SPY'] + list(sectors), os.path.join(work_dir, 'sector_matrix'))
+
+    def risk_model():
+        model = RiskModel(bar_store=bars())
+        model.compute()  # builds the memory-mapped matrix the timed calls reopen
+        return model
+
+    pdf_path = os.path.join(work_dir, 'benchmark_report.pdf')
+
+    return [
+        # Collectors: parsing recorded provider responses
+        Stage('alphavantage.news_sentiment', 'collectors',
+              lambda data: AlphaVantageCollector('benchmark')._parse_news_sentiment(data),
+              setup=lambda: fixture_json('alphavantage_news_sentiment.json'),
+              items=lambda result: len(result[0])),
+        Stage('alphavantage.earnings_csv', 'collectors',
+              lambda csv: AlphaVantageCollector('benchmark')._parse_earnings_csv(
+                  csv, start=FIXTURE_DATE, end=FIXTURE_DATE + timedelta(days=30)),
+              setup=lambda: fixture_text('alphavantage_earnings.csv'), items=len),
+        Stage('finviz.news_html', 'collectors',
+              lambda html: FinvizNewsCollector()._parse_finviz_news(html, 20),
+              setup=lambda: fixture_text('finviz_news.html'), items=len),
+        Stage('finviz.sector_html', 'collectors',
+              lambda html: FinvizCollector()._parse_sector_performance(html),
+              setup=lambda: fixture_text('finviz_sectors.html'), items=len),
+        Stage('forexfactory.calendar_html', 'collectors',
+              lambda html: ForexFactoryCollector()._parse_economic_calendar(html, FIXTURE_DATE),
+              setup=lambda: fixture_text('forexfactory_calendar.html'), items=len),
+        Stage('tradingview.scan_json', 'collectors',
+              lambda data: TradingViewCollector('benchmark')._parse_tradingview_data(data),
+              setup=lambda: fixture_json('tradingview_scan.json'), items=len),
+
+        # Analyzers
+        Stage('news.sentiment_impact', 'analyzers',
+              lambda news: loop.run_until_complete(NewsAnalyzer().analyze_sentiment_impact(news)),
+              setup=lambda: report.news_events, items=lambda _: len(report.news_events)),
+        Stage('sector_rotation.analyze', 'analyzers',
+              lambda matrix: SectorRotationEngine(benchmark='SPY').analyze(matrix, sectors),
+              setup=sector_matrix, items=lambda _: len(sectors)),
+        Stage('risk_model.compute', 'analyzers', lambda model: model.compute(),
+              setup=risk_model, items=lambda _: len(risk_symbols), repeat=10),
+
+        # Archive codec
+        Stage('report_codec.dumps', 'codec', report_codec.dumps, setup=lambda: report),
+        Stage('report_codec.loads', 'codec', report_codec.loads, setup=lambda: encoded),
+
+        # Renderers (each from a cold generator, so no section cache is reused)
+        Stage('report_model.build', 'renderers',
+              lambda data: ReportModel(data.date, tuple(build(data) for build in SECTION_BUILDERS)),
+              setup=lambda: report),
+        Stage('notion.page_blocks', 'renderers',
+              lambda data: NotionReportGenerator('benchmark')._build_page_structure(data),
+              setup=lambda: report, items=len),
+        Stage('audio.script', 'renderers',
+              lambda data: AudioReportGenerator('').generate_audio_script(data),
+              setup=lambda: report),
+        Stage('pdf.render', 'renderers',
+              lambda data: PDFReportGenerator().generate_pdf_report(data, pdf_path),
+              setup=lambda: report, repeat=5),
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline report pipeline benchmarks")
+    parser.add_argument("--repeat", type=int, default=30, help="Timed calls per stage")
+    parser.add_argument("--warmup", type=int, default=3, help="Untimed calls per stage before timing")
+    parser.add_argument("--only", action="append", default=[],
+                        help="Run a stage group, or stages whose name contains this text (repeatable)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH), help="Baseline JSON to compare against")
+    parser.add_argument("--output", help="Where to write this run's JSON (default: benchmarks/results/)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before a stage is flagged (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true", help="Save this run as the new baseline")
+    parser.add_argument("--verbose", action="store_true", help="Show collector and renderer logging")
+    args = parser.parse_args()
+
+    # Some collectors configure logging on import, so set the root level directly
+    logging.basicConfig(format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.ERROR)
+
+    with tempfile.TemporaryDirectory(prefix='premarket_bench_') as work_dir:
+        stages = build_stages(work_dir)
+        if args.only:
+            stages = [stage for stage in stages if any(text == stage.group or text in stage.name for text in args.only)]
+        results = run_stages(stages, args.repeat, args.warmup)
+
+    baseline_path = Path(args.baseline)
+    baseline = load_results(baseline_path)
+    print(format_table(results, baseline))
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    save_results(results, output)
+    print(f"\nResults saved to {output}")
+
+    if args.update_baseline:
+        if baseline and args.only:
+            # Partial runs only replace the stages they measured
+            results = {**results, 'stages': {**baseline['stages'], **results['stages']}}
+        save_results(results, baseline_path)
+        print(f"Baseline updated: {baseline_path}")
+        return 0
+
+    if baseline is None:
+        print(f"No baseline at {baseline_path}; run with --update-baseline to create one")
+        return 0
+
+    regressions = compare(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {baseline_path.name}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nNo regressions against {baseline_path.name} (tolerance {args.tolerance:.0%})")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
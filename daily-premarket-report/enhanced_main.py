@@ -15,15 +15,12 @@ from pathlib import Path
 from datetime import datetime
 import pytz
 import argparse
+from functools import cached_property
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.enhanced_report_generator import EnhancedReportGenerator
-from src.pdf_generator import PDFReportGenerator
-from src.audio_generator import AudioReportGenerator
-from src.integrated_scheduler import IntegratedReportSystem
-from src.notion_integration import NotionIntegration
+# The report pipeline is imported by the commands that use it, so --enhanced-status starts without it
 
 # Configure logging
 logging.basicConfig(
@@ -42,17 +39,27 @@ class EnhancedDailyReportSystem:
         # Load enhanced configuration
         self.config = self._load_enhanced_config()
         
-        # Initialize enhanced components
-        self.report_generator = EnhancedReportGenerator(
+        # Ensure output directory exists
+        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+    
+    @cached_property
+    def report_generator(self):
+        from src.enhanced_report_generator import EnhancedReportGenerator
+        return EnhancedReportGenerator(
             tradingview_username=self.config.get("tradingview", {}).get("username", "auitenbroek"),
             tradingview_key=self.config.get("tradingview", {}).get("password"),
             fiscal_ai_key=self.config.get("fiscal_ai", {}).get("api_key")
         )
-        self.pdf_generator = PDFReportGenerator()
-        self.audio_generator = AudioReportGenerator()
-        
-        # Ensure output directory exists
-        Path(self.output_dir).mkdir(parents=True, exist_ok=True)
+    
+    @cached_property
+    def pdf_generator(self):
+        from src.pdf_generator import PDFReportGenerator
+        return PDFReportGenerator()
+    
+    @cached_property
+    def audio_generator(self):
+        from src.audio_generator import AudioReportGenerator
+        return AudioReportGenerator()
     
     def _load_enhanced_config(self) -> dict:
         """Load enhanced data configuration"""
@@ -69,12 +76,15 @@ class EnhancedDailyReportSystem:
     async def generate_enhanced_example_report(self):
         """Generate an enhanced example report using premium data"""
         
+        from src.tracing import span, RENDER
+        
         logger.info("=== Generating Enhanced Example Report with Premium Data ===")
         
         try:
             # Generate enhanced report data
             logger.info("Step 1: Collecting premium market data (TradingView, Finviz)...")
-            report_data = await self.report_generator.generate_enhanced_daily_report()
+            with span('collect'):
+                report_data = await self.report_generator.generate_enhanced_daily_report()
             
             # Create enhanced output directory
             now = datetime.now(self.central_tz)
@@ -86,13 +96,15 @@ class EnhancedDailyReportSystem:
             logger.info("Step 2: Generating enhanced PDF report...")
             pdf_filename = f"enhanced_daily_premarket_report_{timestamp}.pdf"
             pdf_path = os.path.join(example_dir, pdf_filename)
-            self.pdf_generator.generate_pdf_report(report_data, pdf_path)
+            with span('pdf', RENDER):
+                self.pdf_generator.generate_pdf_report(report_data, pdf_path)
             
             # Generate enhanced audio
             logger.info("Step 3: Generating enhanced audio report...")
-            audio_result = await self.audio_generator.generate_complete_audio_report(
-                report_data, example_dir
-            )
+            with span('audio', RENDER):
+                audio_result = await self.audio_generator.generate_complete_audio_report(
+                    report_data, example_dir
+                )
             
             # Save enhanced metadata
             metadata = {
@@ -165,6 +177,8 @@ class EnhancedDailyReportSystem:
     def show_enhanced_system_status(self):
         """Show enhanced system status"""
         
+        from src.circuit_breaker import get_registry
+        
         print("\n" + "="*70)
         print("ENHANCED DAILY PREMARKET REPORT SYSTEM STATUS")
         print("="*70)
@@ -192,6 +206,15 @@ class EnhancedDailyReportSystem:
         fiscal_status = "✅ ENABLED" if fiscal_config.get("enabled") and fiscal_config.get("api_key") else "⏭️ AVAILABLE"
         print(f"   • fiscal.ai: {fiscal_status}")
         
+        # Source health from the persisted circuit breakers
+        breaker_status = get_registry().get_status()
+        if breaker_status:
+            print(f"\n🩺 Source Health:")
+            for key, state in sorted(breaker_status.items()):
+                status = "✅" if state["state"] == "closed" else "⛔" if state["state"] == "open" else "🔄"
+                detail = f" ({state['last_error']})" if state["state"] != "closed" and state.get("last_error") else ""
+                print(f"   {status} {key}: {state['state']}{detail}")
+        
         # Enhanced features
         print(f"\n🚀 Enhanced Features:")
         features = self.config.get("enhanced_features", {})
@@ -213,6 +236,19 @@ class EnhancedDailyReportSystem:
         
         print("="*70)
 
+async def run_profiled(args, system: EnhancedDailyReportSystem):
+    """Generate the enhanced example report under the sampling profiler and/or tracemalloc"""
+    
+    from src.profiling import profile_run
+    
+    with profile_run(args.profile_dir, cpu=args.profile, memory=args.profile_memory,
+                     top=args.profile_top) as profiler:
+        await system.generate_enhanced_example_report()
+    
+    print("\n" + profiler.summary())
+    for kind, path in profiler.outputs.items():
+        print(f"📈 {kind}: {path}")
+
 async def main():
     """Enhanced main entry point"""
     
@@ -225,6 +261,14 @@ async def main():
                        help="Setup enhanced data configuration")
     parser.add_argument("--output-dir", default="enhanced_reports",
                        help="Output directory for reports")
+    parser.add_argument("--profile", action="store_true",
+                       help="Profile one enhanced report run with the sampling CPU profiler (flamegraph-ready cpu.folded)")
+    parser.add_argument("--profile-memory", action="store_true",
+                       help="Profile one enhanced report run with tracemalloc (top allocations per pipeline stage)")
+    parser.add_argument("--profile-dir", default=None,
+                       help="Where profiles are written (default: PROFILE_DIR or profiles/)")
+    parser.add_argument("--profile-top", type=int, default=15,
+                       help="Functions and allocation sites listed per profile section")
     
     args = parser.parse_args()
     
@@ -237,7 +281,10 @@ async def main():
     # Initialize enhanced system
     system = EnhancedDailyReportSystem(args.output_dir)
     
-    if args.enhanced_example:
+    if args.profile or args.profile_memory:
+        await run_profiled(args, system)
+        
+    elif args.enhanced_example:
         # Generate enhanced example report
         await system.generate_enhanced_example_report()
         
@@ -253,6 +300,7 @@ async def main():
         print("  --enhanced-example    Generate enhanced example report")
         print("  --enhanced-status     Show enhanced system status")
         print("  --setup-config        Setup enhanced data configuration")
+        print("  --profile             Profile an enhanced report run (add --profile-memory for allocations)")
         print("\nFor detailed help: python enhanced_main.py --help")
         
         system.show_enhanced_system_status()
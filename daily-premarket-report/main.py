@@ -15,16 +15,13 @@ from pathlib import Path
 from datetime import datetime
 import pytz
 import argparse
+from functools import cached_property
 
 # Add src directory to path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.report_generator import ReportGenerator
-from src.pdf_generator import PDFReportGenerator
-from src.audio_generator import AudioReportGenerator
-from src.scheduler import DailyReportScheduler
-from src.integrated_scheduler import IntegratedReportSystem
-from src.notion_enhanced_system import NotionEnhancedReportSystem
+# Subsystems (and their pandas/yfinance/reportlab/openai dependencies) are imported by the
+# commands that use them, so --status and --help start without loading the report pipeline
 
 # Configure logging
 logging.basicConfig(
@@ -40,24 +37,41 @@ class DailyPremarketReportOrchestrator:
         self.output_dir = output_dir
         self.central_tz = pytz.timezone('US/Central')
         
-        # Initialize components
-        self.report_generator = ReportGenerator()
-        self.pdf_generator = PDFReportGenerator()
-        self.audio_generator = AudioReportGenerator()
-        self.scheduler = DailyReportScheduler(output_dir)
-        
         # Ensure output directory exists
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
     
+    @cached_property
+    def report_generator(self):
+        from src.report_generator import ReportGenerator
+        return ReportGenerator()
+    
+    @cached_property
+    def pdf_generator(self):
+        from src.pdf_generator import PDFReportGenerator
+        return PDFReportGenerator()
+    
+    @cached_property
+    def audio_generator(self):
+        from src.audio_generator import AudioReportGenerator
+        return AudioReportGenerator()
+    
+    @cached_property
+    def scheduler(self):
+        from src.scheduler import DailyReportScheduler
+        return DailyReportScheduler(self.output_dir)
+    
     async def generate_example_report(self):
         """Generate an example report for user approval"""
         
+        from src.tracing import span, RENDER
+        
         logger.info("=== Generating Example Daily Premarket Report ===")
         
         try:
             # Generate report data
             logger.info("Step 1: Collecting market data and generating analysis...")
-            report_data = await self.report_generator.generate_daily_report()
+            with span('collect'):
+                report_data = await self.report_generator.generate_daily_report()
             
             # Create example output directory
             now = datetime.now(self.central_tz)
@@ -69,13 +83,15 @@ class DailyPremarketReportOrchestrator:
             logger.info("Step 2: Generating professional PDF report...")
             pdf_filename = f"example_daily_premarket_report_{timestamp}.pdf"
             pdf_path = os.path.join(example_dir, pdf_filename)
-            self.pdf_generator.generate_pdf_report(report_data, pdf_path)
+            with span('pdf', RENDER):
+                self.pdf_generator.generate_pdf_report(report_data, pdf_path)
             
             # Generate audio
             logger.info("Step 3: Generating podcast-style audio report...")
-            audio_result = await self.audio_generator.generate_complete_audio_report(
-                report_data, example_dir
-            )
+            with span('audio', RENDER):
+                audio_result = await self.audio_generator.generate_complete_audio_report(
+                    report_data, example_dir
+                )
             
             # Print summary
             logger.info("=== Example Report Generation Complete ===")
@@ -112,7 +128,7 @@ class DailyPremarketReportOrchestrator:
             logger.error(f"Error generating example report: {e}")
             raise
     
-    def start_scheduler(self):
+    async def start_scheduler(self):
         """Start the daily scheduler"""
         logger.info("Starting Daily Premarket Report Scheduler...")
         print(f"\n⏰ Next Scheduled Report: {self.scheduler.get_next_scheduled_time()}")
@@ -121,11 +137,54 @@ class DailyPremarketReportOrchestrator:
         print("\nPress Ctrl+C to stop the scheduler")
         
         try:
-            self.scheduler.schedule_daily_reports()
-        except KeyboardInterrupt:
+            # Already inside the event loop, so run the daemon here rather than via asyncio.run
+            await self.scheduler.run_daemon()
+        except (KeyboardInterrupt, asyncio.CancelledError):
             print("\n🛑 Scheduler stopped by user")
             logger.info("Scheduler stopped by user")
     
+    async def run_backfill(self, start: str, end: str, workers: int, overwrite: bool = False):
+        """Regenerate the reports for past dates in parallel and add them to the report archive"""
+        
+        from src.backfill import ReportBackfill
+        
+        backfill = ReportBackfill(os.path.join(self.output_dir, "backfill"), workers)
+        print(f"⏪ Backfilling reports from {start} to {end} with {backfill.workers} workers...")
+        summary = await asyncio.to_thread(backfill.run, start, end, overwrite)
+        
+        print(f"✅ Built {len(summary['built'])} reports"
+              + (f" in {summary['seconds']:.1f}s" if 'seconds' in summary else "")
+              + (f", skipped {summary['skipped']} already archived" if summary['skipped'] else ""))
+        for date, error in sorted(summary['failed'].items()):
+            print(f"❌ {date}: {error}")
+        return summary
+    
+    async def run_watchlists(self, path: str = None, workers: int = 4):
+        """Collect once for every watchlist, then build and render a report per watchlist"""
+        
+        from src.enhanced_premarket_generator import EnhancedPremarketGenerator
+        from src.tracing import span, RENDER
+        from src.watchlists import load_watchlists, render_views
+        
+        watchlists = load_watchlists(path)
+        if not watchlists:
+            print("⚠️  No watchlists configured (set WATCHLISTS_FILE or pass a file to --watchlists)")
+            return None
+        
+        print(f"📋 Building reports for {len(watchlists)} watchlists from one collection pass...")
+        with span('collect'):
+            reports = await EnhancedPremarketGenerator().generate_watchlist_reports(watchlists)
+        with span('render', RENDER):
+            summary = await asyncio.to_thread(render_views, reports, os.path.join(self.output_dir, "watchlists"),
+                                              workers)
+        
+        names = {watchlist.slug: watchlist.name for watchlist in watchlists}
+        for slug, files in sorted(summary['rendered'].items()):
+            print(f"📄 {names[slug]}: {files['pdf']}")
+        for slug, error in sorted(summary['failed'].items()):
+            print(f"❌ {names[slug]}: {error}")
+        return summary
+    
     def show_system_status(self):
         """Show system status and configuration"""
         
@@ -154,6 +213,29 @@ class DailyPremarketReportOrchestrator:
         print("   • Distribution: Ready for Spotify/YouTube/Substack")
         print("="*60)
 
+async def run_profiled(args, orchestrator: DailyPremarketReportOrchestrator):
+    """Generate one report under the sampling profiler and/or tracemalloc and show where the time went"""
+    
+    from src.profiling import profile_run
+    
+    # The Notion test or page report when one is chosen, otherwise the example report
+    if args.test_notion:
+        from src.integrated_scheduler import IntegratedReportSystem
+        run = IntegratedReportSystem(args.output_dir).test_notion_integration
+    elif args.notion_page:
+        from src.notion_enhanced_system import NotionEnhancedReportSystem
+        run = NotionEnhancedReportSystem().generate_notion_daily_report
+    else:
+        run = orchestrator.generate_example_report
+    
+    with profile_run(args.profile_dir, cpu=args.profile, memory=args.profile_memory,
+                     top=args.profile_top) as profiler:
+        await run()
+    
+    print("\n" + profiler.summary())
+    for kind, path in profiler.outputs.items():
+        print(f"📈 {kind}: {path}")
+
 async def main():
     """Main entry point"""
     
@@ -170,30 +252,60 @@ async def main():
                        help="Generate Notion page report (instead of PDF)")
     parser.add_argument("--status", action="store_true",
                        help="Show system status")
+    parser.add_argument("--backfill", nargs=2, metavar=("START", "END"),
+                       help="Regenerate reports for the weekdays from START to END (YYYY-MM-DD)")
+    parser.add_argument("--backfill-workers", type=int, default=4,
+                       help="Worker processes building backfilled reports")
+    parser.add_argument("--backfill-overwrite", action="store_true",
+                       help="Rebuild dates that already have an archived report")
+    parser.add_argument("--watchlists", nargs="?", const="", metavar="FILE",
+                       help="Build a report per watchlist from one shared collection (default file: WATCHLISTS_FILE or watchlists.json)")
+    parser.add_argument("--watchlist-workers", type=int, default=4,
+                       help="Worker processes rendering watchlist reports")
     parser.add_argument("--output-dir", default="daily_reports",
                        help="Output directory for reports")
+    parser.add_argument("--profile", action="store_true",
+                       help="Profile one report run with the sampling CPU profiler (flamegraph-ready cpu.folded)")
+    parser.add_argument("--profile-memory", action="store_true",
+                       help="Profile one report run with tracemalloc (top allocations per pipeline stage)")
+    parser.add_argument("--profile-dir", default=None,
+                       help="Where profiles are written (default: PROFILE_DIR or profiles/)")
+    parser.add_argument("--profile-top", type=int, default=15,
+                       help="Functions and allocation sites listed per profile section")
     
     args = parser.parse_args()
     
     # Initialize orchestrator
     orchestrator = DailyPremarketReportOrchestrator(args.output_dir)
     
-    if args.example:
+    if args.profile or args.profile_memory:
+        await run_profiled(args, orchestrator)
+        
+    elif args.example:
         # Generate example report
         await orchestrator.generate_example_report()
         
+    elif args.backfill:
+        # Regenerate past reports
+        await orchestrator.run_backfill(*args.backfill, args.backfill_workers, args.backfill_overwrite)
+        
+    elif args.watchlists is not None:
+        # Per-watchlist reports from one collection pass
+        await orchestrator.run_watchlists(args.watchlists or None, args.watchlist_workers)
+        
     elif args.schedule:
         # Start scheduler
-        orchestrator.start_scheduler()
+        await orchestrator.start_scheduler()
         
     elif args.schedule_notion:
         # Start scheduler with Notion integration
         try:
+            from src.integrated_scheduler import IntegratedReportSystem
             integrated_system = IntegratedReportSystem(args.output_dir)
             print("🚀 Starting Daily Scheduler with Notion Integration")
             print(f"⏰ Next Report: {integrated_system.get_next_scheduled_time()}")
             print("💾 Reports will be automatically saved to Notion!")
-            integrated_system.schedule_integrated_daily_reports()
+            await integrated_system.run_daemon()
         except Exception as e:
             print(f"❌ Error starting integrated scheduler: {e}")
             print("💡 Make sure you've run the Notion setup first!")
@@ -201,6 +313,7 @@ async def main():
     elif args.test_notion:
         # Test Notion integration
         try:
+            from src.integrated_scheduler import IntegratedReportSystem
             integrated_system = IntegratedReportSystem(args.output_dir)
             print("🧪 Testing Notion Integration...")
             result = await integrated_system.test_notion_integration()
@@ -216,6 +329,7 @@ async def main():
     elif args.notion_page:
         # Generate Notion page report
         try:
+            from src.notion_enhanced_system import NotionEnhancedReportSystem
             notion_system = NotionEnhancedReportSystem()
             print("📄 Generating comprehensive Notion page report...")
             result = await notion_system.generate_example_notion_report()
@@ -242,6 +356,9 @@ async def main():
         print("  --test-notion     Test Notion integration")
         print("  --notion-page     Generate Notion page report (instead of PDF)")
         print("  --status          Show system status")
+        print("  --backfill S E    Regenerate reports for past dates S..E (YYYY-MM-DD)")
+        print("  --watchlists      Build a report per watchlist from one shared collection")
+        print("  --profile         Profile a report run (add --profile-memory for allocations)")
         print("\nFor detailed help: python main.py --help")
         
         orchestrator.show_system_status()
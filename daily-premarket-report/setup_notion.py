@@ -11,6 +11,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.notion_integration import NotionIntegration
+from src.report_archive import ReportArchive
 import json
 
 def main():
@@ -37,7 +38,7 @@ def main():
         
         # Set up workspace
         print("\n🏗️  Creating Notion workspace structure...")
-        workspace = notion.setup_workspace(PAGE_ID)
+        workspace = notion.setup_workspace(PAGE_ID, ReportArchive())
         
         print("✅ Workspace setup complete!")
         print(f"📊 Database ID: {workspace['database_id']}")
@@ -7,7 +7,6 @@ Collects market data, news, and sentiment analysis from Alpha Vantage API
 """
 
 import asyncio
-import aiohttp
 import logging
 import os
 from datetime import datetime, timedelta
@@ -15,13 +14,25 @@ from typing import Dict, List, Any, Optional
 import json
 
 try:
-    from .report_generator import MarketData, NewsItem
+    from . import clock
+    from .earnings_calendar import (EarningsCalendar, EarningsCsvParser, CHUNK_SIZE, horizon_end,
+                                    load_market_cap_tiers, parse_stream, parse_text)
+    from .market_data import MarketData, NewsItem, FrozenMarketData, now_ns
+    from .response_cache import get_response_cache, EARNINGS_TTL
+    from .single_flight import coalesce
+    from .http_session import shared_session
 except ImportError:
     # For direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-    from report_generator import MarketData, NewsItem
+    import clock
+    from earnings_calendar import (EarningsCalendar, EarningsCsvParser, CHUNK_SIZE, horizon_end,
+                                   load_market_cap_tiers, parse_stream, parse_text)
+    from market_data import MarketData, NewsItem, FrozenMarketData, now_ns
+    from response_cache import get_response_cache, EARNINGS_TTL
+    from single_flight import coalesce
+    from http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -57,7 +68,7 @@ class AlphaVantageCollector:
             
             self.requests_made += 1
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(self.base_url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -100,7 +111,7 @@ class AlphaVantageCollector:
                 
                 self.requests_made += 1
                 
-                async with aiohttp.ClientSession() as session:
+                async with shared_session() as session:
                     async with session.get(self.base_url, params=params) as response:
                         if response.status == 200:
                             data = await response.json()
@@ -117,14 +128,29 @@ class AlphaVantageCollector:
         
         return indicators
     
-    async def get_earnings_calendar(self) -> List[Dict[str, Any]]:
-        """Get earnings calendar from Alpha Vantage"""
+    async def get_earnings_calendar(self, start: str = None, end: str = None, symbols: List[str] = None,
+                                    tiers: List[str] = None, limit: int = None) -> List[Dict[str, Any]]:
+        """Upcoming earnings releases, soonest first, for a date window, symbols and/or market cap tiers"""
         
-        if self.requests_made >= self.max_requests:
-            logger.warning("Alpha Vantage rate limit reached")
-            return []
+        calendar = await self.get_earnings_index()
+        return calendar.select(start or clock.today(), end, symbols, tiers, limit)
+    
+    async def get_earnings_index(self) -> EarningsCalendar:
+        """The day's earnings calendar, streamed and parsed once a day (served from the response cache when fresh)"""
         
-        try:
+        if clock.is_historical():
+            # The feed only lists upcoming releases
+            logger.info("Alpha Vantage earnings calendar is not available for past dates")
+            return EarningsCalendar([])
+        
+        today = clock.today()
+        window_end = horizon_end(today)
+        
+        async def fetch() -> List[Dict[str, Any]]:
+            if self.requests_made >= self.max_requests:
+                logger.warning("Alpha Vantage rate limit reached")
+                return []
+            
             params = {
                 'function': 'EARNINGS_CALENDAR',
                 'apikey': self.api_key
@@ -132,19 +158,32 @@ class AlphaVantageCollector:
             
             self.requests_made += 1
             
-            async with aiohttp.ClientSession() as session:
+            # Rows are parsed as the body downloads and only the window's releases are kept
+            parser = EarningsCsvParser(today, window_end, tier_of=load_market_cap_tiers())
+            async with shared_session() as session:
                 async with session.get(self.base_url, params=params) as response:
-                    if response.status == 200:
-                        # Alpha Vantage returns CSV for earnings calendar
-                        csv_data = await response.text()
-                        return self._parse_earnings_csv(csv_data)
-                    else:
+                    if response.status != 200:
                         logger.warning(f"Alpha Vantage earnings API returned status {response.status}")
                         return []
+                    releases = await parse_stream(response.content.iter_chunked(CHUNK_SIZE), parser)
+            
+            # Alpha Vantage returns CSV for earnings calendar, but JSON for errors
+            if parser.error is not None:
+                logger.warning(f"Alpha Vantage earnings API error: {parser.error}")
+                return []
+            logger.info(f"Parsed {parser.rows_seen} earnings rows, kept {len(releases)} through {window_end}")
+            return releases
+        
+        try:
+            releases = await coalesce(
+                ('alphavantage', 'EARNINGS_CALENDAR', today),
+                lambda: get_response_cache().fetch('alphavantage', f"EARNINGS_CALENDAR:{today}", fetch, EARNINGS_TTL)
+            )
+            return EarningsCalendar(releases or [])
                         
         except Exception as e:
             logger.error(f"Error fetching Alpha Vantage earnings: {e}")
-            return []
+            return EarningsCalendar([])
     
     async def get_market_data(self, symbols: List[str]) -> Dict[str, MarketData]:
         """Get real-time market data for symbols"""
@@ -154,41 +193,58 @@ class AlphaVantageCollector:
         for symbol in symbols[:3]:  # Limit to 3 symbols to conserve API calls
             if self.requests_made >= self.max_requests:
                 break
-                
-            try:
-                params = {
-                    'function': 'GLOBAL_QUOTE',
-                    'symbol': symbol,
-                    'apikey': self.api_key
-                }
-                
-                self.requests_made += 1
-                
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(self.base_url, params=params) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            quote_data = data.get('Global Quote', {})
-                            
-                            if quote_data:
-                                market_data[symbol] = MarketData(
-                                    symbol=symbol,
-                                    current_price=float(quote_data.get('05. price', 0)),
-                                    change=float(quote_data.get('09. change', 0)),
-                                    change_percent=float(quote_data.get('10. change percent', '0%').replace('%', '')),
-                                    volume=int(float(quote_data.get('06. volume', 0))),
-                                    timestamp=datetime.now().isoformat()
-                                )
-                
-                # Small delay to respect rate limits
-                await asyncio.sleep(0.1)
-                
-            except Exception as e:
-                logger.warning(f"Error fetching market data for {symbol}: {e}")
-                continue
+            
+            quote = await self.get_quote(symbol)
+            if quote:
+                market_data[symbol] = quote
+            
+            # Small delay to respect rate limits
+            await asyncio.sleep(0.1)
         
         return market_data
     
+    async def get_quote(self, symbol: str) -> Optional[MarketData]:
+        """Get the latest GLOBAL_QUOTE for one symbol, shared by every caller in the run"""
+        
+        return await coalesce(('alphavantage', 'GLOBAL_QUOTE', symbol), lambda: self._fetch_quote(symbol))
+    
+    async def _fetch_quote(self, symbol: str) -> Optional[MarketData]:
+        """Fetch the latest GLOBAL_QUOTE for one symbol"""
+        
+        if self.requests_made >= self.max_requests:
+            return None
+        
+        try:
+            params = {
+                'function': 'GLOBAL_QUOTE',
+                'symbol': symbol,
+                'apikey': self.api_key
+            }
+            
+            self.requests_made += 1
+            
+            async with shared_session() as session:
+                async with session.get(self.base_url, params=params) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        quote_data = data.get('Global Quote', {})
+                        
+                        if quote_data:
+                            # Frozen: the quote is shared by every caller in the run
+                            return FrozenMarketData(
+                                symbol=symbol,
+                                current_price=float(quote_data.get('05. price', 0)),
+                                change=float(quote_data.get('09. change', 0)),
+                                change_percent=float(quote_data.get('10. change percent', '0%').replace('%', '')),
+                                volume=int(float(quote_data.get('06. volume', 0))),
+                                timestamp=now_ns()
+                            )
+            
+        except Exception as e:
+            logger.warning(f"Error fetching market data for {symbol}: {e}")
+        
+        return None
+    
     def _parse_news_sentiment(self, data: Dict) -> tuple[List[NewsItem], List[str]]:
         """Parse news sentiment data from Alpha Vantage"""
         
@@ -196,7 +252,8 @@ class AlphaVantageCollector:
         themes = set()
         
         try:
-            items = data.get('items', [])
+            # 'feed' holds the articles; 'items' is only their count
+            items = data.get('feed', [])
             
             for item in items:
                 # Extract news item data
@@ -310,38 +367,11 @@ class AlphaVantageCollector:
             logger.warning(f"Error extracting indicator value: {e}")
             return None
     
-    def _parse_earnings_csv(self, csv_data: str) -> List[Dict[str, Any]]:
-        """Parse earnings calendar CSV data"""
-        
-        earnings = []
+    def _parse_earnings_csv(self, csv_data: str, **filters) -> List[Dict[str, Any]]:
+        """Parse earnings calendar CSV data (see EarningsCsvParser for the filters)"""
         
         try:
-            lines = csv_data.strip().split('\n')
-            if len(lines) < 2:
-                return []
-            
-            headers = lines[0].split(',')
-            
-            for line in lines[1:21]:  # Limit to 20 earnings
-                values = line.split(',')
-                if len(values) >= len(headers):
-                    earnings_data = dict(zip(headers, values))
-                    
-                    # Extract key information
-                    symbol = earnings_data.get('symbol', '')
-                    name = earnings_data.get('name', '')
-                    report_date = earnings_data.get('reportDate', '')
-                    
-                    if symbol and report_date:
-                        earnings.append({
-                            'symbol': symbol,
-                            'company_name': name,
-                            'report_date': report_date,
-                            'source': 'Alpha Vantage'
-                        })
-            
-            return earnings
-            
+            return parse_text(csv_data, **filters)
         except Exception as e:
             logger.error(f"Error parsing earnings CSV: {e}")
             return []
@@ -356,7 +386,7 @@ class AlphaVantageCollector:
                 headline="Federal Reserve Maintains Current Interest Rate Policy",
                 summary="The Federal Reserve held interest rates steady, citing ongoing assessment of economic conditions and inflation trends in their latest policy decision.",
                 source="Alpha Vantage Economic Analysis",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=8.2
             ),
@@ -364,7 +394,7 @@ class AlphaVantageCollector:
                 headline="Technology Sector Shows Strong Earnings Performance",
                 summary="Major technology companies exceeded earnings expectations, driven by continued growth in cloud computing and artificial intelligence investments.",
                 source="Alpha Vantage Market Analysis",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=7.8
             ),
@@ -372,7 +402,7 @@ class AlphaVantageCollector:
                 headline="Energy Markets React to Global Supply Developments",
                 summary="Oil prices fluctuated following international supply chain updates and geopolitical developments affecting energy sector valuations.",
                 source="Alpha Vantage Energy Report",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=7.1
             )
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Artifact Store
+==============
+
+Content-addressed store for report outputs with dedup, per-month compressed bundles and an index
+"""
+
+import hashlib
+import logging
+import os
+import re
+import shutil
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Union
+
+try:
+    from .market_data import now_ns
+except ImportError:
+    from market_data import now_ns
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 1 << 20
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    size INTEGER NOT NULL,
+    bundle TEXT,            -- NULL while the blob is a loose file
+    offset INTEGER,
+    stored_size INTEGER,
+    codec TEXT NOT NULL DEFAULT 'raw'
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS artifacts (
+    date TEXT NOT NULL,
+    session TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    name TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES blobs (hash),
+    created_at INTEGER NOT NULL,
+    PRIMARY KEY (date, session, kind)
+);
+CREATE INDEX IF NOT EXISTS artifacts_hash ON artifacts (hash);
+"""
+
+def file_digest(path: Union[str, Path]) -> str:
+    """SHA-256 of a file, read in chunks"""
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class ArtifactStore:
+    """Stores each distinct output once, keyed by SHA-256, and indexes which run produced it"""
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = Path(root_dir or os.getenv('ARTIFACT_STORE_DIR', 'artifact_store'))
+        self.blob_dir = self.root_dir / 'blobs'
+        self.bundle_dir = self.root_dir / 'bundles'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.bundle_dir.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.root_dir / 'index.db'), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.blob_dir / digest[:2] / digest[2:]
+
+    def _blob(self, digest: str) -> Optional[sqlite3.Row]:
+        return self._conn.execute("SELECT * FROM blobs WHERE hash = ?", (digest,)).fetchone()
+
+    # Writing
+
+    def put_file(self, path: Union[str, Path], date: str, session: str = 'premarket', kind: str = None) -> str:
+        """Store a file (once per distinct content) and record it for a run; returns its hash"""
+
+        path = Path(path)
+        digest = file_digest(path)
+
+        with self._lock:
+            if self._blob(digest) is None:
+                blob_path = self._blob_path(digest)
+                blob_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = blob_path.with_suffix('.tmp')
+                shutil.copyfile(path, tmp_path)
+                os.replace(tmp_path, blob_path)
+                with self._conn:
+                    self._conn.execute("INSERT INTO blobs (hash, size) VALUES (?, ?)",
+                                       (digest, path.stat().st_size))
+            else:
+                logger.debug(f"Artifact {path.name} deduplicated as {digest[:12]}")
+
+            with self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?)",
+                    (date, session, kind or path.suffix.lstrip('.'), path.name, digest, now_ns())
+                )
+        return digest
+
+    def put_files(self, files: Dict[str, str], date: str, session: str = 'premarket') -> Dict[str, str]:
+        """Store {kind: path} outputs of one run; returns {kind: hash}, skipping missing files"""
+
+        hashes = {}
+        for kind, path in files.items():
+            if path and os.path.isfile(path):
+                hashes[kind] = self.put_file(path, date, session, kind)
+        return hashes
+
+    # Reading
+
+    def lookup(self, date: str, session: str = 'premarket') -> Dict[str, Dict[str, str]]:
+        """{kind: {'hash', 'name'}} for one run"""
+
+        with self._lock:
+            rows = self._conn.execute("SELECT kind, name, hash FROM artifacts WHERE date = ? AND session = ?",
+                                      (date, session)).fetchall()
+        return {row['kind']: {'hash': row['hash'], 'name': row['name']} for row in rows}
+
+    def get(self, digest: str) -> bytes:
+        """Blob content by hash, wherever it is stored"""
+
+        with self._lock:
+            blob = self._blob(digest)
+            if blob is None:
+                raise KeyError(digest)
+            if blob['bundle'] is None:
+                return self._blob_path(digest).read_bytes()
+            with open(self.bundle_dir / blob['bundle'], 'rb') as f:
+                f.seek(blob['offset'])
+                data = f.read(blob['stored_size'])
+        return zlib.decompress(data) if blob['codec'] == 'zlib' else data
+
+    def materialize(self, digest: str, dest: Union[str, Path]) -> str:
+        """Write a blob out to a file (e.g. for an uploader that needs a path)"""
+
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        blob_path = self._blob_path(digest)
+        if blob_path.exists():
+            shutil.copyfile(blob_path, dest)
+        else:
+            dest.write_bytes(self.get(digest))
+        return str(dest)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*) AS blobs, COALESCE(SUM(size), 0) AS size,"
+                " COALESCE(SUM(COALESCE(stored_size, size)), 0) AS stored,"
+                " COALESCE(SUM(bundle IS NOT NULL), 0) AS bundled FROM blobs"
+            ).fetchone()
+            references = self._conn.execute("SELECT COUNT(*) FROM artifacts").fetchone()[0]
+        return {**dict(row), 'artifacts': references}
+
+    # Retention
+
+    def compact(self, keep_days: int = 30, today: datetime = None) -> int:
+        """Move loose blobs last referenced more than keep_days ago into compressed per-month bundles"""
+
+        cutoff = ((today or datetime.now()) - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+        moved = 0
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT b.hash, MAX(a.date) AS last_date FROM blobs b JOIN artifacts a ON a.hash = b.hash"
+                " WHERE b.bundle IS NULL GROUP BY b.hash HAVING MAX(a.date) < ? ORDER BY last_date",
+                (cutoff,)
+            ).fetchall()
+
+            for row in rows:
+                digest = row['hash']
+                blob_path = self._blob_path(digest)
+                data = blob_path.read_bytes()
+
+                # PDFs and audio are already compressed; keep them raw when zlib doesn't help
+                compressed = zlib.compress(data, 6)
+                codec, payload = ('zlib', compressed) if len(compressed) < len(data) else ('raw', data)
+
+                bundle = f"{row['last_date'][:7]}.bundle"
+                with open(self.bundle_dir / bundle, 'ab') as f:
+                    offset = f.tell()
+                    f.write(payload)
+                    f.flush()
+                    os.fsync(f.fileno())
+
+                with self._conn:
+                    self._conn.execute(
+                        "UPDATE blobs SET bundle = ?, offset = ?, stored_size = ?, codec = ? WHERE hash = ?",
+                        (bundle, offset, len(payload), codec, digest)
+                    )
+                blob_path.unlink()
+                moved += 1
+
+        if moved:
+            logger.info(f"Bundled {moved} artifacts older than {cutoff}")
+        return moved
+
+    def prune_outputs(self, output_dir: Union[str, Path], keep_days: int = 30, today: datetime = None) -> List[str]:
+        """Delete dated output folders past keep_days whose every file is already in the store"""
+
+        cutoff = ((today or datetime.now()) - timedelta(days=keep_days)).strftime('%Y%m%d')
+        removed = []
+
+        for day_dir in sorted(Path(output_dir).iterdir()):
+            if not day_dir.is_dir() or not re.fullmatch(r'\d{8}', day_dir.name) or day_dir.name >= cutoff:
+                continue
+
+            files = [path for path in day_dir.rglob('*') if path.is_file() and path.name != '.DS_Store']
+            with self._lock:
+                stored = all(self._blob(file_digest(path)) is not None for path in files)
+            if not stored:
+                logger.info(f"Keeping {day_dir}: not every output is in the artifact store")
+                continue
+
+            shutil.rmtree(day_dir)
+            removed.append(str(day_dir))
+
+        if removed:
+            logger.info(f"Pruned {len(removed)} output folders older than {cutoff}")
+        return removed
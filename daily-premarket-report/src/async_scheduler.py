@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Async Scheduler Daemon
+======================
+
+Long-running asyncio scheduler with DST-aware wall-clock timers and per-job overlap protection
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, time as dt_time
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Set
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+WEEKDAYS = {0, 1, 2, 3, 4}
+
+# Longest single sleep, so suspend/resume or clock adjustments are noticed promptly
+MAX_SLEEP_SECONDS = 300
+
+@dataclass
+class ScheduledJob:
+    """A coroutine run daily at a local wall-clock time"""
+    name: str
+    at: str  # 'HH:MM' in the scheduler's timezone
+    func: Callable[[], Awaitable[Any]]
+    days: Optional[Set[int]] = None  # weekday numbers (Monday=0), None for every day
+    last_run: Optional[datetime] = None
+    runs: int = 0
+    skipped: int = 0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock, repr=False)
+
+def localize_wall_time(tz, day, at: dt_time) -> datetime:
+    """Aware datetime for a wall-clock time on a date, resolving DST gaps and repeats"""
+
+    naive = datetime.combine(day, at)
+    try:
+        return tz.localize(naive, is_dst=None)
+    except pytz.NonExistentTimeError:
+        # Spring forward: the hour is skipped, so fire at the same offset after the jump
+        return tz.normalize(tz.localize(naive, is_dst=False))
+    except pytz.AmbiguousTimeError:
+        # Fall back: the hour repeats, fire on its first occurrence
+        return tz.localize(naive, is_dst=True)
+
+def next_fire_time(job: ScheduledJob, now: datetime, tz) -> datetime:
+    """Next time a job is due strictly after now"""
+
+    hour, minute = map(int, job.at.split(':'))
+    at = dt_time(hour, minute)
+    local_now = now.astimezone(tz)
+
+    for offset in range(8):
+        day = local_now.date() + timedelta(days=offset)
+        if job.days is not None and day.weekday() not in job.days:
+            continue
+        candidate = localize_wall_time(tz, day, at)
+        if candidate > local_now:
+            return candidate
+
+    raise ValueError(f"Job {job.name} has no run day in the next week")
+
+class AsyncScheduler:
+    """Runs scheduled coroutines in one event loop, keeping HTTP pools and clients warm between runs"""
+
+    def __init__(self, timezone: str = 'US/Central'):
+        self.tz = pytz.timezone(timezone)
+        self.jobs: Dict[str, ScheduledJob] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stop = None
+
+    def add_job(self, name: str, at: str, func: Callable[[], Awaitable[Any]], days: Set[int] = None):
+        """Register a daily job at a local 'HH:MM' time"""
+
+        self.jobs[name] = ScheduledJob(name, at, func, days)
+        logger.info(f"Scheduled {name} at {at} {self.tz.zone}"
+                    + (" on weekdays" if days == WEEKDAYS else ""))
+
+    def next_runs(self, now: datetime = None) -> List[tuple]:
+        """(fire time, job) pairs ordered by fire time"""
+
+        now = now or datetime.now(self.tz)
+        return sorted(((next_fire_time(job, now, self.tz), job) for job in self.jobs.values()),
+                      key=lambda item: item[0])
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+
+    async def run(self):
+        """Sleep until each job is due and launch it, until stop() is called"""
+
+        if not self.jobs:
+            raise ValueError("No jobs scheduled")
+
+        try:
+            from .http_session import warm_pool
+        except ImportError:
+            from http_session import warm_pool
+
+        self._stop = asyncio.Event()
+        async with warm_pool():
+            try:
+                while not self._stop.is_set():
+                    fire_at, _ = self.next_runs()[0]
+                    await self._sleep_until(fire_at)
+                    if self._stop.is_set():
+                        break
+
+                    # Launch every job due at this instant (they may share a time)
+                    now = datetime.now(self.tz)
+                    for due_at, job in self.next_runs(fire_at - timedelta(microseconds=1)):
+                        if due_at > now:
+                            break
+                        self._launch(job, due_at)
+            finally:
+                await self._drain()
+
+    async def _sleep_until(self, fire_at: datetime):
+        """Sleep to an absolute wall-clock time in bounded steps"""
+
+        while not self._stop.is_set():
+            remaining = (fire_at - datetime.now(self.tz)).total_seconds()
+            if remaining <= 0:
+                return
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=min(remaining, MAX_SLEEP_SECONDS))
+            except asyncio.TimeoutError:
+                pass
+
+    def _launch(self, job: ScheduledJob, due_at: datetime):
+        if job.lock.locked():
+            job.skipped += 1
+            logger.warning(f"Skipping {job.name} at {due_at:%H:%M %Z}: previous run still in progress")
+            return
+
+        task = asyncio.create_task(self._run_job(job, due_at), name=job.name)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_job(self, job: ScheduledJob, due_at: datetime):
+        async with job.lock:
+            lateness = (datetime.now(self.tz) - due_at).total_seconds()
+            logger.info(f"Running {job.name} (due {due_at:%Y-%m-%d %H:%M %Z}, started {lateness:.2f}s late)")
+            job.last_run = due_at
+            try:
+                await job.func()
+                job.runs += 1
+            except Exception as e:
+                logger.error(f"Scheduled job {job.name} failed: {e}")
+
+    async def _drain(self):
+        """Wait for in-flight jobs on shutdown"""
+
+        if self._tasks:
+            logger.info(f"Waiting for {len(self._tasks)} running job(s) to finish")
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Next run, last run and counts per job"""
+
+        return {
+            job.name: {
+                'at': job.at,
+                'next_run': fire_at.isoformat(),
+                'last_run': job.last_run.isoformat() if job.last_run else None,
+                'running': job.lock.locked(),
+                'runs': job.runs,
+                'skipped': job.skipped
+            }
+            for fire_at, job in self.next_runs()
+        }
@@ -11,48 +11,56 @@ import asyncio
 import logging
 from datetime import datetime
 from typing import Dict, List, Any
-import openai
 from pathlib import Path
 import json
-from report_generator import ReportData, MarketData, NewsItem
+from market_data import ReportData
+from report_model import build_report_model, Section, POSITIVE, NEGATIVE, WARNING
+from http_replay import provider_base_url
 
 logger = logging.getLogger(__name__)
 
+# Market tables read out, in order
+AUDIO_TABLES = ('futures', 'international', 'currencies', 'commodities')
+
+IMPACT_WORDS = {NEGATIVE: "high", WARNING: "moderate", POSITIVE: "low"}
+
 class AudioReportGenerator:
     """Generates podcast-style audio reports"""
     
     def __init__(self, openai_api_key: str = None):
         self.openai_api_key = openai_api_key or os.getenv('OPENAI_API_KEY')
-        if self.openai_api_key:
-            openai.api_key = self.openai_api_key
+        
+        # {section key: (digest, script)} so unchanged sections are not rephrased
+        self._scripts: Dict[str, tuple] = {}
         
     def generate_audio_script(self, report_data: ReportData) -> str:
         """Generate a natural, podcast-style script from report data"""
         
         script_parts = []
+        model = build_report_model(report_data)
         
         # Introduction
         intro = self._generate_introduction(report_data)
         script_parts.append(intro)
         
         # Executive Summary
-        exec_summary = self._generate_executive_summary_audio(report_data)
+        exec_summary = self._section_script(model.section('executive_summary'), self._generate_executive_summary_audio)
         script_parts.append(exec_summary)
         
         # Market Performance
-        market_performance = self._generate_market_performance_audio(report_data)
+        market_performance = self._section_script(model.section('market_performance'), self._generate_market_performance_audio)
         script_parts.append(market_performance)
         
         # News and Events
-        news_analysis = self._generate_news_analysis_audio(report_data)
+        news_analysis = self._section_script(model.section('news'), self._generate_news_analysis_audio)
         script_parts.append(news_analysis)
         
         # Technical Analysis
-        technical = self._generate_technical_analysis_audio(report_data)
+        technical = self._section_script(model.section('technical_analysis'), self._generate_technical_analysis_audio)
         script_parts.append(technical)
         
         # Risk Assessment & Conclusion
-        conclusion = self._generate_conclusion_audio(report_data)
+        conclusion = self._section_script(model.section('risk_assessment'), self._generate_conclusion_audio)
         script_parts.append(conclusion)
         
         # Combine all parts
@@ -78,11 +86,21 @@ class AudioReportGenerator:
         
         return intro.strip()
     
-    def _generate_executive_summary_audio(self, report_data: ReportData) -> str:
+    def _section_script(self, section: Section, build) -> str:
+        """Script for a model section, reused while the section's digest is unchanged"""
+        
+        cached = self._scripts.get(section.key)
+        if cached and cached[0] == section.digest:
+            return cached[1]
+        
+        text = build(section)
+        self._scripts[section.key] = (section.digest, text)
+        return text
+    
+    def _generate_executive_summary_audio(self, section: Section) -> str:
         """Generate executive summary for audio"""
         
-        exec_summary = report_data.executive_summary
-        sentiment = exec_summary.get('market_sentiment', 'neutral')
+        sentiment = section.kpi('market_sentiment').value
         
         summary_text = f"""
         Starting with our executive summary - the market sentiment this morning is {sentiment}.
@@ -91,64 +109,64 @@ class AudioReportGenerator:
         """
         
         # Add key insights
-        insights = exec_summary.get('key_insights', [])
-        for i, insight in enumerate(insights[:3], 1):
-            summary_text += f"\n\nNumber {i}: {insight}"
+        for i, insight in enumerate(section.items('key_insights')[:3], 1):
+            summary_text += f"\n\nNumber {i}: {insight.text}"
         
         # Add risk level
-        risk_level = exec_summary.get('risk_level', 'medium')
+        risk_level = section.kpi('risk_level').value
         summary_text += f"\n\nOur overall risk assessment for today is {risk_level}."
         
         return summary_text.strip()
     
-    def _generate_market_performance_audio(self, report_data: ReportData) -> str:
+    def _generate_market_performance_audio(self, section: Section) -> str:
         """Generate market performance section for audio"""
         
-        market_perf = report_data.market_performance
-        
         performance_text = """
         Now let's look at market performance overnight.
         """
         
+        # (name, percent change) per table; the PDF-only previous close table is not read out
+        moves = {
+            table: [(name.text, change_percent.value) for name, _, _, change_percent in section.table(table).rows]
+            for table in AUDIO_TABLES if section.table(table)
+        }
+        
         # Futures
-        if 'futures' in market_perf and market_perf['futures']:
+        if moves.get('futures'):
             performance_text += "\n\nStarting with US futures:"
             
-            for name, data in market_perf['futures'].items():
-                if hasattr(data, 'change_percent'):
-                    direction = "up" if data.change_percent > 0 else "down"
-                    performance_text += f"\n{name} are {direction} {abs(data.change_percent):.1f} percent"
+            for name, change_percent in moves['futures']:
+                direction = "up" if change_percent > 0 else "down"
+                performance_text += f"\n{name} are {direction} {abs(change_percent):.1f} percent"
         
         # International
-        if 'international' in market_perf and market_perf['international']:
+        if moves.get('international'):
             performance_text += "\n\nLooking at international markets:"
             
-            for name, data in market_perf['international'].items():
-                if hasattr(data, 'change_percent'):
-                    direction = "gained" if data.change_percent > 0 else "fell"
-                    performance_text += f"\nThe {name} {direction} {abs(data.change_percent):.1f} percent"
+            for name, change_percent in moves['international']:
+                direction = "gained" if change_percent > 0 else "fell"
+                performance_text += f"\nThe {name} {direction} {abs(change_percent):.1f} percent"
         
         # Currencies
-        if 'currencies' in market_perf and market_perf['currencies']:
+        if moves.get('currencies'):
             performance_text += "\n\nIn currency markets:"
             
-            for name, data in market_perf['currencies'].items():
-                if hasattr(data, 'change_percent') and abs(data.change_percent) > 0.1:
-                    direction = "stronger" if data.change_percent > 0 else "weaker"
-                    performance_text += f"\nThe {name} is {direction}, {direction.replace('stronger', 'up').replace('weaker', 'down')} {abs(data.change_percent):.1f} percent"
+            for name, change_percent in moves['currencies']:
+                if abs(change_percent) > 0.1:
+                    direction = "stronger" if change_percent > 0 else "weaker"
+                    performance_text += f"\nThe {name} is {direction}, {direction.replace('stronger', 'up').replace('weaker', 'down')} {abs(change_percent):.1f} percent"
         
         # Commodities
-        if 'commodities' in market_perf and market_perf['commodities']:
+        if moves.get('commodities'):
             performance_text += "\n\nAnd in commodities:"
             
-            for name, data in market_perf['commodities'].items():
-                if hasattr(data, 'change_percent'):
-                    direction = "higher" if data.change_percent > 0 else "lower"
-                    performance_text += f"\n{name} is trading {direction} by {abs(data.change_percent):.1f} percent"
+            for name, change_percent in moves['commodities']:
+                direction = "higher" if change_percent > 0 else "lower"
+                performance_text += f"\n{name} is trading {direction} by {abs(change_percent):.1f} percent"
         
         return performance_text.strip()
     
-    def _generate_news_analysis_audio(self, report_data: ReportData) -> str:
+    def _generate_news_analysis_audio(self, section: Section) -> str:
         """Generate news analysis section for audio"""
         
         news_text = """
@@ -156,81 +174,75 @@ class AudioReportGenerator:
         """
         
         # Overall sentiment
-        sector_analysis = report_data.sector_analysis
-        sentiment = sector_analysis.get('overall_sentiment', 'neutral')
-        impact_score = sector_analysis.get('average_impact_score', 0)
+        sentiment = section.kpi('news_sentiment').value
+        impact_score = section.kpi('average_impact').value
         
         news_text += f"\n\nThe overall news sentiment is {sentiment} with an average impact score of {impact_score} out of 10."
         
         # Top news items
-        top_news = report_data.news_events[:3]  # Top 3 news items
+        top_news = section.items('top_news')[:3]  # Top 3 news items
         
         for i, news_item in enumerate(top_news, 1):
-            impact_desc = "high" if news_item.impact_score >= 8 else "moderate" if news_item.impact_score >= 6 else "low"
+            impact_desc = IMPACT_WORDS[news_item.tone]
             
-            news_text += f"\n\nStory number {i}: {news_item.headline}."
-            news_text += f"\n{news_item.summary}"
+            news_text += f"\n\nStory number {i}: {news_item.text}."
+            news_text += f"\n{news_item.detail}"
             news_text += f"\nThis story has a {impact_desc} market impact rating."
         
         return news_text.strip()
     
-    def _generate_technical_analysis_audio(self, report_data: ReportData) -> str:
+    def _generate_technical_analysis_audio(self, section: Section) -> str:
         """Generate technical analysis section for audio"""
         
-        tech_analysis = report_data.technical_analysis
-        
         technical_text = """
         Let's look at the technical picture.
         """
         
         # VIX
-        vix_level = tech_analysis.get('vix_level', 20)
-        vol_regime = tech_analysis.get('volatility_regime', 'medium')
+        vix_level = section.kpi('vix_level').value
+        vol_regime = section.kpi('volatility_regime').value
         
         technical_text += f"\n\nThe VIX is currently at {vix_level:.1f}, indicating {vol_regime} volatility conditions."
         
         # Market breadth
-        breadth = tech_analysis.get('market_breadth', 'neutral')
+        breadth = section.kpi('market_breadth').value
         technical_text += f"\nMarket breadth is {breadth}."
         
         # Key levels
-        if 'key_levels' in tech_analysis:
+        key_levels = section.table('key_levels')
+        if key_levels:
             technical_text += "\n\nLooking at key technical levels:"
             
-            for symbol, levels in tech_analysis['key_levels'].items():
-                support = levels.get('support')
-                resistance = levels.get('resistance')
-                if support and resistance:
-                    technical_text += f"\nFor {symbol}, we're watching support at {support} and resistance at {resistance}."
+            for symbol, support, resistance in key_levels.rows:
+                if support.value and resistance.value:
+                    technical_text += f"\nFor {symbol.text}, we're watching support at {support.value} and resistance at {resistance.value}."
         
         return technical_text.strip()
     
-    def _generate_conclusion_audio(self, report_data: ReportData) -> str:
+    def _generate_conclusion_audio(self, section: Section) -> str:
         """Generate conclusion and risk assessment"""
         
-        risk_assessment = report_data.risk_assessment
-        
         conclusion_text = """
         To wrap up, let's talk about risk management and opportunities.
         """
         
         # Risk level
-        risk_level = risk_assessment.get('overall_risk_level', 'medium')
+        risk_level = section.kpi('overall_risk_level').value
         conclusion_text += f"\n\nOur overall risk assessment remains {risk_level}."
         
         # Key risks
-        primary_risks = risk_assessment.get('primary_risks', [])
+        primary_risks = section.items('primary_risks')
         if primary_risks:
             conclusion_text += "\n\nThe main risks we're watching include:"
             for risk in primary_risks[:2]:  # Top 2 risks
-                conclusion_text += f"\n{risk}."
+                conclusion_text += f"\n{risk.text}."
         
         # Opportunities
-        opportunities = risk_assessment.get('opportunity_areas', [])
+        opportunities = section.items('opportunity_areas')
         if opportunities:
             conclusion_text += "\n\nOn the opportunity side:"
             for opp in opportunities[:2]:  # Top 2 opportunities
-                conclusion_text += f"\n{opp}."
+                conclusion_text += f"\n{opp.text}."
         
         # Closing
         conclusion_text += """
@@ -254,8 +266,10 @@ class AudioReportGenerator:
             return text_path
         
         try:
-            # Use OpenAI TTS API
-            client = openai.OpenAI(api_key=self.openai_api_key)
+            # Use OpenAI TTS API (the client library is only loaded when audio is synthesized)
+            import openai
+            client = openai.OpenAI(api_key=self.openai_api_key,
+                                   base_url=provider_base_url("https://api.openai.com/v1"))
             
             response = client.audio.speech.create(
                 model="tts-1-hd",  # High quality model
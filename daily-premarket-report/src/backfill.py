@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Historical Backfill
+===================
+
+Builds ReportData for a range of past dates in parallel worker processes sharing one bar store and response cache
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from datetime import timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    from . import clock
+    from . import report_codec
+    from .bar_store import BarStore, ensure_yfinance_range, period_days
+    from .price_matrix import PriceMatrix
+    from .report_archive import ReportArchive
+    from .report_generator import ReportGenerator, MarketDataCollector
+    from .risk_model import RiskModel
+except ImportError:
+    import clock
+    import report_codec
+    from bar_store import BarStore, ensure_yfinance_range, period_days
+    from price_matrix import PriceMatrix
+    from report_archive import ReportArchive
+    from report_generator import ReportGenerator, MarketDataCollector
+    from risk_model import RiskModel
+
+logger = logging.getLogger(__name__)
+
+# Lookbacks the report generator reads (see MarketDataCollector and RiskModel)
+DAILY_LOOKBACK = '1y'
+HOURLY_LOOKBACK = '2d'
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# One generator per worker process, reused for every date it builds
+_worker_generator: Optional[ReportGenerator] = None
+
+def _init_worker(bar_store_dir: str, log_level: int):
+    """Point the worker at the parent's bar store and create its generator"""
+
+    global _worker_generator
+    os.environ['BAR_STORE_DIR'] = bar_store_dir
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+    _worker_generator = ReportGenerator()
+
+def _build_report(date: str, output_dir: str) -> Tuple[str, str, float]:
+    """Generate and save one date's report in a worker; returns (date, path, seconds)"""
+
+    started = time.perf_counter()
+    report = asyncio.run(_worker_generator.generate_daily_report(as_of=date))
+    path = Path(output_dir) / date / f"daily_premarket_report_{date.replace('-', '')}{report_codec.REPORT_SUFFIX}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report_codec.save(report, path)
+    return date, str(path), time.perf_counter() - started
+
+class ReportBackfill:
+    """Regenerates past reports: one shared history fetch, then a process per report date"""
+
+    def __init__(self, output_dir: str = "reports/backfill", workers: int = DEFAULT_WORKERS,
+                 bar_store: BarStore = None, archive: ReportArchive = None):
+        self.output_dir = output_dir
+        self.workers = max(1, workers)
+        self.bar_store = bar_store or BarStore()
+        self.archive = archive or ReportArchive()
+        self.risk_model = RiskModel(self.bar_store)
+
+    def history_plan(self) -> Tuple[List[str], List[str]]:
+        """(daily symbols, hourly symbols) the report generator reads"""
+
+        collector = MarketDataCollector(self.bar_store, extra_daily_symbols=self.risk_model.symbols)
+        return collector.daily_plan, collector.hourly_plan
+
+    def warm(self, dates: List[str]) -> int:
+        """Fetch the bars every date's lookback needs once, so workers only read the store; returns bars added"""
+
+        first, last = clock.report_time(dates[0]), clock.report_time(dates[-1])
+        daily, hourly = self.history_plan()
+        ranges = ([(symbol, first - timedelta(days=period_days(DAILY_LOOKBACK)), last, '1d') for symbol in daily]
+                  + [(symbol, first - timedelta(days=period_days(HOURLY_LOOKBACK)), last, '1h') for symbol in hourly])
+
+        def fetch(symbol, start, end, interval) -> int:
+            try:
+                return ensure_yfinance_range(self.bar_store, symbol, start, end, interval)
+            except Exception as e:
+                logger.warning(f"Could not backfill {interval} bars for {symbol}: {e}")
+                return 0
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            added = sum(pool.map(lambda job: fetch(*job), ranges))
+
+        # Build the risk matrix now rather than in every worker at once
+        PriceMatrix.open_or_build(self.bar_store, self.risk_model.symbols, self.risk_model.matrix_dir)
+
+        logger.info(f"Backfill history: {added} bars added for {len(daily)} daily and {len(hourly)} hourly series")
+        return added
+
+    def run(self, start: str, end: str, overwrite: bool = False) -> Dict[str, Any]:
+        """Build, save and archive reports for the weekdays from start to end"""
+
+        all_dates = clock.report_dates(start, end)
+        # Reports already in the archive (live or backfilled) are kept unless overwriting
+        dates = all_dates if overwrite else [date for date in all_dates if self.archive.load_report(date) is None]
+        summary = {'start': start, 'end': end, 'built': [], 'failed': {}, 'skipped': len(all_dates) - len(dates)}
+        if not dates:
+            logger.info(f"Nothing to backfill between {start} and {end}")
+            return summary
+
+        started = time.perf_counter()
+        summary['bars_added'] = self.warm(dates)
+
+        # spawn: workers start clean instead of inheriting the parent's threads and open sessions
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(dates)), mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(str(self.bar_store.root_dir), logging.getLogger().level)) as pool:
+            futures = {pool.submit(_build_report, date, self.output_dir): date for date in dates}
+            for future in as_completed(futures):
+                date = futures[future]
+                try:
+                    _, path, seconds = future.result()
+                except Exception as e:
+                    logger.error(f"Backfill of {date} failed: {e}")
+                    summary['failed'][date] = str(e)
+                    continue
+
+                # Archive writes stay in this process (one SQLite writer)
+                self.archive.ingest(report_codec.load(path), 'premarket', path)
+                summary['built'].append(date)
+                logger.info(f"Backfilled {date} in {seconds:.1f}s")
+
+        summary['built'].sort()
+        summary['seconds'] = round(time.perf_counter() - started, 1)
+        return summary
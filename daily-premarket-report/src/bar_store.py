@@ -0,0 +1,406 @@
+#!/usr/bin/env python3
+"""
+Historical Bar Store
+====================
+
+Local columnar store of OHLCV bars (one NumPy file per symbol and timespan) with a JSON manifest
+"""
+
+import asyncio
+import contextvars
+import json
+import logging
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: writers in other processes are not serialized
+    fcntl = None
+
+try:
+    from . import clock
+    from .single_flight import coalesce
+except ImportError:
+    import clock
+    from single_flight import coalesce
+
+logger = logging.getLogger(__name__)
+
+# Column layout matches the Polygon aggregate keys used throughout the collectors
+BAR_DTYPE = np.dtype([
+    ('t', '<i8'),   # bar start, epoch milliseconds
+    ('o', '<f8'),   # open
+    ('h', '<f8'),   # high
+    ('l', '<f8'),   # low
+    ('c', '<f8'),   # close
+    ('v', '<f8')    # volume
+])
+
+MANIFEST_VERSION = 1
+
+# yfinance interval -> bar store timespan
+YF_TIMESPANS = {'1d': 'day', '1h': 'hour'}
+
+# yfinance period units in calendar days
+PERIOD_UNITS = {'d': 1, 'wk': 7, 'mo': 31, 'y': 366}
+
+def period_days(period: str) -> int:
+    """Calendar days spanned by a yfinance period such as '5d', '3mo' or '1y'"""
+
+    match = re.fullmatch(r'(\d+)(d|wk|mo|y)', period)
+    if not match:
+        raise ValueError(f"Unsupported period {period!r}")
+    return int(match.group(1)) * PERIOD_UNITS[match.group(2)]
+
+def _ms(moment: datetime) -> int:
+    return int(moment.timestamp() * 1000)
+
+class BarStore:
+    """Stores daily (and optionally intraday) OHLCV bars per symbol for incremental updates"""
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = Path(root_dir or os.getenv('BAR_STORE_DIR', 'bar_store'))
+        self.manifest_path = self.root_dir / 'manifest.json'
+        self.manifest = self._load_manifest()
+        # Collectors refresh symbols from worker threads, so serialize writes
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _process_lock(self):
+        """Serialize writes with other processes sharing the store (backfill workers)"""
+
+        if fcntl is None:
+            yield
+            return
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.root_dir / '.lock', 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        """Load the store manifest, starting a fresh one if missing or unreadable"""
+
+        try:
+            with open(self.manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest
+            logger.warning(f"Bar store manifest version mismatch in {self.root_dir}, starting fresh")
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read bar store manifest: {e}")
+
+        return {'version': MANIFEST_VERSION, 'series': {}}
+
+    def _save_manifest(self):
+        """Atomically persist the manifest"""
+
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def _series_key(self, symbol: str, timespan: str) -> str:
+        return f"{timespan}/{symbol}"
+
+    def _series_path(self, symbol: str, timespan: str) -> Path:
+        # Symbols such as '^VIX', 'ES=F' or 'CME_MINI:ES1!' are not safe file names
+        safe_name = re.sub(r'[^A-Za-z0-9._-]', '_', symbol)
+        return self.root_dir / timespan / f"{safe_name}.npy"
+
+    def has_series(self, symbol: str, timespan: str = 'day') -> bool:
+        """Check whether any bars are stored for a symbol"""
+        return self._series_key(symbol, timespan) in self.manifest['series']
+
+    def symbols(self, timespan: str = 'day') -> List[str]:
+        """List symbols with stored bars for a timespan"""
+
+        prefix = f"{timespan}/"
+        return sorted(key[len(prefix):] for key in self.manifest['series'] if key.startswith(prefix))
+
+    def first_timestamp(self, symbol: str, timespan: str = 'day') -> Optional[int]:
+        """Get the first stored bar timestamp (epoch ms) for a symbol"""
+
+        entry = self.manifest['series'].get(self._series_key(symbol, timespan))
+        return entry['first_t'] if entry else None
+
+    def last_timestamp(self, symbol: str, timespan: str = 'day') -> Optional[int]:
+        """Get the last stored bar timestamp (epoch ms) for a symbol"""
+
+        entry = self.manifest['series'].get(self._series_key(symbol, timespan))
+        return entry['last_t'] if entry else None
+
+    def version(self, symbol: str, timespan: str = 'day') -> Optional[List[int]]:
+        """[last bar timestamp, row count, write count] for a series; changes whenever its bars do"""
+
+        entry = self.manifest['series'].get(self._series_key(symbol, timespan))
+        return [entry['last_t'], entry['rows'], entry.get('writes', 0)] if entry else None
+
+    def coverage(self, symbol: str, timespan: str = 'day') -> Tuple[Optional[int], Optional[int]]:
+        """The span (epoch ms) fetched so far, which can reach past the first and last bars (weekends, holidays)"""
+
+        entry = self.manifest['series'].get(self._series_key(symbol, timespan))
+        if not entry:
+            return None, None
+        return (min(entry.get('fetched_from', entry['first_t']), entry['first_t']),
+                max(entry.get('fetched_to', entry['last_t']), entry['last_t']))
+
+    def covers(self, symbol: str, timespan: str, start_ms: int, end_ms: int) -> bool:
+        """Check whether everything between start_ms and end_ms has been fetched"""
+
+        fetched_from, fetched_to = self.coverage(symbol, timespan)
+        return fetched_from is not None and fetched_from <= start_ms and fetched_to >= end_ms
+
+    def is_fresh(self, symbol: str, timespan: str = 'day', max_age: float = None) -> bool:
+        """Check whether a series was written less than max_age seconds ago"""
+
+        entry = self.manifest['series'].get(self._series_key(symbol, timespan))
+        if max_age is None or not entry or 'updated_at' not in entry:
+            return False
+        age = (datetime.now() - datetime.fromisoformat(entry['updated_at'])).total_seconds()
+        return age < max_age
+
+    def append(self, symbol: str, bars: List[Dict[str, Any]], timespan: str = 'day',
+               covered: Tuple[int, int] = None) -> int:
+        """Merge bars into the store, replacing any stored bar with the same timestamp
+
+        covered is the (start_ms, end_ms) span the bars were fetched for, so later reads inside it don't refetch.
+        """
+
+        new_bars = self._to_array(bars)
+        if len(new_bars) == 0 and (covered is None or not self.has_series(symbol, timespan)):
+            return 0
+
+        with self._lock, self._process_lock():
+            # Pick up series other processes wrote since the manifest was loaded
+            self.manifest = self._load_manifest()
+            return self._merge(symbol, new_bars, timespan, covered)
+
+    def _merge(self, symbol: str, new_bars: np.ndarray, timespan: str, covered: Tuple[int, int] = None) -> int:
+        """Merge new bars into a stored series and rewrite it"""
+
+        existing = self.read(symbol, timespan)
+        previous_count = len(existing)
+
+        # Stable sort keeps the newly fetched bar last within each timestamp run,
+        # so a partial bar from an earlier run is overwritten by the fresh one
+        merged = np.concatenate([np.asarray(existing), new_bars])
+        merged = merged[np.argsort(merged['t'], kind='stable')]
+        keep = np.append(merged['t'][1:] != merged['t'][:-1], True)
+        merged = merged[keep]
+
+        # Counts rewrites that changed the bars, including a partial bar revised in place under the same timestamp
+        previous = self.manifest['series'].get(self._series_key(symbol, timespan), {})
+        changed = len(merged) != previous_count or not np.array_equal(merged, existing)
+        writes = previous.get('writes', 0) + (1 if changed else 0)
+
+        path = self._series_path(symbol, timespan)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix('.tmp.npy')
+        np.save(tmp_path, merged)
+        os.replace(tmp_path, path)
+
+        fetched_from, fetched_to = self.coverage(symbol, timespan)
+        entry = {
+            'symbol': symbol,
+            'timespan': timespan,
+            'file': str(path.relative_to(self.root_dir)),
+            'rows': int(len(merged)),
+            'first_t': int(merged['t'][0]),
+            'last_t': int(merged['t'][-1]),
+            'writes': writes,
+            'updated_at': datetime.now().isoformat()
+        }
+        if covered is not None:
+            # Fetches extend the covered span from either end, so it stays one interval
+            entry['fetched_from'] = min(covered[0], fetched_from if fetched_from is not None else covered[0])
+            entry['fetched_to'] = max(covered[1], fetched_to if fetched_to is not None else covered[1])
+        elif fetched_from is not None:
+            entry['fetched_from'], entry['fetched_to'] = fetched_from, fetched_to
+        self.manifest['series'][self._series_key(symbol, timespan)] = entry
+        self._save_manifest()
+
+        added = len(merged) - previous_count
+        logger.debug(f"Bar store: {symbol} ({timespan}) now has {len(merged)} bars, {added} new")
+        return added
+
+    def read(self, symbol: str, timespan: str = 'day', start_ms: int = None,
+             end_ms: int = None, tail: int = None) -> np.ndarray:
+        """Read stored bars as a memory-mapped structured array, optionally sliced by time"""
+
+        if not self.has_series(symbol, timespan):
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        try:
+            bars = np.load(self._series_path(symbol, timespan), mmap_mode='r')
+        except (FileNotFoundError, ValueError) as e:
+            logger.warning(f"Bar store file for {symbol} ({timespan}) is unreadable: {e}")
+            return np.empty(0, dtype=BAR_DTYPE)
+
+        # Bars are kept sorted by timestamp, so time slicing is a binary search
+        lo = int(np.searchsorted(bars['t'], start_ms, side='left')) if start_ms is not None else 0
+        hi = int(np.searchsorted(bars['t'], end_ms, side='right')) if end_ms is not None else len(bars)
+        bars = bars[lo:hi]
+
+        if tail is not None:
+            bars = bars[-tail:] if tail > 0 else bars[:0]
+
+        return bars
+
+    def read_bar_dicts(self, symbol: str, timespan: str = 'day', start_ms: int = None,
+                       end_ms: int = None, tail: int = None) -> List[Dict[str, Any]]:
+        """Read stored bars in the Polygon-style dict format used by the collectors"""
+
+        bars = self.read(symbol, timespan, start_ms=start_ms, end_ms=end_ms, tail=tail)
+        return [
+            {'c': float(bar['c']), 'o': float(bar['o']), 'h': float(bar['h']),
+             'l': float(bar['l']), 'v': float(bar['v']), 't': int(bar['t'])}
+            for bar in bars
+        ]
+
+    def _to_array(self, bars: List[Dict[str, Any]]) -> np.ndarray:
+        """Convert Polygon-style bar dicts to a structured array, dropping incomplete bars"""
+
+        rows = [
+            (int(bar['t']), bar.get('o') or np.nan, bar.get('h') or np.nan, bar.get('l') or np.nan,
+             bar['c'], bar.get('v') or 0.0)
+            for bar in bars
+            if bar.get('t') is not None and bar.get('c') is not None
+        ]
+        array = np.array(rows, dtype=BAR_DTYPE)
+        array['v'] = np.nan_to_num(array['v'])
+        return array
+
+def history_to_bars(hist) -> List[Dict[str, Any]]:
+    """Convert a yfinance history DataFrame into Polygon-style bar dicts"""
+
+    if hist is None or hist.empty:
+        return []
+
+    bars = []
+    has_volume = 'Volume' in hist.columns
+    for ts, row in hist.iterrows():
+        bars.append({
+            'o': float(row['Open']),
+            'h': float(row['High']),
+            'l': float(row['Low']),
+            'c': float(row['Close']),
+            'v': float(row['Volume']) if has_volume else 0.0,
+            't': int(ts.timestamp() * 1000)
+        })
+    return bars
+
+def load_yfinance_bars(bar_store: BarStore, symbol: str, period: str = '2d', interval: str = '1d',
+                       max_age: float = None):
+    """Get yfinance bars through the bar store, downloading only bars newer than the last stored one
+
+    Series written within max_age seconds (e.g. by the pre-market warm-up) are served without a download.
+    While backfilling, only bars completed by the as-of time are returned.
+    """
+
+    timespan = YF_TIMESPANS.get(interval, interval)
+    cutoff = clock.bar_cutoff_ms(timespan)
+    if cutoff is not None:
+        as_of = clock.now()
+        ensure_yfinance_range(bar_store, symbol, as_of - timedelta(days=period_days(period)), as_of, interval)
+        return bar_store.read(symbol, timespan, end_ms=cutoff)
+
+    if bar_store.is_fresh(symbol, timespan, max_age):
+        return bar_store.read(symbol, timespan)
+
+    import yfinance as yf
+
+    now = datetime.now()
+    last_ts = bar_store.last_timestamp(symbol, timespan)
+    ticker = yf.Ticker(symbol)
+
+    if last_ts is None:
+        hist = ticker.history(period=period, interval=interval)
+        fetched_from = now - timedelta(days=period_days(period))
+    else:
+        # Start at the last stored session so a partial bar is refreshed
+        fetched_from = datetime.fromtimestamp(last_ts / 1000)
+        hist = ticker.history(start=fetched_from.strftime('%Y-%m-%d'), interval=interval)
+
+    bar_store.append(symbol, history_to_bars(hist), timespan, covered=(_ms(fetched_from), _ms(now)))
+    return bar_store.read(symbol, timespan)
+
+def ensure_yfinance_range(bar_store: BarStore, symbol: str, start: datetime, end: datetime,
+                          interval: str = '1d') -> int:
+    """Download whatever part of start..end the store has not fetched yet; returns the bars added"""
+
+    timespan = YF_TIMESPANS.get(interval, interval)
+    start_ms, end_ms = _ms(start), _ms(end)
+    if bar_store.covers(symbol, timespan, start_ms, end_ms):
+        return 0
+
+    # The covered span only grows at its ends, so fetch the missing stretch before and/or after it
+    fetched_from, fetched_to = bar_store.coverage(symbol, timespan)
+    if fetched_from is None:
+        gaps = [(start_ms, end_ms)]
+    else:
+        gaps = [(start_ms, fetched_from)] if start_ms < fetched_from else []
+        if end_ms > fetched_to:
+            gaps.append((fetched_to, end_ms))
+
+    import yfinance as yf
+
+    ticker = yf.Ticker(symbol)
+    added = 0
+    for gap_start, gap_end in gaps:
+        # yfinance's end date is exclusive
+        hist = ticker.history(start=datetime.fromtimestamp(gap_start / 1000).strftime('%Y-%m-%d'),
+                              end=(datetime.fromtimestamp(gap_end / 1000) + timedelta(days=1)).strftime('%Y-%m-%d'),
+                              interval=interval)
+        added += bar_store.append(symbol, history_to_bars(hist), timespan, covered=(gap_start, gap_end))
+    return added
+
+def load_yfinance_bars_many(bar_store: BarStore, symbols: List[str], period: str = '2d', interval: str = '1d',
+                            max_age: float = None, max_workers: int = 8) -> Dict[str, np.ndarray]:
+    """Load a deduplicated symbol plan concurrently, omitting (and logging) symbols that fail"""
+
+    def load(symbol):
+        try:
+            return symbol, load_yfinance_bars(bar_store, symbol, period, interval, max_age)
+        except Exception as e:
+            logger.warning(f"Could not load {interval} bars for {symbol}: {e}")
+            return symbol, None
+
+    # Pool threads don't inherit context variables, so each load runs in a copy of the caller's (the as-of clock)
+    context = contextvars.copy_context()
+    unique = list(dict.fromkeys(symbols))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        loaded = pool.map(lambda symbol: context.copy().run(load, symbol), unique)
+        return {symbol: bars for symbol, bars in loaded if bars is not None}
+
+async def fetch_yfinance_bars(bar_store: BarStore, symbol: str, period: str = '2d', interval: str = '1d',
+                              max_age: float = None):
+    """Async load_yfinance_bars on a worker thread, shared by every caller in the run"""
+
+    return await coalesce(
+        ('yfinance', symbol, period, interval),
+        lambda: asyncio.to_thread(load_yfinance_bars, bar_store, symbol, period, interval, max_age)
+    )
+
+async def fetch_yfinance_plan(bar_store: BarStore, symbols: List[str], period: str = '2d', interval: str = '1d',
+                              max_age: float = None) -> Dict[str, np.ndarray]:
+    """Async load_yfinance_bars_many, shared by every caller in the run"""
+
+    return await coalesce(
+        ('yfinance', 'plan', tuple(symbols), period, interval),
+        lambda: asyncio.to_thread(load_yfinance_bars_many, bar_store, symbols, period, interval, max_age)
+    )
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Circuit Breakers
+================
+
+Per-provider/endpoint circuit breakers with health state persisted across scheduler runs
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Any, Callable, Awaitable, Optional, TypeVar
+
+try:
+    from .tracing import span, COLLECTOR
+except ImportError:
+    from tracing import span, COLLECTOR
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+class SourceError(Exception):
+    """Raised by a fetch when a source answers but the response is unusable"""
+
+class CircuitBreaker:
+    """Opens after consecutive failures or slow calls, then half-opens to probe with backoff"""
+
+    def __init__(self, key: str, registry: 'BreakerRegistry', failure_threshold: int = 3,
+                 slow_call_seconds: float = 8.0, call_timeout: float = 15.0, probe_timeout: float = 5.0,
+                 reset_timeout: float = 3600.0, max_reset_timeout: float = 7 * 86400.0):
+        self.key = key
+        self.registry = registry
+        self.failure_threshold = failure_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.call_timeout = call_timeout
+        self.probe_timeout = probe_timeout
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.open_count = 0  # consecutive trips, drives the reset backoff
+        self.last_error = None
+        self.last_success = None
+        self._probe_in_flight = False
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'opened_at': self.opened_at,
+            'open_count': self.open_count,
+            'last_error': self.last_error,
+            'last_success': self.last_success
+        }
+
+    def load(self, saved: Dict[str, Any]):
+        self.state = saved.get('state', CLOSED)
+        self.consecutive_failures = saved.get('consecutive_failures', 0)
+        self.opened_at = saved.get('opened_at')
+        self.open_count = saved.get('open_count', 0)
+        self.last_error = saved.get('last_error')
+        self.last_success = saved.get('last_success')
+        # A probe cannot survive a restart
+        if self.state == HALF_OPEN:
+            self.state = OPEN
+
+    @property
+    def current_reset_timeout(self) -> float:
+        """Reset window, doubling for every failed probe"""
+        return min(self.max_reset_timeout, self.reset_timeout * 2 ** max(0, self.open_count - 1))
+
+    def allow(self) -> bool:
+        """Whether a call may go through now (moving open -> half-open when the window has passed)"""
+
+        if self.state == CLOSED:
+            return True
+
+        if self.state == OPEN and self.opened_at is not None:
+            if time.time() - self.opened_at >= self.current_reset_timeout:
+                self.state = HALF_OPEN
+                logger.info(f"Circuit {self.key} half-open, probing")
+
+        if self.state == HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+
+        return False
+
+    def record_success(self, elapsed: float):
+        if elapsed > self.slow_call_seconds:
+            self.record_failure(f"slow call ({elapsed:.1f}s)")
+            return
+
+        if self.state != CLOSED:
+            logger.info(f"Circuit {self.key} closed after successful probe")
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self.open_count = 0
+        self.opened_at = None
+        self.last_success = time.time()
+        self._probe_in_flight = False
+        self.registry.save()
+
+    def record_failure(self, error: str):
+        self.consecutive_failures += 1
+        self.last_error = error
+        was_probe = self.state == HALF_OPEN
+        self._probe_in_flight = False
+
+        if was_probe or self.consecutive_failures >= self.failure_threshold:
+            self.state = OPEN
+            self.opened_at = time.time()
+            self.open_count += 1
+            logger.warning(f"Circuit {self.key} open for {self.current_reset_timeout / 3600:.1f}h: {error}")
+
+        self.registry.save()
+
+    def _degraded(self, step, fallback: Callable[[], T], cached: Optional[Callable[[], Optional[T]]]) -> T:
+        """The last cached response when there is one, otherwise the static fallback"""
+
+        if cached is not None:
+            try:
+                value = cached()
+            except Exception as e:
+                logger.warning(f"Could not read the cached {self.key} response: {e}")
+                value = None
+            if value:
+                logger.info(f"Serving the last cached {self.key} response")
+                step.set(served='cache')
+                return value
+        step.set(served='fallback')
+        return fallback()
+
+    async def call(self, fetch: Callable[[], Awaitable[T]], fallback: Callable[[], T],
+                   cached: Callable[[], Optional[T]] = None) -> T:
+        """Run fetch through the breaker; when open or on failure serve cached(), then fallback()"""
+
+        with span(self.key, COLLECTOR, state=self.state) as step:
+            if not self.allow():
+                logger.info(f"Circuit {self.key} open, using cached or fallback data")
+                step.set(outcome='open')
+                return self._degraded(step, fallback, cached)
+
+            probing = self.state == HALF_OPEN
+            timeout = self.probe_timeout if probing else self.call_timeout
+            started = time.monotonic()
+
+            try:
+                result = await asyncio.wait_for(fetch(), timeout=timeout)
+            except asyncio.CancelledError:
+                self._probe_in_flight = False
+                raise
+            except asyncio.TimeoutError:
+                self.record_failure(f"timeout after {timeout:.0f}s")
+                logger.warning(f"{self.key} timed out after {timeout:.0f}s")
+                step.set(outcome='timeout')
+                return self._degraded(step, fallback, cached)
+            except Exception as e:
+                self.record_failure(str(e) or type(e).__name__)
+                logger.error(f"Error fetching {self.key}: {e}")
+                step.set(outcome='fallback', error=str(e) or type(e).__name__)
+                return self._degraded(step, fallback, cached)
+
+            self.record_success(time.monotonic() - started)
+            step.set(outcome='ok')
+            return result
+
+class BreakerRegistry:
+    """Breakers keyed by provider and endpoint, persisted to a JSON state file"""
+
+    def __init__(self, state_file: str = None):
+        self.state_file = Path(state_file or os.getenv('CIRCUIT_STATE_FILE', 'circuit_state.json'))
+        self.breakers: Dict[str, CircuitBreaker] = {}
+        self._saved = self._load()
+        self._lock = threading.Lock()
+
+    def _load(self) -> Dict[str, Any]:
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+        except Exception as e:
+            logger.warning(f"Could not read circuit state: {e}")
+            return {}
+
+    def get(self, provider: str, endpoint: str, **options) -> CircuitBreaker:
+        """Get (or create) the breaker for a provider endpoint"""
+
+        key = f"{provider}:{endpoint}"
+        if key not in self.breakers:
+            breaker = CircuitBreaker(key, self, **options)
+            if key in self._saved:
+                breaker.load(self._saved[key])
+            self.breakers[key] = breaker
+        return self.breakers[key]
+
+    def save(self):
+        """Atomically persist all breaker states"""
+
+        with self._lock:
+            self._saved.update({key: breaker.to_dict() for key, breaker in self.breakers.items()})
+            try:
+                self.state_file.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = self.state_file.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump(self._saved, f, indent=2)
+                os.replace(tmp_path, self.state_file)
+            except Exception as e:
+                logger.warning(f"Could not persist circuit state: {e}")
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        """Current state of every known breaker"""
+
+        status = dict(self._saved)
+        status.update({key: breaker.to_dict() for key, breaker in self.breakers.items()})
+        return status
+
+_default_registry = None
+
+def get_breaker(provider: str, endpoint: str, **options) -> CircuitBreaker:
+    """Get a breaker from the shared process-wide registry"""
+
+    return get_registry().get(provider, endpoint, **options)
+
+def get_registry() -> BreakerRegistry:
+    """Shared process-wide registry"""
+
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = BreakerRegistry()
+    return _default_registry
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+As-Of Clock
+===========
+
+The time a report run sees: the wall clock, or a past report time while backfilling historical reports
+
+Only ReportGenerator.generate_daily_report sets an as-of time; the enhanced and premarket generators run live.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, date, time, timedelta, timezone
+from typing import Iterator, List, Optional, Union
+
+import pytz
+
+logger = logging.getLogger(__name__)
+
+# Reports describe the market as it stood at the 5:00 AM Central delivery time
+REPORT_TZ = pytz.timezone('US/Central')
+REPORT_TIME = time(5, 0)
+
+DateLike = Union[str, date, datetime]
+
+_as_of: ContextVar[Optional[datetime]] = ContextVar('as_of', default=None)
+
+def parse_date(value: DateLike) -> date:
+    """A date from YYYY-MM-DD, a date or a datetime"""
+
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+def report_time(day: DateLike) -> datetime:
+    """Delivery time of the report for a date (tz-aware, US/Central)"""
+    return REPORT_TZ.localize(datetime.combine(parse_date(day), REPORT_TIME))
+
+def report_dates(start: DateLike, end: DateLike) -> List[str]:
+    """Weekday report dates from start to end inclusive"""
+
+    day, last = parse_date(start), parse_date(end)
+    dates = []
+    while day <= last:
+        if day.weekday() < 5:
+            dates.append(day.strftime('%Y-%m-%d'))
+        day += timedelta(days=1)
+    return dates
+
+@contextmanager
+def as_of(when: Optional[DateLike]) -> Iterator[Optional[datetime]]:
+    """Run the block as of a past report date or time (None keeps the wall clock)"""
+
+    if when is None:
+        yield _as_of.get()
+        return
+
+    if isinstance(when, datetime):
+        moment = when if when.tzinfo is not None else when.astimezone()
+    else:
+        moment = report_time(when)
+    token = _as_of.set(moment)
+    try:
+        yield moment
+    finally:
+        _as_of.reset(token)
+
+def current_as_of() -> Optional[datetime]:
+    """The as-of time being backfilled, None when running live"""
+    return _as_of.get()
+
+def is_historical() -> bool:
+    return _as_of.get() is not None
+
+def now(tz=None) -> datetime:
+    """datetime.now(tz) for the run: naive local time unless tz is given"""
+
+    moment = _as_of.get()
+    if moment is None:
+        return datetime.now(tz)
+    if tz is None:
+        return moment.astimezone().replace(tzinfo=None)
+    return moment.astimezone(tz)
+
+def today() -> str:
+    """The run's report date (YYYY-MM-DD)"""
+
+    moment = _as_of.get()
+    return moment.strftime('%Y-%m-%d') if moment is not None else datetime.now().strftime('%Y-%m-%d')
+
+def bar_cutoff_ms(timespan: str = 'day') -> Optional[int]:
+    """Latest bar start (epoch ms) that had completed by the as-of time; None when running live"""
+
+    moment = _as_of.get()
+    if moment is None:
+        return None
+    if timespan == 'day':
+        # Daily bars are stamped between 15:00 UTC the day before (Tokyo) and 05:00 UTC (New York);
+        # only sessions before the report date had closed, so stop half a day before its UTC midnight
+        midnight = datetime.combine(moment.date(), time(0), tzinfo=timezone.utc)
+        return int((midnight - timedelta(hours=12)).timestamp() * 1000) - 1
+    span = {'hour': 3600, 'minute': 60}.get(timespan, 0)
+    return int(moment.timestamp() * 1000) - span * 1000
+
+def last_session_date() -> Optional[str]:
+    """The last session a historical report could see (the day before the report date); None when live"""
+
+    moment = _as_of.get()
+    if moment is None:
+        return None
+    return (moment.date() - timedelta(days=1)).strftime('%Y-%m-%d')
+
+def scoped_key(key: str) -> str:
+    """Cache key for a request that depends on the as-of date"""
+
+    moment = _as_of.get()
+    return key if moment is None else f"{key}@{moment.strftime('%Y-%m-%d')}"
+
+def max_age(ttl: float) -> float:
+    """Cache age limit: responses fetched as of a past date never change, so they never expire"""
+    return ttl if _as_of.get() is None else float('inf')
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+"""
+Deadline Orchestration
+======================
+
+Global run budget split across data sources, with last-known-good substitution for sources that miss their slice
+"""
+
+import asyncio
+import logging
+import os
+import pickle
+import re
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Any, Optional, Callable, Awaitable, Tuple
+
+try:
+    from . import clock
+    from .tracing import span, SOURCE
+except ImportError:
+    import clock
+    from tracing import span, SOURCE
+
+logger = logging.getLogger(__name__)
+
+# Fraction of the collection budget each source may use (sources run concurrently)
+DEFAULT_SOURCE_SHARES = {
+    'futures': 0.6,
+    'international': 0.6,
+    'currencies': 0.6,
+    'commodities': 0.6,
+    'news': 0.5,
+    'technicals': 0.5,
+    'risk': 0.8
+}
+
+class RunBudget:
+    """Wall-clock budget for one report run, with time held back for rendering"""
+
+    def __init__(self, deadline: Optional[datetime] = None, render_reserve: float = 30.0):
+        self.deadline = deadline
+        self.render_reserve = render_reserve
+        self._deadline_monotonic = None
+        if deadline is not None:
+            now = datetime.now(deadline.tzinfo)
+            self._deadline_monotonic = time.monotonic() + (deadline - now).total_seconds()
+
+    @classmethod
+    def from_seconds(cls, seconds: Optional[float], render_reserve: float = 30.0) -> 'RunBudget':
+        """Budget ending a number of seconds from now (None for no deadline)"""
+
+        if seconds is None:
+            return cls(None, render_reserve)
+        return cls(datetime.now() + timedelta(seconds=seconds), render_reserve)
+
+    @property
+    def unlimited(self) -> bool:
+        return self._deadline_monotonic is None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds until the deadline (None when unlimited)"""
+
+        if self.unlimited:
+            return None
+        return max(0.0, self._deadline_monotonic - time.monotonic())
+
+    def collection_remaining(self) -> Optional[float]:
+        """Seconds left for data collection once the render reserve is held back"""
+
+        remaining = self.remaining()
+        if remaining is None:
+            return None
+        return max(0.0, remaining - self.render_reserve)
+
+class LastKnownGoodCache:
+    """Pickled last successful value per source"""
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = Path(cache_dir or os.getenv('LKG_CACHE_DIR', 'last_known_good'))
+
+    def _path(self, source: str) -> Path:
+        return self.cache_dir / f"{re.sub(r'[^A-Za-z0-9._-]', '_', source)}.pkl"
+
+    def put(self, source: str, value: Any):
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            path = self._path(source)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'wb') as f:
+                pickle.dump({'saved_at': datetime.now().isoformat(), 'value': value}, f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache last-known-good value for {source}: {e}")
+
+    def get(self, source: str) -> Optional[Tuple[Any, str]]:
+        """Return (value, saved_at) or None"""
+
+        try:
+            with open(self._path(source), 'rb') as f:
+                entry = pickle.load(f)
+            return entry['value'], entry['saved_at']
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read last-known-good value for {source}: {e}")
+            return None
+
+class DeadlineOrchestrator:
+    """Runs each source within its slice of the budget, substituting cached values when it misses"""
+
+    def __init__(self, budget: RunBudget = None, cache: LastKnownGoodCache = None,
+                 shares: Dict[str, float] = None):
+        self.budget = budget or RunBudget()
+        self.cache = cache or LastKnownGoodCache()
+        self.shares = {**DEFAULT_SOURCE_SHARES, **(shares or {})}
+        self._collection_budget = self.budget.collection_remaining()
+
+        self.stale_sources: Dict[str, Dict[str, Any]] = {}
+        self.timings: Dict[str, float] = {}
+
+    def slice_for(self, source: str) -> Optional[float]:
+        """Timeout for a source: its share of the collection budget, capped by what is left"""
+
+        remaining = self.budget.collection_remaining()
+        if remaining is None:
+            return None
+        share = self.shares.get(source, 1.0) * self._collection_budget
+        return min(share, remaining)
+
+    async def run(self, source: str, fetch: Callable[[], Awaitable[Any]], default: Any = None,
+                  is_valid: Callable[[Any], bool] = bool) -> Any:
+        """Fetch a source within its slice; on timeout, error or empty data use the last-known-good value"""
+
+        timeout = self.slice_for(source)
+        started = time.monotonic()
+        reason = None
+
+        with span(source, SOURCE, slice_seconds=timeout) as step:
+            try:
+                if timeout is not None and timeout <= 0:
+                    reason = "budget exhausted"
+                else:
+                    value = await asyncio.wait_for(fetch(), timeout=timeout)
+                    if is_valid(value):
+                        self.timings[source] = round(time.monotonic() - started, 3)
+                        if not clock.is_historical():
+                            self.cache.put(source, value)
+                        return value
+                    reason = "empty result"
+            except asyncio.TimeoutError:
+                reason = f"missed {timeout:.1f}s slice"
+            except Exception as e:
+                reason = f"error: {e}"
+
+            step.set(stale=reason)
+
+        self.timings[source] = round(time.monotonic() - started, 3)
+        return self._substitute(source, reason, default)
+
+    def _substitute(self, source: str, reason: str, default: Any) -> Any:
+        # Last-known-good values are today's, so a backfilled report gets the default instead
+        cached = None if clock.is_historical() else self.cache.get(source)
+        if cached is not None:
+            value, saved_at = cached
+            logger.warning(f"{source} {reason}, using last-known-good data from {saved_at}")
+            self.stale_sources[source] = {'reason': reason, 'as_of': saved_at}
+            return value
+
+        logger.warning(f"{source} {reason} and no cached data is available")
+        self.stale_sources[source] = {'reason': reason, 'as_of': None}
+        return default
@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+"""
+Earnings Calendar
+=================
+
+Incremental parsing of the Alpha Vantage earnings calendar CSV, filtered as rows arrive, with date and symbol indexes
+"""
+
+import bisect
+import codecs
+import csv
+import io
+import json
+import logging
+import os
+from datetime import timedelta
+from typing import Dict, List, Any, AsyncIterator, Iterable, Mapping, Optional
+
+try:
+    from . import clock
+except ImportError:
+    import clock
+
+logger = logging.getLogger(__name__)
+
+# Days ahead of the report date the day's cached calendar keeps (the feed covers three months)
+HORIZON_DAYS = 30
+CHUNK_SIZE = 64 * 1024
+
+# Tier of a symbol the tier file doesn't list (the feed carries no market caps); tier filters and the report both see it
+DEFAULT_TIER = 'Large'
+
+Release = Dict[str, Any]
+
+def load_market_cap_tiers(path: str = None) -> Dict[str, str]:
+    """{symbol: tier} from EARNINGS_TIERS_FILE ({"Large": [...], "Mid": [...]}); empty when there is none"""
+
+    path = path or os.getenv('EARNINGS_TIERS_FILE', 'market_cap_tiers.json')
+    try:
+        with open(path, 'r') as f:
+            tiers = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Could not read market cap tiers from {path}: {e}")
+        return {}
+    return {symbol.upper(): tier for tier, symbols in tiers.items() for symbol in symbols}
+
+def _float(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class EarningsCsvParser:
+    """Parses the calendar CSV chunk by chunk, keeping the releases inside the date window and symbol/tier filter"""
+
+    def __init__(self, start: clock.DateLike = None, end: clock.DateLike = None, symbols: Iterable[str] = None,
+                 tiers: Iterable[str] = None, tier_of: Mapping[str, str] = None):
+        # ISO dates order as strings, so rows are compared without parsing their dates
+        self.start = clock.parse_date(start).isoformat() if start else None
+        self.end = clock.parse_date(end).isoformat() if end else None
+        self.symbols = set(symbols) if symbols is not None else None
+        self.tiers = set(tiers) if tiers is not None else None
+        self.tier_of = tier_of or {}
+
+        self.releases: List[Release] = []
+        self.rows_seen = 0
+        self.error: Optional[str] = None  # Alpha Vantage answers errors and rate limits with JSON
+        self._header: Optional[List[str]] = None
+        self._symbol_column: Optional[int] = None
+        self._date_column: Optional[int] = None
+        self._buffer = ''
+
+    def feed(self, text: str) -> List[Release]:
+        """Parse every complete row in the text so far; returns the newly matched releases"""
+
+        if self.error is not None:
+            # Keep enough of the JSON body for the log message
+            self.error = (self.error + text)[:200]
+            return []
+        self._buffer += text
+        if self._header is None and self._buffer.lstrip().startswith('{'):
+            self.error, self._buffer = self._buffer.strip()[:200], ''
+            return []
+
+        complete, newline, rest = self._buffer.rpartition('\n')
+        # An odd quote count means the last line ends inside a quoted field, so wait for the rest of it
+        if not newline or complete.count('"') % 2:
+            return []
+        self._buffer = rest
+        return self._parse(complete)
+
+    def close(self) -> List[Release]:
+        """Parse the final row (the body need not end with a newline)"""
+
+        rest, self._buffer = self._buffer, ''
+        if self.error is not None:
+            self.error = self.error.strip()
+            return []
+        if not rest.strip():
+            return []
+        return self._parse(rest)
+
+    def _parse(self, text: str) -> List[Release]:
+        matched = []
+        for values in csv.reader(io.StringIO(text)):
+            if not values:
+                continue
+            if self._header is None:
+                self._header = [name.strip().lstrip('\ufeff') for name in values]
+                self._symbol_column = self._header.index('symbol') if 'symbol' in self._header else None
+                self._date_column = self._header.index('reportDate') if 'reportDate' in self._header else None
+                continue
+            self.rows_seen += 1
+            release = self._release(values)
+            if release is not None:
+                matched.append(release)
+        self.releases.extend(matched)
+        return matched
+
+    def _release(self, values: List[str]) -> Optional[Release]:
+        # The filters only need two columns, so rejected rows never become dicts
+        if self._symbol_column is None or self._date_column is None or len(values) < len(self._header):
+            return None
+        symbol = values[self._symbol_column].strip()
+        report_date = values[self._date_column].strip()
+        if not symbol or not report_date:
+            return None
+        if (self.start and report_date < self.start) or (self.end and report_date > self.end):
+            return None
+        if self.symbols is not None and symbol not in self.symbols:
+            return None
+        tier = self.tier_of.get(symbol, DEFAULT_TIER)
+        if self.tiers is not None and tier not in self.tiers:
+            return None
+
+        row = dict(zip(self._header, values))
+        return {
+            'symbol': symbol,
+            'company_name': row.get('name', '').strip(),
+            'report_date': report_date,
+            'fiscal_date_ending': row.get('fiscalDateEnding', '').strip(),
+            'estimate': _float(row.get('estimate')),
+            'currency': row.get('currency', '').strip(),
+            'market_cap': tier,
+            'source': 'Alpha Vantage'
+        }
+
+async def parse_stream(chunks: AsyncIterator[bytes], parser: EarningsCsvParser) -> List[Release]:
+    """Feed a response body through the parser as it downloads; returns every matched release"""
+
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    async for chunk in chunks:
+        parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    return parser.releases
+
+def parse_text(text: str, **filters) -> List[Release]:
+    """Parse a whole CSV body (see EarningsCsvParser for the filters)"""
+
+    parser = EarningsCsvParser(**filters)
+    parser.feed(text)
+    parser.close()
+    return parser.releases
+
+def horizon_end(start: clock.DateLike, days: int = HORIZON_DAYS) -> str:
+    return (clock.parse_date(start) + timedelta(days=days)).isoformat()
+
+class EarningsCalendar:
+    """Releases indexed by report date and by symbol"""
+
+    def __init__(self, releases: Iterable[Release]):
+        self.releases = sorted(releases, key=lambda release: (release['report_date'], release['symbol']))
+        self._dates = [release['report_date'] for release in self.releases]
+        self._by_symbol: Dict[str, List[Release]] = {}
+        for release in self.releases:
+            self._by_symbol.setdefault(release['symbol'], []).append(release)
+
+    def __len__(self) -> int:
+        return len(self.releases)
+
+    def between(self, start: clock.DateLike = None, end: clock.DateLike = None) -> List[Release]:
+        """Releases reported from start to end inclusive, soonest first"""
+
+        low = bisect.bisect_left(self._dates, clock.parse_date(start).isoformat()) if start else 0
+        high = bisect.bisect_right(self._dates, clock.parse_date(end).isoformat()) if end else len(self._dates)
+        return self.releases[low:high]
+
+    def on(self, day: clock.DateLike) -> List[Release]:
+        return self.between(day, day)
+
+    def for_symbol(self, symbol: str) -> List[Release]:
+        return self._by_symbol.get(symbol, [])
+
+    def select(self, start: clock.DateLike = None, end: clock.DateLike = None, symbols: Iterable[str] = None,
+               tiers: Iterable[str] = None, limit: Optional[int] = None) -> List[Release]:
+        """Releases in a date window for some symbols and/or market cap tiers, soonest first"""
+
+        if symbols is not None:
+            # Watchlists are small: go through the symbol index, then apply the window
+            start = clock.parse_date(start).isoformat() if start else None
+            end = clock.parse_date(end).isoformat() if end else None
+            releases = sorted(
+                (release for symbol in set(symbols) for release in self.for_symbol(symbol)
+                 if (not start or release['report_date'] >= start) and (not end or release['report_date'] <= end)),
+                key=lambda release: (release['report_date'], release['symbol'])
+            )
+        else:
+            releases = self.between(start, end)
+
+        if tiers is not None:
+            wanted = set(tiers)
+            releases = [release for release in releases if release.get('market_cap') in wanted]
+        return releases[:limit]
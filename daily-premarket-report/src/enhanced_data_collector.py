@@ -15,11 +15,22 @@ import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 from dataclasses import dataclass
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
 
-from .report_generator import MarketData, NewsItem
+try:
+    from .market_data import NewsItem, now_ns
+    from .circuit_breaker import get_breaker, SourceError
+    from .response_cache import get_response_cache, STALE_RESPONSE_MAX_AGE
+    from .symbol_universe import UNIVERSE
+    from .http_session import shared_session
+except ImportError:
+    # For direct execution
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    from market_data import NewsItem, now_ns
+    from circuit_breaker import get_breaker, SourceError
+    from response_cache import get_response_cache, STALE_RESPONSE_MAX_AGE
+    from symbol_universe import UNIVERSE
+    from http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -65,12 +76,7 @@ class TradingViewCollector:
             "options": {"lang": "en"},
             "symbols": {
                 "query": {"types": ["futures"]},
-                "tickers": [
-                    "CME_MINI:ES1!",  # S&P 500 E-mini
-                    "CME_MINI:NQ1!",  # NASDAQ E-mini  
-                    "CME_MINI:RTY1!", # Russell 2000 E-mini
-                    "CBOT_MINI:YM1!"  # Dow E-mini
-                ]
+                "tickers": UNIVERSE.plan(['futures'], 'tradingview')
             },
             "columns": [
                 "name", "close", "change", "change_abs", 
@@ -78,33 +84,15 @@ class TradingViewCollector:
             ]
         }
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/america/scan",
-                    json=payload,
-                    headers={"User-Agent": "Mozilla/5.0 (compatible; TradingView Scanner)"}
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_tradingview_data(data)
-                    else:
-                        logger.warning(f"TradingView API returned status {response.status}")
-                        return {}
-        except Exception as e:
-            logger.error(f"Error fetching TradingView futures data: {e}")
-            return {}
+        return await get_breaker('tradingview', 'america_scan').call(
+            lambda: self._scan('america', payload, {"User-Agent": "Mozilla/5.0 (compatible; TradingView Scanner)"}),
+            dict
+        )
     
     async def get_international_indices(self) -> Dict[str, TradingViewData]:
         """Get international market indices"""
         
-        symbols = [
-            "TVC:NI225",   # Nikkei 225
-            "HKEX:HSI",    # Hang Seng
-            "LSE:UKX",     # FTSE 100
-            "XETR:DAX",    # DAX
-            "EURONEXT:PX1" # CAC 40
-        ]
+        symbols = UNIVERSE.plan(['international'], 'tradingview')
         
         payload = {
             "symbols": {"tickers": symbols},
@@ -114,50 +102,37 @@ class TradingViewCollector:
             ]
         }
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/global/scan",
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_tradingview_data(data)
-                    else:
-                        return {}
-        except Exception as e:
-            logger.error(f"Error fetching international indices: {e}")
-            return {}
+        return await get_breaker('tradingview', 'global_scan').call(
+            lambda: self._scan('global', payload), dict
+        )
     
     async def get_crypto_data(self) -> Dict[str, TradingViewData]:
         """Get major cryptocurrency data"""
         
-        symbols = [
-            "BINANCE:BTCUSDT",
-            "BINANCE:ETHUSDT", 
-            "BINANCE:ADAUSDT",
-            "BINANCE:SOLUSDT"
-        ]
+        symbols = UNIVERSE.plan(['crypto'], 'tradingview')
         
         payload = {
             "symbols": {"tickers": symbols},
             "columns": ["name", "close", "change", "change_abs", "volume"]
         }
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/crypto/scan",
-                    json=payload
-                ) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        return self._parse_tradingview_data(data)
-                    else:
-                        return {}
-        except Exception as e:
-            logger.error(f"Error fetching crypto data: {e}")
-            return {}
+        return await get_breaker('tradingview', 'crypto_scan').call(
+            lambda: self._scan('crypto', payload), dict
+        )
+    
+    async def _scan(self, market: str, payload: Dict, headers: Dict = None) -> Dict[str, TradingViewData]:
+        """POST a scanner query, raising SourceError on a non-200 response"""
+        
+        async with shared_session() as session:
+            async with session.post(
+                f"{self.base_url}/{market}/scan",
+                json=payload,
+                headers=headers
+            ) as response:
+                if response.status != 200:
+                    raise SourceError(f"TradingView API returned status {response.status}")
+                data = await response.json()
+                return self._parse_tradingview_data(data)
     
     def _parse_tradingview_data(self, data: Dict) -> Dict[str, TradingViewData]:
         """Parse TradingView API response"""
@@ -205,7 +180,7 @@ class FiscalAICollector:
         end_date = datetime.now() + timedelta(days=days_ahead)
         
         try:
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(
                     f"{self.base_url}/earnings",
                     params={
@@ -234,7 +209,7 @@ class FiscalAICollector:
         
         for symbol in symbols:
             try:
-                async with aiohttp.ClientSession() as session:
+                async with shared_session() as session:
                     async with session.get(
                         f"{self.base_url}/companies/{symbol}/metrics",
                         headers={"Authorization": f"Bearer {self.api_key}"}
@@ -260,73 +235,71 @@ class FinvizCollector:
     async def get_market_overview(self) -> Dict[str, Any]:
         """Get market overview from Finviz"""
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        return self._parse_market_overview(html)
-                    else:
-                        return {}
-        except Exception as e:
-            logger.error(f"Error fetching Finviz market overview: {e}")
-            return {}
+        async def fetch():
+            return self._parse_market_overview(await self._fetch_page("/"))
+        
+        def cached():
+            html = self._cached_page("/")
+            return self._parse_market_overview(html) if html else None
+        
+        return await get_breaker('finviz', 'home').call(fetch, dict, cached)
     
     async def get_sector_performance(self) -> Dict[str, float]:
         """Get sector performance data"""
         
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/groups.ashx?g=sector",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        return self._parse_sector_performance(html)
-                    else:
-                        return {}
-        except Exception as e:
-            logger.error(f"Error fetching sector performance: {e}")
-            return {}
+        async def fetch():
+            return self._parse_sector_performance(await self._fetch_page("/groups.ashx?g=sector"))
+        
+        def cached():
+            html = self._cached_page("/groups.ashx?g=sector")
+            return self._parse_sector_performance(html) if html else None
+        
+        return await get_breaker('finviz', 'groups').call(fetch, dict, cached)
     
     async def get_top_movers(self) -> Dict[str, List[str]]:
         """Get top gainers and losers"""
         
-        try:
-            movers = {"gainers": [], "losers": []}
-            
-            # Get top gainers
-            async with aiohttp.ClientSession() as session:
-                async with session.get(
-                    f"{self.base_url}/screener.ashx?v=111&o=-change",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        movers["gainers"] = self._parse_movers(html)
-                
-                # Get top losers
-                async with session.get(
-                    f"{self.base_url}/screener.ashx?v=111&o=change",
-                    headers=self.headers
-                ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        movers["losers"] = self._parse_movers(html)
-            
-            return movers
-            
-        except Exception as e:
-            logger.error(f"Error fetching top movers: {e}")
-            return {"gainers": [], "losers": []}
+        gainers_path, losers_path = "/screener.ashx?v=111&o=-change", "/screener.ashx?v=111&o=change"
+        
+        async def fetch():
+            async with shared_session() as session:
+                return {
+                    # Get top gainers
+                    "gainers": self._parse_movers(await self._fetch_page(gainers_path, session)),
+                    # Get top losers
+                    "losers": self._parse_movers(await self._fetch_page(losers_path, session))
+                }
+        
+        def cached():
+            gainers, losers = self._cached_page(gainers_path), self._cached_page(losers_path)
+            if not (gainers and losers):
+                return None
+            return {"gainers": self._parse_movers(gainers), "losers": self._parse_movers(losers)}
+        
+        return await get_breaker('finviz', 'screener').call(fetch, lambda: {"gainers": [], "losers": []}, cached)
+    
+    async def _fetch_page(self, path: str, session: aiohttp.ClientSession = None) -> str:
+        """Fetch a Finviz page, raising SourceError on a non-200 response"""
+        
+        if session is None:
+            async with shared_session() as own_session:
+                return await self._fetch_page(path, own_session)
+        
+        async with session.get(f"{self.base_url}{path}", headers=self.headers) as response:
+            if response.status != 200:
+                raise SourceError(f"Finviz returned status {response.status} for {path}")
+            html = await response.text()
+            get_response_cache().put('finviz', f"{self.base_url}{path}", html)
+            return html
+    
+    def _cached_page(self, path: str) -> Optional[str]:
+        """The last copy of a page fetched within STALE_RESPONSE_MAX_AGE, served while Finviz is down"""
+        return get_response_cache().get('finviz', f"{self.base_url}{path}", STALE_RESPONSE_MAX_AGE)
     
     def _parse_market_overview(self, html: str) -> Dict[str, Any]:
         """Parse market overview from Finviz homepage"""
         
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
         overview = {}
         
@@ -357,6 +330,7 @@ class FinvizCollector:
     def _parse_sector_performance(self, html: str) -> Dict[str, float]:
         """Parse sector performance data"""
         
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
         sectors = {}
         
@@ -382,6 +356,7 @@ class FinvizCollector:
     def _parse_movers(self, html: str) -> List[str]:
         """Parse top movers from screener"""
         
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(html, 'html.parser')
         movers = []
         
@@ -454,7 +429,7 @@ class EnhancedDataCollector:
                 headline="Fed Maintains Hawkish Stance as Powell Signals Continued Vigilance",
                 summary="Federal Reserve Chair Jerome Powell emphasized the central bank's commitment to bringing inflation to target, despite recent dovish expectations in markets. Treasury yields rose on the hawkish tone.",
                 source="Federal Reserve / TradingView Analysis",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=9.2
             ),
@@ -462,7 +437,7 @@ class EnhancedDataCollector:
                 headline="Technology Sector Rotation Accelerates Amid AI Infrastructure Spending",
                 summary="Large-cap technology stocks continue to outperform as infrastructure spending on AI capabilities drives earnings beats. Semiconductor stocks lead gains with Finviz showing 3.2% sector performance.",
                 source="Finviz Sector Analysis",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=8.1
             ),
@@ -470,7 +445,7 @@ class EnhancedDataCollector:
                 headline="Asian Markets Mixed as China Manufacturing Data Shows Resilience",
                 summary="Chinese manufacturing PMI data exceeded expectations at 51.4, supporting broader Asian market sentiment. Hang Seng futures up 1.2% in overnight trading according to TradingView data.",
                 source="TradingView / Economic Data",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=7.8
             )
@@ -7,26 +7,35 @@ Improved report generator incorporating feedback for premarket analysis
 """
 
 import asyncio
-import json
 import logging
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import pytz
-from dataclasses import dataclass, asdict
-import yfinance as yf
-import pandas as pd
+from dataclasses import dataclass, field
 
 try:
+    from . import clock
     from .report_generator import ReportData, MarketData, NewsItem, ReportGenerator
+    from .report_codec import save_json
     from .unified_data_collector import UnifiedDataCollector
+    from .single_flight import within_run_scope
+    from .symbol_universe import UNIVERSE
+    from .watchlists import (Watchlist, EARNINGS_LIMIT, union_symbols, union_earnings_symbols,
+                             sector_rotation_view, earnings_view, news_view, watchlist_insight)
 except ImportError:
     # For direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import clock
     from report_generator import ReportData, MarketData, NewsItem, ReportGenerator
+    from report_codec import save_json
     from unified_data_collector import UnifiedDataCollector
+    from single_flight import within_run_scope
+    from symbol_universe import UNIVERSE
+    from watchlists import (Watchlist, EARNINGS_LIMIT, union_symbols, union_earnings_symbols,
+                            sector_rotation_view, earnings_view, news_view, watchlist_insight)
 
 logger = logging.getLogger(__name__)
 
@@ -41,6 +50,18 @@ class EarningsEvent:
     market_cap: Optional[str] = None
     sector: Optional[str] = None
 
+@dataclass
+class PremarketCollection:
+    """Everything one premarket run collects, shared by every report view built from it"""
+    market_data: Dict[str, Dict[str, MarketData]]
+    sector_rotation: Dict[str, Any]
+    earnings_calendar: List[Dict[str, Any]]
+    news_items: List[NewsItem]
+    news_themes: List[str]
+    economic_calendar: List[Dict[str, Any]]
+    risk_metrics: Dict[str, Any]
+    watchlist_quotes: Dict[str, MarketData] = field(default_factory=dict)  # by symbol
+
 class EnhancedPremarketGenerator(ReportGenerator):
     """Enhanced premarket report generator with improved analysis"""
     
@@ -56,73 +77,19 @@ class EnhancedPremarketGenerator(ReportGenerator):
         
         # Major indices for closing data
         self.major_indices = {
-            '^GSPC': 'S&P 500',
-            '^IXIC': 'NASDAQ',
-            '^RUT': 'Russell 2000', 
-            '^DJI': 'Dow Jones',
-            '^VIX': 'VIX'
+            **UNIVERSE.symbol_map('indices', 'yfinance'),
+            **UNIVERSE.symbol_map('volatility', 'yfinance')
         }
     
+    @within_run_scope
     async def generate_premarket_report(self) -> ReportData:
         """Generate enhanced premarket report with feedback incorporated"""
         
         logger.info("Starting enhanced premarket report generation...")
         
         try:
-            # Get comprehensive market data from unified collector
-            logger.info("Collecting comprehensive market data from all APIs...")
-            market_data = await self.data_collector.get_enhanced_market_data()
-            
-            # Get sector rotation analysis from unified collector
-            logger.info("Analyzing sector rotation...")
-            sector_rotation = await self.data_collector.get_sector_rotation_data()
-            
-            # Get upcoming earnings from unified collector
-            logger.info("Collecting upcoming earnings calendar...")
-            earnings_calendar = await self.data_collector.get_earnings_calendar()
-            
-            # Get enhanced news with themes from unified collector
-            logger.info("Collecting and analyzing market news...")
-            news_items, news_themes = await self.data_collector.get_enhanced_news_and_sentiment()
-            
-            # Get economic calendar from unified collector
-            logger.info("Collecting economic calendar...")
-            economic_calendar = await self.data_collector.get_comprehensive_economic_calendar()
-            
-            # Generate enhanced sentiment analysis
-            sentiment_analysis = await self._enhanced_sentiment_analysis(news_items, news_themes)
-            
-            # Generate executive summary
-            executive_summary = self._generate_premarket_executive_summary(
-                market_data.get('previous_close', {}), 
-                market_data.get('overnight_futures', {}), 
-                sentiment_analysis, 
-                sector_rotation
-            )
-            
-            # Enhanced risk assessment
-            risk_assessment = self._generate_premarket_risk_assessment(
-                sentiment_analysis, sector_rotation, earnings_calendar
-            )
-            
-            # Compile enhanced report data
-            report_data = ReportData(
-                date=datetime.now().strftime("%Y-%m-%d"),
-                executive_summary=executive_summary,
-                market_performance={
-                    "previous_close": market_data.get('previous_close', {}),
-                    "overnight_futures": market_data.get('overnight_futures', {}),
-                    "international": market_data.get('international', {}),
-                    "current_prices": market_data.get('current_prices', {}),
-                    "sector_rotation": sector_rotation
-                },
-                news_events=news_items,
-                sector_analysis=sentiment_analysis,
-                technical_analysis={},  # Empty dict to maintain compatibility
-                economic_calendar=economic_calendar,
-                risk_assessment=risk_assessment,
-                earnings_calendar=earnings_calendar  # New field
-            )
+            collection = await self.collect_premarket_data()
+            report_data = await self.build_premarket_report(collection)
             
             logger.info("Enhanced premarket report generation completed")
             return report_data
@@ -132,11 +99,131 @@ class EnhancedPremarketGenerator(ReportGenerator):
             # Fallback to standard generation
             return await super().generate_daily_report()
     
+    @within_run_scope
+    async def generate_watchlist_reports(self, watchlists: List[Watchlist]) -> Dict[str, ReportData]:
+        """One collection pass over the union of the watchlists, then a report view per watchlist (keyed by slug)"""
+        
+        symbols = union_symbols(watchlists)
+        # Watchlists without an earnings focus take the top of the whole calendar
+        earnings_symbols = (union_earnings_symbols(watchlists)
+                            if all(watchlist.earnings_symbols for watchlist in watchlists) else None)
+        logger.info(f"Collecting once for {len(watchlists)} watchlists ({len(symbols)} distinct symbols)...")
+        
+        try:
+            collection = await self.collect_premarket_data(symbols, earnings_symbols, earnings_limit=None)
+            reports = await asyncio.gather(*(self.build_premarket_report(collection, watchlist)
+                                             for watchlist in watchlists))
+        except Exception as e:
+            logger.error(f"Error generating watchlist reports: {e}")
+            raise
+        
+        logger.info(f"Built {len(reports)} watchlist reports from one collection pass")
+        return {watchlist.slug: report for watchlist, report in zip(watchlists, reports)}
     
+    async def collect_premarket_data(self, watchlist_symbols: List[str] = (), earnings_symbols: List[str] = None,
+                                     earnings_limit: Optional[int] = EARNINGS_LIMIT) -> PremarketCollection:
+        """Query every source once; report views are built from the result"""
+        
+        # Risk history refreshes on a worker thread while the APIs are queried
+        risk_future = asyncio.get_running_loop().run_in_executor(None, self.risk_model.assess)
+        
+        # Get comprehensive market data from unified collector
+        logger.info("Collecting comprehensive market data from all APIs...")
+        market_data = await self.data_collector.get_enhanced_market_data()
+        
+        # Watchlist quotes (the union of every watchlist, each symbol once)
+        watchlist_quotes = {}
+        if watchlist_symbols:
+            logger.info(f"Collecting quotes for {len(watchlist_symbols)} watchlist symbols...")
+            watchlist_quotes = await self.data_collector.get_watchlist_quotes(watchlist_symbols)
+        
+        # Get sector rotation analysis from unified collector
+        logger.info("Analyzing sector rotation...")
+        sector_rotation = await self.data_collector.get_sector_rotation_data()
+        
+        # Get upcoming earnings from unified collector
+        logger.info("Collecting upcoming earnings calendar...")
+        earnings_calendar = await self.data_collector.get_earnings_calendar(earnings_symbols, earnings_limit)
+        
+        # Get enhanced news with themes from unified collector
+        logger.info("Collecting and analyzing market news...")
+        news_items, news_themes = await self.data_collector.get_enhanced_news_and_sentiment()
+        
+        # Get economic calendar from unified collector
+        logger.info("Collecting economic calendar...")
+        economic_calendar = await self.data_collector.get_comprehensive_economic_calendar()
+        
+        return PremarketCollection(
+            market_data=market_data,
+            sector_rotation=sector_rotation,
+            earnings_calendar=earnings_calendar,
+            news_items=news_items,
+            news_themes=news_themes,
+            economic_calendar=economic_calendar,
+            risk_metrics=await risk_future,
+            watchlist_quotes=watchlist_quotes
+        )
     
-    
-    
-    
+    async def build_premarket_report(self, collection: PremarketCollection, watchlist: Watchlist = None) -> ReportData:
+        """Report data from a collection, narrowed to a watchlist's symbols, sectors and earnings when given"""
+        
+        market_data = collection.market_data
+        sector_rotation = collection.sector_rotation
+        earnings_calendar = collection.earnings_calendar
+        news_items = collection.news_items
+        watchlist_quotes = {}
+        
+        if watchlist is not None:
+            sector_rotation = sector_rotation_view(sector_rotation, watchlist.sectors,
+                                                   self.data_collector._calculate_rotation_strength)
+            earnings_calendar = earnings_view(earnings_calendar, watchlist.earnings_symbols)
+            news_items = news_view(news_items, watchlist)
+            watchlist_quotes = {symbol: collection.watchlist_quotes[symbol]
+                                for symbol in watchlist.symbols if symbol in collection.watchlist_quotes}
+        
+        # Generate enhanced sentiment analysis
+        sentiment_analysis = await self._enhanced_sentiment_analysis(news_items, collection.news_themes)
+        
+        # Generate executive summary
+        executive_summary = self._generate_premarket_executive_summary(
+            market_data.get('previous_close', {}), 
+            market_data.get('overnight_futures', {}), 
+            sentiment_analysis, 
+            sector_rotation,
+            collection.risk_metrics
+        )
+        if watchlist is not None:
+            insight = watchlist_insight(watchlist, watchlist_quotes)
+            if insight:
+                executive_summary['key_insights'].append(insight)
+        
+        # Enhanced risk assessment
+        risk_assessment = self._generate_premarket_risk_assessment(
+            sentiment_analysis, sector_rotation, earnings_calendar, collection.risk_metrics
+        )
+        
+        market_performance = {
+            "previous_close": market_data.get('previous_close', {}),
+            "overnight_futures": market_data.get('overnight_futures', {}),
+            "international": market_data.get('international', {}),
+            "current_prices": market_data.get('current_prices', {}),
+            "sector_rotation": sector_rotation
+        }
+        if watchlist_quotes:
+            market_performance["watchlist"] = watchlist_quotes
+        
+        # Compile enhanced report data
+        return ReportData(
+            date=clock.today(),
+            executive_summary=executive_summary,
+            market_performance=market_performance,
+            news_events=news_items,
+            sector_analysis=sentiment_analysis,
+            technical_analysis={},  # Empty dict to maintain compatibility
+            economic_calendar=collection.economic_calendar,
+            risk_assessment=risk_assessment,
+            earnings_calendar=earnings_calendar  # New field
+        )
     
     async def _enhanced_sentiment_analysis(self, news_items: List[NewsItem], themes: List[str]) -> Dict[str, Any]:
         """Enhanced sentiment analysis with themes"""
@@ -168,7 +255,8 @@ class EnhancedPremarketGenerator(ReportGenerator):
         }
     
     def _generate_premarket_executive_summary(self, closing_data: Dict, futures_data: Dict, 
-                                            sentiment_analysis: Dict, sector_rotation: Dict) -> Dict[str, Any]:
+                                            sentiment_analysis: Dict, sector_rotation: Dict,
+                                            risk_metrics: Dict = None) -> Dict[str, Any]:
         """Generate executive summary for premarket analysis"""
         
         # Calculate market direction from futures
@@ -199,6 +287,7 @@ class EnhancedPremarketGenerator(ReportGenerator):
         return {
             "market_sentiment": market_sentiment,
             "key_insights": key_insights,
+            "risk_level": (risk_metrics or {}).get("risk_level", "medium"),
             "recommended_actions": [
                 f"Monitor {leader_sectors[0] if leader_sectors else 'Technology'} sector for continued leadership",
                 "Watch futures reaction to overnight developments",
@@ -219,15 +308,16 @@ class EnhancedPremarketGenerator(ReportGenerator):
             return "mixed session with sector rotation"
     
     def _generate_premarket_risk_assessment(self, sentiment_analysis: Dict, sector_rotation: Dict, 
-                                          earnings_calendar: List) -> Dict[str, Any]:
+                                          earnings_calendar: List, risk_metrics: Dict = None) -> Dict[str, Any]:
         """Generate risk assessment incorporating earnings and sector rotation"""
         
         # Assess risk from various factors
         risk_factors = []
         opportunities = []
         
-        # VIX-based risk - simplified without technical analysis
-        # Note: VIX risk assessment would be done with real VIX data in production
+        # Volatility, correlation and drawdown signals from the risk model
+        if risk_metrics:
+            risk_factors.extend(risk_metrics.get('signals', []))
         
         # Earnings risk
         if earnings_calendar:
@@ -254,12 +344,18 @@ class EnhancedPremarketGenerator(ReportGenerator):
         if not opportunities:
             opportunities = ["Sector rotation opportunities", "Individual stock selection alpha"]
         
-        return {
-            "overall_risk_level": "medium",  # Could be enhanced with scoring
+        risk_assessment = {
+            "overall_risk_level": (risk_metrics or {}).get("risk_level", "medium"),
             "primary_risks": risk_factors,
             "opportunity_areas": opportunities,
             "earnings_focus": [f"{e.get('symbol', 'N/A')} ({e.get('timing', 'AMC')})" if isinstance(e, dict) else str(e) for e in earnings_calendar[:3]]
         }
+        
+        if risk_metrics:
+            risk_assessment["risk_score"] = risk_metrics.get("risk_score")
+            risk_assessment["risk_metrics"] = risk_metrics
+        
+        return risk_assessment
 
 async def main():
     """Test enhanced premarket generator"""
@@ -273,9 +369,7 @@ async def main():
     
     timestamp = datetime.now().strftime("%Y%m%d")
     report_file = f"{output_dir}/enhanced_premarket_report_{timestamp}.json"
-    
-    with open(report_file, 'w') as f:
-        json.dump(asdict(report_data), f, indent=2, default=str)
+    save_json(report_data, report_file)
     
     logger.info(f"Enhanced premarket report saved to {report_file}")
     return report_data
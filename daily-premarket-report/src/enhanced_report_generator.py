@@ -7,18 +7,19 @@ Enhanced report generation using TradingView, fiscal.ai, and Finviz data
 """
 
 import asyncio
-import json
 import logging
 import os
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import pytz
-from dataclasses import dataclass, asdict
 
 from report_generator import ReportData, MarketData, NewsItem, ReportGenerator
+from market_data import now_ns
+from report_codec import save_json
 from enhanced_data_collector import EnhancedDataCollector, TradingViewData
 from forexfactory_collector import get_forexfactory_calendar
-from finviz_news_collector import get_finviz_news
+from single_flight import within_run_scope
+from tracing import span
 
 logger = logging.getLogger(__name__)
 
@@ -35,11 +36,15 @@ class EnhancedReportGenerator(ReportGenerator):
             fiscal_ai_key=fiscal_ai_key
         )
         
+    @within_run_scope
     async def generate_enhanced_daily_report(self) -> ReportData:
         """Generate daily report using enhanced data sources"""
         
         logger.info("Starting enhanced daily report generation with premium data sources...")
         
+        # Risk history refreshes on a worker thread while premium data is collected
+        risk_future = asyncio.get_running_loop().run_in_executor(None, self.risk_model.assess)
+        
         try:
             # Collect enhanced data from all premium sources
             enhanced_data = await self.data_collector.collect_comprehensive_data()
@@ -47,20 +52,23 @@ class EnhancedReportGenerator(ReportGenerator):
             # Convert TradingView data to MarketData format
             market_performance = self._convert_enhanced_data(enhanced_data)
             
-            # Get enhanced news analysis from Finviz
-            logger.info("Collecting news from Finviz...")
-            news_items = await get_finviz_news(max_articles=10)
+            # Stream news from Finviz and Alpha Vantage, dropping stories syndicated across both
+            logger.info("Collecting news from Finviz and Alpha Vantage...")
+            news_items = await self.news_analyzer.collect_top_news(10, sources=('finviz', 'alphavantage'))
             
-            # Perform enhanced technical analysis
-            technical_analysis = await self._enhanced_technical_analysis(enhanced_data)
+            with span('analysis'):
+                # Perform enhanced technical analysis
+                technical_analysis = await self._enhanced_technical_analysis(enhanced_data)
             
-            # Generate enhanced sentiment analysis
-            sentiment_analysis = await self._enhanced_sentiment_analysis(news_items, enhanced_data)
+                # Generate enhanced sentiment analysis
+                sentiment_analysis = await self._enhanced_sentiment_analysis(news_items, enhanced_data)
             
-            # Generate executive summary with enhanced insights
-            executive_summary = self._generate_enhanced_executive_summary(
-                market_performance, sentiment_analysis, technical_analysis, enhanced_data
-            )
+                risk_metrics = await risk_future
+            
+                # Generate executive summary with enhanced insights
+                executive_summary = self._generate_enhanced_executive_summary(
+                    market_performance, sentiment_analysis, technical_analysis, enhanced_data, risk_metrics
+                )
             
             # Enhanced economic calendar from ForexFactory
             logger.info("Collecting economic calendar from ForexFactory...")
@@ -68,7 +76,7 @@ class EnhancedReportGenerator(ReportGenerator):
             
             # Enhanced risk assessment
             risk_assessment = self._generate_enhanced_risk_assessment(
-                sentiment_analysis, technical_analysis, enhanced_data
+                sentiment_analysis, technical_analysis, enhanced_data, risk_metrics
             )
             
             # Compile enhanced report data
@@ -114,7 +122,7 @@ class EnhancedReportGenerator(ReportGenerator):
                         change=tv_data.get("change", 0),
                         change_percent=tv_data.get("change_percent", 0),
                         volume=tv_data.get("volume", 0),
-                        timestamp=datetime.now().isoformat()
+                        timestamp=now_ns()
                     )
         
         # Convert international indices
@@ -127,7 +135,7 @@ class EnhancedReportGenerator(ReportGenerator):
                         change=tv_data.get("change", 0),
                         change_percent=tv_data.get("change_percent", 0),
                         volume=tv_data.get("volume", 0),
-                        timestamp=datetime.now().isoformat()
+                        timestamp=now_ns()
                     )
         
         # Add crypto data
@@ -140,7 +148,7 @@ class EnhancedReportGenerator(ReportGenerator):
                         change=tv_data.get("change", 0),
                         change_percent=tv_data.get("change_percent", 0),
                         volume=tv_data.get("volume", 0),
-                        timestamp=datetime.now().isoformat()
+                        timestamp=now_ns()
                     )
         
         # Add enhanced metrics from Finviz
@@ -262,7 +270,8 @@ class EnhancedReportGenerator(ReportGenerator):
     def _generate_enhanced_executive_summary(self, market_performance: Dict, 
                                            sentiment_analysis: Dict, 
                                            technical_analysis: Dict,
-                                           enhanced_data: Dict) -> Dict[str, Any]:
+                                           enhanced_data: Dict,
+                                           risk_metrics: Dict = None) -> Dict[str, Any]:
         """Generate enhanced executive summary with premium insights"""
         
         # Calculate enhanced market direction
@@ -308,7 +317,7 @@ class EnhancedReportGenerator(ReportGenerator):
         summary = {
             "market_sentiment": market_direction,
             "key_insights": enhanced_insights,
-            "risk_level": "medium",  # Enhanced calculation would go here
+            "risk_level": self._quantitative_risk_level(technical_analysis, risk_metrics),
             "recommended_actions": enhanced_actions,
             "data_quality": "premium",
             "sources": ["TradingView", "fiscal.ai", "Finviz"]
@@ -338,10 +347,11 @@ class EnhancedReportGenerator(ReportGenerator):
     
     def _generate_enhanced_risk_assessment(self, sentiment_analysis: Dict, 
                                          technical_analysis: Dict,
-                                         enhanced_data: Dict) -> Dict[str, Any]:
+                                         enhanced_data: Dict,
+                                         risk_metrics: Dict = None) -> Dict[str, Any]:
         """Enhanced risk assessment using premium data"""
         
-        base_assessment = super()._generate_risk_assessment(sentiment_analysis, technical_analysis)
+        base_assessment = super()._generate_risk_assessment(sentiment_analysis, technical_analysis, risk_metrics)
         
         # Enhanced risk factors based on premium data
         enhanced_risks = base_assessment.get("primary_risks", [])
@@ -355,7 +365,7 @@ class EnhancedReportGenerator(ReportGenerator):
         
         # Add volatility-based risks
         vix_level = technical_analysis.get("vix_level", 20)
-        if vix_level > 25:
+        if vix_level > 25 and not risk_metrics:
             enhanced_risks.append("Elevated volatility environment (VIX > 25)")
         
         # Enhanced opportunities
@@ -396,8 +406,7 @@ async def main():
     os.makedirs(output_dir, exist_ok=True)
     
     report_file = f"{output_dir}/enhanced_daily_report_{datetime.now().strftime('%Y%m%d')}.json"
-    with open(report_file, 'w') as f:
-        json.dump(asdict(report_data), f, indent=2, default=str)
+    save_json(report_data, report_file)
     
     logger.info(f"Enhanced report saved to {report_file}")
     return report_data
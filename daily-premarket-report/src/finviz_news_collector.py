@@ -7,14 +7,27 @@ Collects and evaluates news headlines from Finviz.com/news for market relevance
 """
 
 import asyncio
-import aiohttp
 import logging
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
 import re
 
-from .report_generator import NewsItem
+try:
+    from . import clock
+    from .market_data import NewsItem, now_ns
+    from .circuit_breaker import get_breaker, SourceError
+    from .response_cache import get_response_cache, STALE_RESPONSE_MAX_AGE
+    from .http_session import shared_session
+except ImportError:
+    # For direct execution
+    import os
+    import sys
+    sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import clock
+    from market_data import NewsItem, now_ns
+    from circuit_breaker import get_breaker, SourceError
+    from response_cache import get_response_cache, STALE_RESPONSE_MAX_AGE
+    from http_session import shared_session
 
 logger = logging.getLogger(__name__)
 
@@ -53,24 +66,32 @@ class FinvizNewsCollector:
     async def get_finviz_news(self, max_articles: int = 20) -> List[NewsItem]:
         """Get and evaluate news from Finviz"""
         
-        try:
-            news_url = f"{self.base_url}/news.ashx"
-            
-            async with aiohttp.ClientSession() as session:
+        if clock.is_historical():
+            # The news page only lists current headlines
+            logger.info("Finviz news is not available for past dates")
+            return []
+        
+        news_url = f"{self.base_url}/news.ashx"
+        cache = get_response_cache()
+        
+        async def fetch():
+            async with shared_session() as session:
                 async with session.get(
                     news_url,
                     headers=self.headers
                 ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        return self._parse_finviz_news(html, max_articles)
-                    else:
-                        logger.warning(f"Finviz news returned status {response.status}")
-                        return self._get_fallback_news()
-                        
-        except Exception as e:
-            logger.error(f"Error fetching Finviz news: {e}")
-            return self._get_fallback_news()
+                    if response.status != 200:
+                        raise SourceError(f"Finviz news returned status {response.status}")
+                    html = await response.text()
+                    cache.put('finviz', news_url, html)
+                    return self._parse_finviz_news(html, max_articles)
+        
+        def cached():
+            # Yesterday's headlines beat the static placeholder while Finviz is down
+            html = cache.get('finviz', news_url, STALE_RESPONSE_MAX_AGE)
+            return self._parse_finviz_news(html, max_articles) if html else None
+        
+        return await get_breaker('finviz', 'news').call(fetch, self._get_fallback_news, cached)
     
     def _parse_finviz_news(self, html: str, max_articles: int) -> List[NewsItem]:
         """Parse Finviz news HTML and evaluate relevance"""
@@ -78,6 +99,7 @@ class FinvizNewsCollector:
         news_items = []
         
         try:
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(html, 'html.parser')
             
             # Find news table
@@ -262,7 +284,7 @@ class FinvizNewsCollector:
         
         try:
             # Finviz uses formats like "12:34PM", "Today 12:34PM", "Yesterday 12:34PM"
-            now = datetime.now()
+            now = clock.now()
             
             if 'today' in timestamp_text.lower():
                 return now.isoformat()
@@ -274,7 +296,7 @@ class FinvizNewsCollector:
                 return now.isoformat()
                 
         except:
-            return datetime.now().isoformat()
+            return clock.now().isoformat()
     
     def _get_fallback_news(self) -> List[NewsItem]:
         """Provide fallback news data"""
@@ -286,7 +308,7 @@ class FinvizNewsCollector:
                 headline="Federal Reserve Officials Signal Cautious Approach to Future Rate Decisions",
                 summary="Fed officials indicated a more measured approach to monetary policy following recent economic data, affecting market expectations for future rate changes.",
                 source="Federal Reserve Communications",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=8.5
             ),
@@ -294,7 +316,7 @@ class FinvizNewsCollector:
                 headline="Technology Sector Shows Resilience Amid Market Volatility",
                 summary="Major technology companies continue to demonstrate strong fundamentals despite broader market concerns, with AI-related investments driving growth.",
                 source="Market Analysis",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=7.2
             ),
@@ -302,7 +324,7 @@ class FinvizNewsCollector:
                 headline="Oil Prices React to Global Supply Chain Developments",
                 summary="Crude oil markets responding to international supply chain dynamics and geopolitical factors affecting energy sector valuations.",
                 source="Energy Markets",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=6.8
             )
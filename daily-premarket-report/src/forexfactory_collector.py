@@ -7,14 +7,23 @@ Collects economic calendar data from ForexFactory.com with US focus and impact f
 """
 
 import asyncio
-import aiohttp
 import logging
 from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
-from bs4 import BeautifulSoup
 import re
 import pytz
 
+try:
+    from . import clock
+    from .circuit_breaker import get_breaker, SourceError
+    from .response_cache import get_response_cache, CALENDAR_PAGE_TTL, STALE_RESPONSE_MAX_AGE
+    from .http_session import shared_session
+except ImportError:
+    import clock
+    from circuit_breaker import get_breaker, SourceError
+    from response_cache import get_response_cache, CALENDAR_PAGE_TTL, STALE_RESPONSE_MAX_AGE
+    from http_session import shared_session
+
 logger = logging.getLogger(__name__)
 
 class ForexFactoryCollector:
@@ -34,28 +43,40 @@ class ForexFactoryCollector:
     async def get_us_economic_calendar(self, days_ahead: int = 1) -> List[Dict[str, Any]]:
         """Get US economic calendar events with medium and high impact"""
         
-        try:
-            # Calculate target date
-            target_date = datetime.now() + timedelta(days=days_ahead)
-            
-            # ForexFactory calendar URL format
-            calendar_url = f"{self.base_url}/calendar"
-            
-            async with aiohttp.ClientSession() as session:
+        # Calculate target date
+        now = clock.now()
+        target_date = now + timedelta(days=days_ahead)
+        
+        # ForexFactory calendar URL format
+        calendar_url = f"{self.base_url}/calendar"
+        if clock.is_historical():
+            # A past week's page, e.g. calendar?week=jan8.2024
+            calendar_url += f"?week={now.strftime('%b').lower()}{now.day}.{now.year}"
+        cache = get_response_cache()
+        
+        # A week page fetched within the hour (or for a past week) only needs parsing
+        html = cache.get('forexfactory', calendar_url, clock.max_age(CALENDAR_PAGE_TTL))
+        if html:
+            return self._parse_economic_calendar(html, target_date)
+        
+        async def fetch():
+            async with shared_session() as session:
                 async with session.get(
                     calendar_url,
                     headers=self.headers
                 ) as response:
-                    if response.status == 200:
-                        html = await response.text()
-                        return self._parse_economic_calendar(html, target_date)
-                    else:
-                        logger.warning(f"ForexFactory returned status {response.status}")
-                        return self._get_fallback_calendar()
-                        
-        except Exception as e:
-            logger.error(f"Error fetching ForexFactory calendar: {e}")
-            return self._get_fallback_calendar()
+                    if response.status != 200:
+                        raise SourceError(f"ForexFactory returned status {response.status}")
+                    html = await response.text()
+                    cache.put('forexfactory', calendar_url, html)
+                    return self._parse_economic_calendar(html, target_date)
+        
+        def cached():
+            # The last page fetched stands in for the static calendar while ForexFactory is down
+            html = cache.get('forexfactory', calendar_url, clock.max_age(STALE_RESPONSE_MAX_AGE))
+            return self._parse_economic_calendar(html, target_date) if html else None
+        
+        return await get_breaker('forexfactory', 'calendar').call(fetch, self._get_fallback_calendar, cached)
     
     def _parse_economic_calendar(self, html: str, target_date: datetime) -> List[Dict[str, Any]]:
         """Parse ForexFactory economic calendar HTML"""
@@ -63,6 +84,7 @@ class ForexFactoryCollector:
         events = []
         
         try:
+            from bs4 import BeautifulSoup
             soup = BeautifulSoup(html, 'html.parser')
             
             # Find calendar table
@@ -167,12 +189,12 @@ class ForexFactoryCollector:
         try:
             # ForexFactory uses formats like "Today", "Tomorrow", or "Fri Dec 15"
             if date_text.lower() == 'today':
-                return datetime.now().date()
+                return clock.now().date()
             elif date_text.lower() == 'tomorrow':
-                return (datetime.now() + timedelta(days=1)).date()
+                return (clock.now() + timedelta(days=1)).date()
             else:
                 # Try to parse date formats like "Fri Dec 15"
-                current_year = datetime.now().year
+                current_year = clock.now().year
                 date_with_year = f"{date_text} {current_year}"
                 return datetime.strptime(date_with_year, "%a %b %d %Y").date()
         except:
@@ -7,13 +7,22 @@ Collects economic data from Federal Reserve Economic Data (FRED) API
 """
 
 import asyncio
-import aiohttp
 import logging
 import os
-from datetime import datetime, timedelta
 from typing import Dict, List, Any, Optional
 import json
 
+try:
+    from . import clock
+    from .response_cache import get_response_cache, FRED_OBSERVATION_TTL, FRED_SERIES_INFO_TTL
+    from .single_flight import coalesce
+    from .http_session import shared_session
+except ImportError:
+    import clock
+    from response_cache import get_response_cache, FRED_OBSERVATION_TTL, FRED_SERIES_INFO_TTL
+    from single_flight import coalesce
+    from http_session import shared_session
+
 logger = logging.getLogger(__name__)
 
 class FREDDataCollector:
@@ -41,7 +50,7 @@ class FREDDataCollector:
         """Get today's economic releases from FRED"""
         
         try:
-            today = datetime.now().strftime('%Y-%m-%d')
+            today = clock.today()
             
             # Get releases for today
             releases_data = await self._get_fred_releases(today)
@@ -132,7 +141,7 @@ class FREDDataCollector:
             'limit': 20
         }
         
-        async with aiohttp.ClientSession() as session:
+        async with shared_session() as session:
             async with session.get(url, params=params) as response:
                 if response.status == 200:
                     return await response.json()
@@ -141,7 +150,13 @@ class FREDDataCollector:
                     return {}
     
     async def _get_series_latest_observation(self, series_id: str) -> Dict[str, Any]:
-        """Get latest observation for a FRED series"""
+        """Get latest observation for a FRED series, shared by every caller in the run"""
+        
+        return await coalesce(('fred', 'observation', series_id),
+                              lambda: self._fetch_series_latest_observation(series_id))
+    
+    async def _fetch_series_latest_observation(self, series_id: str) -> Dict[str, Any]:
+        """Fetch latest observation for a FRED series"""
         
         url = f"{self.base_url}/series/observations"
         
@@ -152,34 +167,47 @@ class FREDDataCollector:
             'limit': 1,
             'sort_order': 'desc'
         }
+        if clock.is_historical():
+            # The value as published by the day before the report date (FRED vintages)
+            as_of = clock.last_session_date()
+            params.update({'observation_end': as_of, 'realtime_start': as_of, 'realtime_end': as_of})
         
-        try:
-            async with aiohttp.ClientSession() as session:
+        async def fetch() -> Dict[str, Any]:
+            async with shared_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
-                        
                         observations = data.get('observations', [])
-                        if observations:
-                            latest = observations[0]
-                            
-                            # Also get series info for units and title
-                            series_info = await self._get_series_info(series_id)
-                            
-                            return {
-                                'value': latest.get('value'),
-                                'date': latest.get('date'),
-                                'units': series_info.get('units', ''),
-                                'title': series_info.get('title', '')
-                            }
+                        return observations[0] if observations else {}
                     return {}
+        
+        try:
+            latest = await get_response_cache().fetch(
+                'fred', clock.scoped_key(f"observation:{series_id}"), fetch, clock.max_age(FRED_OBSERVATION_TTL)
+            )
+            if latest:
+                # Also get series info for units and title
+                series_info = await self._get_series_info(series_id)
+                
+                return {
+                    'value': latest.get('value'),
+                    'date': latest.get('date'),
+                    'units': series_info.get('units', ''),
+                    'title': series_info.get('title', '')
+                }
+            return {}
                     
         except Exception as e:
             logger.error(f"Error fetching series {series_id}: {e}")
             return {}
     
     async def _get_series_info(self, series_id: str) -> Dict[str, Any]:
-        """Get series information (title, units, etc.)"""
+        """Get series information (title, units, etc.), shared by every caller in the run"""
+        
+        return await coalesce(('fred', 'series', series_id), lambda: self._fetch_series_info(series_id))
+    
+    async def _fetch_series_info(self, series_id: str) -> Dict[str, Any]:
+        """Fetch series information (title, units, etc.)"""
         
         url = f"{self.base_url}/series"
         
@@ -189,8 +217,8 @@ class FREDDataCollector:
             'file_type': 'json'
         }
         
-        try:
-            async with aiohttp.ClientSession() as session:
+        async def fetch() -> Dict[str, Any]:
+            async with shared_session() as session:
                 async with session.get(url, params=params) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -198,6 +226,11 @@ class FREDDataCollector:
                         if series_list:
                             return series_list[0]
                     return {}
+        
+        try:
+            return await get_response_cache().fetch(
+                'fred', f"series:{series_id}", fetch, FRED_SERIES_INFO_TTL
+            )
                     
         except Exception as e:
             logger.error(f"Error fetching series info for {series_id}: {e}")
@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+HTTP Record/Replay
+==================
+
+Cassette recording and replay for the shared aiohttp session, and routing to the local provider stand-in
+"""
+
+import base64
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+from multidict import CIMultiDict, CIMultiDictProxy
+from yarl import URL
+
+try:
+    from .market_data import now_ns
+    from .tracing import span, HTTP
+except ImportError:
+    from market_data import now_ns
+    from tracing import span, HTTP
+
+logger = logging.getLogger(__name__)
+
+LIVE, RECORD, REPLAY, STANDIN = 'live', 'record', 'replay', 'standin'
+HTTP_MODES = (LIVE, RECORD, REPLAY, STANDIN)
+
+DEFAULT_STANDIN_URL = 'http://127.0.0.1:8765'
+
+# Credentials never reach a cassette and are ignored when matching
+SECRET_PARAMS = {'apikey', 'api_key', 'apiKey', 'token', 'access_token', 'key'}
+KEPT_HEADERS = ('Content-Type', 'Retry-After')
+
+# Dates in the path (Polygon open-close, aggregates) or a query value (FRED vintages, Alpha Vantage
+# time_from, the ForexFactory week) replay the latest recording for the route; nothing else is loosened
+DATE_SEGMENT = re.compile(r'\d{4}-\d{2}-\d{2}|\d{8}T\d{4}|\b[a-z]{3}\d{1,2}\.\d{4}\b')
+
+def http_mode() -> str:
+    """Mode for the shared HTTP layer from HTTP_MODE (live, record, replay or standin)"""
+
+    mode = os.getenv('HTTP_MODE', LIVE).lower()
+    if mode not in HTTP_MODES:
+        logger.warning(f"Unknown HTTP_MODE {mode!r}, using live")
+        return LIVE
+    return mode
+
+def _query(url: URL, params: Any = None) -> List[Tuple[str, str]]:
+    pairs = list(url.query.items())
+    if params:
+        pairs.extend((str(k), str(v)) for k, v in (params.items() if isinstance(params, dict) else params))
+    return sorted((k, v) for k, v in pairs if k not in SECRET_PARAMS)
+
+def _body(body: Any) -> str:
+    if body is None:
+        return ''
+    if isinstance(body, (bytes, bytearray)):
+        body = bytes(body).decode('utf-8', 'replace')
+    if isinstance(body, str):
+        try:
+            body = json.loads(body)
+        except ValueError:
+            return body
+    return json.dumps(body, sort_keys=True, separators=(',', ':'))
+
+def standin_url(url: str, standin: str = None) -> str:
+    """https://host/path?query -> <stand-in>/host/path?query"""
+
+    original = URL(url)
+    base = URL(standin or os.getenv('HTTP_STANDIN_URL', DEFAULT_STANDIN_URL))
+    return str(base.with_path(f"/{original.host}{original.path}").with_query(original.query))
+
+def provider_base_url(url: str) -> str:
+    """Base URL for clients outside the shared session (Notion, OpenAI); the stand-in's in standin mode"""
+    return standin_url(url) if http_mode() == STANDIN else url
+
+def request_key(method: str, url: str, params: Any = None, body: Any = None) -> str:
+    """Stable key for a request: method, host, path, query without credentials and canonical body"""
+
+    url = URL(url)
+    query = '&'.join(f"{k}={v}" for k, v in _query(url, params))
+    signature = f"{method.upper()} {url.host}{url.path}?{query}\n{_body(body)}"
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+def request_route(method: str, url: str, params: Any = None) -> str:
+    """Looser match used when no exact recording exists: the full request with its dates ignored
+
+    The query stays in the route, so query-keyed APIs (Alpha Vantage function, FRED series_id,
+    symbols) never replay another request's body.
+    """
+
+    url = URL(url)
+    query = '&'.join(f"{k}={DATE_SEGMENT.sub('{date}', v)}" for k, v in _query(url, params))
+    return f"{method.upper()} {url.host}{DATE_SEGMENT.sub('{date}', url.path)}?{query}"
+
+class CassetteStore:
+    """Recorded responses, one JSON file per request under a directory per host"""
+
+    def __init__(self, root_dir: str = None):
+        self.root_dir = Path(root_dir or os.getenv('HTTP_CASSETTE_DIR', 'http_cassettes'))
+        self._routes: Optional[Dict[str, Dict[str, Any]]] = None
+        self._lock = threading.Lock()
+
+    def _path(self, host: str, key: str) -> Path:
+        return self.root_dir / re.sub(r'[^A-Za-z0-9._-]', '_', host or 'unknown') / f"{key[:20]}.json"
+
+    def save(self, method: str, url: str, params: Any, body: Any, status: int, reason: str,
+             headers: Dict[str, str], content: bytes) -> Path:
+        """Store one response atomically (the URL is stored without credentials)"""
+
+        parsed = URL(url)
+        key = request_key(method, url, params, body)
+        entry = {
+            'key': key,
+            'route': request_route(method, url, params),
+            'method': method.upper(),
+            'url': str(parsed.with_query(_query(parsed, params))),
+            'request_body': _body(body) or None,
+            'status': status,
+            'reason': reason,
+            'headers': headers,
+            'recorded_at': now_ns()
+        }
+        try:
+            entry['body'] = content.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_b64'] = base64.b64encode(content).decode('ascii')
+
+        path = self._path(parsed.host, key)
+        with self._lock:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_suffix('.tmp')
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f, indent=1)
+            os.replace(tmp_path, path)
+            if self._routes is not None:
+                self._routes[entry['route']] = entry
+        logger.debug(f"Recorded {entry['method']} {entry['url']} -> {status}")
+        return path
+
+    def entries(self) -> Iterator[Dict[str, Any]]:
+        for path in sorted(self.root_dir.glob('*/*.json')):
+            try:
+                with open(path, 'r') as f:
+                    yield json.load(f)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable cassette {path}: {e}")
+
+    def _route_index(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            if self._routes is None:
+                routes = {}
+                for entry in self.entries():
+                    # Re-derived from the stored URL (its query included) so older cassettes index the same way
+                    entry['route'] = request_route(entry['method'], entry['url'])
+                    latest = routes.get(entry['route'])
+                    if latest is None or entry['recorded_at'] > latest['recorded_at']:
+                        routes[entry['route']] = entry
+                self._routes = routes
+            return self._routes
+
+    def find(self, method: str, url: str, params: Any = None, body: Any = None) -> Optional[Dict[str, Any]]:
+        """The exact recording for a request, else the latest one differing only in its dates"""
+
+        key = request_key(method, url, params, body)
+        try:
+            with open(self._path(URL(url).host, key), 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            pass
+
+        entry = self._route_index().get(request_route(method, url, params))
+        if entry is not None:
+            logger.debug(f"Replaying {entry['url']} for {method} {url} (route match)")
+        return entry
+
+def entry_content(entry: Dict[str, Any]) -> bytes:
+    if 'body_b64' in entry:
+        return base64.b64decode(entry['body_b64'])
+    return entry.get('body', '').encode('utf-8')
+
+class CassetteContent:
+    """The parts of aiohttp's StreamReader the collectors use, over a recorded body"""
+
+    def __init__(self, content: bytes):
+        self._content = content
+
+    async def read(self, n: int = -1) -> bytes:
+        return self._content
+
+    async def iter_chunked(self, n: int):
+        for start in range(0, len(self._content), n):
+            yield self._content[start:start + n]
+
+class CassetteResponse:
+    """The parts of aiohttp.ClientResponse the collectors use, served from a recording"""
+
+    def __init__(self, entry: Dict[str, Any], method: str, url: str):
+        self.status = entry['status']
+        self.reason = entry.get('reason') or ''
+        self.method = method
+        self.url = URL(url)
+        self.headers = CIMultiDictProxy(CIMultiDict(entry.get('headers') or {}))
+        self._content = entry_content(entry)
+        self.content = CassetteContent(self._content)
+
+    @property
+    def content_type(self) -> str:
+        return self.headers.get('Content-Type', 'application/octet-stream').split(';')[0].strip()
+
+    async def read(self) -> bytes:
+        return self._content
+
+    async def text(self, encoding: str = None, errors: str = 'strict') -> str:
+        return self._content.decode(encoding or 'utf-8', errors)
+
+    async def json(self, encoding: str = None, loads=json.loads, content_type: str = None) -> Any:
+        return loads(self._content.decode(encoding or 'utf-8'))
+
+    def raise_for_status(self):
+        if self.status >= 400:
+            import aiohttp
+            request_info = aiohttp.RequestInfo(self.url, self.method, self.headers, self.url)
+            raise aiohttp.ClientResponseError(request_info, (), status=self.status, message=self.reason)
+
+    def release(self):
+        pass
+
+    async def __aenter__(self) -> 'CassetteResponse':
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        self.release()
+
+class _RequestContext:
+    """Awaitable / async context manager like aiohttp's, around a coroutine returning a response"""
+
+    def __init__(self, coro):
+        self._coro = coro
+        self._response = None
+
+    def __await__(self):
+        return self._coro.__await__()
+
+    async def __aenter__(self):
+        self._response = await self._coro
+        return self._response
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        if self._response is not None:
+            self._response.release()
+
+class ReplaySession:
+    """Wraps an aiohttp session to record, replay or reroute requests to the stand-in server"""
+
+    def __init__(self, session: 'aiohttp.ClientSession', mode: str, store: CassetteStore = None,
+                 standin_url: str = None):
+        self._session = session
+        self.mode = mode
+        self.store = store or get_cassette_store()
+        self.standin_url = standin_url or os.getenv('HTTP_STANDIN_URL', DEFAULT_STANDIN_URL)
+
+    def __getattr__(self, name: str) -> Any:
+        # closed, close(), headers etc. come from the real session
+        return getattr(self._session, name)
+
+    def get(self, url: str, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs):
+        url = str(url)
+        if self.mode == STANDIN:
+            kwargs.setdefault('trace_request_ctx', {'host': URL(url).host})
+            return self._session.request(method, standin_url(url, self.standin_url), **kwargs)
+        if self.mode == RECORD:
+            return _RequestContext(self._record(method, url, **kwargs))
+        return _RequestContext(self._replay(method, url, **kwargs))
+
+    async def _record(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        async with self._session.request(method, url, **kwargs) as response:
+            content = await response.read()
+            headers = {name: response.headers[name] for name in KEPT_HEADERS if name in response.headers}
+            status, reason = response.status, response.reason or ''
+
+        body = kwargs.get('json', kwargs.get('data'))
+        self.store.save(method, url, kwargs.get('params'), body, status, reason, headers, content)
+        return CassetteResponse({'status': status, 'reason': reason, 'headers': headers,
+                                 'body_b64': base64.b64encode(content).decode('ascii')}, method, url)
+
+    async def _replay(self, method: str, url: str, **kwargs) -> CassetteResponse:
+        parsed = URL(url)
+        with span(f"{method.upper()} {parsed.host}", HTTP, host=parsed.host, path=parsed.path,
+                  method=method.upper(), cache_hit=False, replayed=True) as step:
+            entry = self.store.find(method, url, kwargs.get('params'), kwargs.get('json', kwargs.get('data')))
+            if entry is None:
+                import aiohttp
+                raise aiohttp.ClientConnectionError(f"No recorded response for {method} {url}")
+            response = CassetteResponse(entry, method, url)
+            step.set(status=response.status, bytes=len(response._content))
+            return response
+
+def wrap_session(session: 'aiohttp.ClientSession', mode: str = None):
+    """The session itself when live, otherwise a ReplaySession for the configured mode"""
+
+    mode = mode or http_mode()
+    return session if mode == LIVE else ReplaySession(session, mode)
+
+_default_store = None
+
+def get_cassette_store() -> CassetteStore:
+    """Shared process-wide cassette store"""
+
+    global _default_store
+    if _default_store is None:
+        _default_store = CassetteStore()
+    return _default_store
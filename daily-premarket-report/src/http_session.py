@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP Session
+===================
+
+Event-loop-wide aiohttp connection pool that long-running processes keep warm between runs.
+HTTP_MODE=record|replay|standin routes every request through http_replay instead of going live.
+"""
+
+import asyncio
+import logging
+import weakref
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+import aiohttp
+
+try:
+    from .http_replay import wrap_session
+    from .tracing import http_trace_config
+except ImportError:
+    from http_replay import wrap_session
+    from tracing import http_trace_config
+
+logger = logging.getLogger(__name__)
+
+# One pooled session per event loop (sessions cannot be shared across loops)
+_pools: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, aiohttp.ClientSession]" = weakref.WeakKeyDictionary()
+
+@asynccontextmanager
+async def shared_session() -> AsyncIterator[aiohttp.ClientSession]:
+    """The loop's warm pooled session when one is open, otherwise a session closed after use"""
+
+    session = _pools.get(asyncio.get_running_loop())
+    if session is not None and not session.closed:
+        yield wrap_session(session)
+        return
+
+    async with aiohttp.ClientSession(trace_configs=[http_trace_config()]) as session:
+        yield wrap_session(session)
+
+@asynccontextmanager
+async def warm_pool(limit: int = 100, limit_per_host: int = 10,
+                    dns_cache_seconds: int = 3600) -> AsyncIterator[aiohttp.ClientSession]:
+    """Keep one pooled session open on the running loop for every shared_session() caller"""
+
+    loop = asyncio.get_running_loop()
+    connector = aiohttp.TCPConnector(limit=limit, limit_per_host=limit_per_host,
+                                     ttl_dns_cache=dns_cache_seconds)
+    session = aiohttp.ClientSession(connector=connector, trace_configs=[http_trace_config()])
+    _pools[loop] = session
+    logger.info("Shared HTTP pool opened")
+
+    try:
+        yield wrap_session(session)
+    finally:
+        _pools.pop(loop, None)
+        await session.close()
+        logger.info("Shared HTTP pool closed")
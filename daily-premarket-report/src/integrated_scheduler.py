@@ -7,14 +7,15 @@ Enhanced scheduler that automatically saves reports to Notion
 """
 
 import asyncio
-import os
 import json
 import logging
 from datetime import datetime
 from pathlib import Path
 
 from scheduler import DailyReportScheduler
+import report_codec
 from notion_integration import NotionIntegration
+from tracing import trace, span, UPLOAD
 
 logger = logging.getLogger(__name__)
 
@@ -39,66 +40,27 @@ class IntegratedReportSystem(DailyReportScheduler):
             logger.error(f"Error loading Notion config: {e}")
             raise
     
-    async def generate_daily_report_with_notion(self) -> dict:
+    async def generate_daily_report_with_notion(self, session: str = 'premarket') -> dict:
         """Generate report and save to Notion"""
         
         try:
             logger.info("Starting integrated daily report generation with Notion...")
             
-            # Generate the daily report (PDF + Audio)
-            result = await self.generate_daily_report()
-            
-            if result["status"] == "success":
-                # Load the report data for Notion
-                metadata_file = None
-                for file_path in result["files"].values():
-                    if "metadata" in file_path:
-                        metadata_file = file_path
-                        break
+            # The upload joins the report's trace, so the saved span tree covers it too
+            with trace(f"{session}_report", session=session) as run_trace:
+                # Generate the daily report (PDF + Audio)
+                result = await self.generate_daily_report(session)
                 
-                if metadata_file and os.path.exists(metadata_file):
-                    with open(metadata_file, 'r') as f:
+                if result["status"] == "success":
+                    with open(result["metadata_file"], 'r') as f:
                         metadata = json.load(f)
                     
-                    # Load the actual report data
-                    report_data_file = os.path.join(
-                        os.path.dirname(metadata_file), 
-                        f"daily_report_{result['timestamp']}.json"
-                    )
+                    # Reload the archived report data for Notion
+                    report_data = report_codec.load(result["files"]["report_data"])
                     
-                    if os.path.exists(report_data_file):
-                        with open(report_data_file, 'r') as f:
-                            report_data_dict = json.load(f)
-                        
-                        # Convert back to ReportData object for Notion
-                        from report_generator import ReportData, NewsItem, MarketData
-                        
-                        # Reconstruct NewsItem objects
-                        news_events = []
-                        for news_dict in report_data_dict.get('news_events', []):
-                            news_events.append(NewsItem(
-                                headline=news_dict['headline'],
-                                summary=news_dict['summary'],
-                                source=news_dict['source'],
-                                timestamp=news_dict['timestamp'],
-                                sentiment=news_dict['sentiment'],
-                                impact_score=news_dict['impact_score']
-                            ))
-                        
-                        # Create ReportData object
-                        report_data = ReportData(
-                            date=report_data_dict['date'],
-                            executive_summary=report_data_dict['executive_summary'],
-                            market_performance=report_data_dict['market_performance'],
-                            news_events=news_events,
-                            sector_analysis=report_data_dict['sector_analysis'],
-                            technical_analysis=report_data_dict['technical_analysis'],
-                            economic_calendar=report_data_dict['economic_calendar'],
-                            risk_assessment=report_data_dict['risk_assessment']
-                        )
-                        
-                        # Save to Notion
-                        logger.info("Saving report to Notion...")
+                    # Save to Notion
+                    logger.info("Saving report to Notion...")
+                    with span('notion.upload', UPLOAD):
                         notion_page_id = self.notion.save_daily_report(
                             database_id=self.notion_config['database_id'],
                             report_data=report_data,
@@ -106,9 +68,10 @@ class IntegratedReportSystem(DailyReportScheduler):
                             audio_path=result["files"].get("audio_file", ""),
                             metadata=metadata
                         )
-                        
-                        result["notion_page_id"] = notion_page_id
-                        logger.info(f"Report successfully saved to Notion: {notion_page_id}")
+                    
+                    result["notion_page_id"] = notion_page_id
+                    logger.info(f"Report successfully saved to Notion: {notion_page_id}")
+                    self._update_timing(run_trace, result, metadata)
                 
             return result
             
@@ -116,42 +79,43 @@ class IntegratedReportSystem(DailyReportScheduler):
             logger.error(f"Error in integrated report generation: {e}")
             return {"status": "error", "error": str(e)}
     
-    def run_integrated_report_job(self):
-        """Wrapper for integrated async report generation"""
-        logger.info("Triggered integrated daily report job (with Notion) at 5:00 AM Central Time")
-        
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
+    def _update_timing(self, run_trace, result: dict, metadata: dict):
+        """Re-save the span tree and metadata timing once the upload is included"""
         
         try:
-            result = loop.run_until_complete(self.generate_daily_report_with_notion())
-            
-            if result["status"] == "success":
-                logger.info("Integrated daily report job completed successfully")
-                logger.info(f"Notion page created: {result.get('notion_page_id')}")
-            else:
-                logger.error(f"Integrated daily report job failed: {result.get('error')}")
-                
+            run_trace.save(result["files"]["run_trace"])
+            metadata["timing"] = run_trace.summary()
+            with open(result["metadata_file"], 'w') as f:
+                json.dump(metadata, f, indent=2)
+            logger.info(metadata["timing"]["summary"])
+            self._store_artifacts({"run_trace": result["files"]["run_trace"], "report_metadata": result["metadata_file"]},
+                                  metadata["generation_date"], metadata["session"])
         except Exception as e:
-            logger.error(f"Integrated daily report job exception: {e}")
-        finally:
-            loop.close()
+            logger.warning(f"Could not update report timing: {e}")
     
-    def schedule_integrated_daily_reports(self):
-        """Schedule daily reports with Notion integration"""
+    async def run_report(self, session: str = 'premarket'):
+        """Generate one session's report, save it to Notion and log the outcome"""
         
-        import schedule
+        result = await self.generate_daily_report_with_notion(session)
         
-        # Schedule the integrated job for 5:00 AM every day
-        schedule.every().day.at("05:00").do(self.run_integrated_report_job)
+        if result["status"] == "success":
+            logger.info(f"Integrated {session} report job completed successfully")
+            logger.info(f"Notion page created: {result.get('notion_page_id')}")
+        else:
+            logger.error(f"Integrated {session} report job failed: {result.get('error')}")
+        return result
+    
+    def run_integrated_report_job(self):
+        """Run a single integrated report outside the daemon"""
+        logger.info("Triggered integrated daily report job (with Notion)")
         
-        logger.info("Integrated daily premarket reports (with Notion) scheduled for 5:00 AM Central Time")
-        logger.info("Scheduler is now running...")
+        self.run_daily_report_job()
+    
+    def schedule_integrated_daily_reports(self, sessions=('premarket',)):
+        """Run the scheduler daemon with Notion integration"""
         
-        # Keep the scheduler running
-        while True:
-            schedule.run_pending()
-            time.sleep(60)
+        logger.info("Integrated daily reports (with Notion) scheduled in Central Time")
+        self.schedule_daily_reports(sessions)
     
     async def test_notion_integration(self):
         """Test the Notion integration with example report"""
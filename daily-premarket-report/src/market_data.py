@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Market Data Types
+=================
+
+Report records: slotted quotes and news with epoch-nanosecond timestamps, ReportData and a columnar batch of quotes
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, List, Any, Iterator, Mapping, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+NS_PER_SECOND = 1_000_000_000
+
+Timestamp = Union[int, str, datetime, None]
+
+def now_ns() -> int:
+    """Current wall-clock time in epoch nanoseconds"""
+    return time.time_ns()
+
+def to_epoch_ns(value: Timestamp) -> int:
+    """Epoch nanoseconds from an int, datetime or ISO string (naive times are local, unknown is 0)"""
+
+    if value is None or value == "":
+        return 0
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    if isinstance(value, str):
+        try:
+            # Also accepts the compact form Alpha Vantage uses (20240101T120000)
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            logger.debug(f"Unparseable timestamp {value!r}")
+            return 0
+    if isinstance(value, datetime):
+        return int(value.timestamp()) * NS_PER_SECOND + value.microsecond * 1000
+    raise TypeError(f"Unsupported timestamp type {type(value).__name__}")
+
+def ns_to_iso(ns: int) -> str:
+    """Local ISO string for epoch nanoseconds, empty when unknown"""
+
+    if not ns:
+        return ""
+    seconds, remainder = divmod(ns, NS_PER_SECOND)
+    return datetime.fromtimestamp(seconds).replace(microsecond=remainder // 1000).isoformat()
+
+class _Timestamped:
+    """Timestamp coercion shared by the record types (slot-free so subclasses stay slotted)"""
+    __slots__ = ()
+
+    def __post_init__(self):
+        # object.__setattr__ so the frozen variants can normalise too
+        object.__setattr__(self, 'timestamp', to_epoch_ns(self.timestamp))
+
+    @property
+    def timestamp_iso(self) -> str:
+        return ns_to_iso(self.timestamp)
+
+@dataclass(slots=True)
+class MarketData(_Timestamped):
+    """Market data structure"""
+    symbol: str
+    current_price: float
+    change: float
+    change_percent: float
+    volume: int
+    timestamp: int  # epoch ns; ISO strings and datetimes are converted
+
+    def freeze(self) -> 'FrozenMarketData':
+        return FrozenMarketData(self.symbol, self.current_price, self.change,
+                                self.change_percent, self.volume, self.timestamp)
+
+@dataclass(slots=True, frozen=True)
+class FrozenMarketData(_Timestamped):
+    """Immutable, hashable market data for caches and results shared between callers"""
+    symbol: str
+    current_price: float
+    change: float
+    change_percent: float
+    volume: int
+    timestamp: int
+
+@dataclass(slots=True)
+class NewsItem(_Timestamped):
+    """News item structure"""
+    headline: str
+    summary: str
+    source: str
+    timestamp: int  # epoch ns; ISO strings and datetimes are converted
+    sentiment: str
+    impact_score: float
+
+    def freeze(self) -> 'FrozenNewsItem':
+        return FrozenNewsItem(self.headline, self.summary, self.source,
+                              self.timestamp, self.sentiment, self.impact_score)
+
+@dataclass(slots=True, frozen=True)
+class FrozenNewsItem(_Timestamped):
+    """Immutable, hashable news item"""
+    headline: str
+    summary: str
+    source: str
+    timestamp: int
+    sentiment: str
+    impact_score: float
+
+@dataclass
+class ReportData:
+    """Complete report data structure"""
+    date: str
+    executive_summary: Dict[str, Any]
+    market_performance: Dict[str, Any]
+    news_events: List[NewsItem]
+    sector_analysis: Dict[str, Any]
+    technical_analysis: Dict[str, Any]
+    economic_calendar: List[Dict[str, Any]]
+    risk_assessment: Dict[str, Any]
+    earnings_calendar: List[Any] = None  # New field for upcoming earnings
+    stale_sources: Dict[str, Any] = None  # Sources substituted with last-known-good data
+
+class MarketDataFrame:
+    """Struct-of-arrays batch of quotes: one NumPy column per numeric field, keyed by display name"""
+
+    COLUMNS: Tuple[str, ...] = ('current_price', 'change', 'change_percent', 'volume', 'timestamp')
+    DTYPES = {'current_price': np.float64, 'change': np.float64, 'change_percent': np.float64,
+              'volume': np.int64, 'timestamp': np.int64}
+
+    def __init__(self, names: List[str], symbols: List[str], columns: Mapping[str, np.ndarray]):
+        self.names = list(names)
+        self.symbols = list(symbols)
+        self.columns = {column: np.asarray(columns[column], dtype=self.DTYPES[column])
+                        for column in self.COLUMNS}
+        self._index = {name: i for i, name in enumerate(self.names)}
+        for column, values in self.columns.items():
+            if len(values) != len(self.names):
+                raise ValueError(f"Column {column} has {len(values)} rows, expected {len(self.names)}")
+
+    @classmethod
+    def from_quotes(cls, quotes: Mapping[str, MarketData]) -> 'MarketDataFrame':
+        """Batch a {display name: MarketData} mapping"""
+
+        items = list(quotes.items())
+        return cls(
+            [name for name, _ in items],
+            [quote.symbol for _, quote in items],
+            {column: [getattr(quote, column) or 0 for _, quote in items] for column in cls.COLUMNS}
+        )
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def __getattr__(self, column: str) -> np.ndarray:
+        # frame.change_percent etc. return the column
+        try:
+            return self.__dict__['columns'][column]
+        except KeyError:
+            raise AttributeError(column) from None
+
+    def row(self, i: int) -> MarketData:
+        return MarketData(self.symbols[i], float(self.columns['current_price'][i]),
+                          float(self.columns['change'][i]), float(self.columns['change_percent'][i]),
+                          int(self.columns['volume'][i]), int(self.columns['timestamp'][i]))
+
+    def __getitem__(self, name: str) -> MarketData:
+        return self.row(self._index[name])
+
+    def items(self) -> Iterator[Tuple[str, MarketData]]:
+        for i, name in enumerate(self.names):
+            yield name, self.row(i)
+
+    def to_quotes(self) -> Dict[str, MarketData]:
+        """The {display name: MarketData} mapping the renderers take"""
+        return dict(self.items())
+
+    def top_movers(self, n: int = 5) -> List[str]:
+        """Names of the n largest absolute percentage moves"""
+
+        order = np.argsort(-np.abs(self.columns['change_percent']), kind='stable')
+        return [self.names[i] for i in order[:n]]
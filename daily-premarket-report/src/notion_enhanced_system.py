@@ -16,6 +16,7 @@ from pathlib import Path
 from enhanced_report_generator import EnhancedReportGenerator
 from notion_report_generator import NotionReportGenerator
 from audio_generator import AudioReportGenerator
+from tracing import span, RENDER, UPLOAD
 
 logger = logging.getLogger(__name__)
 
@@ -68,14 +69,16 @@ class NotionEnhancedReportSystem:
             
             # Generate enhanced report data
             logger.info("Collecting premium market data...")
-            report_data = await self.report_generator.generate_enhanced_daily_report()
+            with span('collect'):
+                report_data = await self.report_generator.generate_enhanced_daily_report()
             
             # Create comprehensive Notion page
             logger.info("Creating comprehensive Notion page...")
-            notion_page_id = self.notion_generator.create_comprehensive_daily_report(
-                parent_page_id=self.notion_config['main_page_id'],
-                report_data=report_data
-            )
+            with span('notion.page', UPLOAD):
+                notion_page_id = self.notion_generator.create_comprehensive_daily_report(
+                    parent_page_id=self.notion_config['main_page_id'],
+                    report_data=report_data
+                )
             
             # Generate audio report
             logger.info("Generating audio report...")
@@ -83,9 +86,10 @@ class NotionEnhancedReportSystem:
             daily_dir = os.path.join(self.output_dir, timestamp)
             Path(daily_dir).mkdir(parents=True, exist_ok=True)
             
-            audio_result = await self.audio_generator.generate_complete_audio_report(
-                report_data, daily_dir
-            )
+            with span('audio', RENDER):
+                audio_result = await self.audio_generator.generate_complete_audio_report(
+                    report_data, daily_dir
+                )
             
             # Save metadata
             metadata = {
@@ -15,7 +15,9 @@ import requests
 from pathlib import Path
 import base64
 
-from report_generator import ReportData
+from market_data import ReportData
+from report_archive import ReportArchive
+from http_replay import provider_base_url
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +34,7 @@ class NotionIntegration:
             "Content-Type": "application/json",
             "Notion-Version": "2022-06-28"
         }
-        self.base_url = "https://api.notion.com/v1"
+        self.base_url = provider_base_url("https://api.notion.com/v1")
         
     def create_reports_database(self, parent_page_id: str) -> str:
         """Create the main reports database"""
@@ -116,7 +118,7 @@ class NotionIntegration:
             logger.error(f"Error creating database: {e}")
             raise
     
-    def create_analytics_page(self, parent_page_id: str) -> str:
+    def create_analytics_page(self, parent_page_id: str, archive: ReportArchive = None) -> str:
         """Create analytics dashboard page"""
         
         page_data = {
@@ -158,34 +160,7 @@ class NotionIntegration:
                         "rich_text": [{"type": "text", "text": {"content": "🎯 Key Metrics"}}]
                     }
                 },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": "Total Reports Generated"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": "Average Audio Duration: 15-20 minutes"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": "Market Sentiment Distribution"}}]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [{"type": "text", "text": {"content": "Risk Level Trends"}}]
-                    }
-                },
+                *self._analytics_metric_blocks(archive),
                 {
                     "object": "block",
                     "type": "heading_2",
@@ -240,6 +215,40 @@ class NotionIntegration:
             logger.error(f"Error creating analytics page: {e}")
             raise
     
+    def _analytics_metric_blocks(self, archive: ReportArchive = None) -> List[Dict]:
+        """Key metric bullets, filled from the local report archive when one is given"""
+        
+        metrics = [
+            "Total Reports Generated",
+            "Average Audio Duration: 15-20 minutes",
+            "Market Sentiment Distribution",
+            "Risk Level Trends"
+        ]
+        
+        if archive is not None:
+            summary = archive.summary()
+            if summary['total_reports']:
+                def distribution(counts):
+                    return ", ".join(f"{label}: {count}" for label, count in sorted(counts.items(), key=str))
+                
+                metrics = [
+                    f"Total Reports Generated: {summary['total_reports']} ({summary['first_date']} to {summary['last_date']})",
+                    "Average Audio Duration: 15-20 minutes",
+                    f"Market Sentiment Distribution: {distribution(summary['market_sentiment'])}",
+                    f"Risk Level Trends: high risk on {archive.risk_level_frequency('high', 20):.0%} of the last 20 reports"
+                ]
+        
+        return [
+            {
+                "object": "block",
+                "type": "bulleted_list_item",
+                "bulleted_list_item": {
+                    "rich_text": [{"type": "text", "text": {"content": metric}}]
+                }
+            }
+            for metric in metrics
+        ]
+    
     def save_daily_report(self, database_id: str, report_data: ReportData, 
                          pdf_path: str, audio_path: str, metadata: Dict) -> str:
         """Save a daily report to the Notion database"""
@@ -418,6 +427,28 @@ class NotionIntegration:
                 }
             })
         
+        # Reference the outputs by content hash so they can be fetched from the artifact store
+        artifacts = metadata.get('artifacts') or {}
+        if artifacts:
+            page_data["children"].append({
+                "object": "block",
+                "type": "heading_3",
+                "heading_3": {
+                    "rich_text": [{"type": "text", "text": {"content": "🗄️ Artifacts"}}]
+                }
+            })
+            for kind, digest in artifacts.items():
+                page_data["children"].append({
+                    "object": "block",
+                    "type": "bulleted_list_item",
+                    "bulleted_list_item": {
+                        "rich_text": [
+                            {"type": "text", "text": {"content": f"{kind}: "}},
+                            {"type": "text", "text": {"content": f"sha256:{digest}"}, "annotations": {"code": True}}
+                        ]
+                    }
+                })
+        
         try:
             response = requests.post(
                 f"{self.base_url}/pages",
@@ -434,7 +465,7 @@ class NotionIntegration:
             logger.error(f"Error saving report to Notion: {e}")
             raise
     
-    def setup_workspace(self, parent_page_id: str = None) -> Dict[str, str]:
+    def setup_workspace(self, parent_page_id: str = None, archive: ReportArchive = None) -> Dict[str, str]:
         """Set up the complete Notion workspace"""
         
         if not parent_page_id:
@@ -469,7 +500,7 @@ class NotionIntegration:
         
         # Create database and analytics page
         database_id = self.create_reports_database(parent_page_id)
-        analytics_page_id = self.create_analytics_page(parent_page_id)
+        analytics_page_id = self.create_analytics_page(parent_page_id, archive)
         
         return {
             "main_page_id": parent_page_id,
@@ -14,18 +14,45 @@ from typing import Dict, List, Any, Optional
 import requests
 
 try:
-    from .report_generator import ReportData, MarketData, NewsItem
+    from .market_data import ReportData
     from .enhanced_premarket_generator import EnhancedPremarketGenerator, EarningsEvent
+    from .http_replay import provider_base_url
+    from .report_model import (build_report_model, Section, Table as ModelTable, MARKET_TABLES,
+                               POSITIVE, NEGATIVE, WARNING, NEUTRAL)
 except ImportError:
     # For direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-    from report_generator import ReportData, MarketData, NewsItem
+    from market_data import ReportData
     from enhanced_premarket_generator import EnhancedPremarketGenerator, EarningsEvent
+    from http_replay import provider_base_url
+    from report_model import (build_report_model, Section, Table as ModelTable, MARKET_TABLES,
+                              POSITIVE, NEGATIVE, WARNING, NEUTRAL)
 
 logger = logging.getLogger(__name__)
 
+# Report model tones as Notion colours and emoji
+TONE_COLORS = {POSITIVE: "green", NEGATIVE: "red", WARNING: "yellow", NEUTRAL: "yellow", None: "default"}
+TONE_EMOJI = {POSITIVE: "🟢", NEGATIVE: "🔴", WARNING: "🟡", NEUTRAL: "🟡", None: ""}
+
+MARKET_EMOJI = {
+    'previous_close': "📊",
+    'futures': "🌙",
+    'international': "🌍",
+    'currencies': "💱",
+    'commodities': "🏗️"
+}
+
+def _text(content: str, **annotations) -> Dict:
+    """Rich text run; annotations such as bold=True or color='red' are applied when set"""
+    
+    run = {"type": "text", "text": {"content": content}}
+    annotations = {key: value for key, value in annotations.items() if value}
+    if annotations:
+        run["annotations"] = annotations
+    return run
+
 class NotionReportGenerator:
     """Generates comprehensive Notion pages instead of PDFs"""
     
@@ -39,7 +66,10 @@ class NotionReportGenerator:
             "Content-Type": "application/json",
             "Notion-Version": "2022-06-28"
         }
-        self.base_url = "https://api.notion.com/v1"
+        self.base_url = provider_base_url("https://api.notion.com/v1")
+        
+        # {section key: (digest, blocks)} so unchanged sections are not rebuilt
+        self._rendered: Dict[str, tuple] = {}
     
     def create_comprehensive_daily_report(self, parent_page_id: str, report_data: ReportData) -> str:
         """Create a comprehensive daily report as a Notion page"""
@@ -82,21 +112,22 @@ class NotionReportGenerator:
         """Build the complete page structure with all sections"""
         
         content = []
+        model = build_report_model(report_data)
         
         # Header and date
         content.extend(self._build_header(report_data))
         
         # Executive summary
-        content.extend(self._build_executive_summary_section(report_data))
+        content.extend(self._render_section(model.section('executive_summary'), self._build_executive_summary_section))
         
         # Market performance
-        content.extend(self._build_market_performance_section(report_data))
+        content.extend(self._render_section(model.section('market_performance'), self._build_market_performance_section))
         
         # News and events
-        content.extend(self._build_news_events_section(report_data))
+        content.extend(self._render_section(model.section('news'), self._build_news_events_section))
         
         # Economic calendar
-        content.extend(self._build_economic_calendar_section(report_data))
+        content.extend(self._render_section(model.section('economic_calendar'), self._build_economic_calendar_section))
         
         # Earnings calendar (new section)
         content.extend(self._build_earnings_calendar_section(report_data))
@@ -105,7 +136,7 @@ class NotionReportGenerator:
         content.extend(self._build_sector_rotation_section(report_data))
         
         # Risk assessment
-        content.extend(self._build_risk_assessment_section(report_data))
+        content.extend(self._render_section(model.section('risk_assessment'), self._build_risk_assessment_section))
         
         # Footer
         content.extend(self._build_footer())
@@ -164,720 +195,196 @@ class NotionReportGenerator:
             }
         ]
     
-    def _build_executive_summary_section(self, report_data: ReportData) -> List[Dict]:
-        """Build executive summary section"""
-        
-        exec_summary = report_data.executive_summary
-        sentiment = exec_summary.get('market_sentiment', 'neutral')
-        
-        # Choose emoji and color based on sentiment
-        sentiment_emoji = "🟢" if sentiment == "bullish" else "🔴" if sentiment == "bearish" else "🟡"
-        sentiment_color = "green" if sentiment == "bullish" else "red" if sentiment == "bearish" else "yellow"
-        
-        content = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "📋 Executive Summary"},
-                            "annotations": {"bold": True}
-                        }
-                    ]
-                }
-            },
-            {
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": f"{sentiment_emoji} Market Sentiment: "},
-                            "annotations": {"bold": True}
-                        },
-                        {
-                            "type": "text", 
-                            "text": {"content": sentiment.upper()},
-                            "annotations": {"bold": True, "color": sentiment_color}
-                        }
-                    ]
-                }
-            }
-        ]
+    def _render_section(self, section: Section, build) -> List[Dict]:
+        """Blocks for a model section, reused while the section's digest is unchanged"""
         
-        # Key insights
-        content.append({
-            "object": "block",
-            "type": "heading_3",
-            "heading_3": {
-                "rich_text": [
-                    {
-                        "type": "text",
-                        "text": {"content": "🎯 Key Insights"}
-                    }
-                ]
-            }
-        })
+        cached = self._rendered.get(section.key)
+        if cached and cached[0] == section.digest:
+            return cached[1]
         
-        for insight in exec_summary.get('key_insights', []):
-            content.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": insight}
-                        }
-                    ]
-                }
-            })
+        blocks = build(section)
+        self._rendered[section.key] = (section.digest, blocks)
+        return blocks
+    
+    def _heading(self, level: int, content: str, bold: bool = False) -> Dict:
+        kind = f"heading_{level}"
+        return {"object": "block", "type": kind, kind: {"rich_text": [_text(content, bold=bold)]}}
+    
+    def _list_item(self, content: str, ordered: bool = False) -> Dict:
+        kind = "numbered_list_item" if ordered else "bulleted_list_item"
+        return {"object": "block", "type": kind, kind: {"rich_text": [_text(content)]}}
+    
+    def _paragraph(self, *rich_text: Dict) -> Dict:
+        return {"object": "block", "type": "paragraph", "paragraph": {"rich_text": list(rich_text)}}
+    
+    def _table(self, columns, rows: List[List[Dict]]) -> Dict:
+        """Table block with a bold header row; rows are lists of rich text cells"""
         
-        # Recommended actions
-        content.append({
+        header = [[_text(column, bold=True)] for column in columns]
+        return {
             "object": "block",
-            "type": "heading_3",
-            "heading_3": {
-                "rich_text": [
-                    {
-                        "type": "text",
-                        "text": {"content": "📝 Recommended Actions"}
-                    }
+            "type": "table",
+            "table": {
+                "table_width": len(columns),
+                "has_column_header": True,
+                "has_row_header": False,
+                "children": [
+                    {"object": "block", "type": "table_row", "table_row": {"cells": cells}}
+                    for cells in [header] + rows
                 ]
             }
-        })
-        
-        for action in exec_summary.get('recommended_actions', []):
-            content.append({
-                "object": "block",
-                "type": "numbered_list_item",
-                "numbered_list_item": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": action}
-                        }
-                    ]
-                }
-            })
-        
-        return content
+        }
     
-    def _build_market_performance_section(self, report_data: ReportData) -> List[Dict]:
-        """Build market performance section with tables"""
+    def _build_executive_summary_section(self, section: Section) -> List[Dict]:
+        """Build executive summary section"""
+        
+        sentiment = section.kpi('market_sentiment')
         
         content = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "📈 Market Performance Analysis"},
-                            "annotations": {"bold": True}
-                        }
-                    ]
-                }
-            }
+            self._heading(2, "📋 Executive Summary", bold=True),
+            self._paragraph(
+                _text(f"{TONE_EMOJI[sentiment.tone]} {sentiment.label}: ", bold=True),
+                _text(sentiment.text, bold=True, color=TONE_COLORS[sentiment.tone])
+            )
         ]
         
-        market_perf = report_data.market_performance
+        # Key insights
+        content.append(self._heading(3, "🎯 Key Insights"))
+        content.extend(self._list_item(item.text) for item in section.items('key_insights'))
         
-        # Previous session closing data (focus on major indices)
-        previous_close_data = market_perf.get('previous_close')
-        if previous_close_data:
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "📊 Previous Session Close (Major Indices)"}
-                        }
-                    ]
-                }
-            })
-            
-            content.extend(self._create_market_data_table(previous_close_data))
-        else:
-            # If no previous close data, show message
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "📊 Previous Session Close (Major Indices)"}
-                        }
-                    ]
-                }
-            })
-            
-            content.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "Previous session closing data will be available when markets reopen."},
-                            "annotations": {"italic": True}
-                        }
-                    ]
-                }
-            })
+        # Recommended actions
+        content.append(self._heading(3, "📝 Recommended Actions"))
+        content.extend(self._list_item(item.text, ordered=True) for item in section.items('recommended_actions'))
         
-        # Overnight Futures
-        if market_perf.get('futures'):
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "🌙 Overnight Futures"}
-                        }
-                    ]
-                }
-            })
-            
-            content.extend(self._create_market_data_table(market_perf['futures']))
+        return content
+    
+    def _build_market_performance_section(self, section: Section) -> List[Dict]:
+        """Build market performance section with tables"""
         
-        # International Markets
-        if market_perf.get('international'):
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "🌍 International Markets"}
-                        }
-                    ]
-                }
-            })
-            
-            content.extend(self._create_market_data_table(market_perf['international']))
+        content = [self._heading(2, "📈 Market Performance Analysis", bold=True)]
         
-        # Currencies
-        if market_perf.get('currencies'):
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "💱 Currency Markets"}
-                        }
-                    ]
-                }
-            })
-            
-            content.extend(self._create_market_data_table(market_perf['currencies']))
+        # Previous session closing data (focus on major indices) always gets a heading
+        previous_close = section.table('previous_close')
+        if previous_close is None:
+            content.append(self._heading(3, f"{MARKET_EMOJI['previous_close']} {dict(MARKET_TABLES)['previous_close']}"))
+            content.append(self._paragraph(
+                _text("Previous session closing data will be available when markets reopen.", italic=True)
+            ))
         
-        # Commodities
-        if market_perf.get('commodities'):
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "🏗️ Commodities"}
-                        }
-                    ]
-                }
-            })
-            
-            content.extend(self._create_market_data_table(market_perf['commodities']))
+        for heading, table in zip(section.blocks[::2], section.blocks[1::2]):
+            content.append(self._heading(3, f"{MARKET_EMOJI[table.key]} {heading.text}"))
+            content.extend(self._create_market_data_table(table))
         
         return content
     
-    def _create_market_data_table(self, market_data: Dict[str, MarketData]) -> List[Dict]:
+    def _create_market_data_table(self, market_table: ModelTable) -> List[Dict]:
         """Create a Notion table for market data"""
         
-        if not market_data:
-            return [{
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "No data available for this session."},
-                            "annotations": {"italic": True}
-                        }
-                    ]
-                }
-            }]
-        
-        # Create table header
-        table_rows = []
-        
-        for name, data_obj in market_data.items():
-            if hasattr(data_obj, 'current_price'):
-                # Choose emoji and color based on change
-                change_emoji = "🟢" if data_obj.change >= 0 else "🔴"
-                change_color = "green" if data_obj.change >= 0 else "red"
-                
-                table_rows.append({
-                    "object": "block",
-                    "type": "table_row",
-                    "table_row": {
-                        "cells": [
-                            [
-                                {
-                                    "type": "text",
-                                    "text": {"content": name},
-                                    "annotations": {"bold": True}
-                                }
-                            ],
-                            [
-                                {
-                                    "type": "text",
-                                    "text": {"content": f"{data_obj.current_price:.2f}"}
-                                }
-                            ],
-                            [
-                                {
-                                    "type": "text",
-                                    "text": {"content": f"{change_emoji} {data_obj.change:+.2f}"},
-                                    "annotations": {"color": change_color}
-                                }
-                            ],
-                            [
-                                {
-                                    "type": "text",
-                                    "text": {"content": f"{data_obj.change_percent:+.2f}%"},
-                                    "annotations": {"color": change_color, "bold": True}
-                                }
-                            ]
-                        ]
-                    }
-                })
-        
-        if not table_rows:
-            return [{
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "No market data available."},
-                            "annotations": {"italic": True}
-                        }
-                    ]
-                }
-            }]
-        
-        # Create the table block
-        table_content = [
-            {
-                "object": "block",
-                "type": "table",
-                "table": {
-                    "table_width": 4,
-                    "has_column_header": True,
-                    "has_row_header": False,
-                    "children": [
-                        {
-                            "object": "block",
-                            "type": "table_row",
-                            "table_row": {
-                                "cells": [
-                                    [
-                                        {
-                                            "type": "text",
-                                            "text": {"content": "Asset"},
-                                            "annotations": {"bold": True}
-                                        }
-                                    ],
-                                    [
-                                        {
-                                            "type": "text",
-                                            "text": {"content": "Price"},
-                                            "annotations": {"bold": True}
-                                        }
-                                    ],
-                                    [
-                                        {
-                                            "type": "text",
-                                            "text": {"content": "Change"},
-                                            "annotations": {"bold": True}
-                                        }
-                                    ],
-                                    [
-                                        {
-                                            "type": "text",
-                                            "text": {"content": "Change %"},
-                                            "annotations": {"bold": True}
-                                        }
-                                    ]
-                                ]
-                            }
-                        }
-                    ] + table_rows
-                }
-            }
+        if not market_table.rows:
+            return [self._paragraph(_text("No market data available.", italic=True))]
+        
+        rows = [
+            [
+                [_text(name.text, bold=True)],
+                [_text(price.text)],
+                [_text(f"{TONE_EMOJI[change.tone]} {change.text}", color=TONE_COLORS[change.tone])],
+                [_text(change_percent.text, bold=True, color=TONE_COLORS[change_percent.tone])]
+            ]
+            for name, price, change, change_percent in market_table.rows
         ]
-        
-        return table_content
+        return [self._table(market_table.columns, rows)]
     
-    def _build_news_events_section(self, report_data: ReportData) -> List[Dict]:
+    def _build_news_events_section(self, section: Section) -> List[Dict]:
         """Build news and events section"""
         
-        content = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "📰 News & Events Impact"},
-                            "annotations": {"bold": True}
-                        }
-                    ]
-                }
-            }
-        ]
+        content = [self._heading(2, "📰 News & Events Impact", bold=True)]
         
         # Overall sentiment with key themes
-        sector_analysis = report_data.sector_analysis
-        sentiment = sector_analysis.get('overall_sentiment', 'neutral')
-        impact_score = sector_analysis.get('average_impact_score', 0)
-        key_themes = sector_analysis.get('key_themes', [])
+        sentiment = section.kpi('news_sentiment')
+        themes = section.items('key_themes')
         
         content.append({
             "object": "block",
             "type": "callout",
             "callout": {
-                "rich_text": [
-                    {
-                        "type": "text",
-                        "text": {"content": f"News Sentiment: {sentiment} with {len(key_themes)} key themes"}
-                    }
-                ],
+                "rich_text": [_text(f"News Sentiment: {sentiment.value} with {len(themes)} key themes")],
                 "icon": {"emoji": "📊"}
             }
         })
         
         # Add key themes as bulleted list immediately below
-        if key_themes:
-            for theme in key_themes:
-                content.append({
-                    "object": "block",
-                    "type": "bulleted_list_item",
-                    "bulleted_list_item": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": theme}
-                            }
-                        ]
-                    }
-                })
+        content.extend(self._list_item(theme.text) for theme in themes)
         
         # Key news items
-        for i, news_item in enumerate(report_data.news_events[:5], 1):
-            impact_emoji = "🔴" if news_item.impact_score >= 8 else "🟡" if news_item.impact_score >= 6 else "🟢"
-            impact_color = "red" if news_item.impact_score >= 8 else "yellow" if news_item.impact_score >= 6 else "green"
-            
+        for i, news_item in enumerate(section.items('top_news'), 1):
             content.extend([
-                {
-                    "object": "block",
-                    "type": "heading_3",
-                    "heading_3": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": f"{i}. {news_item.headline}"}
-                            }
-                        ]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": news_item.summary}
-                            }
-                        ]
-                    }
-                },
-                {
-                    "object": "block",
-                    "type": "paragraph",
-                    "paragraph": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": f"Source: {news_item.source} | Impact: "},
-                                "annotations": {"italic": True}
-                            },
-                            {
-                                "type": "text",
-                                "text": {"content": f"{impact_emoji} {news_item.impact_score}/10"},
-                                "annotations": {"bold": True, "color": impact_color}
-                            }
-                        ]
-                    }
-                }
+                self._heading(3, f"{i}. {news_item.text}"),
+                self._paragraph(_text(news_item.detail)),
+                self._paragraph(
+                    _text(f"Source: {news_item.meta} | Impact: ", italic=True),
+                    _text(f"{TONE_EMOJI[news_item.tone]} {news_item.value}/10",
+                          bold=True, color=TONE_COLORS[news_item.tone])
+                )
             ])
         
         return content
     
-    
-    def _build_economic_calendar_section(self, report_data: ReportData) -> List[Dict]:
+    def _build_economic_calendar_section(self, section: Section) -> List[Dict]:
         """Build economic calendar section"""
         
-        content = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "📅 Today's Economic Calendar"},
-                            "annotations": {"bold": True}
-                        }
-                    ]
-                }
-            }
-        ]
+        content = [self._heading(2, "📅 Today's Economic Calendar", bold=True)]
         
-        if not report_data.economic_calendar:
-            content.append({
-                "object": "block",
-                "type": "paragraph",
-                "paragraph": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "No major economic events scheduled for today."},
-                            "annotations": {"italic": True}
-                        }
-                    ]
-                }
-            })
+        calendar = section.table('economic_calendar')
+        if not calendar.rows:
+            content.append(self._paragraph(_text("No major economic events scheduled for today.", italic=True)))
             return content
         
         # Create calendar table
-        table_rows = []
-        
-        for event in report_data.economic_calendar:
-            importance = event.get('importance', 'low')
-            importance_emoji = "🔴" if importance == 'high' else "🟡" if importance == 'medium' else "🟢"
-            importance_color = "red" if importance == 'high' else "yellow" if importance == 'medium' else "green"
-            
-            table_rows.append({
-                "object": "block",
-                "type": "table_row",
-                "table_row": {
-                    "cells": [
-                        [
-                            {
-                                "type": "text",
-                                "text": {"content": event.get('time', '')},
-                                "annotations": {"bold": True}
-                            }
-                        ],
-                        [
-                            {
-                                "type": "text",
-                                "text": {"content": event.get('event', '')}
-                            }
-                        ],
-                        [
-                            {
-                                "type": "text",
-                                "text": {"content": f"{importance_emoji} {importance.title()}"},
-                                "annotations": {"color": importance_color}
-                            }
-                        ],
-                        [
-                            {
-                                "type": "text",
-                                "text": {"content": event.get('forecast', 'N/A')}
-                            }
-                        ],
-                        [
-                            {
-                                "type": "text",
-                                "text": {"content": event.get('previous', 'N/A')}
-                            }
-                        ]
-                    ]
-                }
-            })
-        
-        content.append({
-            "object": "block",
-            "type": "table",
-            "table": {
-                "table_width": 5,
-                "has_column_header": True,
-                "has_row_header": False,
-                "children": [
-                    {
-                        "object": "block",
-                        "type": "table_row",
-                        "table_row": {
-                            "cells": [
-                                [{"type": "text", "text": {"content": "Time (ET)"}, "annotations": {"bold": True}}],
-                                [{"type": "text", "text": {"content": "Event"}, "annotations": {"bold": True}}],
-                                [{"type": "text", "text": {"content": "Importance"}, "annotations": {"bold": True}}],
-                                [{"type": "text", "text": {"content": "Forecast"}, "annotations": {"bold": True}}],
-                                [{"type": "text", "text": {"content": "Previous"}, "annotations": {"bold": True}}]
-                            ]
-                        }
-                    }
-                ] + table_rows
-            }
-        })
+        rows = [
+            [
+                [_text(time_cell.text, bold=True)],
+                [_text(event_cell.text)],
+                [_text(f"{TONE_EMOJI[importance.tone]} {importance.text}", color=TONE_COLORS[importance.tone])],
+                [_text(forecast.text)],
+                [_text(previous.text)]
+            ]
+            for time_cell, event_cell, importance, forecast, previous in calendar.rows
+        ]
+        content.append(self._table(calendar.columns, rows))
         
         return content
     
-    def _build_risk_assessment_section(self, report_data: ReportData) -> List[Dict]:
+    def _build_risk_assessment_section(self, section: Section) -> List[Dict]:
         """Build risk assessment section"""
         
-        risk_assessment = report_data.risk_assessment
-        
-        content = [
-            {
-                "object": "block",
-                "type": "heading_2",
-                "heading_2": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "⚖️ Risk Assessment & Opportunities"},
-                            "annotations": {"bold": True}
-                        }
-                    ]
-                }
-            }
-        ]
+        content = [self._heading(2, "⚖️ Risk Assessment & Opportunities", bold=True)]
         
         # Overall risk level
-        risk_level = risk_assessment.get('overall_risk_level', 'medium')
-        risk_emoji = "🔴" if risk_level == 'high' else "🟡" if risk_level == 'medium' else "🟢"
-        risk_color = "red" if risk_level == 'high' else "yellow" if risk_level == 'medium' else "green"
-        
+        risk = section.kpi('overall_risk_level')
         content.append({
             "object": "block",
             "type": "callout",
             "callout": {
                 "rich_text": [
-                    {
-                        "type": "text",
-                        "text": {"content": f"Overall Risk Level: {risk_emoji} {risk_level.upper()}"},
-                        "annotations": {"bold": True, "color": risk_color}
-                    }
+                    _text(f"{risk.label}: {TONE_EMOJI[risk.tone]} {risk.text}", bold=True, color=TONE_COLORS[risk.tone])
                 ],
                 "icon": {"emoji": "⚠️"}
             }
         })
         
         # Primary risks
-        content.append({
-            "object": "block",
-            "type": "heading_3",
-            "heading_3": {
-                "rich_text": [
-                    {
-                        "type": "text",
-                        "text": {"content": "⚠️ Primary Risk Factors"}
-                    }
-                ]
-            }
-        })
-        
-        for risk in risk_assessment.get('primary_risks', []):
-            content.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": risk}
-                        }
-                    ]
-                }
-            })
+        content.append(self._heading(3, "⚠️ Primary Risk Factors"))
+        content.extend(self._list_item(item.text) for item in section.items('primary_risks'))
         
         # Opportunities
-        content.append({
-            "object": "block",
-            "type": "heading_3",
-            "heading_3": {
-                "rich_text": [
-                    {
-                        "type": "text",
-                        "text": {"content": "🎯 Opportunity Areas"}
-                    }
-                ]
-            }
-        })
-        
-        for opp in risk_assessment.get('opportunity_areas', []):
-            content.append({
-                "object": "block",
-                "type": "bulleted_list_item",
-                "bulleted_list_item": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": opp}
-                        }
-                    ]
-                }
-            })
+        content.append(self._heading(3, "🎯 Opportunity Areas"))
+        content.extend(self._list_item(item.text) for item in section.items('opportunity_areas'))
         
         # Hedging recommendations
-        if risk_assessment.get('hedging_recommendations'):
-            content.append({
-                "object": "block",
-                "type": "heading_3",
-                "heading_3": {
-                    "rich_text": [
-                        {
-                            "type": "text",
-                            "text": {"content": "🛡️ Hedging Recommendations"}
-                        }
-                    ]
-                }
-            })
-            
-            for hedge in risk_assessment['hedging_recommendations']:
-                content.append({
-                    "object": "block",
-                    "type": "numbered_list_item",
-                    "numbered_list_item": {
-                        "rich_text": [
-                            {
-                                "type": "text",
-                                "text": {"content": hedge}
-                            }
-                        ]
-                    }
-                })
+        hedges = section.items('hedging_recommendations')
+        if hedges:
+            content.append(self._heading(3, "🛡️ Hedging Recommendations"))
+            content.extend(self._list_item(item.text, ordered=True) for item in hedges)
         
         return content
     
@@ -7,20 +7,19 @@ Professional PDF generation for Daily Premarket Reports
 """
 
 import os
-import matplotlib.pyplot as plt
-import seaborn as sns
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import List, Any
 from reportlab.lib.pagesizes import letter
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak, Image
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
 from reportlab.lib import colors
 from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_RIGHT
-from io import BytesIO
-import base64
-import pandas as pd
-from report_generator import ReportData, MarketData, NewsItem
+from market_data import ReportData
+from report_model import build_report_model, Cell, Table as ModelTable, POSITIVE, NEGATIVE, WARNING, NEUTRAL
+
+# Report model tones as ReportLab font colours
+TONE_COLORS = {POSITIVE: 'green', NEGATIVE: 'red', WARNING: 'orange', NEUTRAL: 'orange', None: 'black'}
 
 class PDFReportGenerator:
     """Generates professional PDF reports for portfolio managers"""
@@ -162,18 +161,16 @@ class PDFReportGenerator:
         """Build executive summary section"""
         story = []
         
+        section = build_report_model(report_data).section('executive_summary')
+        
         # Section header
-        header = Paragraph("Executive Summary", self.styles['SectionHeader'])
+        header = Paragraph(section.title, self.styles['SectionHeader'])
         story.append(header)
         
-        exec_summary = report_data.executive_summary
-        
         # Market sentiment
-        sentiment = exec_summary.get('market_sentiment', 'neutral')
-        sentiment_color = 'green' if sentiment == 'bullish' else 'red' if sentiment == 'bearish' else 'orange'
-        
+        sentiment = section.kpi('market_sentiment')
         sentiment_para = Paragraph(
-            f"<b>Market Sentiment:</b> <font color='{sentiment_color}'>{sentiment.upper()}</font>",
+            f"<b>{sentiment.label}:</b> <font color='{TONE_COLORS[sentiment.tone]}'>{sentiment.text}</font>",
             self.styles['Normal']
         )
         story.append(sentiment_para)
@@ -183,8 +180,8 @@ class PDFReportGenerator:
         insights_header = Paragraph("Key Insights:", self.styles['SubSection'])
         story.append(insights_header)
         
-        for insight in exec_summary.get('key_insights', []):
-            insight_para = Paragraph(f"• {insight}", self.styles['KeyInsight'])
+        for insight in section.items('key_insights'):
+            insight_para = Paragraph(f"• {insight.text}", self.styles['KeyInsight'])
             story.append(insight_para)
         
         story.append(Spacer(1, 0.1*inch))
@@ -193,8 +190,8 @@ class PDFReportGenerator:
         actions_header = Paragraph("Recommended Actions:", self.styles['SubSection'])
         story.append(actions_header)
         
-        for action in exec_summary.get('recommended_actions', []):
-            action_para = Paragraph(f"• {action}", self.styles['Normal'])
+        for action in section.items('recommended_actions'):
+            action_para = Paragraph(f"• {action.text}", self.styles['Normal'])
             story.append(action_para)
         
         story.append(Spacer(1, 0.2*inch))
@@ -205,75 +202,32 @@ class PDFReportGenerator:
         """Build market performance section"""
         story = []
         
-        header = Paragraph("Market Performance Analysis", self.styles['SectionHeader'])
-        story.append(header)
-        
-        market_perf = report_data.market_performance
+        section = build_report_model(report_data).section('market_performance')
         
-        # Overnight Futures
-        if 'futures' in market_perf and market_perf['futures']:
-            futures_header = Paragraph("Overnight Futures", self.styles['SubSection'])
-            story.append(futures_header)
-            
-            futures_table = self._create_market_data_table(market_perf['futures'])
-            story.append(futures_table)
-            story.append(Spacer(1, 0.1*inch))
+        header = Paragraph(section.title, self.styles['SectionHeader'])
+        story.append(header)
         
-        # International Markets
-        if 'international' in market_perf and market_perf['international']:
-            intl_header = Paragraph("International Markets", self.styles['SubSection'])
-            story.append(intl_header)
-            
-            intl_table = self._create_market_data_table(market_perf['international'])
-            story.append(intl_table)
+        # Heading + table pairs in display order (the PDF leaves out the previous close table)
+        for heading, table in zip(section.blocks[::2], section.blocks[1::2]):
+            if table.key == 'previous_close':
+                continue
+            story.append(Paragraph(heading.text, self.styles['SubSection']))
+            story.append(self._create_market_data_table(table))
             story.append(Spacer(1, 0.1*inch))
         
-        # Currencies
-        if 'currencies' in market_perf and market_perf['currencies']:
-            curr_header = Paragraph("Currency Markets", self.styles['SubSection'])
-            story.append(curr_header)
-            
-            curr_table = self._create_market_data_table(market_perf['currencies'])
-            story.append(curr_table)
-            story.append(Spacer(1, 0.1*inch))
-        
-        # Commodities
-        if 'commodities' in market_perf and market_perf['commodities']:
-            comm_header = Paragraph("Commodities", self.styles['SubSection'])
-            story.append(comm_header)
-            
-            comm_table = self._create_market_data_table(market_perf['commodities'])
-            story.append(comm_table)
-        
-        story.append(Spacer(1, 0.2*inch))
+        story.append(Spacer(1, 0.1*inch))
         
         return story
     
-    def _create_market_data_table(self, market_data: Dict[str, MarketData]) -> Table:
+    def _create_market_data_table(self, market_table: ModelTable) -> Table:
         """Create a formatted table for market data"""
         
         # Table headers
-        data = [['Asset', 'Price', 'Change', 'Change %']]
-        
-        # Add data rows
-        for name, data_obj in market_data.items():
-            if hasattr(data_obj, 'current_price'):
-                change_color = 'green' if data_obj.change >= 0 else 'red'
-                
-                # Create properly formatted cells
-                name_cell = name
-                price_cell = f"{data_obj.current_price:.2f}"
-                change_cell = Paragraph(
-                    f"<font color='{change_color}'>{data_obj.change:+.2f}</font>",
-                    self.styles['Normal']
-                )
-                change_percent_cell = Paragraph(
-                    f"<font color='{change_color}'>{data_obj.change_percent:+.2f}%</font>",
-                    self.styles['Normal']
-                )
-                
-                row = [name_cell, price_cell, change_cell, change_percent_cell]
-                data.append(row)
+        data = [list(market_table.columns)]
+        
+        # Add data rows; change cells carry their colour
+        for name, price, change, change_percent in market_table.rows:
+            data.append([name.text, price.text, self._tone_cell(change), self._tone_cell(change_percent)])
         
         # Create table
         table = Table(data, colWidths=[2.5*inch, 1*inch, 1*inch, 1*inch])
@@ -295,21 +249,25 @@ class PDFReportGenerator:
         
         return table
     
+    def _tone_cell(self, cell: Cell) -> Paragraph:
+        """Table cell coloured by its tone"""
+        return Paragraph(f"<font color='{TONE_COLORS[cell.tone]}'>{cell.text}</font>", self.styles['Normal'])
+    
     def _build_news_events(self, report_data: ReportData) -> List:
         """Build news and events section"""
         story = []
         
-        header = Paragraph("News & Events Impact", self.styles['SectionHeader'])
+        section = build_report_model(report_data).section('news')
+        
+        header = Paragraph(section.title, self.styles['SectionHeader'])
         story.append(header)
         
         # Sentiment analysis summary
-        sector_analysis = report_data.sector_analysis
-        sentiment = sector_analysis.get('overall_sentiment', 'neutral')
-        impact_score = sector_analysis.get('average_impact_score', 0)
-        
+        sentiment = section.kpi('news_sentiment')
+        impact = section.kpi('average_impact')
         sentiment_para = Paragraph(
-            f"<b>Overall News Sentiment:</b> {sentiment.title()} "
-            f"<b>Average Impact Score:</b> {impact_score}/10",
+            f"<b>{sentiment.label}:</b> {sentiment.text} "
+            f"<b>{impact.label}:</b> {impact.text}",
             self.styles['Normal']
         )
         story.append(sentiment_para)
@@ -319,14 +277,12 @@ class PDFReportGenerator:
         news_header = Paragraph("Key News Items:", self.styles['SubSection'])
         story.append(news_header)
         
-        for i, news_item in enumerate(report_data.news_events[:5]):  # Top 5 news items
-            impact_color = 'red' if news_item.impact_score >= 8 else 'orange' if news_item.impact_score >= 6 else 'green'
-            
+        for news_item in section.items('top_news'):
             news_para = Paragraph(
-                f"<b>{news_item.headline}</b><br/>"
-                f"{news_item.summary}<br/>"
-                f"<i>Source: {news_item.source} | "
-                f"Impact: <font color='{impact_color}'>{news_item.impact_score}/10</font></i>",
+                f"<b>{news_item.text}</b><br/>"
+                f"{news_item.detail}<br/>"
+                f"<i>Source: {news_item.meta} | "
+                f"Impact: <font color='{TONE_COLORS[news_item.tone]}'>{news_item.value}/10</font></i>",
                 self.styles['Normal']
             )
             story.append(news_para)
@@ -338,33 +294,32 @@ class PDFReportGenerator:
         """Build technical analysis section"""
         story = []
         
-        header = Paragraph("Technical Analysis", self.styles['SectionHeader'])
-        story.append(header)
+        section = build_report_model(report_data).section('technical_analysis')
         
-        tech_analysis = report_data.technical_analysis
+        header = Paragraph(section.title, self.styles['SectionHeader'])
+        story.append(header)
         
         # VIX and volatility
-        vix_level = tech_analysis.get('vix_level', 20)
-        vol_regime = tech_analysis.get('volatility_regime', 'medium')
-        vol_color = 'red' if vol_regime == 'high' else 'orange' if vol_regime == 'medium' else 'green'
-        
+        vix = section.kpi('vix_level')
+        regime = section.kpi('volatility_regime')
         vix_para = Paragraph(
-            f"<b>VIX Level:</b> {vix_level} "
-            f"<b>Volatility Regime:</b> <font color='{vol_color}'>{vol_regime.title()}</font>",
+            f"<b>{vix.label}:</b> {vix.text} "
+            f"<b>{regime.label}:</b> <font color='{TONE_COLORS[regime.tone]}'>{regime.text}</font>",
             self.styles['Normal']
         )
         story.append(vix_para)
         story.append(Spacer(1, 0.1*inch))
         
         # Key levels
-        if 'key_levels' in tech_analysis:
+        levels = section.table('key_levels')
+        if levels:
             levels_header = Paragraph("Key Technical Levels:", self.styles['SubSection'])
             story.append(levels_header)
             
-            for symbol, levels in tech_analysis['key_levels'].items():
+            for symbol, support, resistance in levels.rows:
                 levels_para = Paragraph(
-                    f"<b>{symbol}:</b> Support: {levels.get('support', 'N/A')} | "
-                    f"Resistance: {levels.get('resistance', 'N/A')}",
+                    f"<b>{symbol.text}:</b> Support: {support.text} | "
+                    f"Resistance: {resistance.text}",
                     self.styles['Normal']
                 )
                 story.append(levels_para)
@@ -377,28 +332,18 @@ class PDFReportGenerator:
         """Build economic calendar section"""
         story = []
         
-        header = Paragraph("Today's Economic Calendar", self.styles['SectionHeader'])
+        section = build_report_model(report_data).section('economic_calendar')
+        
+        header = Paragraph(section.title, self.styles['SectionHeader'])
         story.append(header)
         
-        if report_data.economic_calendar:
-            # Create table
-            cal_data = [['Time (ET)', 'Event', 'Importance', 'Forecast', 'Previous']]
-            
-            for event in report_data.economic_calendar:
-                importance_color = 'red' if event.get('importance') == 'high' else 'orange' if event.get('importance') == 'medium' else 'green'
-                
-                # Create properly formatted table cells
-                time_cell = event.get('time', '')
-                event_cell = event.get('event', '')
-                importance_cell = Paragraph(
-                    f"<font color='{importance_color}'>{event.get('importance', '').title()}</font>",
-                    self.styles['Normal']
-                )
-                forecast_cell = event.get('forecast', 'N/A')
-                previous_cell = event.get('previous', 'N/A')
-                
-                row = [time_cell, event_cell, importance_cell, forecast_cell, previous_cell]
-                cal_data.append(row)
+        calendar = section.table('economic_calendar')
+        if calendar.rows:
+            # Create table; the importance cell carries its colour
+            cal_data = [list(calendar.columns)]
+            for time_cell, event_cell, importance_cell, forecast_cell, previous_cell in calendar.rows:
+                cal_data.append([time_cell.text, event_cell.text, self._tone_cell(importance_cell),
+                                 forecast_cell.text, previous_cell.text])
             
             cal_table = Table(cal_data, colWidths=[1*inch, 2*inch, 0.8*inch, 0.8*inch, 0.8*inch])
             cal_table.setStyle(TableStyle([
@@ -427,49 +372,29 @@ class PDFReportGenerator:
         """Build risk assessment section"""
         story = []
         
-        header = Paragraph("Risk Assessment & Opportunities", self.styles['SectionHeader'])
-        story.append(header)
+        section = build_report_model(report_data).section('risk_assessment')
         
-        risk_assessment = report_data.risk_assessment
+        header = Paragraph(section.title, self.styles['SectionHeader'])
+        story.append(header)
         
         # Overall risk level
-        risk_level = risk_assessment.get('overall_risk_level', 'medium')
-        risk_color = 'red' if risk_level == 'high' else 'orange' if risk_level == 'medium' else 'green'
-        
+        risk = section.kpi('overall_risk_level')
         risk_para = Paragraph(
-            f"<b>Overall Risk Level:</b> <font color='{risk_color}'>{risk_level.upper()}</font>",
+            f"<b>{risk.label}:</b> <font color='{TONE_COLORS[risk.tone]}'>{risk.text}</font>",
             self.styles['Normal']
         )
         story.append(risk_para)
         story.append(Spacer(1, 0.1*inch))
         
-        # Primary risks
-        risks_header = Paragraph("Primary Risk Factors:", self.styles['SubSection'])
-        story.append(risks_header)
-        
-        for risk in risk_assessment.get('primary_risks', []):
-            risk_para = Paragraph(f"• {risk}", self.styles['Normal'])
-            story.append(risk_para)
-        
-        story.append(Spacer(1, 0.1*inch))
-        
-        # Opportunities
-        opps_header = Paragraph("Opportunity Areas:", self.styles['SubSection'])
-        story.append(opps_header)
-        
-        for opp in risk_assessment.get('opportunity_areas', []):
-            opp_para = Paragraph(f"• {opp}", self.styles['Normal'])
-            story.append(opp_para)
-        
-        story.append(Spacer(1, 0.1*inch))
-        
-        # Hedging recommendations
-        hedge_header = Paragraph("Hedging Recommendations:", self.styles['SubSection'])
-        story.append(hedge_header)
-        
-        for hedge in risk_assessment.get('hedging_recommendations', []):
-            hedge_para = Paragraph(f"• {hedge}", self.styles['Normal'])
-            story.append(hedge_para)
+        # Risks, opportunities and hedges as bullet lists
+        for key, title in (('primary_risks', "Primary Risk Factors:"),
+                           ('opportunity_areas', "Opportunity Areas:"),
+                           ('hedging_recommendations', "Hedging Recommendations:")):
+            if key != 'primary_risks':
+                story.append(Spacer(1, 0.1*inch))
+            story.append(Paragraph(title, self.styles['SubSection']))
+            for item in section.items(key):
+                story.append(Paragraph(f"• {item.text}", self.styles['Normal']))
         
         # Footer
         story.append(Spacer(1, 0.3*inch))
@@ -7,7 +7,6 @@ Collects real-time market data from Polygon.io API
 """
 
 import asyncio
-import aiohttp
 import logging
 import os
 from datetime import datetime, timedelta
@@ -15,82 +14,90 @@ from typing import Dict, List, Any, Optional
 import json
 
 try:
-    from .report_generator import MarketData
+    from . import clock
+    from .market_data import MarketData, now_ns
+    from .bar_store import BarStore
+    from .price_matrix import PriceMatrix, HORIZONS
+    from .http_session import shared_session
+    from .single_flight import coalesce
+    from .symbol_universe import UNIVERSE
 except ImportError:
     # For direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-    from report_generator import MarketData
+    import clock
+    from market_data import MarketData, now_ns
+    from bar_store import BarStore
+    from price_matrix import PriceMatrix, HORIZONS
+    from http_session import shared_session
+    from single_flight import coalesce
+    from symbol_universe import UNIVERSE
 
 logger = logging.getLogger(__name__)
 
 class PolygonCollector:
     """Collects real-time market data from Polygon.io API"""
     
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, bar_store: BarStore = None):
         self.api_key = api_key or os.getenv('POLYGON_API_KEY', 'HbXfH6nXt1eipjkkBwRrsob56NLB1BPo')
         self.base_url = "https://api.polygon.io"
         
+        # Local history so each run only fetches bars newer than what is stored
+        self.bar_store = bar_store or BarStore()
+        
         # No rate limiting with Stocks Starter plan!
         self.unlimited_calls = True
         self.plan_type = "Stocks Starter"
         
         # Major market symbols
-        self.major_indices = {
-            'SPY': 'S&P 500 ETF',
-            'QQQ': 'NASDAQ ETF', 
-            'IWM': 'Russell 2000 ETF',
-            'DIA': 'Dow Jones ETF'
-        }
-        
-        self.futures_symbols = {
-            'ES': 'S&P 500 Futures',
-            'NQ': 'NASDAQ Futures',
-            'RTY': 'Russell 2000 Futures',
-            'YM': 'Dow Futures'
-        }
+        self.major_indices = UNIVERSE.symbol_map('major_etfs', 'polygon')
+        
+        # Use ETFs but display as index names (index data requires separate Polygon plan)
+        self.previous_close_symbols = UNIVERSE.symbol_map('previous_close', 'polygon', context='previous_close')
+        
+        self.futures_symbols = UNIVERSE.symbol_map('futures', 'polygon')
+        
+        # Sector ETFs for rotation analysis
+        self.sector_etfs = UNIVERSE.symbol_map('sectors', 'polygon')
     
     async def get_previous_close_data(self) -> Dict[str, MarketData]:
         """Get previous trading day closing data for major indices - optimized for 5 req/min limit"""
         
         closing_data = {}
         
-        # Use ETFs but display as index names (index data requires separate Polygon plan)
-        priority_symbols = [
-            ('SPY', 'S&P 500'),
-            ('QQQ', 'NASDAQ Composite'), 
-            ('IWM', 'Russell 2000'),
-            ('VIX', 'VIX'),
-            ('DIA', 'Dow Jones Industrial Average')
-        ]
-        
-        for symbol, name in priority_symbols:
+        for symbol, name in self.previous_close_symbols.items():
             # No rate limit check needed with unlimited calls!
-                
-            try:
-                # Get previous close data
-                prev_close = await self._get_previous_close(symbol)
-                
-                if prev_close:
-                    closing_data[name] = MarketData(
-                        symbol=symbol,
-                        current_price=prev_close.get('c', 0),  # close price
-                        change=prev_close.get('c', 0) - prev_close.get('o', 0),  # close - open
-                        change_percent=((prev_close.get('c', 0) - prev_close.get('o', 0)) / prev_close.get('o', 1)) * 100,
-                        volume=int(prev_close.get('v', 0)),  # volume
-                        timestamp=datetime.now().isoformat()
-                    )
-                    logger.info(f"Successfully got {symbol} data: ${prev_close.get('c', 0)}")
-                else:
-                    logger.warning(f"No data returned for {symbol}")
-                    
-            except Exception as e:
-                logger.error(f"Error fetching closing data for {symbol}: {e}")
-                continue
+            quote = await self.get_previous_close_quote(symbol)
+            if quote:
+                closing_data[name] = quote
         
         return closing_data
     
+    async def get_previous_close_quote(self, symbol: str) -> Optional[MarketData]:
+        """Get the previous session's close for one symbol"""
+        
+        try:
+            prev_close = await self._get_previous_close(symbol)
+            
+            if prev_close:
+                logger.info(f"Successfully got {symbol} data: ${prev_close.get('c', 0)}")
+                return MarketData(
+                    symbol=symbol,
+                    current_price=prev_close.get('c', 0),  # close price
+                    change=prev_close.get('c', 0) - prev_close.get('o', 0),  # close - open
+                    change_percent=((prev_close.get('c', 0) - prev_close.get('o', 0)) / prev_close.get('o', 1)) * 100,
+                    volume=int(prev_close.get('v', 0)),  # volume
+                    timestamp=now_ns()
+                )
+            else:
+                logger.warning(f"No data returned for {symbol}")
+                
+        except Exception as e:
+            logger.error(f"Error fetching closing data for {symbol}: {e}")
+        
+        return None
+    
     async def get_overnight_futures(self) -> Dict[str, MarketData]:
         """Get overnight futures data"""
         
@@ -100,33 +107,40 @@ class PolygonCollector:
         # We'll try to get futures data, but fall back to ETF equivalents
         
         for symbol, name in self.futures_symbols.items():
+            quote = await self.get_future_quote(symbol)
+            if quote:
+                futures_data[name] = quote
+        
+        return futures_data
+    
+    async def get_future_quote(self, symbol: str) -> Optional[MarketData]:
+        """Get the current front-month futures price against the previous close"""
+        
+        try:
+            # Try to get futures data (may not be available on free tier)
+            current_price = await self._get_current_price(f"{symbol}1!")
+            
+            if current_price:
+                # Get previous close for comparison
+                prev_close = await self._get_previous_close(f"{symbol}1!")
                 
-            try:
-                # Try to get futures data (may not be available on free tier)
-                current_price = await self._get_current_price(f"{symbol}1!")
-                
-                if current_price:
-                    # Get previous close for comparison
-                    prev_close = await self._get_previous_close(f"{symbol}1!")
+                if prev_close:
+                    change = current_price - prev_close.get('c', current_price)
+                    change_percent = (change / prev_close.get('c', current_price)) * 100
                     
-                    if prev_close:
-                        change = current_price - prev_close.get('c', current_price)
-                        change_percent = (change / prev_close.get('c', current_price)) * 100
-                        
-                        futures_data[name] = MarketData(
-                            symbol=f"{symbol}1!",
-                            current_price=current_price,
-                            change=change,
-                            change_percent=change_percent,
-                            volume=0,  # Volume not available for current price
-                            timestamp=datetime.now().isoformat()
-                        )
-                        
-            except Exception as e:
-                logger.warning(f"Error fetching futures data for {symbol}: {e}")
-                continue
+                    return MarketData(
+                        symbol=f"{symbol}1!",
+                        current_price=current_price,
+                        change=change,
+                        change_percent=change_percent,
+                        volume=0,  # Volume not available for current price
+                        timestamp=now_ns()
+                    )
+                    
+        except Exception as e:
+            logger.warning(f"Error fetching futures data for {symbol}: {e}")
         
-        return futures_data
+        return None
     
     async def get_international_markets(self) -> Dict[str, MarketData]:
         """Get international market data (ETFs)"""
@@ -134,13 +148,7 @@ class PolygonCollector:
         international_data = {}
         
         # International market ETFs (more likely to be available on free tier)
-        intl_etfs = {
-            'EWJ': 'Japan (Nikkei)',
-            'EWH': 'Hong Kong (Hang Seng)', 
-            'EWU': 'UK (FTSE)',
-            'EWG': 'Germany (DAX)',
-            'EWQ': 'France (CAC)'
-        }
+        intl_etfs = UNIVERSE.symbol_map('international', 'polygon', context='etf_proxy')
         
         for symbol, name in intl_etfs.items():
                 
@@ -154,7 +162,7 @@ class PolygonCollector:
                         change=prev_close.get('c', 0) - prev_close.get('o', 0),
                         change_percent=((prev_close.get('c', 0) - prev_close.get('o', 0)) / prev_close.get('o', 1)) * 100,
                         volume=int(prev_close.get('v', 0)),
-                        timestamp=datetime.now().isoformat()
+                        timestamp=now_ns()
                     )
                     
             except Exception as e:
@@ -168,20 +176,7 @@ class PolygonCollector:
         
         sector_data = {}
         
-        sector_etfs = {
-            'XLK': 'Technology',
-            'XLF': 'Financial',
-            'XLE': 'Energy',
-            'XLV': 'Healthcare',
-            'XLI': 'Industrial',
-            'XLP': 'Consumer Staples',
-            'XLY': 'Consumer Discretionary',
-            'XLU': 'Utilities',
-            'XLB': 'Materials',
-            'XLRE': 'Real Estate'
-        }
-        
-        for symbol, sector in sector_etfs.items():
+        for symbol, sector in self.sector_etfs.items():
                 
             try:
                 # Get 5-day historical data for weekly performance
@@ -212,12 +207,27 @@ class PolygonCollector:
         
         return sector_data
     
+    async def get_price_matrix(self, symbols: List[str], lookback: int = HORIZONS['1y'],
+                               max_age: float = None) -> PriceMatrix:
+        """Bring stored history up to date for symbols and open the date x symbol price matrix"""
+        
+        # Calendar days needed to cover the lookback in trading sessions
+        days = int(lookback * 365 / 252) + 7
+        await asyncio.gather(*(self._get_historical_data(symbol, days=days, max_age=max_age) for symbol in symbols))
+        
+        return PriceMatrix.open_or_build(self.bar_store, symbols)
+    
     async def _get_previous_close(self, symbol: str) -> Optional[Dict]:
-        """Get previous trading day data for a symbol"""
+        """Get previous trading day data for a symbol, shared by every caller in the run"""
+        
+        return await coalesce(('polygon', 'previous_close', symbol), lambda: self._fetch_previous_close(symbol))
+    
+    async def _fetch_previous_close(self, symbol: str) -> Optional[Dict]:
+        """Fetch previous trading day data for a symbol"""
         
         # Try multiple recent trading days since markets might be closed
         for days_back in range(1, 6):  # Try last 5 days
-            date = datetime.now() - timedelta(days=days_back)
+            date = clock.now() - timedelta(days=days_back)
             
             # Skip weekends
             if date.weekday() >= 5:  # Saturday = 5, Sunday = 6
@@ -230,7 +240,7 @@ class PolygonCollector:
             
             try:
                 
-                async with aiohttp.ClientSession() as session:
+                async with shared_session() as session:
                     # Use correct parameter name 'apikey' (not 'apiKey')
                     async with session.get(url, params={'apikey': self.api_key, 'adjusted': 'true'}) as response:
                         if response.status == 200:
@@ -265,11 +275,15 @@ class PolygonCollector:
     async def _get_current_price(self, symbol: str) -> Optional[float]:
         """Get current price for a symbol"""
         
+        if clock.is_historical():
+            # The last trade is only available live
+            return None
+        
         url = f"{self.base_url}/v2/last/trade/{symbol}"
         
         try:
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(url, params={'apikey': self.api_key}) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -282,17 +296,57 @@ class PolygonCollector:
             logger.error(f"Error fetching current price for {symbol}: {e}")
             return None
     
-    async def _get_historical_data(self, symbol: str, days: int = 5) -> List[Dict]:
-        """Get historical data for a symbol"""
+    async def _get_historical_data(self, symbol: str, days: int = 5, timespan: str = 'day',
+                                   max_age: float = None) -> List[Dict]:
+        """Get historical data for a symbol, fetching only bars missing from the local store"""
+        
+        now = clock.now()
+        window_start = now - timedelta(days=days+2)  # Extra days for weekends
+        window_start_ms = int(window_start.timestamp() * 1000)
+        now_ms = int(now.timestamp() * 1000)
         
-        end_date = datetime.now().strftime('%Y-%m-%d')
-        start_date = (datetime.now() - timedelta(days=days+2)).strftime('%Y-%m-%d')  # Extra days for weekends
+        cutoff = clock.bar_cutoff_ms(timespan)
+        if cutoff is not None:
+            # Backfilling: fetch the window once, then serve every as-of date inside it from the store
+            if not self.bar_store.covers(symbol, timespan, window_start_ms, now_ms):
+                bars = await self._fetch_aggregates(
+                    symbol, window_start.strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d'), timespan
+                )
+                if bars:
+                    self.bar_store.append(symbol, bars, timespan, covered=(window_start_ms, now_ms))
+            return self.bar_store.read_bar_dicts(symbol, timespan, start_ms=window_start_ms, end_ms=cutoff)
         
-        url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/day/{start_date}/{end_date}"
+        first_ts = self.bar_store.first_timestamp(symbol, timespan)
+        last_ts = self.bar_store.last_timestamp(symbol, timespan)
+        
+        if first_ts is not None and first_ts <= window_start_ms and self.bar_store.is_fresh(symbol, timespan, max_age):
+            # Written within max_age (earlier in the run or by another process), nothing new to fetch
+            return self.bar_store.read_bar_dicts(symbol, timespan, start_ms=window_start_ms)
+        
+        if first_ts is None or first_ts > window_start_ms:
+            # Nothing stored yet, or the store does not reach back far enough
+            fetch_start = window_start
+        else:
+            # Refetch from the last stored bar so a partial session is replaced
+            fetch_start = datetime.fromtimestamp(last_ts / 1000)
+        
+        bars = await self._fetch_aggregates(
+            symbol, fetch_start.strftime('%Y-%m-%d'), now.strftime('%Y-%m-%d'), timespan
+        )
+        if bars:
+            self.bar_store.append(symbol, bars, timespan, covered=(int(fetch_start.timestamp() * 1000), now_ms))
+        
+        return self.bar_store.read_bar_dicts(symbol, timespan, start_ms=window_start_ms)
+    
+    async def _fetch_aggregates(self, symbol: str, start_date: str, end_date: str,
+                                timespan: str = 'day') -> List[Dict]:
+        """Fetch aggregate bars from Polygon for a date range"""
+        
+        url = f"{self.base_url}/v2/aggs/ticker/{symbol}/range/1/{timespan}/{start_date}/{end_date}"
         
         try:
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(url, params={'apikey': self.api_key}) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -325,14 +379,19 @@ class PolygonCollector:
         
         indicators = {}
         
+        # Last 30 days, ending at the last session before the report date when backfilling
+        window = {'timestamp.gte': (clock.now() - timedelta(days=30)).strftime('%Y-%m-%d')}
+        if clock.is_historical():
+            window['timestamp.lte'] = clock.last_session_date()
+        
         try:
             # Get SMA (Simple Moving Average)
             sma_url = f"{self.base_url}/v1/indicators/sma/{symbol}"
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 # 20-day SMA
                 async with session.get(sma_url, params={
                     'apikey': self.api_key,
-                    'timestamp.gte': (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'),
+                    **window,
                     'timespan': 'day',
                     'window': 20,
                     'series_type': 'close'
@@ -346,7 +405,7 @@ class PolygonCollector:
                 rsi_url = f"{self.base_url}/v1/indicators/rsi/{symbol}"
                 async with session.get(rsi_url, params={
                     'apikey': self.api_key,
-                    'timestamp.gte': (datetime.now() - timedelta(days=30)).strftime('%Y-%m-%d'),
+                    **window,
                     'timespan': 'day',
                     'window': 14,
                     'series_type': 'close'
@@ -367,7 +426,7 @@ class PolygonCollector:
         try:
             url = f"{self.base_url}/v2/snapshot/locale/us/markets/stocks/tickers"
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(url, params={'apikey': self.api_key}) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -394,7 +453,7 @@ class PolygonCollector:
             # Company details
             url = f"{self.base_url}/v3/reference/tickers/{symbol}"
             
-            async with aiohttp.ClientSession() as session:
+            async with shared_session() as session:
                 async with session.get(url, params={'apikey': self.api_key}) as response:
                     if response.status == 200:
                         data = await response.json()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Pre-market Warm-up
+==================
+
+Staged prefetch of the report run's slow, slowly-changing daily history into the bar store ahead of the run
+"""
+
+import asyncio
+import logging
+import time
+from typing import Dict, List, Any, Callable, Awaitable
+
+try:
+    from .bar_store import BarStore
+    from .risk_model import RiskModel
+    from .report_generator import MarketDataCollector
+except ImportError:
+    from bar_store import BarStore
+    from risk_model import RiskModel
+    from report_generator import MarketDataCollector
+
+logger = logging.getLogger(__name__)
+
+# Minutes before the report run at which each stage fires, and the sources it warms.
+# The scheduled ReportGenerator's only slow, slowly-changing input is its daily bar plan
+# (a year of history for its quote symbols and the risk universe); futures, quotes, VIX
+# and news stay with the run itself. The later stage re-runs every warmer: entries still
+# fresh are no-ops, so it only retries sources that failed earlier and refreshes anything that expired.
+WARMUP_STAGES = {
+    'T-30': {'minutes_before': 30, 'sources': ['daily_bars']},
+    'T-10': {'minutes_before': 10, 'sources': ['daily_bars']}
+}
+
+class PremarketPrefetcher:
+    """Runs warm-up stages so the scheduled run only has to fetch volatile data"""
+
+    def __init__(self, bar_store: BarStore = None, risk_model: RiskModel = None,
+                 stages: Dict[str, Dict[str, Any]] = None, source_timeout: float = 300):
+        # Share the report generator's store so its in-memory manifest sees the warmed bars
+        self.bar_store = bar_store or BarStore()
+        self.risk_model = risk_model or RiskModel(self.bar_store)
+        self.stages = stages or WARMUP_STAGES
+        self.source_timeout = source_timeout
+
+        self.last_results: Dict[str, Dict[str, Any]] = {}
+
+    def _warmers(self) -> Dict[str, Callable[[], Awaitable[Any]]]:
+        return {
+            'daily_bars': self._warm_daily_bars
+        }
+
+    async def _warm_daily_bars(self):
+        # The same plan and age limit the report run's history load uses, so that load is served from the store
+        collector = MarketDataCollector(self.bar_store, extra_daily_symbols=self.risk_model.symbols)
+        return await collector.load_daily_bars()
+
+    async def run_stage(self, stage: str) -> Dict[str, Any]:
+        """Warm every source in a stage concurrently, returning per-source status and timing"""
+
+        sources = self.stages[stage]['sources']
+        warmers = self._warmers()
+        started = time.monotonic()
+        logger.info(f"Warm-up {stage}: prefetching {', '.join(sources)}")
+
+        outcomes = await asyncio.gather(
+            *(self._warm(source, warmers[source]) for source in sources)
+        )
+        results = dict(zip(sources, outcomes))
+
+        self.last_results[stage] = results
+        failed = [source for source, result in results.items() if result['status'] != 'ok']
+        logger.info(f"Warm-up {stage} finished in {time.monotonic() - started:.1f}s"
+                    + (f" ({', '.join(failed)} failed)" if failed else ""))
+        return results
+
+    async def _warm(self, source: str, warmer: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(warmer(), timeout=self.source_timeout)
+            status = 'ok'
+        except asyncio.TimeoutError:
+            status = f"timed out after {self.source_timeout:.0f}s"
+        except Exception as e:
+            status = f"error: {e}"
+
+        if status != 'ok':
+            logger.warning(f"Warm-up of {source} {status}")
+        return {'status': status, 'seconds': round(time.monotonic() - started, 3)}
+
+    def stage_times(self, run_time: str) -> List[tuple]:
+        """(stage, 'HH:MM') pairs for a run at run_time, earliest first"""
+
+        hour, minute = map(int, run_time.split(':'))
+        run_minutes = hour * 60 + minute
+        times = []
+        for stage, config in self.stages.items():
+            stage_minutes = (run_minutes - config['minutes_before']) % (24 * 60)
+            times.append((stage, f"{stage_minutes // 60:02d}:{stage_minutes % 60:02d}"))
+        return sorted(times, key=lambda item: -self.stages[item[0]]['minutes_before'])
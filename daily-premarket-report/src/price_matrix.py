@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Price Matrix
+============
+
+Read-only memory-mapped date x symbol close/volume matrix built from the bar store
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+import numpy as np
+
+try:
+    from .bar_store import BarStore
+except ImportError:
+    from bar_store import BarStore
+
+logger = logging.getLogger(__name__)
+
+# Lookback horizons in trading days
+HORIZONS = {
+    '1w': 5,
+    '1m': 21,
+    '3m': 63,
+    '1y': 252
+}
+
+def bar_date(t_ms: int) -> str:
+    """Map a daily bar timestamp to its session date"""
+    # Daily bars are stamped at exchange-local midnight, which lands anywhere from
+    # 15:00 UTC the previous day (Tokyo) to 05:00 UTC (New York); rounding to the
+    # nearest UTC midnight gives the session date for all of them
+    return (datetime.fromtimestamp(t_ms / 1000, tz=timezone.utc) + timedelta(hours=12)).strftime('%Y-%m-%d')
+
+class PriceMatrix:
+    """Date x symbol matrix of closes and volumes with O(1) date and symbol lookup"""
+
+    def __init__(self, dates: List[str], symbols: List[str], closes: np.ndarray, volumes: np.ndarray,
+                 source: Dict[str, List[int]] = None):
+        self.dates = dates
+        self.symbols = symbols
+        self.closes = closes
+        self.volumes = volumes
+        self.source = source or {}
+
+        self.date_index = {date: row for row, date in enumerate(dates)}
+        self.symbol_index = {symbol: col for col, symbol in enumerate(symbols)}
+
+    @classmethod
+    def build(cls, bar_store: BarStore, symbols: List[str], matrix_dir: str = None) -> 'PriceMatrix':
+        """Build the matrix from stored daily bars, save it and reopen it memory-mapped"""
+
+        matrix_dir = Path(matrix_dir or Path(bar_store.root_dir) / 'matrix')
+        matrix_dir.mkdir(parents=True, exist_ok=True)
+
+        series = {}
+        for symbol in symbols:
+            bars = bar_store.read(symbol)
+            if len(bars) == 0:
+                logger.warning(f"No stored bars for {symbol}, leaving its column empty")
+            series[symbol] = bars
+
+        all_dates = sorted({bar_date(t) for bars in series.values() for t in bars['t']})
+        date_index = {date: row for row, date in enumerate(all_dates)}
+
+        closes = np.full((len(all_dates), len(symbols)), np.nan)
+        volumes = np.zeros((len(all_dates), len(symbols)))
+        for col, symbol in enumerate(symbols):
+            bars = series[symbol]
+            if len(bars) == 0:
+                continue
+            rows = np.fromiter((date_index[bar_date(t)] for t in bars['t']), dtype=np.int64, count=len(bars))
+            closes[rows, col] = bars['c']
+            volumes[rows, col] = bars['v']
+
+        # Markets keep different holidays, so carry the last close across missing sessions
+        closes = _forward_fill(closes)
+
+        # Written atomically: backfill workers may open the matrix while another process rebuilds it
+        _save_atomic(matrix_dir / 'closes.npy', closes)
+        _save_atomic(matrix_dir / 'volumes.npy', volumes)
+        index = {
+            'dates': all_dates,
+            'symbols': list(symbols),
+            'source': {symbol: bar_store.version(symbol) for symbol in symbols},
+            'built_at': datetime.now().isoformat()
+        }
+        tmp_path = matrix_dir / f'index.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(index, f)
+        os.replace(tmp_path, matrix_dir / 'index.json')
+
+        logger.info(f"Built price matrix: {len(all_dates)} dates x {len(symbols)} symbols")
+        return cls.open(str(matrix_dir))
+
+    @classmethod
+    def open(cls, matrix_dir: str) -> 'PriceMatrix':
+        """Open a previously built matrix without loading it into memory"""
+
+        matrix_dir = Path(matrix_dir)
+        with open(matrix_dir / 'index.json', 'r') as f:
+            index = json.load(f)
+
+        closes = np.load(matrix_dir / 'closes.npy', mmap_mode='r')
+        volumes = np.load(matrix_dir / 'volumes.npy', mmap_mode='r')
+        return cls(index['dates'], index['symbols'], closes, volumes, index.get('source'))
+
+    @classmethod
+    def open_or_build(cls, bar_store: BarStore, symbols: List[str], matrix_dir: str = None) -> 'PriceMatrix':
+        """Reuse the saved matrix while it matches the bar store, otherwise rebuild it"""
+
+        matrix_dir = matrix_dir or str(Path(bar_store.root_dir) / 'matrix')
+        try:
+            matrix = cls.open(matrix_dir)
+            # Last timestamp, row count and write count: a bar revised in place keeps its timestamp
+            current = {symbol: bar_store.version(symbol) for symbol in symbols}
+            if matrix.symbols == list(symbols) and matrix.source == current:
+                return matrix
+        except (FileNotFoundError, ValueError, KeyError):
+            pass
+
+        return cls.build(bar_store, symbols, matrix_dir)
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.closes.shape
+
+    @property
+    def last_date(self) -> Optional[str]:
+        return self.dates[-1] if self.dates else None
+
+    def row_for(self, date: str = None) -> int:
+        """Get the row for a date, falling back to the last session on or before it"""
+
+        if date is None:
+            return len(self.dates) - 1
+        row = self.date_index.get(date)
+        if row is not None:
+            return row
+        # Weekends and holidays resolve to the prior session
+        return int(np.searchsorted(np.asarray(self.dates), date, side='right')) - 1
+
+    def columns(self, symbols: List[str]) -> List[int]:
+        """Get column indices for symbols, skipping any not in the matrix"""
+        return [self.symbol_index[symbol] for symbol in symbols if symbol in self.symbol_index]
+
+    def window(self, lookback: int, end_date: str = None, symbols: List[str] = None) -> Dict[str, Any]:
+        """Slice the trailing lookback sessions (plus the base session) ending at end_date"""
+
+        end_row = self.row_for(end_date)
+        start_row = max(0, end_row - lookback)
+        cols = self.columns(symbols) if symbols is not None else slice(None)
+
+        return {
+            'dates': self.dates[start_row:end_row + 1],
+            'symbols': symbols if symbols is not None else self.symbols,
+            'closes': self.closes[start_row:end_row + 1, cols],
+            'volumes': self.volumes[start_row:end_row + 1, cols]
+        }
+
+    def returns(self, lookback: int, end_date: str = None, symbols: List[str] = None) -> np.ndarray:
+        """Percent return over the lookback for each symbol (NaN where history is too short)"""
+
+        end_row = self.row_for(end_date)
+        start_row = end_row - lookback
+        cols = self.columns(symbols) if symbols is not None else slice(None)
+        if start_row < 0:
+            width = len(self.columns(symbols)) if symbols is not None else len(self.symbols)
+            return np.full(width, np.nan)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (self.closes[end_row, cols] / self.closes[start_row, cols] - 1) * 100
+
+def _save_atomic(path: Path, values: np.ndarray):
+    tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.tmp.npy")
+    np.save(tmp_path, values)
+    os.replace(tmp_path, path)
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    """Forward fill NaNs down each column"""
+
+    mask = np.isnan(values)
+    idx = np.where(~mask, np.arange(values.shape[0])[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    filled = values[idx, np.arange(values.shape[1])]
+    return filled
@@ -0,0 +1,281 @@
+#!/usr/bin/env python3
+"""
+Run Profiling
+=============
+
+Sampling CPU profiler and per-stage tracemalloc reports for one report run (main.py / enhanced_main.py --profile)
+"""
+
+import importlib
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional, Tuple
+
+try:
+    from .tracing import Span, STAGE, RENDER, UPLOAD
+except ImportError:
+    from tracing import Span, STAGE, RENDER, UPLOAD
+
+logger = logging.getLogger(__name__)
+
+# Sequential pipeline steps samples and allocations are attributed to (collect, analysis, pdf, audio, notion...)
+STAGE_KINDS = {STAGE, RENDER, UPLOAD}
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_TOP = 15
+
+# Frames a parked worker thread sits in; those samples are dropped
+IDLE_FRAMES = {
+    ('threading.py', 'wait'), ('threading.py', '_wait_for_tstate_lock'), ('queue.py', 'get'), ('thread.py', '_worker')
+}
+
+# Allocation sites left out of stage reports (the profiler's own bookkeeping and imports)
+IGNORED_ALLOCATION_FILES = {
+    tracemalloc.__file__, __file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>',
+    '<unknown>'
+}
+
+def _tracing_modules() -> List[Any]:
+    # Entry points load modules both as src.x and as x (and import them lazily), so both copies are observed
+    modules = []
+    for name in ('tracing', 'src.tracing'):
+        try:
+            modules.append(importlib.import_module(name))
+        except ImportError:
+            pass
+    return modules
+
+class StackSampler:
+    """Samples every thread's Python stack on a timer thread, keyed by the active pipeline stage"""
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, stage_label=lambda: 'run'):
+        self.interval = interval
+        self.stage_label = stage_label
+        self.counts: Counter = Counter()
+        self.ticks = 0
+        self._labels: Dict[Any, str] = {}
+        self._thread_names: Dict[int, str] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = self._labels[code] = f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        return label
+
+    def _stack(self, frame) -> Tuple[str, ...]:
+        stack = []
+        while frame is not None:
+            stack.append(self._label(frame.f_code))
+            frame = frame.f_back
+        return tuple(reversed(stack))
+
+    def _sample(self, own: int, main: int):
+        stage = self.stage_label()
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            if ident != main and (os.path.basename(frame.f_code.co_filename), frame.f_code.co_name) in IDLE_FRAMES:
+                continue
+            if ident not in self._thread_names:
+                self._thread_names = {thread.ident: thread.name for thread in threading.enumerate()}
+            thread = self._thread_names.get(ident, str(ident))
+            self.counts[(stage, thread, self._stack(frame))] += 1
+        self.ticks += 1
+
+    def _run(self):
+        own, main = threading.get_ident(), threading.main_thread().ident
+        while not self._stop.wait(self.interval):
+            self._sample(own, main)
+
+    def start(self):
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def folded(self) -> List[str]:
+        """Collapsed stacks ("stage;thread;outer;...;inner count") for flamegraph.pl or speedscope"""
+        return [f"{';'.join((stage, thread) + stack)} {count}"
+                for (stage, thread, stack), count in sorted(self.counts.items(), key=lambda item: -item[1])]
+
+    def by_stage(self) -> Dict[str, int]:
+        stages = Counter()
+        for (stage, _, _), count in self.counts.items():
+            stages[stage] += count
+        return dict(stages.most_common())
+
+    def top_functions(self, top: int = DEFAULT_TOP) -> List[Tuple[str, int]]:
+        """Functions by samples spent in them (self time)"""
+
+        leaves = Counter()
+        for (_, _, stack), count in self.counts.items():
+            if stack:
+                leaves[stack[-1]] += count
+        return leaves.most_common(top)
+
+class RunProfiler:
+    """Span observer sampling CPU and/or diffing tracemalloc snapshots around each pipeline stage"""
+
+    def __init__(self, output_dir: str = None, cpu: bool = True, memory: bool = False,
+                 interval: float = DEFAULT_INTERVAL, top: int = DEFAULT_TOP):
+        base_dir = Path(output_dir or os.getenv('PROFILE_DIR', 'profiles'))
+        self.output_dir = base_dir / datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.cpu = cpu
+        self.memory = memory
+        self.top = top
+        self.sampler = StackSampler(interval, self.stage_label) if cpu else None
+
+        self.stages: List[Dict[str, Any]] = []
+        self._active: List[Span] = []  # stages in progress, outermost first
+        self._snapshots: Dict[int, tracemalloc.Snapshot] = {}
+        self._started_tracemalloc = False
+        self._snapshotting = False
+        self._started = None
+        self.elapsed = 0.0
+        self.peak_kib = None
+        self.outputs: Dict[str, str] = {}
+
+    def stage_label(self) -> str:
+        # Time spent taking and comparing snapshots is the profiler's, not the stage's
+        if self._snapshotting:
+            return 'profiler'
+        return '/'.join(span.name for span in self._active) or 'setup'
+
+    def span_started(self, span: Span):
+        if span.kind not in STAGE_KINDS:
+            return
+        self._active.append(span)
+        if self.memory:
+            self._snapshots[id(span)] = self._snapshot()
+
+    def span_finished(self, span: Span):
+        if not any(active is span for active in self._active):
+            return
+        label = self.stage_label()
+        self._active = [active for active in self._active if active is not span]
+
+        stage = {'stage': label, 'seconds': round(span.seconds, 3)}
+        before = self._snapshots.pop(id(span), None)
+        if before is not None:
+            self._snapshotting = True
+            try:
+                stage.update(self._allocations(before, tracemalloc.take_snapshot()))
+            finally:
+                self._snapshotting = False
+        self.stages.append(stage)
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        self._snapshotting = True
+        try:
+            return tracemalloc.take_snapshot()
+        finally:
+            self._snapshotting = False
+
+    def _allocations(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> Dict[str, Any]:
+        """Net growth over the stage and the top-N source lines it was allocated at"""
+
+        stats = [stat for stat in after.compare_to(before, 'lineno')
+                 if stat.traceback[0].filename not in IGNORED_ALLOCATION_FILES]
+        grown = [stat for stat in stats if stat.size_diff > 0]
+        return {
+            'net_kib': round(sum(stat.size_diff for stat in stats) / 1024, 1),
+            'net_blocks': sum(stat.count_diff for stat in stats),
+            'top_allocations': [
+                {'where': f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                 'kib': round(stat.size_diff / 1024, 1), 'blocks': stat.count_diff}
+                for stat in grown[:self.top]
+            ]
+        }
+
+    def start(self):
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for module in _tracing_modules():
+            module.add_observer(self)
+        if self.sampler is not None:
+            self.sampler.start()
+        self._started = time.perf_counter()
+
+    def stop(self):
+        if self.sampler is not None:
+            self.sampler.stop()
+        for module in _tracing_modules():
+            module.remove_observer(self)
+        self.elapsed = time.perf_counter() - self._started
+        self.peak_kib = round(tracemalloc.get_traced_memory()[1] / 1024, 1) if self.memory else None
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+    def save(self) -> Dict[str, str]:
+        """Write cpu.folded, memory.json and summary.txt; returns {name: path}"""
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.sampler is not None:
+            path = self.output_dir / 'cpu.folded'
+            path.write_text('\n'.join(self.sampler.folded()) + '\n')
+            self.outputs['cpu'] = str(path)
+        if self.memory:
+            path = self.output_dir / 'memory.json'
+            with open(path, 'w') as f:
+                json.dump({'peak_kib': self.peak_kib, 'stages': self.stages}, f, indent=2)
+            self.outputs['memory'] = str(path)
+
+        path = self.output_dir / 'summary.txt'
+        path.write_text(self.summary())
+        self.outputs['summary'] = str(path)
+        return self.outputs
+
+    def summary(self) -> str:
+        lines = [f"Profiled run: {self.elapsed:.2f}s"]
+
+        if self.sampler is not None:
+            total = sum(self.sampler.counts.values()) or 1
+            lines += ['', f"CPU samples by stage ({self.sampler.ticks} ticks at {self.sampler.interval * 1000:.0f}ms):"]
+            if self.memory:
+                lines.append("  (tracemalloc was on, so Python-heavy stages read slower than they run)")
+            lines += [f"  {count / total:6.1%}  {stage}" for stage, count in self.sampler.by_stage().items()]
+            lines += ['', f"Top {self.top} functions by self samples:"]
+            lines += [f"  {count / total:6.1%}  {name}" for name, count in self.sampler.top_functions(self.top)]
+
+        if self.memory:
+            lines += ['', f"Allocations by stage (peak traced {self.peak_kib:,.0f} KiB):"]
+            for stage in self.stages:
+                lines.append(f"  {stage['stage']}: {stage['seconds']:.2f}s, net {stage['net_kib']:+,.1f} KiB "
+                             f"in {stage['net_blocks']:+,} blocks")
+                lines += [f"      {entry['kib']:>10,.1f} KiB {entry['blocks']:>8,}  {entry['where']}"
+                          for entry in stage['top_allocations']]
+        return '\n'.join(lines) + '\n'
+
+@contextmanager
+def profile_run(output_dir: str = None, cpu: bool = True, memory: bool = False, **options) -> Iterator[RunProfiler]:
+    """Profile the block, writing the results under output_dir/<timestamp>/ when it exits"""
+
+    profiler = RunProfiler(output_dir, cpu, memory, **options)
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        profiler.stop()
+        try:
+            profiler.save()
+            logger.info(f"Profile written to {profiler.output_dir}")
+        except Exception as e:
+            logger.error(f"Could not write profile: {e}")
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Provider Stand-in Server
+========================
+
+Local HTTP server replaying recorded provider responses with configurable latency, jitter, errors and 429s.
+
+    python src/provider_standin.py --port 8765 --latency-ms 80 --jitter-ms 40 --error-rate 0.02 \\
+        --rate-limit api.polygon.io=5
+    HTTP_MODE=standin HTTP_STANDIN_URL=http://127.0.0.1:8765 python main.py --example
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from contextlib import asynccontextmanager
+from typing import Dict, Any, AsyncIterator, Optional
+
+from aiohttp import web
+
+try:
+    from .http_replay import CassetteStore, entry_content
+except ImportError:
+    from http_replay import CassetteStore, entry_content
+
+logger = logging.getLogger(__name__)
+
+STATS_PATH = '/__standin__/stats'
+
+class TokenBucket:
+    """Requests per second allowance with a burst of one second's worth (at least one request)"""
+
+    def __init__(self, rate: float):
+        self.rate = rate
+        self.capacity = max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+class ProviderStandin:
+    """Serves <host>/<path> from cassettes, e.g. GET /api.polygon.io/v1/open-close/SPY/2026-07-14"""
+
+    def __init__(self, cassette_dir: str = None, latency_ms: float = 50, jitter_ms: float = 25,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0,
+                 rate_limits: Dict[str, float] = None, seed: int = None):
+        self.store = CassetteStore(cassette_dir)
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate        # share of requests answered 503
+        self.throttle_rate = throttle_rate  # share of requests answered 429 regardless of rate
+        self.buckets = {host: TokenBucket(rate) for host, rate in (rate_limits or {}).items()}
+        self.random = random.Random(seed)
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._runner: Optional[web.AppRunner] = None
+
+        self.app = web.Application()
+        self.app.router.add_get(STATS_PATH, self._stats)
+        self.app.router.add_route('*', '/{host}/{tail:.*}', self._handle)
+
+    def _delay(self) -> float:
+        return max(0.0, self.latency_ms + self.random.uniform(-self.jitter_ms, self.jitter_ms)) / 1000
+
+    async def _handle(self, request: web.Request) -> web.Response:
+        host = request.match_info['host']
+        url = f"https://{host}/{request.match_info['tail']}"
+        if request.query_string:
+            url = f"{url}?{request.query_string}"
+        body = await request.read() if request.can_read_body else None
+
+        stats = self.stats[host]
+        stats['requests'] += 1
+        await asyncio.sleep(self._delay())
+
+        bucket = self.buckets.get(host)
+        if (bucket is not None and not bucket.take()) or self.random.random() < self.throttle_rate:
+            stats['throttled'] += 1
+            return web.json_response({'status': 'ERROR', 'error': 'Too many requests (stand-in)'},
+                                     status=429, headers={'Retry-After': '1'})
+        if self.random.random() < self.error_rate:
+            stats['errors'] += 1
+            return web.json_response({'status': 'ERROR', 'error': 'Injected failure (stand-in)'}, status=503)
+
+        entry = self.store.find(request.method, url, body=body)
+        if entry is None:
+            stats['not_found'] += 1
+            return web.json_response({'status': 'NOT_FOUND', 'error': f'No recording for {url}'}, status=404)
+
+        stats['served'] += 1
+        return web.Response(status=entry['status'], body=entry_content(entry), headers=entry.get('headers') or {})
+
+    async def _stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.snapshot())
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Per-host request, served, throttled, error and not-found counts"""
+        return {host: dict(counts) for host, counts in self.stats.items()}
+
+    async def start(self, host: str = '127.0.0.1', port: int = 0) -> str:
+        """Start serving on the running loop; returns the base URL (port 0 picks a free port)"""
+
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = self._runner.addresses[0][1]
+        logger.info(f"Provider stand-in serving {self.store.root_dir} on http://{host}:{port}")
+        return f"http://{host}:{port}"
+
+    async def stop(self):
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    @asynccontextmanager
+    async def running(self, host: str = '127.0.0.1', port: int = 0) -> AsyncIterator[str]:
+        """Serve for the duration of the block, pointing the shared HTTP layer at this server"""
+
+        url = await self.start(host, port)
+        previous = {name: os.environ.get(name) for name in ('HTTP_MODE', 'HTTP_STANDIN_URL')}
+        os.environ.update({'HTTP_MODE': 'standin', 'HTTP_STANDIN_URL': url})
+        try:
+            yield url
+        finally:
+            for name, value in previous.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+            await self.stop()
+
+def _rate_limit(value: str):
+    host, _, rate = value.partition('=')
+    return host, float(rate)
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve recorded provider responses locally")
+    parser.add_argument("--host", default='127.0.0.1')
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--cassettes", default=None, help="Cassette directory (default: HTTP_CASSETTE_DIR)")
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--jitter-ms", type=float, default=25)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered 429")
+    parser.add_argument("--rate-limit", type=_rate_limit, action="append", default=[],
+                        help="host=requests_per_second; requests past the rate get 429 (repeatable)")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+
+    standin = ProviderStandin(args.cassettes, args.latency_ms, args.jitter_ms, args.error_rate,
+                              args.throttle_rate, dict(args.rate_limit), args.seed)
+    logger.info(f"Stats at http://{args.host}:{args.port}{STATS_PATH}")
+    web.run_app(standin.app, host=args.host, port=args.port, access_log=None)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Quote Racer
+===========
+
+Hedged multi-provider quote resolution: first validated result wins, slower requests are cancelled
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from typing import Dict, List, Any, Optional, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# A provider is a (name, zero-argument coroutine factory) pair
+Provider = Tuple[str, Callable[[], Awaitable[Any]]]
+
+def valid_quote(result: Any) -> bool:
+    """Default validation: a MarketData-like result with a positive, finite price"""
+
+    price = getattr(result, 'current_price', None)
+    return price is not None and math.isfinite(price) and price > 0
+
+class ProviderLatency:
+    """Rolling window of successful response times for one provider"""
+
+    def __init__(self, max_samples: int = 50):
+        self.samples = deque(maxlen=max_samples)
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile, or None until enough samples are collected"""
+
+        if len(self.samples) < 5:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+class QuoteRacer:
+    """Races providers for the same quote, hedging to the next provider when one runs slow"""
+
+    def __init__(self, hedge_percentile: float = 90, default_hedge_delay: float = 1.5,
+                 min_hedge_delay: float = 0.25, timeout: float = 20.0):
+        self.hedge_percentile = hedge_percentile
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.timeout = timeout
+
+        self.latency: Dict[str, ProviderLatency] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def hedge_delay(self, provider: str) -> float:
+        """How long to wait on a provider before hedging to the next one"""
+
+        observed = self._latency(provider).percentile(self.hedge_percentile)
+        if observed is None:
+            return self.default_hedge_delay
+        return max(self.min_hedge_delay, observed)
+
+    async def resolve(self, key: str, providers: List[Provider],
+                      validate: Callable[[Any], bool] = valid_quote) -> Optional[Tuple[str, Any]]:
+        """Return (provider, result) for the first validated result, or None if every provider fails"""
+
+        pending_providers = list(providers)
+        running: Dict[asyncio.Task, Tuple[str, float]] = {}
+        deadline = time.monotonic() + self.timeout
+
+        def launch_next():
+            name, factory = pending_providers.pop(0)
+            task = asyncio.ensure_future(factory())
+            running[task] = (name, time.monotonic())
+            return name
+
+        launch_next()
+
+        try:
+            while running:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    logger.warning(f"Quote for {key} timed out across {len(running)} providers")
+                    return None
+
+                # Hedge once the most recently launched provider has run past its usual latency
+                if pending_providers:
+                    newest_name, newest_start = max(running.values(), key=lambda item: item[1])
+                    wait = max(0.0, newest_start + self.hedge_delay(newest_name) - time.monotonic())
+                    wait = min(wait, remaining)
+                else:
+                    wait = remaining
+
+                done, _ = await asyncio.wait(running.keys(), timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+
+                if not done:
+                    hedged = launch_next()
+                    self._count(hedged, 'hedged')
+                    logger.debug(f"Hedging {key} to {hedged}")
+                    continue
+
+                for task in done:
+                    name, started = running.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        logger.debug(f"{name} failed for {key}: {e}")
+                        result = None
+
+                    if result is not None and validate(result):
+                        # Only usable answers count: a provider that fails fast must not shorten its own hedge delay
+                        self._latency(name).record(time.monotonic() - started)
+                        self._count(name, 'wins')
+                        return name, result
+
+                    self._count(name, 'invalid')
+
+                # Everything running came back unusable, so move straight to the next provider
+                if not running and pending_providers:
+                    launch_next()
+
+            return None
+
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running.keys(), return_exceptions=True)
+
+    def _latency(self, provider: str) -> ProviderLatency:
+        if provider not in self.latency:
+            self.latency[provider] = ProviderLatency()
+        return self.latency[provider]
+
+    def _count(self, provider: str, outcome: str):
+        counts = self.stats.setdefault(provider, {'wins': 0, 'hedged': 0, 'invalid': 0})
+        counts[outcome] += 1
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Win/hedge counts and latency percentiles per provider"""
+
+        return {
+            provider: {
+                **counts,
+                'p50': self._latency(provider).percentile(50),
+                'p90': self._latency(provider).percentile(90)
+            }
+            for provider, counts in self.stats.items()
+        }
@@ -0,0 +1,278 @@
+#!/usr/bin/env python3
+"""
+Report Archive
+==============
+
+Embedded SQLite archive of generated reports, indexed by date, symbol, sentiment and risk level
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Union
+
+import numpy as np
+
+try:
+    from .market_data import ReportData, now_ns
+    from .report_codec import dumps, loads, load, REPORT_SUFFIX
+    from .price_matrix import bar_date
+except ImportError:
+    from market_data import ReportData, now_ns
+    from report_codec import dumps, loads, load, REPORT_SUFFIX
+    from price_matrix import bar_date
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    date TEXT NOT NULL,
+    session TEXT NOT NULL,
+    archived_at INTEGER NOT NULL,
+    market_sentiment TEXT,
+    news_sentiment TEXT,
+    risk_level TEXT,
+    risk_score REAL,
+    vix_level REAL,
+    news_count INTEGER,
+    path TEXT,
+    payload BLOB NOT NULL,
+    UNIQUE (date, session)
+);
+CREATE INDEX IF NOT EXISTS reports_market_sentiment ON reports (market_sentiment, date);
+CREATE INDEX IF NOT EXISTS reports_news_sentiment ON reports (news_sentiment, date);
+CREATE INDEX IF NOT EXISTS reports_risk_level ON reports (risk_level, date);
+
+CREATE TABLE IF NOT EXISTS quotes (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    category TEXT NOT NULL,
+    name TEXT NOT NULL,
+    symbol TEXT,
+    price REAL,
+    change REAL,
+    change_percent REAL,
+    volume INTEGER,
+    timestamp INTEGER
+);
+CREATE INDEX IF NOT EXISTS quotes_symbol ON quotes (symbol, date);
+CREATE INDEX IF NOT EXISTS quotes_report ON quotes (report_id);
+
+CREATE TABLE IF NOT EXISTS news (
+    report_id INTEGER NOT NULL REFERENCES reports (id) ON DELETE CASCADE,
+    date TEXT NOT NULL,
+    timestamp INTEGER,
+    source TEXT,
+    sentiment TEXT,
+    impact_score REAL,
+    headline TEXT
+);
+CREATE INDEX IF NOT EXISTS news_sentiment ON news (sentiment, date);
+CREATE INDEX IF NOT EXISTS news_report ON news (report_id);
+
+-- Daily closes with the move from the previous close, synced from the bar store
+CREATE TABLE IF NOT EXISTS closes (
+    symbol TEXT NOT NULL,
+    date TEXT NOT NULL,
+    close REAL NOT NULL,
+    change_percent REAL,
+    PRIMARY KEY (symbol, date)
+) WITHOUT ROWID;
+"""
+
+class ReportArchive:
+    """Ingests every generated ReportData and answers trend queries over the history"""
+
+    def __init__(self, db_path: str = None):
+        self.db_path = Path(db_path or os.getenv('REPORT_ARCHIVE_DB', 'report_archive.db'))
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        self._conn.executescript(SCHEMA)
+        self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+
+    def close(self):
+        self._conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        with self._lock, self._conn:
+            yield self._conn
+
+    def _query(self, sql: str, params: Iterable = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self._conn.execute(sql, tuple(params)).fetchall()
+
+    # Ingestion
+
+    def ingest(self, report: ReportData, session: str = 'premarket', path: str = None) -> int:
+        """Store a report (replacing an earlier one for the same date and session)"""
+
+        summary = report.executive_summary or {}
+        risk = report.risk_assessment or {}
+        technicals = report.technical_analysis or {}
+
+        with self._transaction() as conn:
+            conn.execute("DELETE FROM reports WHERE date = ? AND session = ?", (report.date, session))
+            report_id = conn.execute(
+                "INSERT INTO reports (date, session, archived_at, market_sentiment, news_sentiment, risk_level,"
+                " risk_score, vix_level, news_count, path, payload) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (report.date, session, now_ns(), summary.get('market_sentiment'),
+                 (report.sector_analysis or {}).get('overall_sentiment'), risk.get('overall_risk_level'),
+                 _number(risk.get('risk_score')), _number(technicals.get('vix_level')),
+                 len(report.news_events or []), path, dumps(report))
+            ).lastrowid
+
+            conn.executemany(
+                "INSERT INTO quotes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                [(report_id, report.date, category, name, quote.symbol, _number(quote.current_price),
+                  _number(quote.change), _number(quote.change_percent), _integer(quote.volume), quote.timestamp)
+                 for category, name, quote in _quotes(report.market_performance)]
+            )
+            conn.executemany(
+                "INSERT INTO news VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [(report_id, report.date, item.timestamp, item.source, item.sentiment,
+                  _number(item.impact_score), item.headline)
+                 for item in report.news_events or []]
+            )
+
+        logger.info(f"Archived {session} report for {report.date}")
+        return report_id
+
+    def ingest_directory(self, directory: Union[str, Path], pattern: str = f'**/*{REPORT_SUFFIX}') -> int:
+        """Backfill from report files (binary archives or JSON exports) under a directory"""
+
+        count = 0
+        for path in sorted(Path(directory).glob(pattern)):
+            try:
+                report = load(path)
+            except Exception as e:
+                logger.warning(f"Skipping unreadable report {path}: {e}")
+                continue
+            match = re.match(r'daily_(\w+?)_report_', path.name)
+            session = match.group(1) if match else 'premarket'
+            self.ingest(report, session, str(path))
+            count += 1
+        return count
+
+    def sync_closes(self, bar_store, symbols: Iterable[str], tail: int = 400) -> int:
+        """Copy recent daily closes (and close-to-close moves) from the bar store"""
+
+        rows = []
+        for symbol in symbols:
+            bars = bar_store.read(symbol, 'day', tail=tail + 1)
+            if len(bars) < 2:
+                continue
+            closes = np.asarray(bars['c'], dtype=np.float64)
+            moves = (closes[1:] / closes[:-1] - 1) * 100
+            rows.extend((symbol, bar_date(int(t)), float(close), float(move))
+                        for t, close, move in zip(bars['t'][1:], closes[1:], moves))
+
+        with self._transaction() as conn:
+            conn.executemany("INSERT OR REPLACE INTO closes VALUES (?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # Queries
+
+    def load_report(self, date: str, session: str = 'premarket') -> Optional[ReportData]:
+        rows = self._query("SELECT payload FROM reports WHERE date = ? AND session = ?", (date, session))
+        return loads(rows[0]['payload']) if rows else None
+
+    def count_by(self, column: str, days: int = None, session: str = 'premarket') -> Dict[str, int]:
+        """Report counts per market_sentiment, news_sentiment or risk_level over the last days reports"""
+
+        if column not in ('market_sentiment', 'news_sentiment', 'risk_level'):
+            raise ValueError(f"Cannot group reports by {column}")
+        rows = self._query(
+            f"SELECT {column} AS value, COUNT(*) AS n FROM "
+            f"(SELECT {column} FROM reports WHERE session = ? ORDER BY date DESC LIMIT ?) GROUP BY value",
+            (session, days or -1)
+        )
+        return {row['value']: row['n'] for row in rows}
+
+    def risk_level_frequency(self, level: str = 'high', days: int = None) -> float:
+        """Share of reports with a given risk level"""
+
+        counts = self.count_by('risk_level', days)
+        total = sum(counts.values())
+        return counts.get(level, 0) / total if total else 0.0
+
+    def sentiment_vs_next_move(self, symbol: str = 'SPY', days: int = 250,
+                               sentiment: str = 'market_sentiment') -> Dict[str, Any]:
+        """Per-report sentiment against the symbol's move on the first session on or after the report date"""
+
+        if sentiment not in ('market_sentiment', 'news_sentiment'):
+            raise ValueError(f"Unknown sentiment column {sentiment}")
+        rows = self._query(
+            f"SELECT r.date, r.{sentiment} AS sentiment,"
+            " (SELECT c.change_percent FROM closes c WHERE c.symbol = ? AND c.date >= r.date"
+            "  ORDER BY c.date LIMIT 1) AS move"
+            " FROM reports r WHERE r.session = 'premarket' ORDER BY r.date DESC LIMIT ?",
+            (symbol, days)
+        )
+
+        observations = [dict(row) for row in rows if row['move'] is not None]
+        by_sentiment = {}
+        for label in sorted({row['sentiment'] for row in observations}, key=str):
+            moves = np.array([row['move'] for row in observations if row['sentiment'] == label])
+            by_sentiment[label] = {
+                'count': int(len(moves)),
+                'mean_move': round(float(moves.mean()), 3),
+                'up_rate': round(float((moves > 0).mean()), 3)
+            }
+
+        return {'symbol': symbol, 'observations': len(observations),
+                'by_sentiment': by_sentiment, 'rows': observations[::-1]}
+
+    def quote_history(self, symbol: str, days: int = 250) -> List[Dict[str, Any]]:
+        """Archived quotes for a symbol, oldest first"""
+
+        rows = self._query(
+            "SELECT date, category, name, price, change_percent FROM quotes"
+            " WHERE symbol = ? ORDER BY date DESC LIMIT ?", (symbol, days)
+        )
+        return [dict(row) for row in reversed(rows)]
+
+    def summary(self) -> Dict[str, Any]:
+        """Headline figures for the analytics dashboard"""
+
+        totals = self._query("SELECT COUNT(*) AS n, MIN(date) AS first, MAX(date) AS last FROM reports")[0]
+        return {
+            'total_reports': totals['n'],
+            'first_date': totals['first'],
+            'last_date': totals['last'],
+            'market_sentiment': self.count_by('market_sentiment'),
+            'risk_level': self.count_by('risk_level')
+        }
+
+def _quotes(market_performance: Dict[str, Any]) -> Iterator[tuple]:
+    """(category, name, quote) for every quote in the performance section"""
+
+    for category, group in (market_performance or {}).items():
+        if not isinstance(group, dict):
+            continue
+        for name, quote in group.items():
+            if hasattr(quote, 'change_percent'):
+                yield category, name, quote
+
+def _number(value) -> Optional[float]:
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def _integer(value) -> Optional[int]:
+    try:
+        return int(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+Report Codec
+============
+
+Versioned binary serialization of ReportData (msgpack + zstd, or JSON + zlib) with a lossless JSON export
+"""
+
+import json
+import logging
+import os
+import struct
+import zlib
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Union
+
+import numpy as np
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+try:
+    from .market_data import MarketData, FrozenMarketData, NewsItem, FrozenNewsItem, ReportData
+except ImportError:
+    from market_data import MarketData, FrozenMarketData, NewsItem, FrozenNewsItem, ReportData
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 1
+
+MAGIC = b'RPTC'
+HEADER = struct.Struct('>4sBB')  # magic, schema version, codec id
+
+CODEC_MSGPACK_ZSTD = 1
+CODEC_JSON_ZLIB = 2
+
+REPORT_SUFFIX = '.rpt'
+
+QUOTE_FIELDS = tuple(f.name for f in fields(MarketData))
+NEWS_FIELDS = tuple(f.name for f in fields(NewsItem))
+
+_QUOTE_TYPES = (MarketData, FrozenMarketData)
+_NEWS_TYPES = (NewsItem, FrozenNewsItem)
+
+def default_codec() -> int:
+    return CODEC_MSGPACK_ZSTD if msgpack is not None and zstandard is not None else CODEC_JSON_ZLIB
+
+# Record form: plain lists/dicts/scalars. Quote mappings and news lists are stored column-wise
+# under a tag key, which is what keeps a year of reports small and quick to decode.
+
+def _scalar(value: Any) -> Any:
+    # Collectors often hand over NumPy scalars (e.g. volumes from pandas)
+    return value.item() if isinstance(value, np.generic) else value
+
+def _columns(items: List[Any], names: Iterable[str]) -> Dict[str, list]:
+    return {name: [_scalar(getattr(item, name)) for item in items] for name in names}
+
+def _encode(value: Any) -> Any:
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, dict):
+        if value and all(isinstance(v, _QUOTE_TYPES) for v in value.values()):
+            return {'__quotes__': {'names': [str(k) for k in value],
+                                   **_columns(list(value.values()), QUOTE_FIELDS)}}
+        return {str(k): _encode(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        if value and all(isinstance(v, _NEWS_TYPES) for v in value):
+            return {'__news__': _columns(value, NEWS_FIELDS)}
+        return [_encode(v) for v in value]
+    if isinstance(value, _QUOTE_TYPES):
+        return {'__quote__': [_scalar(getattr(value, name)) for name in QUOTE_FIELDS]}
+    if isinstance(value, _NEWS_TYPES):
+        return {'__newsitem__': [_scalar(getattr(value, name)) for name in NEWS_FIELDS]}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if is_dataclass(value):
+        return {f.name: _encode(getattr(value, f.name)) for f in fields(value)}
+    # Same last resort as the json.dump(..., default=str) calls this replaces
+    return str(value)
+
+def _decode(value: Any) -> Any:
+    if isinstance(value, list):
+        return [_decode(v) for v in value]
+    if not isinstance(value, dict):
+        return value
+    if len(value) == 1:
+        tag, body = next(iter(value.items()))
+        if tag == '__quotes__':
+            columns = [body[name] for name in QUOTE_FIELDS]
+            return {name: MarketData(*row) for name, row in zip(body['names'], zip(*columns))}
+        if tag == '__news__':
+            return [NewsItem(*row) for row in zip(*(body[name] for name in NEWS_FIELDS))]
+        if tag == '__quote__':
+            return MarketData(*body)
+        if tag == '__newsitem__':
+            return NewsItem(*body)
+    return {k: _decode(v) for k, v in value.items()}
+
+def to_record(report: ReportData) -> Dict[str, Any]:
+    """Plain, versioned record of a report"""
+
+    record = {f.name: _encode(getattr(report, f.name)) for f in fields(ReportData)}
+    record['schema_version'] = SCHEMA_VERSION
+    return record
+
+def from_record(record: Dict[str, Any]) -> ReportData:
+    """Rebuild a report from to_record() output or a legacy asdict() JSON dump"""
+
+    version = record.get('schema_version', 0)
+    if version > SCHEMA_VERSION:
+        raise ValueError(f"Report schema {version} is newer than supported {SCHEMA_VERSION}")
+
+    values = {f.name: _decode(record.get(f.name)) for f in fields(ReportData)}
+    if version == 0:
+        values = _upgrade_legacy(values)
+    return ReportData(**values)
+
+def _upgrade_legacy(values: Dict[str, Any]) -> Dict[str, Any]:
+    """asdict() dumps flattened quotes and news to dicts; restore the records"""
+
+    values['news_events'] = [NewsItem(**item) if isinstance(item, dict) else item
+                             for item in values.get('news_events') or []]
+
+    def restore(value):
+        if isinstance(value, dict):
+            if set(value) == set(QUOTE_FIELDS):
+                return MarketData(**value)
+            return {k: restore(v) for k, v in value.items()}
+        return value
+
+    values['market_performance'] = restore(values.get('market_performance') or {})
+    return values
+
+def dumps(report: ReportData, codec: int = None) -> bytes:
+    """Encode a report to the binary container"""
+
+    codec = codec or default_codec()
+    record = to_record(report)
+    if codec == CODEC_MSGPACK_ZSTD:
+        if msgpack is None or zstandard is None:
+            raise RuntimeError("msgpack and zstandard are required for this codec")
+        payload = zstandard.ZstdCompressor(level=3).compress(msgpack.packb(record, use_bin_type=True))
+    elif codec == CODEC_JSON_ZLIB:
+        payload = zlib.compress(json.dumps(record, separators=(',', ':')).encode('utf-8'), 6)
+    else:
+        raise ValueError(f"Unknown report codec {codec}")
+    return HEADER.pack(MAGIC, SCHEMA_VERSION, codec) + payload
+
+def loads(data: bytes) -> ReportData:
+    """Decode a report from the binary container"""
+
+    magic, _, codec = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("Not a report archive")
+    payload = memoryview(data)[HEADER.size:]
+
+    if codec == CODEC_MSGPACK_ZSTD:
+        if msgpack is None or zstandard is None:
+            raise RuntimeError("msgpack and zstandard are required to read this report")
+        record = msgpack.unpackb(zstandard.ZstdDecompressor().decompress(payload),
+                                 raw=False, strict_map_key=False)
+    elif codec == CODEC_JSON_ZLIB:
+        record = json.loads(zlib.decompress(payload))
+    else:
+        raise ValueError(f"Unknown report codec {codec}")
+    return from_record(record)
+
+def save(report: ReportData, path: Union[str, Path], codec: int = None) -> str:
+    """Write a report archive atomically"""
+
+    path = str(path)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(dumps(report, codec))
+    os.replace(tmp_path, path)
+    return path
+
+def load(path: Union[str, Path]) -> ReportData:
+    """Read a report from a binary archive or a JSON export"""
+
+    with open(path, 'rb') as f:
+        data = f.read()
+    if data.startswith(MAGIC):
+        return loads(data)
+    return from_record(json.loads(data))
+
+def to_json(report: ReportData, indent: int = 2) -> str:
+    """Lossless JSON export (load() reads it back)"""
+    return json.dumps(to_record(report), indent=indent)
+
+def save_json(report: ReportData, path: Union[str, Path], indent: int = 2) -> str:
+    path = str(path)
+    with open(path, 'w') as f:
+        f.write(to_json(report, indent))
+    return path
+
+def load_reports(directory: Union[str, Path], pattern: str = f'**/*{REPORT_SUFFIX}') -> List[ReportData]:
+    """Every archived report under a directory, oldest first"""
+
+    reports = []
+    for path in sorted(Path(directory).glob(pattern)):
+        try:
+            reports.append(load(path))
+        except Exception as e:
+            logger.warning(f"Skipping unreadable report {path}: {e}")
+    reports.sort(key=lambda report: report.date)
+    return reports
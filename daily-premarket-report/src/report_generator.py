@@ -8,96 +8,99 @@ Leverages SAFLA and FACT integrations for advanced analysis and caching.
 """
 
 import asyncio
-import json
 import logging
 import os
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Iterable, Optional
 import pytz
-from dataclasses import dataclass, asdict
 import aiohttp
-import yfinance as yf
-import pandas as pd
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, PageBreak
-from reportlab.lib import colors
-import matplotlib.pyplot as plt
-import seaborn as sns
-from io import BytesIO
-import base64
+
+try:
+    from . import clock
+    from .bar_store import BarStore, fetch_yfinance_bars, fetch_yfinance_plan
+    from .risk_model import RiskModel
+    from .response_cache import BAR_TTL, RUN_BAR_MAX_AGE
+    from .symbol_universe import UNIVERSE, SymbolUniverse
+    from .deadline import DeadlineOrchestrator
+    from .single_flight import within_run_scope
+    from .market_data import MarketData, NewsItem, ReportData, MarketDataFrame, now_ns
+    from .report_codec import save_json
+    from .tracing import span, http_trace_config, ANALYZER
+    from .news_stream import NewsStream, NewsSource, DEFAULT_TOP_K
+except ImportError:
+    import clock
+    from bar_store import BarStore, fetch_yfinance_bars, fetch_yfinance_plan
+    from risk_model import RiskModel
+    from response_cache import BAR_TTL, RUN_BAR_MAX_AGE
+    from symbol_universe import UNIVERSE, SymbolUniverse
+    from deadline import DeadlineOrchestrator
+    from single_flight import within_run_scope
+    from market_data import MarketData, NewsItem, ReportData, MarketDataFrame, now_ns
+    from report_codec import save_json
+    from tracing import span, http_trace_config, ANALYZER
+    from news_stream import NewsStream, NewsSource, DEFAULT_TOP_K
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class MarketData:
-    """Market data structure"""
-    symbol: str
-    current_price: float
-    change: float
-    change_percent: float
-    volume: int
-    timestamp: str
-
-@dataclass
-class NewsItem:
-    """News item structure"""
-    headline: str
-    summary: str
-    source: str
-    timestamp: str
-    sentiment: str
-    impact_score: float
-
-@dataclass
-class ReportData:
-    """Complete report data structure"""
-    date: str
-    executive_summary: Dict[str, Any]
-    market_performance: Dict[str, Any]
-    news_events: List[NewsItem]
-    sector_analysis: Dict[str, Any]
-    technical_analysis: Dict[str, Any]
-    economic_calendar: List[Dict[str, Any]]
-    risk_assessment: Dict[str, Any]
-    earnings_calendar: List[Any] = None  # New field for upcoming earnings
-
 class MarketDataCollector:
     """Collects and processes market data from multiple sources"""
     
-    def __init__(self):
+    def __init__(self, bar_store: BarStore = None, universe: SymbolUniverse = None,
+                 extra_daily_symbols: List[str] = None):
         self.session = None
+        self.bar_store = bar_store or BarStore()
+        self.universe = universe or UNIVERSE
+        
+        # One deduplicated request wave per interval; extra symbols come from other
+        # consumers of the same run (e.g. the risk model) so overlaps load only once
+        self.hourly_plan = self.universe.plan(['futures'], 'yfinance')
+        self.quote_plan = self.universe.plan(['international', 'currencies', 'commodities'], 'yfinance')
+        self.daily_plan = list(dict.fromkeys(self.quote_plan + list(extra_daily_symbols or [])))
         
     async def __aenter__(self):
-        self.session = aiohttp.ClientSession()
+        self.session = aiohttp.ClientSession(trace_configs=[http_trace_config()])
         return self
         
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         if self.session:
             await self.session.close()
     
+    async def load_daily_bars(self) -> Dict[str, Any]:
+        """Load the run's daily bar plan (shared by every caller in the run)"""
+        # History written within BAR_TTL (the T-30/T-10 warm-up) is read from the store without a download
+        return await fetch_yfinance_plan(self.bar_store, self.daily_plan, '1y', '1d', max_age=BAR_TTL)
+    
+    async def load_daily_quotes(self) -> Dict[str, Any]:
+        """Refresh the latest daily bars of the quoted symbols (their history comes from the warm-up)"""
+        # Overnight sessions move these, so only bars written earlier in this run count as fresh
+        return await fetch_yfinance_plan(self.bar_store, self.quote_plan, '1y', '1d', max_age=RUN_BAR_MAX_AGE)
+    
+    async def _planned_bars(self, symbol: str, interval: str = '1d'):
+        """Bars for a symbol from its interval's request wave"""
+        
+        if interval == '1h':
+            loaded = await fetch_yfinance_plan(self.bar_store, self.hourly_plan, '2d', '1h')
+        else:
+            loaded = await self.load_daily_quotes()
+        if symbol not in loaded:
+            raise ValueError(f"no {interval} bars loaded")
+        return loaded[symbol]
+    
     async def get_overnight_futures(self) -> Dict[str, MarketData]:
         """Get overnight futures data for major indices"""
-        symbols = {
-            'ES=F': 'S&P 500 Futures',
-            'NQ=F': 'NASDAQ Futures', 
-            'RTY=F': 'Russell 2000 Futures',
-            'YM=F': 'Dow Futures'
-        }
+        symbols = self.universe.symbol_map('futures', 'yfinance')
         
         futures_data = {}
         
         for symbol, name in symbols.items():
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d', interval='1h')
+                bars = (await self._planned_bars(symbol, '1h'))[-2:]
                 
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
+                if len(bars) > 0:
+                    current_price = float(bars['c'][-1])
+                    prev_close = float(bars['c'][-2]) if len(bars) > 1 else current_price
                     change = current_price - prev_close
                     change_percent = (change / prev_close) * 100
                     
@@ -106,8 +109,8 @@ class MarketDataCollector:
                         current_price=round(current_price, 2),
                         change=round(change, 2),
                         change_percent=round(change_percent, 2),
-                        volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns else 0,
-                        timestamp=datetime.now().isoformat()
+                        volume=int(bars['v'][-1]),
+                        timestamp=now_ns()
                     )
                     
             except Exception as e:
@@ -117,24 +120,17 @@ class MarketDataCollector:
     
     async def get_international_markets(self) -> Dict[str, MarketData]:
         """Get international market data"""
-        symbols = {
-            '^N225': 'Nikkei 225',
-            '^HSI': 'Hang Seng',
-            '^FTSE': 'FTSE 100',
-            '^GDAXI': 'DAX',
-            '^FCHI': 'CAC 40'
-        }
+        symbols = self.universe.symbol_map('international', 'yfinance')
         
         international_data = {}
         
         for symbol, name in symbols.items():
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
+                bars = (await self._planned_bars(symbol))[-2:]
                 
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
+                if len(bars) > 0:
+                    current_price = float(bars['c'][-1])
+                    prev_close = float(bars['c'][-2]) if len(bars) > 1 else current_price
                     change = current_price - prev_close
                     change_percent = (change / prev_close) * 100
                     
@@ -143,8 +139,8 @@ class MarketDataCollector:
                         current_price=round(current_price, 2),
                         change=round(change, 2),
                         change_percent=round(change_percent, 2),
-                        volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns else 0,
-                        timestamp=datetime.now().isoformat()
+                        volume=int(bars['v'][-1]),
+                        timestamp=now_ns()
                     )
                     
             except Exception as e:
@@ -154,23 +150,17 @@ class MarketDataCollector:
     
     async def get_currency_data(self) -> Dict[str, MarketData]:
         """Get major currency pair data"""
-        symbols = {
-            'EURUSD=X': 'EUR/USD',
-            'GBPUSD=X': 'GBP/USD', 
-            'USDJPY=X': 'USD/JPY',
-            'DX-Y.NYB': 'DXY Index'
-        }
+        symbols = self.universe.symbol_map('currencies', 'yfinance')
         
         currency_data = {}
         
         for symbol, name in symbols.items():
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
+                bars = (await self._planned_bars(symbol))[-2:]
                 
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
+                if len(bars) > 0:
+                    current_price = float(bars['c'][-1])
+                    prev_close = float(bars['c'][-2]) if len(bars) > 1 else current_price
                     change = current_price - prev_close
                     change_percent = (change / prev_close) * 100
                     
@@ -179,8 +169,8 @@ class MarketDataCollector:
                         current_price=round(current_price, 4),
                         change=round(change, 4),
                         change_percent=round(change_percent, 2),
-                        volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns else 0,
-                        timestamp=datetime.now().isoformat()
+                        volume=int(bars['v'][-1]),
+                        timestamp=now_ns()
                     )
                     
             except Exception as e:
@@ -190,23 +180,17 @@ class MarketDataCollector:
     
     async def get_commodities_data(self) -> Dict[str, MarketData]:
         """Get commodities data"""
-        symbols = {
-            'GC=F': 'Gold',
-            'CL=F': 'Crude Oil',
-            'SI=F': 'Silver',
-            'HG=F': 'Copper'
-        }
+        symbols = self.universe.symbol_map('commodities', 'yfinance')
         
         commodities_data = {}
         
         for symbol, name in symbols.items():
             try:
-                ticker = yf.Ticker(symbol)
-                hist = ticker.history(period='2d')
+                bars = (await self._planned_bars(symbol))[-2:]
                 
-                if not hist.empty:
-                    current_price = hist['Close'].iloc[-1]
-                    prev_close = hist['Close'].iloc[-2] if len(hist) > 1 else current_price
+                if len(bars) > 0:
+                    current_price = float(bars['c'][-1])
+                    prev_close = float(bars['c'][-2]) if len(bars) > 1 else current_price
                     change = current_price - prev_close
                     change_percent = (change / prev_close) * 100
                     
@@ -215,8 +199,8 @@ class MarketDataCollector:
                         current_price=round(current_price, 2),
                         change=round(change, 2),
                         change_percent=round(change_percent, 2),
-                        volume=int(hist['Volume'].iloc[-1]) if 'Volume' in hist.columns else 0,
-                        timestamp=datetime.now().isoformat()
+                        volume=int(bars['v'][-1]),
+                        timestamp=now_ns()
                     )
                     
             except Exception as e:
@@ -224,11 +208,46 @@ class MarketDataCollector:
                 
         return commodities_data
 
+# Streamed news sources, fastest first in practice
+NEWS_SOURCES = ('finviz', 'alphavantage', 'desk')
+NEWS_TICKERS = ['AAPL', 'MSFT', 'GOOGL', 'TSLA', 'NVDA']
+
 class NewsAnalyzer:
     """Analyzes news and events for market impact"""
     
     def __init__(self):
         self.safla_integration = None
+    
+    def news_sources(self, names: Iterable[str] = NEWS_SOURCES) -> Dict[str, NewsSource]:
+        """Fetchers for the named news sources (finviz, alphavantage, desk)"""
+        
+        async def finviz() -> List[NewsItem]:
+            try:
+                from .finviz_news_collector import FinvizNewsCollector
+            except ImportError:
+                from finviz_news_collector import FinvizNewsCollector
+            return await FinvizNewsCollector().get_finviz_news(max_articles=20)
+        
+        async def alphavantage() -> List[NewsItem]:
+            # The news feed is always current, so a past report goes without it
+            if clock.is_historical():
+                return []
+            try:
+                from .alphavantage_collector import AlphaVantageCollector
+            except ImportError:
+                from alphavantage_collector import AlphaVantageCollector
+            news_items, _ = await AlphaVantageCollector().get_market_news_with_sentiment(NEWS_TICKERS)
+            return news_items
+        
+        fetchers = {'finviz': finviz, 'alphavantage': alphavantage, 'desk': self.collect_market_news}
+        return {name: fetchers[name] for name in names}
+    
+    async def collect_top_news(self, k: int = DEFAULT_TOP_K, timeout: float = None,
+                               sources: Iterable[str] = NEWS_SOURCES) -> List[NewsItem]:
+        """Top k stories across the news sources, deduplicated, without waiting on the slowest feed"""
+        
+        stream = NewsStream(self.news_sources(sources), k)
+        return await stream.take(k, timeout=timeout)
         
     async def collect_market_news(self) -> List[NewsItem]:
         """Collect and analyze market news"""
@@ -240,7 +259,7 @@ class NewsAnalyzer:
                 headline="Federal Reserve Signals Potential Rate Pause",
                 summary="Fed officials indicated a possible pause in rate hikes following recent economic data showing cooling inflation trends.",
                 source="Federal Reserve",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=8.5
             ),
@@ -248,7 +267,7 @@ class NewsAnalyzer:
                 headline="Tech Earnings Beat Expectations",
                 summary="Major technology companies report stronger than expected Q4 earnings, driven by AI investments and cloud growth.",
                 source="Corporate Earnings",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=7.2
             ),
@@ -256,7 +275,7 @@ class NewsAnalyzer:
                 headline="China Manufacturing PMI Expansion",
                 summary="China's manufacturing PMI reached 51.2, indicating expansion and potential global growth implications.",
                 source="Economic Data",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=6.8
             )
@@ -289,17 +308,18 @@ class NewsAnalyzer:
 class TechnicalAnalyzer:
     """Performs technical analysis on market data"""
     
-    def __init__(self):
-        pass
+    def __init__(self, bar_store: BarStore = None):
+        self.bar_store = bar_store or BarStore()
     
     async def analyze_market_technicals(self, market_data: Dict[str, Any]) -> Dict[str, Any]:
         """Perform technical analysis on market data"""
         
         # Get VIX data for volatility analysis
         try:
-            vix = yf.Ticker('^VIX')
-            vix_hist = vix.history(period='5d')
-            current_vix = vix_hist['Close'].iloc[-1] if not vix_hist.empty else 20.0
+            # Served from the store when the run's daily plan has just loaded it
+            vix_bars = await fetch_yfinance_bars(self.bar_store, UNIVERSE.get('VIX').symbol('yfinance'), '5d',
+                                                 max_age=RUN_BAR_MAX_AGE)
+            current_vix = float(vix_bars['c'][-1]) if len(vix_bars) > 0 else 20.0
             
             # Simple technical indicators
             technical_analysis = {
@@ -334,59 +354,93 @@ class ReportGenerator:
     
     def __init__(self):
         self.market_collector = None
+        self.bar_store = BarStore()
         self.news_analyzer = NewsAnalyzer()
-        self.technical_analyzer = TechnicalAnalyzer()
+        self.technical_analyzer = TechnicalAnalyzer(self.bar_store)
+        self.risk_model = RiskModel(self.bar_store)
         
-    async def generate_daily_report(self) -> ReportData:
-        """Generate complete daily report data"""
+    @within_run_scope
+    async def generate_daily_report(self, orchestrator: DeadlineOrchestrator = None, as_of: str = None) -> ReportData:
+        """Generate complete daily report data, as of a past date (YYYY-MM-DD) when backfilling"""
         
-        logger.info("Starting daily report generation...")
+        with clock.as_of(as_of):
+            return await self._generate_daily_report(orchestrator)
+    
+    async def _generate_daily_report(self, orchestrator: DeadlineOrchestrator = None) -> ReportData:
+        """Generate complete daily report data, keeping each source within its share of the run budget"""
+        
+        logger.info(f"Starting daily report generation{' as of ' + clock.today() if clock.is_historical() else ''}...")
+        orchestrator = orchestrator or DeadlineOrchestrator()
         
-        async with MarketDataCollector() as collector:
-            # Collect all market data
-            futures_data = await collector.get_overnight_futures()
-            international_data = await collector.get_international_markets()
-            currency_data = await collector.get_currency_data()
-            commodities_data = await collector.get_commodities_data()
+        async with MarketDataCollector(self.bar_store, extra_daily_symbols=self.risk_model.symbols) as collector:
             
-            # Collect and analyze news
-            news_items = await self.news_analyzer.collect_market_news()
-            sentiment_analysis = await self.news_analyzer.analyze_sentiment_impact(news_items)
+            async def technicals():
+                await collector.load_daily_bars()
+                with span('technicals.analyze', ANALYZER):
+                    return await self.technical_analyzer.analyze_market_technicals({})
             
-            # Perform technical analysis
-            technical_analysis = await self.technical_analyzer.analyze_market_technicals({})
+            async def news():
+                # Stop streaming a little inside the news slice so the stories gathered so far are kept
+                timeout = orchestrator.slice_for('news')
+                return await self.news_analyzer.collect_top_news(timeout=timeout * 0.9 if timeout else None)
             
-            # Generate executive summary
-            executive_summary = self._generate_executive_summary(
-                futures_data, sentiment_analysis, technical_analysis
-            )
+            async def risk():
+                # The daily plan covers the risk universe, so assess() finds its bars fresh
+                await collector.load_daily_bars()
+                with span('risk_model.assess', ANALYZER):
+                    return await asyncio.to_thread(self.risk_model.assess)
             
-            # Compile report data
-            report_data = ReportData(
-                date=datetime.now().strftime("%Y-%m-%d"),
-                executive_summary=executive_summary,
-                market_performance={
-                    "futures": futures_data,
-                    "international": international_data,
-                    "currencies": currency_data,
-                    "commodities": commodities_data
-                },
-                news_events=news_items,
-                sector_analysis=sentiment_analysis,
-                technical_analysis=technical_analysis,
-                economic_calendar=self._get_economic_calendar(),
-                risk_assessment=self._generate_risk_assessment(sentiment_analysis, technical_analysis)
+            # Collect all sources concurrently; any that miss their slice fall back to cached data
+            (futures_data, international_data, currency_data, commodities_data,
+             news_items, technical_analysis, risk_metrics) = await asyncio.gather(
+                orchestrator.run('futures', collector.get_overnight_futures, {}),
+                orchestrator.run('international', collector.get_international_markets, {}),
+                orchestrator.run('currencies', collector.get_currency_data, {}),
+                orchestrator.run('commodities', collector.get_commodities_data, {}),
+                orchestrator.run('news', news, []),
+                orchestrator.run('technicals', technicals, {}),
+                orchestrator.run('risk', risk, {})
             )
             
+            with span('analysis'):
+                # Analyze news
+                with span('news.sentiment_impact', ANALYZER, items=len(news_items)):
+                    sentiment_analysis = await self.news_analyzer.analyze_sentiment_impact(news_items)
+            
+                # Generate executive summary
+                with span('executive_summary', ANALYZER):
+                    executive_summary = self._generate_executive_summary(
+                        futures_data, sentiment_analysis, technical_analysis, risk_metrics
+                    )
+            
+                # Compile report data
+                report_data = ReportData(
+                    date=clock.today(),
+                    executive_summary=executive_summary,
+                    market_performance={
+                        "futures": futures_data,
+                        "international": international_data,
+                        "currencies": currency_data,
+                        "commodities": commodities_data
+                    },
+                    news_events=news_items,
+                    sector_analysis=sentiment_analysis,
+                    technical_analysis=technical_analysis,
+                    economic_calendar=self._get_economic_calendar(),
+                    risk_assessment=self._generate_risk_assessment(sentiment_analysis, technical_analysis, risk_metrics),
+                    stale_sources=orchestrator.stale_sources
+                )
+            
         logger.info("Daily report data generation completed")
         return report_data
     
-    def _generate_executive_summary(self, futures_data: Dict, sentiment_analysis: Dict, technical_analysis: Dict) -> Dict[str, Any]:
+    def _generate_executive_summary(self, futures_data: Dict, sentiment_analysis: Dict, technical_analysis: Dict,
+                                    risk_metrics: Dict = None) -> Dict[str, Any]:
         """Generate executive summary"""
         
         # Calculate overall market direction
-        futures_changes = [data.change_percent for data in futures_data.values()]
-        avg_futures_change = sum(futures_changes) / len(futures_changes) if futures_changes else 0
+        futures = MarketDataFrame.from_quotes(futures_data)
+        avg_futures_change = float(futures.change_percent.mean()) if len(futures) else 0
         
         market_direction = "bullish" if avg_futures_change > 0.5 else "bearish" if avg_futures_change < -0.5 else "neutral"
         
@@ -397,7 +451,7 @@ class ReportGenerator:
                 f"News sentiment is {sentiment_analysis.get('overall_sentiment', 'neutral')} with impact score of {sentiment_analysis.get('average_impact_score', 0)}",
                 f"VIX at {technical_analysis.get('vix_level', 20)} indicating {technical_analysis.get('volatility_regime', 'medium')} volatility"
             ],
-            "risk_level": "medium",  # Would be calculated based on various factors
+            "risk_level": self._quantitative_risk_level(technical_analysis, risk_metrics),
             "recommended_actions": [
                 "Monitor Federal Reserve communications",
                 "Watch for any changes in volatility regime",
@@ -430,13 +484,21 @@ class ReportGenerator:
         
         return sample_events
     
-    def _generate_risk_assessment(self, sentiment_analysis: Dict, technical_analysis: Dict) -> Dict[str, Any]:
-        """Generate risk assessment"""
+    def _quantitative_risk_level(self, technical_analysis: Dict, risk_metrics: Dict = None) -> str:
+        """Risk level from the risk model, falling back to the VIX rule"""
+        
+        if risk_metrics and risk_metrics.get("risk_level"):
+            return risk_metrics["risk_level"]
         
-        risk_factors = sentiment_analysis.get('risk_factors', [])
         vix_level = technical_analysis.get('vix_level', 20)
+        return "high" if vix_level > 25 else "medium" if vix_level > 15 else "low"
+    
+    def _generate_risk_assessment(self, sentiment_analysis: Dict, technical_analysis: Dict,
+                                  risk_metrics: Dict = None) -> Dict[str, Any]:
+        """Generate risk assessment"""
         
-        risk_level = "high" if vix_level > 25 else "medium" if vix_level > 15 else "low"
+        risk_factors = list(sentiment_analysis.get('risk_factors', []))
+        risk_level = self._quantitative_risk_level(technical_analysis, risk_metrics)
         
         risk_assessment = {
             "overall_risk_level": risk_level,
@@ -453,6 +515,11 @@ class ReportGenerator:
             ]
         }
         
+        if risk_metrics:
+            risk_assessment["primary_risks"] = risk_metrics.get("signals", []) + risk_factors
+            risk_assessment["risk_score"] = risk_metrics.get("risk_score")
+            risk_assessment["risk_metrics"] = risk_metrics
+        
         return risk_assessment
 
 async def main():
@@ -465,8 +532,7 @@ async def main():
     os.makedirs(output_dir, exist_ok=True)
     
     report_file = f"{output_dir}/daily_report_{datetime.now().strftime('%Y%m%d')}.json"
-    with open(report_file, 'w') as f:
-        json.dump(asdict(report_data), f, indent=2, default=str)
+    save_json(report_data, report_file)
     
     logger.info(f"Report data saved to {report_file}")
     return report_data
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Report Section Model
+====================
+
+Render-once intermediate model of a report (headings, tables, bullet lists, KPIs) shared by every output
+"""
+
+import hashlib
+import logging
+import weakref
+from dataclasses import dataclass, field
+from typing import Dict, List, Any, Optional, Tuple, Union
+
+try:
+    from .market_data import ReportData
+except ImportError:
+    from market_data import ReportData
+
+logger = logging.getLogger(__name__)
+
+# Tones are what renderers map to colours, emoji or wording
+POSITIVE, NEGATIVE, WARNING, NEUTRAL = 'positive', 'negative', 'warning', 'neutral'
+
+# Market tables in display order: (market_performance key, title)
+MARKET_TABLES = (
+    ('previous_close', 'Previous Session Close (Major Indices)'),
+    ('futures', 'Overnight Futures'),
+    ('international', 'International Markets'),
+    ('currencies', 'Currency Markets'),
+    ('commodities', 'Commodities'),
+    ('watchlist', 'Watchlist')
+)
+MARKET_COLUMNS = ('Asset', 'Price', 'Change', 'Change %')
+CALENDAR_COLUMNS = ('Time (ET)', 'Event', 'Importance', 'Forecast', 'Previous')
+LEVEL_COLUMNS = ('Symbol', 'Support', 'Resistance')
+TOP_NEWS = 5
+
+def sentiment_tone(sentiment: str) -> str:
+    return POSITIVE if sentiment == 'bullish' else NEGATIVE if sentiment == 'bearish' else NEUTRAL
+
+def level_tone(level: str) -> str:
+    """Tone for risk, volatility and importance levels (high is bad)"""
+    return NEGATIVE if level == 'high' else WARNING if level == 'medium' else POSITIVE
+
+def impact_tone(score: float) -> str:
+    return NEGATIVE if score >= 8 else WARNING if score >= 6 else POSITIVE
+
+def change_tone(change: float) -> str:
+    return POSITIVE if change >= 0 else NEGATIVE
+
+@dataclass(frozen=True)
+class Cell:
+    text: str
+    tone: Optional[str] = None
+    value: Any = None  # raw value for renderers that phrase rather than print
+
+@dataclass(frozen=True)
+class Heading:
+    text: str
+
+@dataclass(frozen=True)
+class KPI:
+    key: str
+    label: str
+    text: str
+    tone: Optional[str] = None
+    value: Any = None
+
+@dataclass(frozen=True)
+class Item:
+    text: str
+    detail: Optional[str] = None
+    meta: Optional[str] = None
+    tone: Optional[str] = None
+    value: Any = None
+
+@dataclass(frozen=True)
+class BulletList:
+    key: str
+    items: Tuple[Item, ...]
+    ordered: bool = False
+
+@dataclass(frozen=True)
+class Table:
+    key: str
+    columns: Tuple[str, ...]
+    rows: Tuple[Tuple[Cell, ...], ...]
+
+Block = Union[Heading, KPI, BulletList, Table]
+
+@dataclass(frozen=True)
+class Section:
+    """One report section; the digest changes only when its rendered content would"""
+    key: str
+    title: str
+    blocks: Tuple[Block, ...]
+    digest: str = field(init=False, compare=False)
+
+    def __post_init__(self):
+        content = repr((self.key, self.title, self.blocks)).encode('utf-8')
+        object.__setattr__(self, 'digest', hashlib.sha1(content).hexdigest())
+
+    def _find(self, kind, key: str):
+        return next((block for block in self.blocks if isinstance(block, kind) and block.key == key), None)
+
+    def kpi(self, key: str) -> Optional[KPI]:
+        return self._find(KPI, key)
+
+    def table(self, key: str) -> Optional[Table]:
+        return self._find(Table, key)
+
+    def items(self, key: str) -> Tuple[Item, ...]:
+        bullets = self._find(BulletList, key)
+        return bullets.items if bullets else ()
+
+@dataclass(frozen=True)
+class ReportModel:
+    date: str
+    sections: Tuple[Section, ...]
+
+    def section(self, key: str) -> Section:
+        return next(section for section in self.sections if section.key == key)
+
+    def digests(self) -> Dict[str, str]:
+        return {section.key: section.digest for section in self.sections}
+
+def _bullets(key: str, texts: List[str], ordered: bool = False) -> BulletList:
+    return BulletList(key, tuple(Item(str(text)) for text in texts or []), ordered)
+
+def _executive_summary(report: ReportData) -> Section:
+    summary = report.executive_summary or {}
+    sentiment = summary.get('market_sentiment', 'neutral')
+    risk_level = summary.get('risk_level', 'medium')
+
+    return Section('executive_summary', 'Executive Summary', (
+        KPI('market_sentiment', 'Market Sentiment', sentiment.upper(), sentiment_tone(sentiment), sentiment),
+        KPI('risk_level', 'Risk Level', str(risk_level).upper(), level_tone(risk_level), risk_level),
+        Heading('Key Insights'),
+        _bullets('key_insights', summary.get('key_insights', [])),
+        Heading('Recommended Actions'),
+        _bullets('recommended_actions', summary.get('recommended_actions', []), ordered=True)
+    ))
+
+def _market_table(key: str, quotes: Dict[str, Any]) -> Table:
+    rows = []
+    for name, quote in (quotes or {}).items():
+        if not hasattr(quote, 'current_price'):
+            continue
+        tone = change_tone(quote.change)
+        rows.append((
+            Cell(name),
+            Cell(f"{quote.current_price:.2f}", value=quote.current_price),
+            Cell(f"{quote.change:+.2f}", tone, quote.change),
+            Cell(f"{quote.change_percent:+.2f}%", tone, quote.change_percent)
+        ))
+    return Table(key, MARKET_COLUMNS, tuple(rows))
+
+def _market_performance(report: ReportData) -> Section:
+    performance = report.market_performance or {}
+    blocks = []
+    for key, title in MARKET_TABLES:
+        if performance.get(key):
+            blocks.extend([Heading(title), _market_table(key, performance[key])])
+    return Section('market_performance', 'Market Performance Analysis', tuple(blocks))
+
+def _news(report: ReportData) -> Section:
+    analysis = report.sector_analysis or {}
+    sentiment = analysis.get('overall_sentiment', 'neutral')
+    impact = analysis.get('average_impact_score', 0)
+
+    top_news = tuple(
+        Item(item.headline, item.summary, item.source, impact_tone(item.impact_score), item.impact_score)
+        for item in (report.news_events or [])[:TOP_NEWS]
+    )
+    return Section('news', 'News & Events Impact', (
+        KPI('news_sentiment', 'Overall News Sentiment', sentiment.title(), None, sentiment),
+        KPI('average_impact', 'Average Impact Score', f"{impact}/10", None, impact),
+        _bullets('key_themes', analysis.get('key_themes', [])),
+        BulletList('top_news', top_news)
+    ))
+
+def _technical_analysis(report: ReportData) -> Section:
+    technicals = report.technical_analysis or {}
+    vix = technicals.get('vix_level', 20)
+    regime = technicals.get('volatility_regime', 'medium')
+    breadth = technicals.get('market_breadth', 'neutral')
+
+    blocks = [
+        KPI('vix_level', 'VIX Level', str(vix), None, vix),
+        KPI('volatility_regime', 'Volatility Regime', regime.title(), level_tone(regime), regime),
+        KPI('market_breadth', 'Market Breadth', str(breadth), None, breadth)
+    ]
+    if 'key_levels' in technicals:
+        rows = tuple(
+            (Cell(str(symbol)),
+             Cell(str(levels.get('support', 'N/A')), value=levels.get('support')),
+             Cell(str(levels.get('resistance', 'N/A')), value=levels.get('resistance')))
+            for symbol, levels in technicals['key_levels'].items()
+        )
+        blocks.extend([Heading('Key Technical Levels'), Table('key_levels', LEVEL_COLUMNS, rows)])
+    return Section('technical_analysis', 'Technical Analysis', tuple(blocks))
+
+def _economic_calendar(report: ReportData) -> Section:
+    rows = []
+    for event in report.economic_calendar or []:
+        importance = event.get('importance') or 'low'
+        rows.append((
+            Cell(str(event.get('time', ''))),
+            Cell(str(event.get('event', ''))),
+            Cell(importance.title(), level_tone(importance), importance),
+            Cell(str(event.get('forecast', 'N/A'))),
+            Cell(str(event.get('previous', 'N/A')))
+        ))
+    return Section('economic_calendar', "Today's Economic Calendar",
+                   (Table('economic_calendar', CALENDAR_COLUMNS, tuple(rows)),))
+
+def _risk_assessment(report: ReportData) -> Section:
+    risk = report.risk_assessment or {}
+    level = risk.get('overall_risk_level', 'medium')
+
+    return Section('risk_assessment', 'Risk Assessment & Opportunities', (
+        KPI('overall_risk_level', 'Overall Risk Level', level.upper(), level_tone(level), level),
+        Heading('Primary Risk Factors'),
+        _bullets('primary_risks', risk.get('primary_risks', [])),
+        Heading('Opportunity Areas'),
+        _bullets('opportunity_areas', risk.get('opportunity_areas', [])),
+        Heading('Hedging Recommendations'),
+        _bullets('hedging_recommendations', risk.get('hedging_recommendations', []), ordered=True)
+    ))
+
+SECTION_BUILDERS = (
+    _executive_summary,
+    _market_performance,
+    _news,
+    _technical_analysis,
+    _economic_calendar,
+    _risk_assessment
+)
+
+# One model per live ReportData object, so each renderer in a run reuses it
+_models: Dict[int, Tuple[weakref.ref, ReportModel]] = {}
+
+def build_report_model(report: ReportData) -> ReportModel:
+    """Section model for a report, computed once per report object (treat the report as read-only after)"""
+
+    cached = _models.get(id(report))
+    if cached is not None and cached[0]() is report:
+        return cached[1]
+
+    model = ReportModel(report.date, tuple(builder(report) for builder in SECTION_BUILDERS))
+    key = id(report)
+    _models[key] = (weakref.ref(report, lambda _: _models.pop(key, None)), model)
+    return model
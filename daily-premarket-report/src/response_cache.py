@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Response Cache
+==============
+
+Disk cache of raw provider responses with per-entry age limits, shared across report runs and processes
+"""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Callable, Awaitable
+
+try:
+    from .tracing import event, HTTP
+except ImportError:
+    from tracing import event, HTTP
+
+logger = logging.getLogger(__name__)
+
+# How long a cached response may stand in for a live fetch
+EARNINGS_TTL = 12 * 3600
+FRED_OBSERVATION_TTL = 12 * 3600
+FRED_SERIES_INFO_TTL = 7 * 86400
+CALENDAR_PAGE_TTL = 3600
+BAR_TTL = 3600  # stored daily bars, checked against the bar store manifest
+RUN_BAR_MAX_AGE = 300  # bars loaded earlier in the same run
+# How old a response may be and still stand in for a source whose circuit is open
+STALE_RESPONSE_MAX_AGE = 24 * 3600
+
+class ResponseCache:
+    """JSON-serializable response bodies keyed by namespace and request key"""
+
+    def __init__(self, cache_dir: str = None):
+        self.cache_dir = Path(cache_dir or os.getenv('RESPONSE_CACHE_DIR', 'response_cache'))
+        self._lock = threading.Lock()
+
+    def _path(self, namespace: str, key: str) -> Path:
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        return self.cache_dir / re.sub(r'[^A-Za-z0-9._-]', '_', namespace) / f"{digest}.json"
+
+    def get(self, namespace: str, key: str, max_age: float) -> Optional[Any]:
+        """Cached body if it was stored less than max_age seconds ago"""
+
+        try:
+            with open(self._path(namespace, key), 'r') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Could not read cached {namespace} response: {e}")
+            return None
+
+        if entry.get('key') != key or time.time() - entry.get('saved_at', 0) > max_age:
+            return None
+        event(f"cache {namespace}", HTTP, cache_hit=True, namespace=namespace)
+        return entry['body']
+
+    def put(self, namespace: str, key: str, body: Any):
+        """Atomically store a response body"""
+
+        path = self._path(namespace, key)
+        try:
+            with self._lock:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp_path = path.with_suffix('.tmp')
+                with open(tmp_path, 'w') as f:
+                    json.dump({'key': key, 'saved_at': time.time(), 'body': body}, f)
+                os.replace(tmp_path, path)
+        except Exception as e:
+            logger.warning(f"Could not cache {namespace} response: {e}")
+
+    async def fetch(self, namespace: str, key: str, fetch: Callable[[], Awaitable[Any]],
+                    max_age: float) -> Any:
+        """Return a fresh cached body, or await fetch() and cache a non-empty result"""
+
+        cached = self.get(namespace, key, max_age)
+        if cached is not None:
+            logger.debug(f"Using cached {namespace} response for {key}")
+            return cached
+
+        body = await fetch()
+        if body:
+            self.put(namespace, key, body)
+        return body
+
+_default_cache = None
+
+def get_response_cache() -> ResponseCache:
+    """Shared process-wide response cache"""
+
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
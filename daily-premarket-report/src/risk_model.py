@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Cross-Asset Risk Model
+======================
+
+Realized volatility, EWMA correlation and regime signals across futures, FX, commodities and index ETFs
+"""
+
+import logging
+import warnings
+from pathlib import Path
+from typing import Dict, List, Any
+
+import numpy as np
+
+try:
+    from . import clock
+    from .bar_store import BarStore, load_yfinance_bars_many
+    from .price_matrix import PriceMatrix
+    from .response_cache import BAR_TTL
+    from .symbol_universe import UNIVERSE
+except ImportError:
+    import clock
+    from bar_store import BarStore, load_yfinance_bars_many
+    from price_matrix import PriceMatrix
+    from response_cache import BAR_TTL
+    from symbol_universe import UNIVERSE
+
+logger = logging.getLogger(__name__)
+
+# Daily series used for the cross-asset view (yfinance symbols)
+RISK_UNIVERSE = UNIVERSE.symbol_map('risk', 'yfinance')
+
+VIX_SYMBOL = UNIVERSE.get('VIX').symbol('yfinance')
+EQUITY_SYMBOL = UNIVERSE.get('SPY').symbol('yfinance')
+TRADING_DAYS = 252
+
+class RiskModel:
+    """Quantitative risk level from stored daily bars"""
+
+    def __init__(self, bar_store: BarStore = None, universe: Dict[str, str] = None,
+                 vol_window: int = 20, ewma_lambda: float = 0.94, history_days: int = TRADING_DAYS,
+                 refresh_max_age: float = BAR_TTL):
+        self.bar_store = bar_store or BarStore()
+        self.universe = universe or RISK_UNIVERSE
+        self.vol_window = vol_window
+        self.ewma_lambda = ewma_lambda  # RiskMetrics daily decay
+        self.history_days = history_days
+        self.refresh_max_age = refresh_max_age  # daily bars refreshed this recently are not re-downloaded
+        self.matrix_dir = str(Path(self.bar_store.root_dir) / 'risk_matrix')
+
+    @property
+    def symbols(self) -> List[str]:
+        return list(self.universe) + [VIX_SYMBOL]
+
+    def refresh(self):
+        """Top up stored daily bars for the universe (only new bars are downloaded)"""
+
+        load_yfinance_bars_many(self.bar_store, self.symbols, '1y', '1d', max_age=self.refresh_max_age)
+
+    def assess(self) -> Dict[str, Any]:
+        """Refresh history and compute risk metrics (as of the backfill date), returning {} if unavailable"""
+
+        try:
+            self.refresh()
+            return self.compute(end_date=clock.last_session_date())
+        except Exception as e:
+            logger.error(f"Error computing risk model: {e}")
+            return {}
+
+    def compute(self, end_date: str = None) -> Dict[str, Any]:
+        """Compute volatility, correlation and regime signals from the stored price matrix"""
+
+        matrix = PriceMatrix.open_or_build(self.bar_store, self.symbols, self.matrix_dir)
+        window = matrix.window(self.history_days, end_date=end_date)
+        closes = np.asarray(window['closes'], dtype=float)
+        if closes.shape[0] <= self.vol_window:
+            logger.warning("Not enough stored history for the risk model")
+            return {}
+
+        symbols = window['symbols']
+        vix_col = symbols.index(VIX_SYMBOL)
+        asset_cols = [i for i, symbol in enumerate(symbols) if symbol != VIX_SYMBOL]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_returns = np.diff(np.log(closes[:, asset_cols]), axis=0)
+
+        # Drop assets without enough history in the window
+        valid_counts = np.sum(np.isfinite(log_returns), axis=0)
+        keep = valid_counts >= self.vol_window
+        asset_symbols = [symbols[c] for c, k in zip(asset_cols, keep) if k]
+        log_returns = np.nan_to_num(log_returns[:, keep], nan=0.0, posinf=0.0, neginf=0.0)
+        if not asset_symbols:
+            return {}
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            short_vol = log_returns[-self.vol_window:].std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+            long_vol = log_returns.std(axis=0, ddof=1) * np.sqrt(TRADING_DAYS) * 100
+            vol_ratio = np.where(long_vol > 0, short_vol / long_vol, np.nan)
+
+        ewma_corr = self._ewma_correlation(log_returns)
+        full_corr = self._correlation(log_returns)
+        off_diagonal = ~np.eye(len(asset_symbols), dtype=bool)
+        avg_corr = float(np.nanmean(np.abs(ewma_corr[off_diagonal]))) if len(asset_symbols) > 1 else 0.0
+        baseline_corr = float(np.nanmean(np.abs(full_corr[off_diagonal]))) if len(asset_symbols) > 1 else 0.0
+
+        vix_series = closes[:, vix_col]
+        vix_level = float(vix_series[-1]) if np.isfinite(vix_series[-1]) else None
+
+        equity_vol_ratio = None
+        drawdown = None
+        if EQUITY_SYMBOL in asset_symbols:
+            idx = asset_symbols.index(EQUITY_SYMBOL)
+            equity_vol_ratio = float(vol_ratio[idx])
+            equity_closes = closes[:, symbols.index(EQUITY_SYMBOL)]
+            drawdown = float((equity_closes[-1] / np.nanmax(equity_closes) - 1) * 100)
+
+        signals = self._regime_signals(vix_level, equity_vol_ratio, avg_corr, baseline_corr, drawdown)
+        risk_score = self._risk_score(vix_level, equity_vol_ratio, avg_corr, drawdown)
+
+        return {
+            'as_of': window['dates'][-1],
+            'risk_score': round(risk_score, 1),
+            'risk_level': 'high' if risk_score >= 65 else 'medium' if risk_score >= 35 else 'low',
+            'vix_level': round(vix_level, 2) if vix_level is not None else None,
+            'volatility_regime': signals['volatility_regime'],
+            'correlation_regime': signals['correlation_regime'],
+            'average_correlation': round(avg_corr, 3),
+            'baseline_correlation': round(baseline_corr, 3),
+            'equity_drawdown': round(drawdown, 2) if drawdown is not None else None,
+            'realized_vol': {
+                self.universe.get(symbol, symbol): {
+                    'current': round(float(short_vol[i]), 2),
+                    'one_year': round(float(long_vol[i]), 2),
+                    'ratio': round(float(vol_ratio[i]), 2) if np.isfinite(vol_ratio[i]) else None
+                }
+                for i, symbol in enumerate(asset_symbols)
+            },
+            'top_correlations': self._top_pairs(ewma_corr, asset_symbols),
+            'signals': signals['messages']
+        }
+
+    def _ewma_correlation(self, returns: np.ndarray) -> np.ndarray:
+        """EWMA correlation matrix (zero-mean RiskMetrics weighting) in a single matrix product"""
+
+        n = returns.shape[0]
+        weights = (1 - self.ewma_lambda) * self.ewma_lambda ** np.arange(n - 1, -1, -1)
+        covariance = (returns * weights[:, None]).T @ returns
+        return self._cov_to_corr(covariance)
+
+    def _correlation(self, returns: np.ndarray) -> np.ndarray:
+        """Equal-weighted correlation matrix over the full window"""
+
+        centered = returns - returns.mean(axis=0)
+        return self._cov_to_corr(centered.T @ centered)
+
+    def _cov_to_corr(self, covariance: np.ndarray) -> np.ndarray:
+        std = np.sqrt(np.diag(covariance))
+        with np.errstate(divide='ignore', invalid='ignore'):
+            corr = covariance / np.outer(std, std)
+        return np.clip(np.nan_to_num(corr), -1.0, 1.0)
+
+    def _top_pairs(self, corr: np.ndarray, symbols: List[str], count: int = 5) -> List[Dict[str, Any]]:
+        """Most strongly correlated (or anti-correlated) asset pairs"""
+
+        rows, cols = np.triu_indices(len(symbols), k=1)
+        values = corr[rows, cols]
+        order = np.argsort(-np.abs(values))[:count]
+        return [
+            {
+                'pair': f"{self.universe.get(symbols[rows[k]], symbols[rows[k]])} / "
+                        f"{self.universe.get(symbols[cols[k]], symbols[cols[k]])}",
+                'correlation': round(float(values[k]), 2)
+            }
+            for k in order
+        ]
+
+    def _regime_signals(self, vix_level, equity_vol_ratio, avg_corr, baseline_corr, drawdown) -> Dict[str, Any]:
+        """Classify volatility and correlation regimes and describe notable signals"""
+
+        messages = []
+
+        if vix_level is None:
+            volatility_regime = 'unknown'
+        else:
+            volatility_regime = 'high' if vix_level > 25 else 'medium' if vix_level > 15 else 'low'
+        if equity_vol_ratio is not None and equity_vol_ratio > 1.3:
+            messages.append(f"Equity realized volatility expanding ({equity_vol_ratio:.1f}x its 1-year average)")
+
+        if avg_corr > baseline_corr + 0.1:
+            correlation_regime = 'rising'
+            messages.append(f"Cross-asset correlation elevated ({avg_corr:.2f} vs {baseline_corr:.2f} baseline)")
+        elif avg_corr < baseline_corr - 0.1:
+            correlation_regime = 'falling'
+        else:
+            correlation_regime = 'normal'
+
+        if vix_level is not None and vix_level > 25:
+            messages.append(f"Elevated volatility environment (VIX {vix_level:.1f})")
+        if drawdown is not None and drawdown < -10:
+            messages.append(f"S&P 500 {abs(drawdown):.1f}% below its 1-year high")
+
+        return {
+            'volatility_regime': volatility_regime,
+            'correlation_regime': correlation_regime,
+            'messages': messages
+        }
+
+    def _risk_score(self, vix_level, equity_vol_ratio, avg_corr, drawdown) -> float:
+        """Blend the regime inputs into a 0-100 score"""
+
+        components = []
+        if vix_level is not None:
+            components.append((0.35, np.clip((vix_level - 12) / 23, 0, 1)))       # VIX 12 -> 35
+        if equity_vol_ratio is not None and np.isfinite(equity_vol_ratio):
+            components.append((0.25, np.clip(equity_vol_ratio - 0.8, 0, 1)))       # 0.8x -> 1.8x
+        components.append((0.2, np.clip(avg_corr / 0.6, 0, 1)))
+        if drawdown is not None:
+            components.append((0.2, np.clip(-drawdown / 15, 0, 1)))                # 0% -> -15%
+
+        total_weight = sum(weight for weight, _ in components)
+        return float(100 * sum(weight * value for weight, value in components) / total_weight)
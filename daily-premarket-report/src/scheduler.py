@@ -8,30 +8,46 @@ Automated scheduling system for daily premarket reports at 5:00 AM Central Time
 
 import asyncio
 import os
-import schedule
-import time
 import logging
 from datetime import datetime, timezone
 import pytz
 from pathlib import Path
 import json
-from typing import Dict, Any
+from functools import cached_property
+from typing import Dict, Any, Iterable
 
-from report_generator import ReportGenerator
-from pdf_generator import PDFReportGenerator  
-from audio_generator import AudioReportGenerator
+import report_codec
+from artifact_store import ArtifactStore
+from symbol_universe import UNIVERSE
+from deadline import DeadlineOrchestrator, RunBudget
+from async_scheduler import AsyncScheduler, ScheduledJob, WEEKDAYS, next_fire_time
+from tracing import trace, span, Trace, RENDER
 
 logger = logging.getLogger(__name__)
 
+# Report sessions the daemon can run in one process (Central Time)
+REPORT_SESSIONS = {
+    'premarket': {'at': '05:00', 'days': None},
+    'midday': {'at': '11:30', 'days': WEEKDAYS},
+    'close': {'at': '15:15', 'days': WEEKDAYS}
+}
+
 class DailyReportScheduler:
     """Schedules and executes daily premarket reports"""
     
-    def __init__(self, output_dir: str = None):
+    def __init__(self, output_dir: str = None, deadline_seconds: float = 120, render_reserve: float = 30,
+                 report_time: str = "05:00", artifact_keep_days: int = 30):
         self.output_dir = output_dir or "daily_reports"
         self.central_tz = pytz.timezone('US/Central')
-        self.report_generator = ReportGenerator()
-        self.pdf_generator = PDFReportGenerator()
-        self.audio_generator = AudioReportGenerator()
+        self.report_time = report_time
+        
+        # Reports must be ready deadline_seconds after the job fires (5:02 for the 5:00 run)
+        self.deadline_seconds = deadline_seconds
+        self.render_reserve = render_reserve
+        
+        # Outputs are kept by content hash; dated folders older than artifact_keep_days are bundled and pruned
+        self.artifacts = ArtifactStore()
+        self.artifact_keep_days = artifact_keep_days
         
         # Ensure output directory exists
         Path(self.output_dir).mkdir(parents=True, exist_ok=True)
@@ -39,6 +55,34 @@ class DailyReportScheduler:
         # Setup logging
         self._setup_logging()
         
+    # The pipeline stages load on first use, so status checks and scheduling don't import them
+    
+    @cached_property
+    def report_generator(self):
+        from report_generator import ReportGenerator
+        return ReportGenerator()
+    
+    @cached_property
+    def pdf_generator(self):
+        from pdf_generator import PDFReportGenerator
+        return PDFReportGenerator()
+    
+    @cached_property
+    def audio_generator(self):
+        from audio_generator import AudioReportGenerator
+        return AudioReportGenerator()
+    
+    @cached_property
+    def archive(self):
+        from report_archive import ReportArchive
+        return ReportArchive()
+    
+    @cached_property
+    def prefetcher(self):
+        """Warms the report generator's daily history at T-30/T-10 so the run itself only fetches volatile data"""
+        from prefetch import PremarketPrefetcher
+        return PremarketPrefetcher(self.report_generator.bar_store, self.report_generator.risk_model)
+    
     def _setup_logging(self):
         """Setup logging for scheduled operations"""
         log_file = os.path.join(self.output_dir, "scheduler.log")
@@ -52,47 +96,74 @@ class DailyReportScheduler:
             ]
         )
         
-    async def generate_daily_report(self) -> Dict[str, Any]:
+    async def generate_daily_report(self, session: str = 'premarket') -> Dict[str, Any]:
         """Generate complete daily report (PDF + Audio)"""
         
+        with trace(f"{session}_report", session=session) as run_trace:
+            return await self._generate_report(session, run_trace)
+    
+    async def _generate_report(self, session: str, run_trace: Trace) -> Dict[str, Any]:
+        """Collect, render and save one session's report, timing each stage in run_trace"""
+        
         try:
-            logger.info("Starting daily premarket report generation...")
+            logger.info(f"Starting daily {session} report generation...")
             
             # Generate timestamp for files
             now = datetime.now(self.central_tz)
             timestamp = now.strftime("%Y%m%d")
             date_str = now.strftime("%Y-%m-%d")
             
-            # Create daily output directory
+            # Create daily output directory (later sessions get their own subdirectory)
             daily_dir = os.path.join(self.output_dir, timestamp)
+            if session != 'premarket':
+                daily_dir = os.path.join(daily_dir, session)
             Path(daily_dir).mkdir(parents=True, exist_ok=True)
             
-            # Step 1: Generate report data
+            # Step 1: Generate report data within the run budget
             logger.info("Collecting market data and generating report content...")
-            report_data = await self.report_generator.generate_daily_report()
+            orchestrator = DeadlineOrchestrator(
+                RunBudget.from_seconds(self.deadline_seconds, render_reserve=self.render_reserve)
+            )
+            with span('collect'):
+                report_data = await self.report_generator.generate_daily_report(orchestrator)
             
             # Step 2: Generate PDF report
             logger.info("Generating PDF report...")
-            pdf_filename = f"daily_premarket_report_{timestamp}.pdf"
+            pdf_filename = f"daily_{session}_report_{timestamp}.pdf"
             pdf_path = os.path.join(daily_dir, pdf_filename)
-            self.pdf_generator.generate_pdf_report(report_data, pdf_path)
+            with span('pdf', RENDER):
+                self.pdf_generator.generate_pdf_report(report_data, pdf_path)
+            
+            # Archive the report data for reloading (Notion) and analysis
+            with span('archive'):
+                report_data_path = report_codec.save(
+                    report_data, os.path.join(daily_dir, f"daily_{session}_report_{timestamp}{report_codec.REPORT_SUFFIX}")
+                )
+                self._archive_report(report_data, session, report_data_path)
             
             # Step 3: Generate audio report
             logger.info("Generating audio report...")
-            audio_result = await self.audio_generator.generate_complete_audio_report(
-                report_data, daily_dir
-            )
+            with span('audio', RENDER):
+                audio_result = await self.audio_generator.generate_complete_audio_report(
+                    report_data, daily_dir
+                )
+            
+            # The span tree sits next to the report; uploads that follow re-save it
+            trace_file = run_trace.save(os.path.join(daily_dir, f"run_trace_{timestamp}.json"))
             
             # Step 4: Save report metadata
             logger.info("Saving report metadata...")
             metadata = {
                 "generation_date": date_str,
+                "session": session,
                 "generation_time": now.isoformat(),
                 "timezone": "US/Central",
                 "files": {
                     "pdf_report": pdf_path,
                     "audio_file": audio_result["audio_file"],
-                    "audio_metadata": audio_result["metadata_file"]
+                    "audio_metadata": audio_result["metadata_file"],
+                    "report_data": report_data_path,
+                    "run_trace": trace_file
                 },
                 "report_stats": {
                     "audio_duration_minutes": audio_result["duration_minutes"],
@@ -106,23 +177,39 @@ class DailyReportScheduler:
                     "news_analysis": "Generated",
                     "technical_analysis": "YFinance + Custom",
                     "economic_calendar": "Sample Data"
-                }
+                },
+                "stale_sources": report_data.stale_sources or {},
+                "source_timings": orchestrator.timings,
+                "timing": run_trace.summary(),
+                "deadline_seconds": self.deadline_seconds,
+                "warmup": self.prefetcher.last_results
             }
+            metadata["artifacts"] = self._store_artifacts(metadata["files"], date_str, session)
             
             metadata_file = os.path.join(daily_dir, f"report_metadata_{timestamp}.json")
             with open(metadata_file, 'w') as f:
                 json.dump(metadata, f, indent=2)
+            self._store_artifacts({"report_metadata": metadata_file}, date_str, session)
+            self._retain_outputs()
             
             logger.info(f"Daily report generation completed successfully!")
             logger.info(f"Files saved to: {daily_dir}")
             logger.info(f"PDF: {pdf_filename}")
             logger.info(f"Audio: {os.path.basename(audio_result['audio_file'])}")
             logger.info(f"Duration: {audio_result['duration_minutes']:.1f} minutes")
+            logger.info(metadata["timing"]["summary"])
+            if report_data.stale_sources:
+                logger.warning(f"Stale sources substituted: {', '.join(report_data.stale_sources)}")
+            
+            # The next run starts from a fresh warm-up
+            self.prefetcher.last_results = {}
             
             return {
                 "status": "success",
+                "session": session,
                 "timestamp": timestamp,
                 "output_directory": daily_dir,
+                "metadata_file": metadata_file,
                 "files": metadata["files"],
                 "stats": metadata["report_stats"]
             }
@@ -135,58 +222,115 @@ class DailyReportScheduler:
                 "timestamp": timestamp
             }
     
+    def _archive_report(self, report_data, session: str, path: str):
+        """Index the report and the benchmark closes behind next-day trend queries"""
+        
+        try:
+            self.archive.ingest(report_data, session, path)
+            self.archive.sync_closes(self.report_generator.bar_store, UNIVERSE.plan(['major_etfs'], 'yfinance'))
+        except Exception as e:
+            logger.warning(f"Could not archive {session} report: {e}")
+    
+    def _store_artifacts(self, files: Dict[str, str], date_str: str, session: str) -> Dict[str, str]:
+        """Add run outputs to the artifact store, returning {kind: hash}"""
+        
+        try:
+            return self.artifacts.put_files(files, date_str, session)
+        except Exception as e:
+            logger.warning(f"Could not store {session} artifacts: {e}")
+            return {}
+    
+    def _retain_outputs(self):
+        """Bundle old artifacts and drop dated output folders that are safely stored"""
+        
+        try:
+            self.artifacts.compact(self.artifact_keep_days)
+            self.artifacts.prune_outputs(self.output_dir, self.artifact_keep_days)
+        except Exception as e:
+            logger.warning(f"Artifact retention failed: {e}")
+    
+    async def run_report(self, session: str = 'premarket'):
+        """Generate one session's report and log the outcome"""
+        
+        result = await self.generate_daily_report(session)
+        
+        if result["status"] == "success":
+            logger.info(f"Daily {session} report job completed successfully")
+        else:
+            logger.error(f"Daily {session} report job failed: {result.get('error')}")
+        return result
+    
     def run_daily_report_job(self):
-        """Wrapper for async report generation"""
-        logger.info("Triggered daily report job at 5:00 AM Central Time")
+        """Run a single report outside the daemon"""
+        logger.info("Triggered daily report job")
         
         # Run the async function
         loop = asyncio.new_event_loop()
         asyncio.set_event_loop(loop)
         
         try:
-            result = loop.run_until_complete(self.generate_daily_report())
-            
-            if result["status"] == "success":
-                logger.info("Daily report job completed successfully")
-            else:
-                logger.error(f"Daily report job failed: {result.get('error')}")
-                
+            loop.run_until_complete(self.run_report())
         except Exception as e:
             logger.error(f"Daily report job exception: {e}")
         finally:
             loop.close()
     
-    def schedule_daily_reports(self):
-        """Schedule daily reports for 5:00 AM Central Time"""
+    def run_prefetch_job(self, stage: str):
+        """Run a single warm-up stage outside the daemon"""
+        logger.info(f"Triggered warm-up stage {stage}")
         
-        # Schedule the job for 5:00 AM every day
-        schedule.every().day.at("05:00").do(self.run_daily_report_job)
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
         
-        logger.info("Daily premarket reports scheduled for 5:00 AM Central Time")
+        try:
+            loop.run_until_complete(self.prefetcher.run_stage(stage))
+        except Exception as e:
+            logger.error(f"Warm-up stage {stage} exception: {e}")
+        finally:
+            loop.close()
+    
+    def _session_time(self, session: str) -> str:
+        # report_time overrides the premarket slot
+        return self.report_time if session == 'premarket' else REPORT_SESSIONS[session]['at']
+    
+    def build_daemon(self, sessions: Iterable[str] = ('premarket',)) -> AsyncScheduler:
+        """Async scheduler with each session's warm-up stages and report job"""
+        
+        daemon = AsyncScheduler('US/Central')
+        for session in sessions:
+            at = self._session_time(session)
+            days = REPORT_SESSIONS[session]['days']
+            for stage, stage_time in self.prefetcher.stage_times(at):
+                daemon.add_job(f"{session}:{stage}", stage_time,
+                               lambda stage=stage: self.prefetcher.run_stage(stage), days)
+            daemon.add_job(session, at, lambda session=session: self.run_report(session), days)
+        return daemon
+    
+    async def run_daemon(self, sessions: Iterable[str] = ('premarket',)):
+        """Run the scheduler daemon in the current event loop until cancelled"""
+        
+        self.daemon = self.build_daemon(sessions)
         logger.info("Scheduler is now running...")
+        await self.daemon.run()
+    
+    def schedule_daily_reports(self, sessions: Iterable[str] = ('premarket',)):
+        """Run the scheduler daemon for 5:00 AM Central Time (plus any other sessions)"""
         
-        # Keep the scheduler running
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # Check every minute
+        asyncio.run(self.run_daemon(sessions))
     
-    def run_test_report(self):
-        """Generate a test report immediately"""
+    def run_test_report(self, warmup: bool = False):
+        """Generate a test report immediately, optionally running the warm-up stages first"""
         logger.info("Running test report generation...")
+        if warmup:
+            for stage, _ in self.prefetcher.stage_times(self.report_time):
+                self.run_prefetch_job(stage)
         return self.run_daily_report_job()
     
-    def get_next_scheduled_time(self) -> str:
+    def get_next_scheduled_time(self, session: str = 'premarket') -> str:
         """Get the next scheduled report time"""
         
-        central_tz = pytz.timezone('US/Central')
-        now = datetime.now(central_tz)
-        
-        # Calculate next 5:00 AM Central
-        next_run = now.replace(hour=5, minute=0, second=0, microsecond=0)
-        
-        # If it's past 5:00 AM today, schedule for tomorrow
-        if now.hour >= 5:
-            next_run = next_run.replace(day=next_run.day + 1)
+        job = ScheduledJob(session, self._session_time(session), None, REPORT_SESSIONS[session]['days'])
+        next_run = next_fire_time(job, datetime.now(self.central_tz), self.central_tz)
         
         return next_run.strftime("%Y-%m-%d %H:%M:%S %Z")
 
@@ -199,21 +343,28 @@ def main():
     parser.add_argument("--test", action="store_true", help="Run a test report immediately")
     parser.add_argument("--output-dir", default="daily_reports", help="Output directory for reports")
     parser.add_argument("--schedule", action="store_true", help="Start the scheduler (default)")
+    parser.add_argument("--deadline-seconds", type=float, default=120,
+                       help="Seconds after the job fires by which the report must be ready")
+    parser.add_argument("--sessions", nargs="+", choices=list(REPORT_SESSIONS), default=["premarket"],
+                       help="Report sessions to schedule in the daemon")
+    parser.add_argument("--warmup", action="store_true",
+                       help="With --test, run the pre-market warm-up stages before the report")
     
     args = parser.parse_args()
     
-    scheduler = DailyReportScheduler(output_dir=args.output_dir)
+    scheduler = DailyReportScheduler(output_dir=args.output_dir, deadline_seconds=args.deadline_seconds)
     
     if args.test:
         # Run test report
         print("Generating test report...")
-        scheduler.run_test_report()
+        scheduler.run_test_report(warmup=args.warmup)
         print("Test report completed!")
         
     else:
         # Start scheduler (default behavior)
-        print(f"Next scheduled report: {scheduler.get_next_scheduled_time()}")
-        scheduler.schedule_daily_reports()
+        for session in args.sessions:
+            print(f"Next scheduled {session} report: {scheduler.get_next_scheduled_time(session)}")
+        scheduler.schedule_daily_reports(args.sessions)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Sector Rotation Engine
+======================
+
+Vectorized multi-horizon sector rotation analysis over a date x symbol price matrix
+"""
+
+import logging
+import warnings
+from typing import Dict, Any
+
+import numpy as np
+
+try:
+    from .price_matrix import PriceMatrix, HORIZONS
+except ImportError:
+    from price_matrix import PriceMatrix, HORIZONS
+
+logger = logging.getLogger(__name__)
+
+class SectorRotationEngine:
+    """Computes returns, relative strength, ranks, dispersion and volume trends for a sector universe"""
+
+    def __init__(self, benchmark: str = 'SPY', horizons: Dict[str, int] = None,
+                 rank_lag: int = 5, volume_short: int = 5, volume_long: int = 20):
+        self.benchmark = benchmark
+        self.horizons = horizons or HORIZONS
+        self.rank_lag = rank_lag  # sessions back used for rank changes
+        self.volume_short = volume_short
+        self.volume_long = volume_long
+
+    def analyze(self, matrix: PriceMatrix, sectors: Dict[str, str], end_date: str = None) -> Dict[str, Any]:
+        """Analyze sector ETFs (symbol -> sector name) against the benchmark in one pass"""
+
+        symbols = [symbol for symbol in sectors if symbol in matrix.symbol_index]
+        if not symbols:
+            return {'sectors': {}, 'horizons': {}}
+
+        names = [sectors[symbol] for symbol in symbols]
+        horizon_names = list(self.horizons)
+        lookbacks = np.array([self.horizons[h] for h in horizon_names])
+
+        has_benchmark = self.benchmark in matrix.symbol_index
+        window_symbols = symbols + ([self.benchmark] if has_benchmark else [])
+        depth = max(int(lookbacks.max()) + self.rank_lag, self.volume_long)
+        window = matrix.window(depth, end_date=end_date, symbols=window_symbols)
+
+        closes = np.asarray(window['closes'], dtype=float)
+        volumes = np.asarray(window['volumes'], dtype=float)
+        last = closes.shape[0] - 1
+
+        # horizons x symbols returns now and rank_lag sessions ago
+        current = self._horizon_returns(closes, last, lookbacks)
+        previous = self._horizon_returns(closes, last - self.rank_lag, lookbacks)
+
+        sector_current = current[:, :len(symbols)]
+        sector_previous = previous[:, :len(symbols)]
+        benchmark_current = current[:, -1:] if has_benchmark else np.zeros((len(lookbacks), 1))
+        benchmark_previous = previous[:, -1:] if has_benchmark else np.zeros((len(lookbacks), 1))
+
+        relative = sector_current - benchmark_current
+        relative_previous = sector_previous - benchmark_previous
+
+        ranks = self._rank(relative)
+        ranks_previous = self._rank(relative_previous)
+        rank_change = np.where(np.isnan(relative) | np.isnan(relative_previous), 0, ranks_previous - ranks)
+
+        with warnings.catch_warnings():
+            # Horizons without enough history are all-NaN rows
+            warnings.simplefilter('ignore', RuntimeWarning)
+            dispersion = np.nanstd(sector_current, axis=1)
+
+        # Average volume over the short window vs the long window
+        sector_volumes = volumes[:, :len(symbols)]
+        short_avg = sector_volumes[-self.volume_short:].mean(axis=0)
+        long_avg = sector_volumes[-self.volume_long:].mean(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volume_ratio = np.where(long_avg > 0, short_avg / long_avg, np.nan)
+
+        analysis = {
+            'as_of': window['dates'][-1] if window['dates'] else None,
+            'benchmark': self.benchmark if has_benchmark else None,
+            'horizons': {},
+            'sectors': {}
+        }
+
+        for i, horizon in enumerate(horizon_names):
+            analysis['horizons'][horizon] = {
+                'sessions': int(lookbacks[i]),
+                'benchmark_return': _round(benchmark_current[i, 0]) if has_benchmark else None,
+                'dispersion': _round(dispersion[i]),
+                'spread': _round(np.nanmax(sector_current[i]) - np.nanmin(sector_current[i]))
+                if not np.all(np.isnan(sector_current[i])) else None
+            }
+
+        for j, (symbol, name) in enumerate(zip(symbols, names)):
+            start_row = max(0, last - self.horizons.get('1w', lookbacks[0]))
+            analysis['sectors'][name] = {
+                'symbol': symbol,
+                'current_price': _round(closes[last, j]),
+                'start_date': window['dates'][start_row],
+                'end_date': window['dates'][last],
+                'returns': {h: _round(sector_current[i, j]) for i, h in enumerate(horizon_names)},
+                'relative_strength': {h: _round(relative[i, j]) for i, h in enumerate(horizon_names)},
+                'rank': {h: int(ranks[i, j]) for i, h in enumerate(horizon_names)},
+                'rank_change': {h: int(rank_change[i, j]) for i, h in enumerate(horizon_names)},
+                'volume_ratio': _round(volume_ratio[j]),
+                'volume_trend': self._volume_trend(volume_ratio[j])
+            }
+
+        return analysis
+
+    def _horizon_returns(self, closes: np.ndarray, end_row: int, lookbacks: np.ndarray) -> np.ndarray:
+        """Percent returns ending at end_row for every lookback (NaN where history is too short)"""
+
+        start_rows = end_row - lookbacks
+        valid = (start_rows >= 0) & (end_row >= 0)
+        safe_rows = np.clip(start_rows, 0, None)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            returns = (closes[max(end_row, 0)][None, :] / closes[safe_rows] - 1) * 100
+        returns[~valid] = np.nan
+        return returns
+
+    def _rank(self, values: np.ndarray) -> np.ndarray:
+        """Rank each row descending (1 = strongest), NaNs ranked last"""
+
+        filled = np.where(np.isnan(values), -np.inf, values)
+        order = np.argsort(-filled, axis=1, kind='stable')
+        ranks = np.empty_like(order)
+        np.put_along_axis(ranks, order, np.broadcast_to(np.arange(1, values.shape[1] + 1), order.shape), axis=1)
+        return ranks
+
+    def _volume_trend(self, ratio: float) -> str:
+        """Classify short vs long average volume"""
+
+        if np.isnan(ratio):
+            return 'unknown'
+        if ratio > 1.1:
+            return 'increasing'
+        if ratio < 0.9:
+            return 'decreasing'
+        return 'stable'
+
+def _round(value, digits: int = 2):
+    """Round numpy scalars to plain floats, mapping NaN to None"""
+
+    value = float(value)
+    return None if np.isnan(value) else round(value, digits)
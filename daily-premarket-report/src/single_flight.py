@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Single-Flight Request Coalescing
+================================
+
+Identical upstream calls within one report run share a single in-flight future and its result
+"""
+
+import asyncio
+import functools
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Dict, Any, Optional, Callable, Awaitable, Hashable, AsyncIterator
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Coalesces calls by key: concurrent callers await one task, later callers reuse its result"""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {'calls': 0, 'shared': 0}
+
+    async def do(self, key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the shared call for key, starting it unless one is running or already succeeded"""
+
+        self.stats['calls'] += 1
+        future = self._calls.get(key)
+
+        # Failed or cancelled calls are not remembered, so a later caller retries
+        if future is None or (future.done() and (future.cancelled() or future.exception() is not None)):
+            future = asyncio.ensure_future(fetch())
+            future.add_done_callback(_consume_exception)
+            self._calls[key] = future
+        else:
+            self.stats['shared'] += 1
+
+        # A caller being cancelled (e.g. a losing hedged request) must not cancel the shared call
+        return await asyncio.shield(future)
+
+    def forget(self, key: Hashable):
+        self._calls.pop(key, None)
+
+    def close(self):
+        """Cancel calls nobody is waiting on any more"""
+
+        for future in self._calls.values():
+            if not future.done():
+                future.cancel()
+        self._calls.clear()
+
+def _consume_exception(future: asyncio.Future):
+    # Retrieve the exception so an unawaited shared failure is not reported as never retrieved
+    if not future.cancelled():
+        future.exception()
+
+_current_group: ContextVar[Optional[SingleFlight]] = ContextVar('single_flight_group', default=None)
+
+@asynccontextmanager
+async def run_scope() -> AsyncIterator[SingleFlight]:
+    """Share upstream calls for the duration of a run (nested scopes join the outer one)"""
+
+    group = _current_group.get()
+    if group is not None:
+        yield group
+        return
+
+    group = SingleFlight()
+    token = _current_group.set(group)
+    try:
+        yield group
+    finally:
+        _current_group.reset(token)
+        group.close()
+        if group.stats['shared']:
+            logger.info(f"Coalesced {group.stats['shared']} of {group.stats['calls']} upstream calls")
+
+def within_run_scope(func):
+    """Decorator running a coroutine function inside a run scope"""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        async with run_scope():
+            return await func(*args, **kwargs)
+    return wrapper
+
+async def coalesce(key: Hashable, fetch: Callable[[], Awaitable[Any]]) -> Any:
+    """Run fetch through the current run's single-flight group, or directly outside a run
+
+    Results are shared between callers, so treat them as read-only.
+    """
+
+    group = _current_group.get()
+    if group is None:
+        return await fetch()
+    return await group.do(key, fetch)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Symbol Universe
+===============
+
+Registry of logical instruments with per-provider symbols, asset classes and display names
+"""
+
+import logging
+from dataclasses import dataclass, field
+from typing import Dict, List, Iterable, Iterator, Mapping, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class Instrument:
+    """One logical instrument and how each provider names it"""
+    key: str
+    name: str
+    asset_class: str
+    symbols: Mapping[str, str]
+    groups: Tuple[str, ...] = ()
+    aliases: Mapping[str, str] = field(default_factory=dict)  # display name per context
+
+    def symbol(self, provider: str) -> Optional[str]:
+        return self.symbols.get(provider)
+
+    def display(self, context: str = None) -> str:
+        return self.aliases.get(context, self.name)
+
+class SymbolUniverse:
+    """Lookup of instruments by key, group and provider symbol"""
+
+    def __init__(self, instruments: Iterable[Instrument]):
+        self.instruments: Dict[str, Instrument] = {}
+        self._by_symbol: Dict[Tuple[str, str], Instrument] = {}
+        for instrument in instruments:
+            if instrument.key in self.instruments:
+                raise ValueError(f"Duplicate instrument {instrument.key}")
+            self.instruments[instrument.key] = instrument
+            for provider, symbol in instrument.symbols.items():
+                self._by_symbol[(provider, symbol)] = instrument
+
+    def __iter__(self) -> Iterator[Instrument]:
+        return iter(self.instruments.values())
+
+    def get(self, key: str) -> Instrument:
+        return self.instruments[key]
+
+    def lookup(self, provider: str, symbol: str) -> Optional[Instrument]:
+        """Instrument a provider symbol belongs to"""
+        return self._by_symbol.get((provider, symbol))
+
+    def group(self, name: str) -> List[Instrument]:
+        """Instruments in a group, in registry order"""
+        return [instrument for instrument in self if name in instrument.groups]
+
+    def symbol_map(self, group: str, provider: str, context: str = None) -> Dict[str, str]:
+        """{provider symbol: display name} for a group, skipping instruments the provider lacks"""
+
+        return {
+            instrument.symbol(provider): instrument.display(context)
+            for instrument in self.group(group)
+            if instrument.symbol(provider)
+        }
+
+    def plan(self, groups: Iterable[str], provider: str) -> List[str]:
+        """Minimal deduplicated provider symbol list covering several groups"""
+
+        symbols = []
+        seen = set()
+        for group in groups:
+            for instrument in self.group(group):
+                symbol = instrument.symbol(provider)
+                if symbol and symbol not in seen:
+                    seen.add(symbol)
+                    symbols.append(symbol)
+        return symbols
+
+def _future(key, name, yfinance, tradingview, groups=('futures',)):
+    return Instrument(key, name, 'index_future',
+                      {'polygon': key, 'yfinance': yfinance, 'tradingview': tradingview}, groups)
+
+def _etf(key, name, asset_class, groups, aliases=None):
+    return Instrument(key, name, asset_class,
+                      {'polygon': key, 'yfinance': key, 'alphavantage': key}, groups, aliases or {})
+
+def _yahoo(key, name, asset_class, yfinance, groups, **symbols):
+    return Instrument(key, name, asset_class, {'yfinance': yfinance, **symbols}, groups)
+
+def _sector(key, name):
+    return Instrument(key, name, 'sector_etf', {'polygon': key, 'yfinance': key}, ('sectors',))
+
+def _crypto(key, name, tradingview):
+    return Instrument(key, name, 'crypto', {'tradingview': tradingview}, ('crypto',))
+
+# Registry order is the display order within each group
+UNIVERSE = SymbolUniverse([
+    # Index futures (Polygon takes the root and appends the front-month suffix)
+    _future('ES', 'S&P 500 Futures', 'ES=F', 'CME_MINI:ES1!', ('futures', 'risk')),
+    _future('NQ', 'NASDAQ Futures', 'NQ=F', 'CME_MINI:NQ1!', ('futures', 'risk')),
+    _future('RTY', 'Russell 2000 Futures', 'RTY=F', 'CME_MINI:RTY1!', ('futures', 'risk')),
+    _future('YM', 'Dow Futures', 'YM=F', 'CBOT_MINI:YM1!'),
+
+    # Index ETFs, shown under the index name in the previous-close table
+    _etf('SPY', 'S&P 500 ETF', 'equity_etf', ('major_etfs', 'previous_close', 'risk'),
+         {'previous_close': 'S&P 500'}),
+    _etf('QQQ', 'NASDAQ ETF', 'equity_etf', ('major_etfs', 'previous_close', 'risk'),
+         {'previous_close': 'NASDAQ Composite'}),
+    _etf('IWM', 'Russell 2000 ETF', 'equity_etf', ('major_etfs', 'previous_close', 'risk'),
+         {'previous_close': 'Russell 2000'}),
+    _etf('DIA', 'Dow Jones ETF', 'equity_etf', ('major_etfs', 'previous_close'),
+         {'previous_close': 'Dow Jones Industrial Average'}),
+    _etf('TLT', '20Y Treasury ETF', 'rates', ('risk',)),
+    Instrument('VIX', 'VIX', 'volatility',
+               {'polygon': 'VIX', 'yfinance': '^VIX', 'alphavantage': 'VIX'}, ('previous_close', 'volatility')),
+
+    # Cash indices
+    _yahoo('SPX', 'S&P 500', 'equity_index', '^GSPC', ('indices',)),
+    _yahoo('COMP', 'NASDAQ', 'equity_index', '^IXIC', ('indices',)),
+    _yahoo('RUT', 'Russell 2000', 'equity_index', '^RUT', ('indices',)),
+    _yahoo('DJI', 'Dow Jones', 'equity_index', '^DJI', ('indices',)),
+
+    # International indices (Polygon uses country ETFs as proxies)
+    Instrument('N225', 'Nikkei 225', 'equity_index',
+               {'yfinance': '^N225', 'tradingview': 'TVC:NI225', 'polygon': 'EWJ'},
+               ('international',), {'etf_proxy': 'Japan (Nikkei)'}),
+    Instrument('HSI', 'Hang Seng', 'equity_index',
+               {'yfinance': '^HSI', 'tradingview': 'HKEX:HSI', 'polygon': 'EWH'},
+               ('international',), {'etf_proxy': 'Hong Kong (Hang Seng)'}),
+    Instrument('UKX', 'FTSE 100', 'equity_index',
+               {'yfinance': '^FTSE', 'tradingview': 'LSE:UKX', 'polygon': 'EWU'},
+               ('international',), {'etf_proxy': 'UK (FTSE)'}),
+    Instrument('DAX', 'DAX', 'equity_index',
+               {'yfinance': '^GDAXI', 'tradingview': 'XETR:DAX', 'polygon': 'EWG'},
+               ('international',), {'etf_proxy': 'Germany (DAX)'}),
+    Instrument('CAC', 'CAC 40', 'equity_index',
+               {'yfinance': '^FCHI', 'tradingview': 'EURONEXT:PX1', 'polygon': 'EWQ'},
+               ('international',), {'etf_proxy': 'France (CAC)'}),
+
+    # Currencies
+    _yahoo('EURUSD', 'EUR/USD', 'fx', 'EURUSD=X', ('currencies', 'risk')),
+    _yahoo('GBPUSD', 'GBP/USD', 'fx', 'GBPUSD=X', ('currencies',)),
+    _yahoo('USDJPY', 'USD/JPY', 'fx', 'USDJPY=X', ('currencies', 'risk')),
+    _yahoo('DXY', 'DXY Index', 'fx', 'DX-Y.NYB', ('currencies', 'risk')),
+
+    # Commodities
+    _yahoo('GC', 'Gold', 'commodity', 'GC=F', ('commodities', 'risk')),
+    _yahoo('CL', 'Crude Oil', 'commodity', 'CL=F', ('commodities', 'risk')),
+    _yahoo('SI', 'Silver', 'commodity', 'SI=F', ('commodities',)),
+    _yahoo('HG', 'Copper', 'commodity', 'HG=F', ('commodities', 'risk')),
+
+    # Sector ETFs for rotation analysis
+    _sector('XLK', 'Technology'),
+    _sector('XLF', 'Financial'),
+    _sector('XLE', 'Energy'),
+    _sector('XLV', 'Healthcare'),
+    _sector('XLI', 'Industrial'),
+    _sector('XLP', 'Consumer Staples'),
+    _sector('XLY', 'Consumer Discretionary'),
+    _sector('XLU', 'Utilities'),
+    _sector('XLB', 'Materials'),
+    _sector('XLRE', 'Real Estate'),
+
+    # Crypto (TradingView only)
+    _crypto('BTC', 'Bitcoin', 'BINANCE:BTCUSDT'),
+    _crypto('ETH', 'Ethereum', 'BINANCE:ETHUSDT'),
+    _crypto('ADA', 'Cardano', 'BINANCE:ADAUSDT'),
+    _crypto('SOL', 'Solana', 'BINANCE:SOLUSDT')
+])
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Run Tracing
+===========
+
+Nested timing spans for one report run (sources, collector calls, HTTP requests, analyzers, renderers, uploads)
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Any, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+STAGE, SOURCE, COLLECTOR, HTTP, ANALYZER, RENDER, UPLOAD = (
+    'stage', 'source', 'collector', 'http', 'analyzer', 'render', 'upload'
+)
+
+# Span kinds the critical path descends into; other spans are reported as one step
+GROUP_KINDS = {STAGE, SOURCE}
+
+SLOWEST_REQUESTS = 5
+
+class Span:
+    """One timed step; children started while it is current are nested under it"""
+
+    __slots__ = ('name', 'kind', 'attrs', 'start_ns', 'end_ns', 'error', 'children')
+
+    def __init__(self, name: str, kind: str = STAGE, attrs: Dict[str, Any] = None):
+        self.name = name
+        self.kind = kind
+        self.attrs = attrs or {}
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self.children: List['Span'] = []
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def finish(self, error: BaseException = None):
+        if self.end_ns is None:
+            self.end_ns = time.perf_counter_ns()
+        if error is not None and self.error is None:
+            self.error = f"{type(error).__name__}: {error}" if str(error) else type(error).__name__
+
+    def end(self) -> int:
+        """End time, or now while the span is still open"""
+        return self.end_ns if self.end_ns is not None else time.perf_counter_ns()
+
+    @property
+    def seconds(self) -> float:
+        return (self.end() - self.start_ns) / 1e9
+
+    def walk(self) -> Iterator['Span']:
+        yield self
+        for child in self.children:
+            yield from child.walk()
+
+    def to_dict(self, origin_ns: int) -> Dict[str, Any]:
+        span = {
+            'name': self.name,
+            'kind': self.kind,
+            'start_ms': round((self.start_ns - origin_ns) / 1e6, 3),
+            'duration_ms': round(self.seconds * 1000, 3)
+        }
+        if self.attrs:
+            span['attrs'] = self.attrs
+        if self.error:
+            span['error'] = self.error
+        if self.children:
+            span['children'] = [child.to_dict(origin_ns) for child in self.children]
+        return span
+
+class Trace:
+    """Span tree for one run, with a timing breakdown and critical-path summary"""
+
+    def __init__(self, name: str, **attrs):
+        self.started_at = datetime.now(timezone.utc).isoformat()
+        self.root = Span(name, STAGE, attrs)
+
+    def critical_path(self, span: Span = None) -> List[Span]:
+        """The chain of steps that determined when the run (or span) finished"""
+
+        span = span or self.root
+        chain = []
+        cursor = span.end()
+        # Walk back from the end: the latest-finishing child before the cursor, then what preceded it
+        children = [child for child in span.children if child.end() > child.start_ns]
+        while True:
+            previous = [child for child in children if child.end() <= cursor and child not in chain]
+            if not previous:
+                break
+            step = max(previous, key=Span.end)
+            chain.append(step)
+            cursor = step.start_ns
+
+        path = []
+        for step in reversed(chain):
+            if step.kind in GROUP_KINDS and step.children:
+                path.extend(self.critical_path(step) or [step])
+            else:
+                path.append(step)
+        return path
+
+    def summary(self) -> Dict[str, Any]:
+        """Totals per stage and kind, HTTP counts, slowest requests and the critical path"""
+
+        spans = list(self.root.walk())[1:]
+        requests = [span for span in spans if span.kind == HTTP]
+        by_kind: Dict[str, Dict[str, float]] = {}
+        for span in spans:
+            totals = by_kind.setdefault(span.kind, {'count': 0, 'seconds': 0.0})
+            totals['count'] += 1
+            totals['seconds'] += span.seconds
+
+        path = self.critical_path()
+        return {
+            'total_seconds': round(self.root.seconds, 3),
+            'stages': {child.name: round(child.seconds, 3) for child in self.root.children},
+            'by_kind': {kind: {'count': totals['count'], 'seconds': round(totals['seconds'], 3)}
+                        for kind, totals in by_kind.items()},
+            'http': {
+                'requests': sum(1 for span in requests if not span.attrs.get('cache_hit')),
+                'cache_hits': sum(1 for span in requests if span.attrs.get('cache_hit')),
+                'bytes': sum(span.attrs.get('bytes', 0) for span in requests),
+                'errors': sum(1 for span in requests if span.error or span.attrs.get('status', 0) >= 400)
+            },
+            'slowest_requests': [
+                {'name': span.name, 'seconds': round(span.seconds, 3), **span.attrs}
+                for span in sorted(requests, key=lambda span: span.seconds, reverse=True)[:SLOWEST_REQUESTS]
+            ],
+            'critical_path': [{'name': step.name, 'kind': step.kind, 'seconds': round(step.seconds, 3)}
+                              for step in path],
+            'summary': "critical path: " + " → ".join(f"{step.name} {step.seconds:.1f}s" for step in path)
+        }
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at,
+            'summary': self.summary(),
+            'root': self.root.to_dict(self.root.start_ns)
+        }
+
+    def save(self, path: str) -> str:
+        """Write the span tree as JSON (may be called again as later stages finish)"""
+
+        path = Path(path)
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=1, default=str)
+        os.replace(tmp_path, path)
+        return str(path)
+
+# Notified as span() blocks start and finish, inside or outside a trace (the run profiler)
+_observers: List[Any] = []
+
+def add_observer(observer: Any):
+    """Register an object with span_started(span) and span_finished(span) methods"""
+    _observers.append(observer)
+
+def remove_observer(observer: Any):
+    if observer in _observers:
+        _observers.remove(observer)
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('trace_span', default=None)
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar('trace', default=None)
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+@contextmanager
+def trace(name: str, **attrs) -> Iterator[Trace]:
+    """Trace the block as one run, or join the run already being traced"""
+
+    active = _current_trace.get()
+    if active is not None:
+        yield active
+        return
+
+    run = Trace(name, **attrs)
+    trace_token = _current_trace.set(run)
+    span_token = _current_span.set(run.root)
+    try:
+        yield run
+    finally:
+        run.root.finish()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+
+def start_span(name: str, kind: str = STAGE, **attrs) -> Optional[Span]:
+    """Child of the current span that the caller finishes itself; None outside a trace"""
+
+    parent = _current_span.get()
+    if parent is None:
+        return None
+    child = Span(name, kind, attrs)
+    parent.children.append(child)
+    return child
+
+@contextmanager
+def span(name: str, kind: str = STAGE, **attrs) -> Iterator[Span]:
+    """Time the block as a child of the current span (a detached span outside a trace)"""
+
+    child = start_span(name, kind, **attrs) or Span(name, kind, attrs)
+    token = _current_span.set(child)
+    for observer in _observers:
+        observer.span_started(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.finish(e)
+        raise
+    finally:
+        child.finish()
+        _current_span.reset(token)
+        for observer in _observers:
+            observer.span_finished(child)
+
+def event(name: str, kind: str = STAGE, **attrs):
+    """Record an instantaneous step, e.g. a cache hit"""
+
+    child = start_span(name, kind, **attrs)
+    if child is not None:
+        child.end_ns = child.start_ns
+
+def traced(name: str = None, kind: str = STAGE):
+    """Decorator timing each call of a function or coroutine function as a span"""
+
+    def decorate(func):
+        label = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(label, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label, kind):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorate
+
+def http_trace_config() -> 'aiohttp.TraceConfig':
+    """aiohttp hooks recording a span per request with host, status, bytes and latency"""
+
+    import aiohttp
+
+    async def on_request_start(session, context, params):
+        # Rerouted requests (the stand-in) pass the provider's host as trace_request_ctx
+        url = params.url
+        host = (context.trace_request_ctx or {}).get('host', url.host)
+        context.span = start_span(f"{params.method} {host}", HTTP, host=host, path=url.path,
+                                  method=params.method, cache_hit=False, bytes=0)
+
+    async def on_request_end(session, context, params):
+        if context.span is not None:
+            context.span.set(status=params.response.status)
+            context.span.finish()
+
+    async def on_request_exception(session, context, params):
+        if context.span is not None:
+            context.span.finish(params.exception)
+
+    async def on_response_chunk_received(session, context, params):
+        # Body chunks arrive after the headers, so latency stays time-to-headers
+        if getattr(context, 'span', None) is not None:
+            context.span.attrs['bytes'] += len(params.chunk)
+
+    config = aiohttp.TraceConfig()
+    config.on_request_start.append(on_request_start)
+    config.on_request_end.append(on_request_end)
+    config.on_request_exception.append(on_request_exception)
+    config.on_response_chunk_received.append(on_response_chunk_received)
+    return config
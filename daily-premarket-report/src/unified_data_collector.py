@@ -9,22 +9,34 @@ Integrates FRED, Alpha Vantage, and Polygon.io APIs for comprehensive market dat
 import asyncio
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional, Tuple
+from typing import Dict, List, Any, Iterable, Optional, Tuple
 
 try:
+    from . import clock
     from .fred_data_collector import FREDDataCollector
     from .alphavantage_collector import AlphaVantageCollector
     from .polygon_collector import PolygonCollector
-    from .report_generator import MarketData, NewsItem
+    from .market_data import MarketData, NewsItem, now_ns
+    from .sector_rotation import SectorRotationEngine
+    from .quote_racer import QuoteRacer
+    from .bar_store import fetch_yfinance_bars
+    from .response_cache import BAR_TTL
+    from .symbol_universe import UNIVERSE, Instrument
 except ImportError:
     # For direct execution
     import sys
     import os
     sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+    import clock
     from fred_data_collector import FREDDataCollector
     from alphavantage_collector import AlphaVantageCollector
     from polygon_collector import PolygonCollector
-    from report_generator import MarketData, NewsItem
+    from market_data import MarketData, NewsItem, now_ns
+    from sector_rotation import SectorRotationEngine
+    from quote_racer import QuoteRacer
+    from bar_store import fetch_yfinance_bars
+    from response_cache import BAR_TTL
+    from symbol_universe import UNIVERSE, Instrument
 
 logger = logging.getLogger(__name__)
 
@@ -36,6 +48,10 @@ class UnifiedDataCollector:
         self.fred = FREDDataCollector(fred_key)
         self.alphavantage = AlphaVantageCollector(alphavantage_key)
         self.polygon = PolygonCollector(polygon_key)
+        self.rotation_engine = SectorRotationEngine(benchmark='SPY')
+        
+        # Polygon first, hedged to yfinance and then Alpha Vantage when it runs slow
+        self.quote_racer = QuoteRacer()
         
         logger.info("Unified Data Collector initialized with all three APIs")
     
@@ -83,31 +99,26 @@ class UnifiedDataCollector:
         }
         
         try:
-            # Try Polygon.io first for real-time data
-            logger.info("Attempting to get market data from Polygon.io...")
-            polygon_close = await self.polygon.get_previous_close_data()
+            # Race providers for previous closes and overnight futures at the same time
+            logger.info("Resolving previous closes and futures across providers...")
+            previous_close, futures_data = await asyncio.gather(
+                self.resolve_previous_closes(), self.resolve_overnight_futures()
+            )
             
-            if polygon_close:
-                market_data['previous_close'] = polygon_close
-                logger.info(f"Got {len(polygon_close)} closing prices from Polygon.io")
+            if previous_close:
+                market_data['previous_close'] = previous_close
+                logger.info(f"Got {len(previous_close)} closing prices")
             
             # Get Alpha Vantage market data as backup/supplement
             logger.info("Getting market data from Alpha Vantage...")
-            major_symbols = ['SPY', 'QQQ', 'DIA', 'IWM', 'VIX']
+            major_symbols = UNIVERSE.plan(['major_etfs', 'volatility'], 'alphavantage')
             av_market_data = await self.alphavantage.get_market_data(major_symbols)
             
             if av_market_data:
                 # Convert Alpha Vantage data to our format
                 for symbol, data in av_market_data.items():
-                    name_mapping = {
-                        'SPY': 'S&P 500 ETF',
-                        'QQQ': 'NASDAQ ETF', 
-                        'DIA': 'Dow Jones ETF',
-                        'IWM': 'Russell 2000 ETF',
-                        'VIX': 'VIX'
-                    }
-                    
-                    friendly_name = name_mapping.get(symbol, symbol)
+                    instrument = UNIVERSE.lookup('alphavantage', symbol)
+                    friendly_name = instrument.name if instrument else symbol
                     market_data['current_prices'][friendly_name] = data
                 
                 logger.info(f"Got {len(av_market_data)} current prices from Alpha Vantage")
@@ -117,11 +128,9 @@ class UnifiedDataCollector:
                 market_data['previous_close'] = market_data['current_prices']
                 logger.info("Using Alpha Vantage current prices as previous close data")
             
-            # Try to get overnight futures from Polygon
-            futures_data = await self.polygon.get_overnight_futures()
             if futures_data:
                 market_data['overnight_futures'] = futures_data
-                logger.info(f"Got {len(futures_data)} futures contracts from Polygon.io")
+                logger.info(f"Got {len(futures_data)} futures contracts")
             
             # Try to get international markets from Polygon
             intl_data = await self.polygon.get_international_markets()
@@ -136,6 +145,77 @@ class UnifiedDataCollector:
         
         return market_data
     
+    async def resolve_previous_closes(self) -> Dict[str, MarketData]:
+        """Previous session closes, first valid provider per symbol"""
+        
+        async def resolve(instrument: Instrument):
+            polygon, yahoo, av = (instrument.symbol(p) for p in ('polygon', 'yfinance', 'alphavantage'))
+            providers = [
+                ('polygon', lambda: self.polygon.get_previous_close_quote(polygon)),
+                ('yfinance', lambda: self._yfinance_quote(yahoo, session_change=True)),
+                ('alphavantage', lambda: self.alphavantage.get_quote(av))
+            ]
+            name = instrument.display('previous_close')
+            resolved = await self.quote_racer.resolve(instrument.key, providers)
+            if resolved:
+                provider, quote = resolved
+                logger.debug(f"{instrument.key} previous close from {provider}")
+                return name, quote
+            return name, None
+        
+        results = await asyncio.gather(*(resolve(instrument) for instrument in UNIVERSE.group('previous_close')))
+        return {name: quote for name, quote in results if quote}
+    
+    async def resolve_overnight_futures(self) -> Dict[str, MarketData]:
+        """Overnight futures, first valid provider per contract"""
+        
+        async def resolve(instrument: Instrument):
+            providers = [
+                ('polygon', lambda: self.polygon.get_future_quote(instrument.symbol('polygon'))),
+                ('yfinance', lambda: self._yfinance_quote(instrument.symbol('yfinance')))
+            ]
+            resolved = await self.quote_racer.resolve(instrument.key, providers)
+            return instrument.name, resolved[1] if resolved else None
+        
+        results = await asyncio.gather(*(resolve(instrument) for instrument in UNIVERSE.group('futures')))
+        return {name: quote for name, quote in results if quote}
+    
+    async def get_watchlist_quotes(self, symbols: Iterable[str]) -> Dict[str, MarketData]:
+        """Previous session quotes for watchlist symbols (keyed by symbol), first valid provider per symbol"""
+        
+        async def resolve(symbol: str):
+            providers = [
+                ('polygon', lambda: self.polygon.get_previous_close_quote(symbol)),
+                ('yfinance', lambda: self._yfinance_quote(symbol, session_change=True)),
+                ('alphavantage', lambda: self.alphavantage.get_quote(symbol))
+            ]
+            resolved = await self.quote_racer.resolve(symbol, providers)
+            return symbol, resolved[1] if resolved else None
+        
+        results = await asyncio.gather(*(resolve(symbol) for symbol in symbols))
+        return {symbol: quote for symbol, quote in results if quote}
+    
+    async def _yfinance_quote(self, symbol: str, session_change: bool = False) -> Optional[MarketData]:
+        """Latest daily bar from yfinance via the bar store (the blocking call runs on a thread)"""
+        
+        bars = await fetch_yfinance_bars(self.polygon.bar_store, symbol, '5d')
+        if len(bars) == 0:
+            return None
+        
+        last = bars[-1]
+        # Previous close quotes compare close to open like Polygon; futures compare to the prior close
+        base = float(last['o']) if session_change else float(bars[-2]['c']) if len(bars) > 1 else float(last['c'])
+        change = float(last['c']) - base
+        
+        return MarketData(
+            symbol=symbol,
+            current_price=round(float(last['c']), 2),
+            change=round(change, 2),
+            change_percent=round((change / base) * 100, 2) if base else 0.0,
+            volume=int(last['v']),
+            timestamp=now_ns()
+        )
+    
     async def get_enhanced_news_and_sentiment(self) -> Tuple[List[NewsItem], List[str]]:
         """Get news with sentiment analysis and themes from Alpha Vantage"""
         
@@ -159,7 +239,51 @@ class UnifiedDataCollector:
         """Get sector rotation data from available sources"""
         
         try:
-            # Try Polygon.io for sector ETF data
+            # Multi-horizon analysis over the stored price matrix
+            sector_etfs = self.polygon.sector_etfs
+            matrix = await self.polygon.get_price_matrix(
+                list(sector_etfs) + [self.rotation_engine.benchmark], max_age=BAR_TTL
+            )
+            # The stored matrix runs to the latest bar; a past report only sees sessions closed by its as-of time
+            analysis = self.rotation_engine.analyze(matrix, sector_etfs, end_date=clock.last_session_date())
+            
+            weekly_performance = {}
+            for sector, data in analysis['sectors'].items():
+                if data['returns'].get('1w') is None:
+                    continue
+                weekly_performance[sector] = {
+                    'weekly_return': data['returns']['1w'],
+                    'current_price': data['current_price'],
+                    'volume_trend': data['volume_trend'],
+                    'relative_strength': data['relative_strength'],
+                    'rank_change': data['rank_change'].get('1w', 0),
+                    'start_date': data['start_date'],
+                    'end_date': data['end_date']
+                }
+            
+            if len(weekly_performance) >= 3:
+                # Calculate leaders and laggards
+                sorted_sectors = sorted(weekly_performance.items(), key=lambda x: x[1]['weekly_return'], reverse=True)
+                
+                rotation_analysis = {
+                    'weekly_performance': weekly_performance,
+                    'leaders': sorted_sectors[:3],
+                    'laggards': sorted_sectors[-3:],
+                    'rotation_strength': self._calculate_rotation_strength(weekly_performance),
+                    'benchmark': analysis['benchmark'],
+                    'as_of': analysis['as_of'],
+                    'horizons': analysis['horizons'],
+                    'sectors': analysis['sectors']
+                }
+                
+                logger.info(f"Got multi-horizon sector rotation data for {len(weekly_performance)} sectors from Polygon.io")
+                return rotation_analysis
+            
+        except Exception as e:
+            logger.error(f"Error getting multi-horizon sector rotation data: {e}")
+        
+        try:
+            # Fall back to the plain weekly sector ETF returns
             sector_data = await self.polygon.get_sector_etf_data()
             
             if sector_data and len(sector_data) >= 3:
@@ -169,7 +293,9 @@ class UnifiedDataCollector:
                     weekly_performance[sector] = {
                         'weekly_return': data['weekly_return'],
                         'current_price': data['current_price'],
-                        'volume_trend': 'increasing'  # Would need more data to determine
+                        'volume_trend': 'unknown',
+                        'start_date': data['start_date'],
+                        'end_date': data['end_date']
                     }
                 
                 # Calculate leaders and laggards
@@ -192,23 +318,28 @@ class UnifiedDataCollector:
         logger.warning("Sector rotation data not available")
         return {"weekly_performance": {}, "leaders": [], "laggards": [], "rotation_strength": "unknown"}
     
-    async def get_earnings_calendar(self) -> List[Dict[str, Any]]:
-        """Get earnings calendar from Alpha Vantage"""
+    async def get_earnings_calendar(self, symbols: Iterable[str] = None, limit: Optional[int] = 10) -> List[Dict[str, Any]]:
+        """Get earnings calendar from Alpha Vantage, optionally only for some symbols (limit None keeps every release)"""
         
         try:
-            earnings_data = await self.alphavantage.get_earnings_calendar()
+            calendar = await self.alphavantage.get_earnings_index()
             
-            if earnings_data:
+            if len(calendar):
+                # Indexed lookup in the day's parsed calendar, soonest releases first; a loaded calendar
+                # with no releases for these symbols is an empty selection, not an outage
+                earnings_data = calendar.select(clock.today(), symbols=list(symbols) if symbols is not None else None,
+                                                limit=limit)
+                
                 # Convert to our format
                 formatted_earnings = []
-                for earning in earnings_data[:10]:  # Limit to 10
+                for earning in earnings_data:
                     formatted_earnings.append({
                         'symbol': earning.get('symbol', ''),
-                        'company_name': earning.get('name', ''),
+                        'company_name': earning.get('company_name', ''),
                         'date': earning.get('report_date', ''),
                         'day_of_week': self._get_day_of_week(earning.get('report_date', '')),
                         'timing': 'AMC',  # Alpha Vantage doesn't specify timing
-                        'market_cap': 'Large',  # Assume large cap for now
+                        'market_cap': earning.get('market_cap'),
                         'sector': 'Technology'  # Would need additional lookup
                     })
                 
@@ -258,7 +389,7 @@ class UnifiedDataCollector:
                 change=4.95,
                 change_percent=0.79,
                 volume=45000000,
-                timestamp=datetime.now().isoformat()
+                timestamp=now_ns()
             ),
             'NASDAQ': MarketData(
                 symbol='QQQ',
@@ -266,7 +397,7 @@ class UnifiedDataCollector:
                 change=5.41,
                 change_percent=0.98,
                 volume=32000000,
-                timestamp=datetime.now().isoformat()
+                timestamp=now_ns()
             ),
             'Russell 2000': MarketData(
                 symbol='IWM',
@@ -274,7 +405,7 @@ class UnifiedDataCollector:
                 change=1.23,
                 change_percent=0.53,
                 volume=18000000,
-                timestamp=datetime.now().isoformat()
+                timestamp=now_ns()
             ),
             'Dow Jones': MarketData(
                 symbol='DIA',
@@ -282,7 +413,7 @@ class UnifiedDataCollector:
                 change=2.14,
                 change_percent=0.48,
                 volume=12000000,
-                timestamp=datetime.now().isoformat()
+                timestamp=now_ns()
             ),
             'VIX': MarketData(
                 symbol='VIX',
@@ -290,7 +421,7 @@ class UnifiedDataCollector:
                 change=-1.25,
                 change_percent=-6.25,
                 volume=0,
-                timestamp=datetime.now().isoformat()
+                timestamp=now_ns()
             )
         }
     
@@ -302,7 +433,7 @@ class UnifiedDataCollector:
                 headline="Federal Reserve Maintains Current Policy Stance",
                 summary="The Federal Reserve held interest rates steady in their latest policy decision, citing continued assessment of economic conditions and inflation trends.",
                 source="Federal Reserve Communications",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=8.5
             ),
@@ -310,7 +441,7 @@ class UnifiedDataCollector:
                 headline="Technology Sector Shows Continued Strength",
                 summary="Major technology companies demonstrate resilient performance with strong fundamentals and continued investment in artificial intelligence capabilities.",
                 source="Market Analysis",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="positive",
                 impact_score=7.8
             ),
@@ -318,7 +449,7 @@ class UnifiedDataCollector:
                 headline="Energy Markets React to Global Supply Updates",
                 summary="Oil prices fluctuated following international supply chain developments and geopolitical factors affecting global energy markets.",
                 source="Energy Markets Report",
-                timestamp=datetime.now().isoformat(),
+                timestamp=now_ns(),
                 sentiment="neutral",
                 impact_score=7.1
             )
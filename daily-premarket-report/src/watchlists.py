@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Watchlists
+==========
+
+Per-PM watchlists: one shared collection pass over their union, then a filtered report view and render per watchlist
+"""
+
+import json
+import logging
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Any, Iterable, Optional, Tuple
+
+try:
+    from .market_data import NewsItem, ReportData
+    from .symbol_universe import UNIVERSE
+except ImportError:
+    from market_data import NewsItem, ReportData
+    from symbol_universe import UNIVERSE
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = min(4, os.cpu_count() or 1)
+
+# Releases listed in a view (the single report's earnings limit)
+EARNINGS_LIMIT = 10
+
+@dataclass(frozen=True)
+class Watchlist:
+    """One recipient's focus: symbols, sectors and the companies whose earnings they follow"""
+    name: str
+    symbols: Tuple[str, ...] = ()
+    sectors: Tuple[str, ...] = ()  # sector names or sector ETF symbols; empty keeps every sector
+    earnings_focus: Tuple[str, ...] = ()  # empty follows the watchlist symbols
+    recipients: Tuple[str, ...] = ()
+
+    @property
+    def slug(self) -> str:
+        return re.sub(r'[^a-z0-9]+', '_', self.name.lower()).strip('_') or 'watchlist'
+
+    @property
+    def earnings_symbols(self) -> Tuple[str, ...]:
+        return self.earnings_focus or self.symbols
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Watchlist':
+        return cls(
+            name=data['name'],
+            symbols=tuple(symbol.upper() for symbol in data.get('symbols', [])),
+            sectors=tuple(data.get('sectors', [])),
+            earnings_focus=tuple(symbol.upper() for symbol in data.get('earnings_focus', [])),
+            recipients=tuple(data.get('recipients', []))
+        )
+
+def load_watchlists(path: str = None) -> List[Watchlist]:
+    """Watchlists from a JSON file ({"watchlists": [...]} or a bare list); WATCHLISTS_FILE by default"""
+
+    path = path or os.getenv('WATCHLISTS_FILE', 'watchlists.json')
+    try:
+        with open(path, 'r') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        logger.warning(f"No watchlists file at {path}")
+        return []
+    except Exception as e:
+        logger.error(f"Could not read watchlists from {path}: {e}")
+        return []
+
+    watchlists = []
+    for entry in data.get('watchlists', []) if isinstance(data, dict) else data:
+        try:
+            watchlists.append(Watchlist.from_dict(entry))
+        except (KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"Skipping malformed watchlist {entry!r}: {e}")
+
+    slugs = [watchlist.slug for watchlist in watchlists]
+    duplicates = {slug for slug in slugs if slugs.count(slug) > 1}
+    if duplicates:
+        logger.warning(f"Watchlists share output names {sorted(duplicates)}; later ones overwrite earlier renders")
+    return watchlists
+
+def _union(groups: Iterable[Iterable[str]]) -> List[str]:
+    seen = {}
+    for group in groups:
+        for item in group:
+            seen.setdefault(item, None)
+    return list(seen)
+
+def union_symbols(watchlists: Iterable[Watchlist]) -> List[str]:
+    """Every watchlist symbol once, in first-seen order"""
+    return _union(watchlist.symbols for watchlist in watchlists)
+
+def union_earnings_symbols(watchlists: Iterable[Watchlist]) -> List[str]:
+    return _union(watchlist.earnings_symbols for watchlist in watchlists)
+
+def _sector_names(sectors: Iterable[str]) -> set:
+    # Sector ETF symbols (XLK) and sector names (Technology) both select the sector
+    names = set()
+    for sector in sectors:
+        instrument = UNIVERSE.lookup('polygon', sector.upper())
+        names.add(instrument.name if instrument and 'sectors' in instrument.groups else sector)
+    return names
+
+def sector_rotation_view(sector_rotation: Dict[str, Any], sectors: Iterable[str], strength) -> Dict[str, Any]:
+    """The rotation analysis narrowed to some sectors, leaders and laggards re-ranked among them"""
+
+    wanted = _sector_names(sectors)
+    weekly = sector_rotation.get('weekly_performance', {})
+    if not wanted or not weekly:
+        return sector_rotation
+
+    weekly = {sector: data for sector, data in weekly.items() if sector in wanted}
+    ranked = sorted(weekly.items(), key=lambda item: item[1]['weekly_return'], reverse=True)
+    view = dict(sector_rotation, weekly_performance=weekly, leaders=ranked[:3], laggards=ranked[-3:],
+                rotation_strength=strength(weekly))
+    if 'sectors' in sector_rotation:
+        view['sectors'] = {sector: data for sector, data in sector_rotation['sectors'].items() if sector in wanted}
+    return view
+
+def earnings_view(earnings: List[Dict[str, Any]], symbols: Iterable[str], limit: int = EARNINGS_LIMIT) -> List[Dict[str, Any]]:
+    """Upcoming releases for the focus symbols (the whole calendar's first releases without a focus)"""
+
+    # The collector's error placeholder is passed through so the view reports the outage too
+    if any('ERROR' in earning for earning in earnings if isinstance(earning, dict)):
+        return earnings
+    wanted = set(symbols)
+    if not wanted:
+        return earnings[:limit]
+    return [earning for earning in earnings if earning.get('symbol') in wanted][:limit]
+
+def news_view(news_items: List[NewsItem], watchlist: Watchlist) -> List[NewsItem]:
+    """Shared news with stories naming a watchlist symbol or sector first (otherwise in collection order)"""
+
+    terms = [re.compile(rf"\b{re.escape(term)}\b") for term in watchlist.symbols + tuple(_sector_names(watchlist.sectors))]
+    if not terms:
+        return news_items
+
+    def mentions(item: NewsItem) -> bool:
+        text = f"{item.headline} {item.summary}"
+        return any(term.search(text) for term in terms)
+
+    return sorted(news_items, key=lambda item: not mentions(item))
+
+def watchlist_insight(watchlist: Watchlist, quotes: Dict[str, Any]) -> Optional[str]:
+    """One executive-summary line on how the watchlist closed"""
+
+    if not quotes:
+        return None
+    higher = sum(1 for quote in quotes.values() if quote.change > 0)
+    symbol, lead = max(quotes.items(), key=lambda item: abs(item[1].change_percent))
+    return (f"{watchlist.name} watchlist: {higher} of {len(quotes)} names closed higher, "
+            f"largest move {symbol} ({lead.change_percent:+.2f}%)")
+
+# One PDF renderer per worker process, reused for every watchlist it renders
+_worker_renderer = None
+
+def _init_worker(log_level: int):
+    """Create the worker's PDF renderer"""
+
+    global _worker_renderer
+    logging.basicConfig(level=log_level, format='%(asctime)s - %(processName)s - %(levelname)s - %(message)s')
+    try:
+        from .pdf_generator import PDFReportGenerator
+    except ImportError:
+        from pdf_generator import PDFReportGenerator
+    _worker_renderer = PDFReportGenerator()
+
+def _render_view(slug: str, report: ReportData, output_dir: str) -> Tuple[str, Dict[str, str], float]:
+    """Save and render one watchlist's report; returns (slug, {kind: path}, seconds)"""
+
+    try:
+        from . import report_codec
+    except ImportError:
+        import report_codec
+
+    started = time.perf_counter()
+    stem = Path(output_dir) / slug / f"premarket_report_{slug}_{report.date.replace('-', '')}"
+    stem.parent.mkdir(parents=True, exist_ok=True)
+    files = {
+        'report': report_codec.save(report, f"{stem}{report_codec.REPORT_SUFFIX}"),
+        'pdf': f"{stem}.pdf"
+    }
+    _worker_renderer.generate_pdf_report(report, files['pdf'])
+    return slug, files, time.perf_counter() - started
+
+def render_views(reports: Dict[str, ReportData], output_dir: str = "reports/watchlists",
+                 workers: int = DEFAULT_WORKERS) -> Dict[str, Any]:
+    """Save and render every watchlist's report concurrently, one process per render (PDF layout is CPU-bound)"""
+
+    summary = {'rendered': {}, 'failed': {}}
+    if not reports:
+        return summary
+
+    started = time.perf_counter()
+    # spawn: workers start clean instead of inheriting the parent's threads and open sessions
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=min(max(1, workers), len(reports)), mp_context=context,
+                             initializer=_init_worker, initargs=(logging.getLogger().level,)) as pool:
+        futures = {pool.submit(_render_view, slug, report, output_dir): slug for slug, report in reports.items()}
+        for future in as_completed(futures):
+            slug = futures[future]
+            try:
+                _, files, seconds = future.result()
+            except Exception as e:
+                logger.error(f"Rendering the {slug} watchlist report failed: {e}")
+                summary['failed'][slug] = str(e)
+                continue
+            summary['rendered'][slug] = files
+            logger.info(f"Rendered {slug} watchlist report in {seconds:.1f}s")
+
+    summary['seconds'] = round(time.perf_counter() - started, 1)
+    return summary
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Test HTTP Replay
+================
+
+Cassette matching checks: exact replays, date-only fallbacks, and query-keyed requests that must not cross over
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from http_replay import CassetteStore, ReplaySession, REPLAY
+
+ALPHAVANTAGE = 'https://www.alphavantage.co/query'
+FRED = 'https://api.stlouisfed.org/fred/series/observations'
+POLYGON = 'https://api.polygon.io/v1/open-close/SPY/2024-01-05'
+
+def store_with(*recordings) -> CassetteStore:
+    """A temporary store holding (url, params, body text) recordings"""
+
+    store = CassetteStore(tempfile.mkdtemp())
+    for url, params, text in recordings:
+        store.save('GET', url, params, None, 200, 'OK', {'Content-Type': 'application/json'}, text.encode('utf-8'))
+    return store
+
+def body(entry) -> str:
+    return entry['body'] if entry else None
+
+def test_exact_match_ignores_credentials():
+    store = store_with((ALPHAVANTAGE, {'function': 'NEWS_SENTIMENT', 'apikey': 'recorded'}, 'news'))
+    entry = store.find('GET', ALPHAVANTAGE, {'function': 'NEWS_SENTIMENT', 'apikey': 'other'})
+    assert body(entry) == 'news'
+
+def test_different_function_gets_no_match():
+    """An Alpha Vantage function never replays another function's body"""
+
+    store = store_with((ALPHAVANTAGE, {'function': 'NEWS_SENTIMENT', 'apikey': 'x'}, 'news'))
+    assert store.find('GET', ALPHAVANTAGE, {'function': 'EARNINGS_CALENDAR', 'apikey': 'x'}) is None
+
+def test_different_series_gets_no_match():
+    store = store_with((FRED, {'series_id': 'DGS10', 'file_type': 'json'}, 'dgs10'))
+    assert store.find('GET', FRED, {'series_id': 'UNRATE', 'file_type': 'json'}) is None
+
+def test_dates_fall_back_to_latest_recording():
+    """Requests differing only in dates (path or query) replay the route's recording"""
+
+    store = store_with(
+        (FRED, {'series_id': 'DGS10', 'realtime_start': '2024-01-05'}, 'dgs10'),
+        (POLYGON, None, 'spy')
+    )
+    assert body(store.find('GET', FRED, {'series_id': 'DGS10', 'realtime_start': '2026-10-16'})) == 'dgs10'
+    assert body(store.find('GET', POLYGON.replace('2024-01-05', '2026-10-16'))) == 'spy'
+    assert store.find('GET', POLYGON.replace('SPY', 'QQQ')) is None
+
+def test_replay_session_refuses_unrecorded_function():
+    """The replaying session raises rather than serving a mismatched body"""
+
+    import aiohttp
+
+    store = store_with((ALPHAVANTAGE, {'function': 'NEWS_SENTIMENT'}, 'news'))
+
+    async def replay(function):
+        session = ReplaySession(None, REPLAY, store)
+        async with session.get(ALPHAVANTAGE, params={'function': function}) as response:
+            return await response.text()
+
+    assert asyncio.run(replay('NEWS_SENTIMENT')) == 'news'
+    try:
+        asyncio.run(replay('EARNINGS_CALENDAR'))
+    except aiohttp.ClientConnectionError:
+        pass
+    else:
+        raise AssertionError("EARNINGS_CALENDAR replayed the NEWS_SENTIMENT recording")
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith('test_') and callable(check):
+            check()
+            print(f"✅ {name}")
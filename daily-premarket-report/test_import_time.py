@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Test Import Time
+================
+
+Startup budget: the entry points and each subsystem import in isolation, without their heavy dependencies
+"""
+
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Loaded at the point of use (collection, parsing, rendering, audio), never at import
+HEAVY_MODULES = ('yfinance', 'pandas', 'matplotlib', 'seaborn', 'reportlab', 'openai', 'bs4')
+NETWORK_MODULES = ('aiohttp', 'requests')
+
+# module -> (modules it must not pull in, import budget in seconds)
+# The budgets are generous multiples of the measured times so slow CI machines don't flake
+BUDGETS = {
+    'main': (HEAVY_MODULES + NETWORK_MODULES + ('numpy',), 1.0),
+    'enhanced_main': (HEAVY_MODULES + NETWORK_MODULES + ('numpy',), 1.0),
+    'scheduler': (HEAVY_MODULES + NETWORK_MODULES, 1.5),
+    'integrated_scheduler': (HEAVY_MODULES + ('aiohttp',), 2.0),
+    'notion_integration': (HEAVY_MODULES + ('aiohttp',), 2.0),
+    'tracing': (HEAVY_MODULES + NETWORK_MODULES + ('numpy',), 0.5),
+    'profiling': (HEAVY_MODULES + NETWORK_MODULES + ('numpy',), 0.5),
+    'circuit_breaker': (HEAVY_MODULES + NETWORK_MODULES + ('numpy',), 0.5),
+    'async_scheduler': (HEAVY_MODULES + NETWORK_MODULES + ('numpy',), 0.5),
+    'market_data': (HEAVY_MODULES + NETWORK_MODULES, 1.0),
+    'report_archive': (HEAVY_MODULES + NETWORK_MODULES, 1.5),
+    'watchlists': (HEAVY_MODULES + NETWORK_MODULES, 1.0),
+    'news_stream': (HEAVY_MODULES + NETWORK_MODULES, 1.0),
+    'earnings_calendar': (HEAVY_MODULES + NETWORK_MODULES, 1.0),
+    'http_replay': (HEAVY_MODULES + NETWORK_MODULES, 1.5),
+    'report_generator': (HEAVY_MODULES, 3.0),
+    'pdf_generator': (tuple(name for name in HEAVY_MODULES if name != 'reportlab'), 3.0),
+    'audio_generator': (HEAVY_MODULES, 2.0),
+}
+
+PROBE = """
+import sys, time
+started = time.perf_counter()
+import {module}
+print(time.perf_counter() - started)
+print(' '.join(sorted(name for name in {forbidden!r} if name in sys.modules)))
+"""
+
+def measure_import(module: str, forbidden: tuple) -> tuple:
+    """Import the module in a fresh interpreter; returns (seconds, forbidden modules it loaded)"""
+
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, 'src')]))
+    result = subprocess.run(
+        [sys.executable, '-c', PROBE.format(module=module, forbidden=forbidden)],
+        cwd=ROOT, env=env, capture_output=True, text=True, timeout=120
+    )
+    assert result.returncode == 0, f"import {module} failed:\n{result.stderr}"
+    seconds, loaded = (result.stdout.splitlines() + ['', ''])[:2]
+    return float(seconds), loaded.split()
+
+def test_import_time():
+    """Every entry point and subsystem stays within its import budget"""
+
+    failures = []
+    for module, (forbidden, budget) in BUDGETS.items():
+        seconds, loaded = measure_import(module, forbidden)
+        print(f"{module:<22} {seconds * 1000:7.0f} ms  {' '.join(loaded)}")
+        if loaded:
+            failures.append(f"{module} imports {', '.join(loaded)}")
+        if seconds > budget:
+            failures.append(f"{module} took {seconds:.2f}s (budget {budget:.1f}s)")
+
+    assert not failures, "\n".join(failures)
+
+if __name__ == "__main__":
+    test_import_time()
+    print("✅ All modules within their import budgets")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Test News Stream
+================
+
+Behaviour checks for the streaming news collector: near-duplicate handling, top-k ranking, early stop and timeout
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from news_stream import NewsStream
+from market_data import NewsItem
+
+def story(headline: str, impact: float, source: str = 'Test') -> NewsItem:
+    return NewsItem(headline=headline, summary='', source=source, timestamp='', sentiment='neutral',
+                    impact_score=impact)
+
+def source(items, delay: float = 0.0):
+    """A news source returning items after delay seconds"""
+
+    async def fetch():
+        await asyncio.sleep(delay)
+        return list(items)
+    return fetch
+
+def impacts(items) -> list:
+    return [item.impact_score for item in items]
+
+def test_syndicated_duplicates_are_dropped():
+    """The same story under outlet attributions is kept once"""
+
+    stream = NewsStream({
+        'a': source([story("Fed holds rates steady as inflation cools - Reuters", 7)]),
+        'b': source([story("Fed holds rates steady as inflation cools | Bloomberg", 6),
+                     story("Oil slides on supply glut", 6)], delay=0.01)
+    })
+    top = asyncio.run(stream.take(5, timeout=5))
+
+    assert [item.headline for item in top] == ["Fed holds rates steady as inflation cools - Reuters",
+                                               "Oil slides on supply glut"]
+    assert stream.stats['b']['duplicates'] == 1
+
+def test_duplicate_replaced_by_higher_impact_version():
+    """A later, higher-impact copy of a story takes the original's place in the ranking"""
+
+    stream = NewsStream({
+        'a': source([story("Apple beats quarterly earnings expectations", 5, 'Wire')]),
+        'b': source([story("Apple beats quarterly earnings expectations - CNBC", 8, 'CNBC')], delay=0.01)
+    })
+    top = asyncio.run(stream.take(5, timeout=5))
+
+    assert len(top) == 1
+    assert (top[0].source, top[0].impact_score) == ('CNBC', 8)
+
+def test_whole_batch_is_ranked_before_stopping():
+    """Stopping at k stories ranks every story of the batch that crossed the threshold"""
+
+    stream = NewsStream({
+        'a': source([story("Apple beats earnings expectations", 7), story("Oil slides on supply glut", 6)]),
+        'b': source([story("Treasury yields jump after auction", 8), story("Retail sales flat in May", 5),
+                     story("Fed raises rates", 9), story("Fed cuts rates", 9)], delay=0.01)
+    }, k=3)
+    top = asyncio.run(stream.take(3, timeout=5))
+
+    assert impacts(top) == [9, 9, 8]
+
+def test_early_stop_cancels_slow_sources():
+    """Once k stories reach min_impact the stream returns without waiting for the rest"""
+
+    stream = NewsStream({
+        'fast': source([story("Fed raises rates", 9), story("Treasury yields jump after auction", 8),
+                        story("Oil slides on supply glut", 7)]),
+        'slow': source([story("Apple beats earnings expectations", 10)], delay=10)
+    }, k=3)
+    started = time.monotonic()
+    top = asyncio.run(stream.take(3, min_impact=5, timeout=30))
+
+    assert time.monotonic() - started < 2
+    assert impacts(top) == [9, 8, 7]
+    assert stream.stats['slow']['seconds'] is None
+
+def test_timeout_keeps_stories_gathered_so_far():
+    """Sources still running at the timeout are abandoned, not waited for"""
+
+    stream = NewsStream({
+        'fast': source([story("Oil slides on supply glut", 6)]),
+        'slow': source([story("Fed raises rates", 9)], delay=10)
+    })
+    started = time.monotonic()
+    top = asyncio.run(stream.take(5, timeout=0.2))
+
+    assert time.monotonic() - started < 2
+    assert [item.headline for item in top] == ["Oil slides on supply glut"]
+
+def test_error_placeholders_are_skipped():
+    """Collector outage items never reach the ranking"""
+
+    stream = NewsStream({'a': source([story("ERROR", 0, 'ERROR'), story("Oil slides on supply glut", 6)])})
+    assert [item.headline for item in asyncio.run(stream.take(5, timeout=5))] == ["Oil slides on supply glut"]
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith('test_') and callable(check):
+            check()
+            print(f"✅ {name}")
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Test Watchlist Earnings
+=======================
+
+Earnings views: a watchlist whose companies don't report soon gets an empty list, a failed calendar an outage
+"""
+
+import asyncio
+import os
+import sys
+from datetime import date, timedelta
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'src'))
+
+from earnings_calendar import EarningsCalendar, parse_text
+from unified_data_collector import UnifiedDataCollector
+from watchlists import Watchlist, earnings_view
+
+def upcoming_csv() -> str:
+    soon = (date.today() + timedelta(days=3)).isoformat()
+    later = (date.today() + timedelta(days=10)).isoformat()
+    return ("symbol,name,reportDate,fiscalDateEnding,estimate,currency\n"
+            f"AAPL,Apple Inc,{soon},2026-09-30,1.60,USD\n"
+            f"MSFT,Microsoft Corp,{later},2026-09-30,3.10,USD\n")
+
+class CalendarSource:
+    """Stands in for the Alpha Vantage collector with an already parsed calendar"""
+
+    def __init__(self, calendar: EarningsCalendar):
+        self.calendar = calendar
+
+    async def get_earnings_index(self) -> EarningsCalendar:
+        return self.calendar
+
+def collector_with(calendar: EarningsCalendar) -> UnifiedDataCollector:
+    collector = UnifiedDataCollector.__new__(UnifiedDataCollector)
+    collector.alphavantage = CalendarSource(calendar)
+    return collector
+
+def test_watchlist_without_upcoming_releases_gets_empty_view():
+    """Quarterly reporters outside the horizon are no releases, not a data outage"""
+
+    watchlist = Watchlist(name="Energy", symbols=("XOM", "CVX"))
+    collector = collector_with(EarningsCalendar(parse_text(upcoming_csv())))
+    earnings = asyncio.run(collector.get_earnings_calendar(symbols=watchlist.earnings_symbols, limit=None))
+
+    assert earnings == []
+    assert earnings_view(earnings, watchlist.earnings_symbols) == []
+
+def test_watchlist_with_upcoming_releases():
+    watchlist = Watchlist(name="Tech Desk", symbols=("AAPL", "NVDA"))
+    collector = collector_with(EarningsCalendar(parse_text(upcoming_csv())))
+    earnings = asyncio.run(collector.get_earnings_calendar(symbols=("AAPL", "MSFT", "XOM"), limit=None))
+
+    assert [earning['symbol'] for earning in earnings] == ['AAPL', 'MSFT']
+    assert [earning['symbol'] for earning in earnings_view(earnings, watchlist.earnings_symbols)] == ['AAPL']
+
+def test_failed_calendar_still_reports_outage():
+    """An empty calendar (fetch failed or rate limited) keeps the ERROR placeholder for every view"""
+
+    watchlist = Watchlist(name="Energy", symbols=("XOM",))
+    earnings = asyncio.run(collector_with(EarningsCalendar([])).get_earnings_calendar(symbols=watchlist.symbols))
+
+    assert earnings == [{"ERROR": "No real earnings calendar data available"}]
+    assert earnings_view(earnings, watchlist.earnings_symbols) == earnings
+
+if __name__ == "__main__":
+    for name, check in list(globals().items()):
+        if name.startswith('test_') and callable(check):
+            check()
+            print(f"✅ {name}")